@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# scripts/benchmark_tgs_render.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Benchmark animated sticker (TGS) to MP4 conversion: frames per second and peak RSS.
+
+Each mode converts every sticker in a fresh subprocess so peak RSS is measured
+per mode:
+- legacy: the previous pipeline (SVG -> cairosvg PNG bytes -> PIL -> numpy,
+  per-frame alpha compositing, all frames kept for imageio.mimsave)
+- direct: cairosvg rasterizes into a preallocated frame stack, the stack is
+  composited in one pass and frames stream into the encoder (in-process)
+- pool: the direct path with frames rendered in TGS_RENDER_WORKERS processes
+
+Peak RSS for the pool mode includes the largest worker process.
+
+Expected usage:
+    python scripts/benchmark_tgs_render.py                      # samples/media/*.tgs
+    python scripts/benchmark_tgs_render.py sticker1.tgs sticker2.tgs --fps 8
+    python scripts/benchmark_tgs_render.py --modes direct pool --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to path so we can import modules
+SRC_DIR = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+SAMPLES_MEDIA_DIR = Path(__file__).parent.parent / "samples" / "media"
+
+MODES = ("legacy", "direct", "pool")
+
+
+def _legacy_convert(tgs_path: Path, output_path: Path, size: int, target_fps: float) -> int:
+    """The conversion as it was before frames were rasterized into a shared stack."""
+    import cairosvg
+    import imageio
+    import numpy as np
+    from lottie.exporters import svg
+    from PIL import Image
+
+    from media.tgs_converter import _load_animation, _plan_frames
+
+    animation = _load_animation(tgs_path, size, size)
+    frames = []
+    for frame in _plan_frames(animation, size, size, None, target_fps):
+        svg_buffer = io.StringIO()
+        svg.export_svg(animation, svg_buffer, frame=frame)
+        png_data = cairosvg.svg2png(
+            bytestring=svg_buffer.getvalue().encode("utf-8"), output_width=size, output_height=size
+        )
+        frames.append(np.array(Image.open(io.BytesIO(png_data))))
+    rgb_frames = []
+    for frame in frames:
+        alpha = frame[:, :, 3:4] / 255.0
+        rgb = frame[:, :, :3]
+        white_bg = np.ones_like(rgb) * 255
+        rgb_frames.append((rgb * alpha + white_bg * (1 - alpha)).astype(np.uint8))
+    imageio.mimsave(
+        str(output_path), rgb_frames, fps=target_fps, codec="libx264", pixelformat="yuv420p", quality=8
+    )
+    return len(rgb_frames)
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS of this process or its largest child, in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak / scale
+
+
+def run_mode(mode: str, paths: list[Path], size: int, target_fps: float) -> dict:
+    """Convert every sticker with one mode in this process and return totals."""
+    import logging
+
+    logging.disable(logging.INFO)
+    from media.tgs_converter import _write_video, iter_tgs_frame_batches, shutdown_tgs_render_pool
+
+    frames = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for index, path in enumerate(paths):
+            output_path = Path(tmp) / f"{index}.mp4"
+            if mode == "legacy":
+                frames += _legacy_convert(path, output_path, size, target_fps)
+            else:
+                # What convert_tgs_to_video does, keeping the frame count
+                batches = iter_tgs_frame_batches(path, size, size, None, target_fps)
+                frames += _write_video(batches, output_path, target_fps)
+        elapsed = time.perf_counter() - start
+    shutdown_tgs_render_pool()
+    return {"frames": frames, "seconds": elapsed, "peak_rss_mb": _peak_rss_mb()}
+
+
+def _run_subprocess(mode: str, args: argparse.Namespace, paths: list[Path]) -> dict:
+    env = dict(os.environ)
+    env["TGS_RENDER_WORKERS"] = str(args.workers) if mode == "pool" else "0"
+    # Workers are spawned and import media.tgs_converter themselves
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    command = [
+        sys.executable,
+        __file__,
+        "--run-mode",
+        mode,
+        "--size",
+        str(args.size),
+        "--fps",
+        str(args.fps),
+        *map(str, paths),
+    ]
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{mode} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("stickers", nargs="*", type=Path, help="TGS files (default: samples/media/*.tgs)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--fps", type=float, default=4.0, help="sampled frames per second of animation")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--limit", type=int, default=20, help="maximum number of stickers")
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    paths = args.stickers
+    if not paths:
+        paths = sorted(SAMPLES_MEDIA_DIR.glob("*.tgs"))
+    paths = paths[: args.limit]
+    if not paths:
+        print("No TGS files found; pass sticker paths as arguments", file=sys.stderr)
+        return 1
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args.run_mode, paths, args.size, args.fps)))
+        return 0
+
+    print(f"{len(paths)} stickers at {args.size}x{args.size}, {args.fps:g} fps sampling")
+    print(f"{'mode':>8}  {'frames':>7}  {'seconds':>8}  {'frames/s':>9}  {'peak RSS MB':>12}")
+    for mode in args.modes:
+        result = _run_subprocess(mode, args, paths)
+        rate = result["frames"] / result["seconds"] if result["seconds"] else 0.0
+        print(
+            f"{mode:>8}  {result['frames']:>7}  {result['seconds']:>8.2f}  "
+            f"{rate:>9.1f}  {result['peak_rss_mb']:>12.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
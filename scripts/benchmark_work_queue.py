@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# scripts/benchmark_work_queue.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Micro-benchmark for WorkQueue bookkeeping cost as the number of graphs grows.
+
+Each simulated tick does what run_one_tick and insert_received_task_for_conversation
+do around a task, apart from running it: look up the graph for a conversation,
+find the graph containing a task, look up a node, remove a graph and add its
+replacement. The "bookkeeping" column times only those steps; with indexed
+lookups it should stay flat from 100 to 10,000 graphs. The "select" column adds
+the round-robin task selection. The simulated graphs wait an hour before their
+tasks are ready. An untimed first selection parks all of them, so each timed
+selection only visits the graph added by the previous tick.
+
+The "run_one_tick" column times the scheduler's whole idle tick: each iteration
+finishes one conversation's graph, runs run_one_tick (event check, typing
+indicator pass, selection and completed-graph cleanup, which removes the
+finished graph) and adds the conversation's next graph. The typing pass is
+forced every tick rather than every 2 s. The event index is preloaded empty so
+the tick never queries MySQL. All three columns should stay flat as the queue
+grows.
+
+Expected usage:
+    python scripts/benchmark_work_queue.py
+    python scripts/benchmark_work_queue.py --sizes 1000 10000 50000 --ticks 5000 --select-ticks 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to path so we can import modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import tick  # noqa: E402
+from db import events as db_events  # noqa: E402
+from task_graph import TaskGraph, TaskNode, TaskStatus, WorkQueue  # noqa: E402
+
+
+def _make_graph(agent_id: int, channel_id: int, serial: int) -> TaskGraph:
+    tasks = [
+        TaskNode(id=f"wait-{serial}", type="wait", params={"delay": 3600}),
+        TaskNode(id=f"received-{serial}", type="received", depends_on=[f"wait-{serial}"]),
+        TaskNode(id=f"send-{serial}", type="send", depends_on=[f"received-{serial}"]),
+    ]
+    return TaskGraph(
+        id=f"recv-{serial}",
+        context={"agent_id": agent_id, "channel_id": channel_id},
+        tasks=tasks,
+    )
+
+
+def _build_queue(size: int, agents: int, queue: WorkQueue | None = None) -> tuple[WorkQueue, list[TaskGraph]]:
+    queue = queue if queue is not None else WorkQueue()
+    graphs = []
+    for i in range(size):
+        graph = _make_graph(agent_id=i % agents, channel_id=i, serial=i)
+        queue.add_graph(graph)
+        graphs.append(graph)
+    return queue, graphs
+
+
+def bench(size: int, ticks: int, agents: int, seed: int, select: bool) -> float:
+    """Return mean microseconds per simulated tick for a queue of `size` graphs.
+
+    With `select`, each tick also runs the round-robin task selection.
+    """
+    rng = random.Random(seed)
+    queue, graphs = _build_queue(size, agents)
+    serial = size
+    if select:
+        # Steady state: the first pass parks every waiting graph until it is ready
+        queue.round_robin_tasks(4)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if select:
+            queue.round_robin_tasks(4)
+        slot = rng.randrange(len(graphs))
+        graph = graphs[slot]
+        agent_id = graph.context["agent_id"]
+        channel_id = graph.context["channel_id"]
+
+        found = queue.graph_for_conversation(agent_id, channel_id)
+        task = found.get_node(f"send-{found.id[len('recv-'):]}")
+        assert queue.graph_containing(task) is found
+
+        # Replace the conversation's graph, as a new incoming message would
+        queue.remove(found)
+        replacement = _make_graph(agent_id, channel_id, serial)
+        serial += 1
+        queue.add_graph(replacement)
+        graphs[slot] = replacement
+    elapsed = time.perf_counter() - start
+    return elapsed / ticks * 1_000_000
+
+
+async def bench_run_one_tick(size: int, ticks: int, agents: int, seed: int) -> float:
+    """Return mean microseconds per idle run_one_tick for a queue of `size` graphs."""
+    rng = random.Random(seed)
+    # Loaded and empty, so _process_due_events never goes to MySQL
+    db_events._event_index.replace_all([])
+    # The typing pass reads the singleton queue
+    WorkQueue.reset_instance()
+    queue, graphs = _build_queue(size, agents, WorkQueue.get_instance())
+    serial = size
+    await tick.run_one_tick(queue)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        slot = rng.randrange(len(graphs))
+        graph = graphs[slot]
+        # The conversation's graph finishes outside selection; the tick's cleanup removes it
+        for task in graph.tasks:
+            task.status = TaskStatus.DONE
+        queue.mark_dirty(graph)
+        tick._last_typing_refresh = None
+        await tick.run_one_tick(queue)
+        assert graph not in queue.completed_graphs()
+
+        replacement = _make_graph(graph.context["agent_id"], graph.context["channel_id"], serial)
+        serial += 1
+        queue.add_graph(replacement)
+        graphs[slot] = replacement
+    elapsed = time.perf_counter() - start
+    return elapsed / ticks * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--ticks", type=int, default=2_000)
+    parser.add_argument("--select-ticks", type=int, default=2_000, help="ticks for the select and run_one_tick columns")
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'graphs':>10}  {'bookkeeping us':>15}  {'select us':>10}  {'run_one_tick us':>16}")
+    for size in args.sizes:
+        bookkeeping = bench(size, args.ticks, args.agents, args.seed, select=False)
+        select = bench(size, args.select_ticks, args.agents, args.seed, select=True)
+        full_tick = asyncio.run(bench_run_one_tick(size, args.select_ticks, args.agents, args.seed))
+        print(f"{size:>10}  {bookkeeping:>15.2f}  {select:>10.2f}  {full_tick:>16.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -838,6 +838,9 @@ def register_configuration_routes(agents_bp: Blueprint):
 
             # Update agent's gagged status in place
             agent.is_gagged = is_gagged
+            # Every dialog without an override is affected; have the next unread scan walk them all
+            from agent_server.dialog_state import request_full_dialog_scan
+            request_full_dialog_scan(agent)
 
             return jsonify({"success": True})
         except Exception as e:
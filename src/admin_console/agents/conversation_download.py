@@ -12,6 +12,7 @@ import json as json_lib
 import logging
 import mimetypes
 import re
+import shutil
 import tempfile
 import zipfile
 from datetime import UTC, datetime
@@ -69,7 +70,13 @@ _TRANSLATION_SCHEMA = {
 }
 
 
-def _cache_media_to_state(unique_id: str, filename: str, media_bytes: bytes) -> None:
+def _read_media_header(path: Path) -> bytes:
+    """Read the first bytes of a media file (enough for MIME sniffing)."""
+    with open(path, "rb") as f:
+        return f.read(1024)
+
+
+def _cache_media_to_state(unique_id: str, filename: str, media_path: Path) -> None:
     """Cache downloaded media to state/media for future conversation downloads."""
     try:
         state_media_dir = get_state_media_path()
@@ -78,7 +85,7 @@ def _cache_media_to_state(unique_id: str, filename: str, media_bytes: bytes) ->
         state_media_dir.mkdir(parents=True, exist_ok=True)
         cache_path = state_media_dir / filename
         if not cache_path.exists():
-            cache_path.write_bytes(media_bytes)
+            shutil.copyfile(media_path, cache_path)
             logger.debug(f"Cached media {unique_id} to {cache_path} for future downloads")
     except Exception as e:
         logger.warning(f"Failed to cache media {unique_id} to state: {e}")
@@ -134,7 +141,7 @@ def register_conversation_download_routes(agents_bp: Blueprint):
                 is_dm,
                 sender_entity_to_partner_cache_entry,
             )
-            from telegram_download import download_media_bytes
+            from telegram_download import download_media_bytes, download_media_to_file
             from telegram_media import iter_media_parts, get_unique_id
             from media.mime_utils import detect_mime_type_from_bytes, get_file_extension_from_mime_or_bytes
 
@@ -522,14 +529,12 @@ def register_conversation_download_routes(agents_bp: Blueprint):
                                     # If found in cache, copy it
                                     if cached_file and cached_file.exists():
                                         try:
-                                            with open(cached_file, "rb") as f:
-                                                media_bytes = f.read()
-                                            mime_type = detect_mime_type_from_bytes(media_bytes[:1024])
-                                            ext = get_file_extension_from_mime_or_bytes(mime_type, media_bytes)
+                                            header = _read_media_header(cached_file)
+                                            mime_type = detect_mime_type_from_bytes(header)
+                                            ext = get_file_extension_from_mime_or_bytes(mime_type, header)
                                             filename = f"{unique_id}{ext}"
                                             media_path = media_dir / filename
-                                            with open(media_path, "wb") as f:
-                                                f.write(media_bytes)
+                                            shutil.copyfile(cached_file, media_path)
                                             media_map[unique_id] = filename
                                             mime_map[unique_id] = mime_type
                                         except Exception as e:
@@ -553,17 +558,19 @@ def register_conversation_download_routes(agents_bp: Blueprint):
                                             media_items = iter_media_parts(msg_obj)
                                             for item in media_items:
                                                 if item.unique_id == unique_id:
-                                                    media_bytes = await download_media_bytes(client, item.file_ref)
-                                                    mime_type = detect_mime_type_from_bytes(media_bytes[:1024])
-                                                    ext = get_file_extension_from_mime_or_bytes(mime_type, media_bytes)
+                                                    # Stream to disk; large videos are never held in memory
+                                                    download_path = media_dir / f"{unique_id}.download"
+                                                    await download_media_to_file(client, item.file_ref, download_path)
+                                                    header = _read_media_header(download_path)
+                                                    mime_type = detect_mime_type_from_bytes(header)
+                                                    ext = get_file_extension_from_mime_or_bytes(mime_type, header)
                                                     filename = f"{unique_id}{ext}"
                                                     media_path = media_dir / filename
-                                                    with open(media_path, "wb") as f:
-                                                        f.write(media_bytes)
+                                                    download_path.replace(media_path)
                                                     media_map[unique_id] = filename
                                                     mime_map[unique_id] = mime_type
                                                     # Cache to persistent storage for future downloads
-                                                    _cache_media_to_state(unique_id, filename, media_bytes)
+                                                    _cache_media_to_state(unique_id, filename, media_path)
                                                     break
                                         except Exception as e:
                                             logger.warning(f"Error downloading media {unique_id}: {e}")
@@ -652,7 +659,7 @@ def register_conversation_download_routes(agents_bp: Blueprint):
                                             emoji_map[doc_id] = filename
                                             # Cache to persistent storage (use unique_id for lookup)
                                             emoji_cache_filename = f"{unique_id_emoji}{ext}"
-                                            _cache_media_to_state(unique_id_emoji, emoji_cache_filename, emoji_bytes)
+                                            _cache_media_to_state(unique_id_emoji, emoji_cache_filename, emoji_path)
                             except Exception as e:
                                 logger.warning(f"Error downloading emoji {doc_id}: {e}")
 
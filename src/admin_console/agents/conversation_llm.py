@@ -280,6 +280,11 @@ def register_conversation_llm_routes(agents_bp: Blueprint):
                         logger.warning(f"Error setting blocked status: {e}")
                         return jsonify({"error": f"Failed to set blocked status: {str(e)}"}), 500
 
+            if is_gagged is not None or is_muted is not None:
+                # Let the next unread scan act on the new settings instead of waiting for reconciliation
+                from agent_server.dialog_state import mark_dialog_changed
+                mark_dialog_changed(agent, channel_id)
+
             return jsonify({"success": True})
         except Exception as e:
             logger.error(f"Error updating conversation parameters for {agent_config_name}/{user_id}: {e}")
@@ -560,6 +560,9 @@ def register_membership_routes(agents_bp: Blueprint):
                     # Invalidate cache so next check gets fresh data
                     if agent.api_cache and hasattr(agent.api_cache, "_mute_cache"):
                         agent.api_cache._mute_cache.pop(channel_id_normalized, None)
+                    # Let the next unread scan pick up messages that were muted
+                    from agent_server.dialog_state import mark_dialog_changed
+                    mark_dialog_changed(agent, channel_id_normalized)
 
                     return {"success": True, "is_muted": is_muted}
 
@@ -626,6 +629,9 @@ def register_membership_routes(agents_bp: Blueprint):
                 # Set override
                 conversation_gagged.set_conversation_gagged(agent.agent_id, channel_id_normalized, is_gagged)
                 logger.info(f"Set conversation gagged override for channel {channel_id}: {is_gagged}")
+            # Let the next unread scan act on the change instead of waiting for reconciliation
+            from agent_server.dialog_state import mark_dialog_changed
+            mark_dialog_changed(agent, channel_id_normalized)
 
             return jsonify({"success": True, "is_gagged": is_gagged})
         except Exception as e:
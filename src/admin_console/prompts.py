@@ -15,6 +15,7 @@ from pathlib import Path
 from flask import Blueprint, jsonify, request  # pyright: ignore[reportMissingImports]
 
 from config import CONFIG_DIRECTORIES
+from prompt_loader import invalidate_prompt_cache
 
 logger = logging.getLogger(__name__)
 
@@ -275,6 +276,7 @@ def api_update_prompt(filename: str):
         
         # Write content (create if doesn't exist)
         prompt_path.write_text(content, encoding="utf-8")
+        invalidate_prompt_cache()
         
         logger.info(f"Updated prompt {filename} in {prompts_dir}")
         return jsonify({"success": True, "filename": filename})
@@ -306,6 +308,7 @@ def api_delete_prompt(filename: str):
             return jsonify({"error": "Prompt not found"}), 404
         
         prompt_path.unlink()
+        invalidate_prompt_cache()
         
         logger.info(f"Deleted prompt {filename} from {prompts_dir}")
         return jsonify({"success": True})
@@ -352,6 +355,7 @@ def api_rename_prompt(filename: str):
             return jsonify({"error": "Target filename already exists"}), 400
         
         old_path.rename(new_path)
+        invalidate_prompt_cache()
         
         logger.info(f"Renamed prompt {filename} to {new_filename} in {prompts_dir}")
         return jsonify({"success": True, "filename": new_filename})
@@ -406,6 +410,7 @@ def api_move_prompt(filename: str):
         
         # Move the file
         shutil.move(str(from_path), str(to_path))
+        invalidate_prompt_cache()
         
         logger.info(
             f"Moved prompt {filename} from {from_prompts_dir} to {to_prompts_dir}"
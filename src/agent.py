@@ -111,6 +111,7 @@ class Agent(
         self._entity_cache_obj = None  # TelegramEntityCache
         self._api_cache_obj = None  # TelegramAPICache
         self._storage_obj = None  # AgentStorage
+        self._compiled_schedule = None  # CompiledSchedule, dropped on _save_schedule
 
         # Tracks which sticker set short names have been loaded into caches
         self.loaded_sticker_sets = set()  # e.g., {"WendyDancer", "CINDYAI"}
@@ -10,7 +10,7 @@ System prompt building for Agent.
 import logging
 from typing import TYPE_CHECKING
 
-from prompt_loader import load_system_prompt
+from prompt_loader import cached_render, load_system_prompt
 from core.prompt_utils import substitute_templates
 
 logger = logging.getLogger(__name__)
@@ -22,7 +22,31 @@ if TYPE_CHECKING:
 class AgentPromptMixin:
     """Mixin providing system prompt building capabilities."""
 
-    def _build_system_prompt(self, channel_name, specific_instructions, channel_id: int | None = None, for_summarization: bool = False):
+    def _build_intentions_section(self, channel_id: int | None) -> str:
+        """Return the channel plan (if any) followed by the agent's intentions, or ''."""
+        intention_parts = []
+
+        # Load channel plans first (before intentions)
+        if channel_id is not None:
+            plan_content = self._load_plan_content(channel_id)
+            if plan_content:
+                intention_parts.append("# Channel Plan\n\n```json\n" + plan_content + "\n```")
+
+        # Load intentions
+        intention_content = self._load_intention_content()
+        if intention_content:
+            intention_parts.append("# Intentions\n\n```json\n" + intention_content + "\n```")
+
+        return "\n\n".join(intention_parts)
+
+    def _build_system_prompt(
+        self,
+        channel_name,
+        specific_instructions,
+        channel_id: int | None = None,
+        for_summarization: bool = False,
+        stable_layout: bool = False,
+    ):
         """
         Private helper to build the system prompt.
         
@@ -31,38 +55,68 @@ class AgentPromptMixin:
             specific_instructions: Paragraph injected into the LLM prompt.
             channel_id: Optional channel ID for loading channel-specific plans.
             for_summarization: If True, use Instructions-Summarize.md and filter Task-* prompts.
+            stable_layout: If True, leave out the per-turn parts (specific instructions,
+                channel plan and intentions) so the result only changes with configuration.
         
         Returns:
             Base system prompt string
         """
-        prompt_parts = []
+        turn_parts = []
 
         # Add specific instructions for the current turn
-        if specific_instructions:
-            prompt_parts.append(specific_instructions)
+        if specific_instructions and not stable_layout:
+            turn_parts.append(specific_instructions)
+
+        # Build intentions section with plans (if any) before intentions
+        if not for_summarization and not stable_layout:
+            intentions_section = self._build_intentions_section(channel_id)
+            if intentions_section:
+                turn_parts.append(intentions_section)
+
+        # The rest only depends on configuration and prompt files, so it is rendered once
+        # per channel and reused until a prompt file changes
+        base_prompt = self._render_base_prompt(channel_name, channel_id, for_summarization)
+        if not turn_parts:
+            return base_prompt
+        turn_prompt = self._substitute_templates("\n\n".join(turn_parts), channel_name, channel_id)
+        return f"{turn_prompt}\n\n{base_prompt}"
+
+    def _substitute_templates(self, text: str, channel_name, channel_id: int | None) -> str:
+        return substitute_templates(
+            text,
+            self.name,
+            channel_name,
+            agent_telegram_id=getattr(self, "agent_id", None),
+            channel_telegram_id=channel_id,
+        )
+
+    def _render_base_prompt(self, channel_name, channel_id: int | None, for_summarization: bool) -> str:
+        """Return the LLM prompt, agent instructions and role prompts with templates substituted (cached)."""
+        key = (
+            "agent-base-prompt",
+            self.name,
+            getattr(self, "agent_id", None),
+            channel_name,
+            channel_id,
+            for_summarization,
+            None if for_summarization else self.llm.prompt_name,
+            self.instructions,
+            tuple(self.role_prompt_names),
+        )
+        return cached_render(
+            key,
+            lambda: self._substitute_templates(
+                self._build_base_prompt(for_summarization), channel_name, channel_id
+            ),
+        )
+
+    def _build_base_prompt(self, for_summarization: bool) -> str:
+        prompt_parts = []
 
         # Add LLM-specific prompt
         if for_summarization:
             llm_prompt = load_system_prompt("Instructions-Summarize")
         else:
-            # Build intentions section with plans (if any) before intentions
-            intention_parts = []
-            
-            # Load channel plans first (before intentions)
-            if channel_id is not None:
-                plan_content = self._load_plan_content(channel_id)
-                if plan_content:
-                    intention_parts.append("# Channel Plan\n\n```json\n" + plan_content + "\n```")
-            
-            # Load intentions
-            intention_content = self._load_intention_content()
-            if intention_content:
-                intention_parts.append("# Intentions\n\n```json\n" + intention_content + "\n```")
-            
-            # Add intentions section if we have any content
-            if intention_parts:
-                prompt_parts.append("\n\n".join(intention_parts))
-
             llm_prompt = load_system_prompt(self.llm.prompt_name)
         prompt_parts.append(llm_prompt)
 
@@ -90,16 +144,7 @@ class AgentPromptMixin:
                 role_prompt = load_system_prompt(role_prompt_name)
                 prompt_parts.append(role_prompt)
 
-        # Apply template substitution across the assembled prompt
-        final_prompt = "\n\n".join(prompt_parts)
-        final_prompt = substitute_templates(
-            final_prompt,
-            self.name,
-            channel_name,
-            agent_telegram_id=getattr(self, "agent_id", None),
-            channel_telegram_id=channel_id,
-        )
-        return final_prompt
+        return "\n\n".join(prompt_parts)
 
     def get_system_prompt(self, channel_name, specific_instructions, channel_id: int | None = None):
         """
@@ -126,6 +171,26 @@ class AgentPromptMixin:
         """
         return self._build_system_prompt(channel_name, specific_instructions, channel_id=channel_id, for_summarization=False)
 
+    def get_stable_system_prompt(self, channel_name, channel_id: int | None = None):
+        """
+        Get the parts of the base system prompt that only change with configuration.
+
+        Same as get_system_prompt without the specific instructions, channel
+        plan and intentions: the Instructions prompt, agent instructions and role
+        prompts. build_complete_system_prompt puts this first when
+        PROMPT_STABLE_PREFIX is enabled so providers can cache it.
+        """
+        return self._build_system_prompt(
+            channel_name, None, channel_id=channel_id, for_summarization=False, stable_layout=True
+        )
+
+    def get_intentions_section(self, channel_name, channel_id: int | None = None) -> str:
+        """Get the channel plan and intentions section with templates substituted ('' if none)."""
+        section = self._build_intentions_section(channel_id)
+        if not section:
+            return ""
+        return self._substitute_templates(section, channel_name, channel_id)
+
     def get_system_prompt_for_summarization(self, channel_name, specific_instructions, channel_id: int | None = None):
         """
         Get the base system prompt for summarization tasks.
@@ -19,6 +19,7 @@ logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from agent import Agent
     from agent.storage_mysql import AgentStorageMySQL
+    from schedule import CompiledSchedule
 
 
 class AgentStorageMixin:
@@ -27,6 +28,7 @@ class AgentStorageMixin:
     name: str
     config_directory: str | None
     _storage_obj: "AgentStorageMySQL | None"
+    _compiled_schedule: "CompiledSchedule | None"
 
     @property
     def _storage(self):
@@ -80,7 +82,14 @@ class AgentStorageMixin:
 
     async def _load_summary_content(self, channel_id: int, json_format: bool = False, include_metadata: bool = False) -> str:
         """Load channel-specific summary content from state directory."""
-        return self._storage.load_summary_content(channel_id, json_format=json_format, include_metadata=include_metadata)
+        from db.aio import run_db
+
+        return await run_db(
+            self._storage.load_summary_content,
+            channel_id,
+            json_format=json_format,
+            include_metadata=include_metadata,
+        )
 
     def get_channel_llm_model(self, channel_id: int) -> str | None:
         """Get the LLM model name for a specific channel from the channel memory file."""
@@ -99,6 +108,23 @@ class AgentStorageMixin:
         # Return a deep copy to prevent accidental mutation
         return copy.deepcopy(schedule) if schedule is not None else None
 
+    def _get_compiled_schedule(self) -> "CompiledSchedule":
+        """
+        Get the agent's schedule parsed for fast time lookups.
+
+        Loaded from MySQL on first use and cached until the schedule is saved
+        (schedule tasks, schedule extension and the admin console all save via
+        _save_schedule).
+
+        Returns:
+            CompiledSchedule (empty if the agent has no schedule)
+        """
+        if self._compiled_schedule is None:
+            from schedule import CompiledSchedule
+
+            self._compiled_schedule = CompiledSchedule(self._storage.load_schedule())
+        return self._compiled_schedule
+
     def _save_schedule(self, schedule: dict) -> None:
         """
         Save agent's schedule to MySQL.
@@ -106,4 +132,8 @@ class AgentStorageMixin:
         Args:
             schedule: Schedule dictionary to save
         """
-        self._storage.save_schedule(schedule)
+        try:
+            self._storage.save_schedule(schedule)
+        finally:
+            # Recompile from storage on next use
+            self._compiled_schedule = None
@@ -20,16 +20,26 @@ from db import plans
 from db import schedules
 from db import summaries
 from db import events as db_events
+from db.content_cache import get_agent_content_cache
 
 logger = logging.getLogger(__name__)
 
 
+def _render_json(rows: list) -> str:
+    """Pretty-printed JSON of content rows, or empty string when there are none."""
+    return json.dumps(rows, indent=2, ensure_ascii=False) if rows else ""
+
+
 class AgentStorageMySQL:
     """
     MySQL-based storage implementation for agent data.
     
     Stores agent state data (memories, intentions, plans, summaries, schedules, notes) in MySQL.
     Channel metadata still uses filesystem (for llm_model overrides).
+
+    Prompt content (notes, memories, plans, intentions, events, summaries) is
+    read through the process-wide content cache (db.content_cache), which the
+    db save/delete functions invalidate.
     """
 
     def __init__(
@@ -64,9 +74,14 @@ class AgentStorageMySQL:
             JSON-formatted string of intention entries, or empty string when absent.
         """
         try:
-            intentions_list = intentions.load_intentions(self.agent_telegram_id)
-            if intentions_list:
-                return json.dumps(intentions_list, indent=2, ensure_ascii=False)
+            return get_agent_content_cache().rendered(
+                "intentions",
+                self.agent_telegram_id,
+                None,
+                "json",
+                lambda: intentions.load_intentions(self.agent_telegram_id),
+                _render_json,
+            )
         except Exception as exc:
             logger.warning(f"{format_log_prefix_resolved(self.agent_config_name, None)} Failed to load intention content: {exc}")
         return ""
@@ -114,9 +129,14 @@ class AgentStorageMySQL:
         """
         try:
             from db import notes
-            notes_list = notes.load_notes(self.agent_telegram_id, user_id)
-            if notes_list:
-                return json.dumps(notes_list, indent=2, ensure_ascii=False)
+            return get_agent_content_cache().rendered(
+                "notes",
+                self.agent_telegram_id,
+                user_id,
+                "json",
+                lambda: notes.load_notes(self.agent_telegram_id, user_id),
+                _render_json,
+            )
         except Exception as e:
             logger.warning(
                 f"{format_log_prefix_resolved(self.agent_config_name, None)} Failed to load notes from MySQL for channel {user_id}: {e}"
@@ -131,9 +151,14 @@ class AgentStorageMySQL:
             Pretty-printed JSON string of the memory array, or empty string if no memory exists.
         """
         try:
-            memories_list = memories.load_memories(self.agent_telegram_id)
-            if memories_list:
-                return json.dumps(memories_list, indent=2, ensure_ascii=False)
+            return get_agent_content_cache().rendered(
+                "memories",
+                self.agent_telegram_id,
+                None,
+                "json",
+                lambda: memories.load_memories(self.agent_telegram_id),
+                _render_json,
+            )
         except Exception as e:
             logger.warning(
                 f"{format_log_prefix_resolved(self.agent_config_name, None)} Failed to load state memory from MySQL: {e}"
@@ -144,9 +169,14 @@ class AgentStorageMySQL:
     def load_plan_content(self, channel_id: int) -> str:
         """Load channel-specific plan content from MySQL."""
         try:
-            plans_list = plans.load_plans(self.agent_telegram_id, channel_id)
-            if plans_list:
-                return json.dumps(plans_list, indent=2, ensure_ascii=False)
+            return get_agent_content_cache().rendered(
+                "plans",
+                self.agent_telegram_id,
+                channel_id,
+                "json",
+                lambda: plans.load_plans(self.agent_telegram_id, channel_id),
+                _render_json,
+            )
         except Exception as exc:
             logger.warning(
                 f"{format_log_prefix_resolved(self.agent_config_name, None)} Failed to load plan content from MySQL: {exc}"
@@ -161,22 +191,31 @@ class AgentStorageMySQL:
         try:
             from datetime import UTC, datetime
 
-            raw = db_events.load_events(self.agent_telegram_id, channel_id)
-            if not raw:
-                return ""
-            out = []
-            for ev in raw:
-                e = {"id": ev["id"], "intent": ev.get("intent", "")}
-                if ev.get("time_utc"):
-                    dt_utc = datetime.fromisoformat(ev["time_utc"].replace("Z", "+00:00"))
-                    if dt_utc.tzinfo is None:
-                        dt_utc = dt_utc.replace(tzinfo=UTC)
-                    e["time"] = dt_utc.astimezone(tz).isoformat()
-                    e["interval"] = ev["interval"]
-                if ev.get("occurrences") is not None:
-                    e["occurrences"] = ev["occurrences"]
-                out.append(e)
-            return json.dumps(out, indent=2, ensure_ascii=False)
+            def render(raw: list) -> str:
+                if not raw:
+                    return ""
+                out = []
+                for ev in raw:
+                    e = {"id": ev["id"], "intent": ev.get("intent", "")}
+                    if ev.get("time_utc"):
+                        dt_utc = datetime.fromisoformat(ev["time_utc"].replace("Z", "+00:00"))
+                        if dt_utc.tzinfo is None:
+                            dt_utc = dt_utc.replace(tzinfo=UTC)
+                        e["time"] = dt_utc.astimezone(tz).isoformat()
+                        e["interval"] = ev["interval"]
+                    if ev.get("occurrences") is not None:
+                        e["occurrences"] = ev["occurrences"]
+                    out.append(e)
+                return json.dumps(out, indent=2, ensure_ascii=False)
+
+            return get_agent_content_cache().rendered(
+                "events",
+                self.agent_telegram_id,
+                channel_id,
+                ("json", str(tz)),
+                lambda: db_events.load_events(self.agent_telegram_id, channel_id),
+                render,
+            )
         except Exception as exc:
             logger.warning(
                 f"{format_log_prefix_resolved(self.agent_config_name, None)} Failed to load event content: {exc}"
@@ -196,93 +235,107 @@ class AgentStorageMySQL:
             Summary content as JSON string (if json_format=True) or formatted text (if json_format=False)
         """
         try:
-            summaries_list = summaries.load_summaries(self.agent_telegram_id, channel_id)
-            if summaries_list:
-                if json_format:
-                    return json.dumps(summaries_list, indent=2, ensure_ascii=False)
-                else:
-                    if include_metadata:
-                        # Format summaries with full metadata for Task-Summarize role
-                        summary_lines = []
-                        for summary in summaries_list:
-                            content = summary.get("content", "").strip()
-                            if not content:
-                                continue
-                            
-                            # Build metadata line
-                            min_id = summary.get("min_message_id")
-                            max_id = summary.get("max_message_id")
-                            first_date = summary.get("first_message_date", "")
-                            last_date = summary.get("last_message_date", "")
-                            summary_id = summary.get("id", "")
-                            
-                            # Format date range (MM/DD/YYYY format)
-                            date_range = ""
-                            if first_date or last_date:
-                                def format_date_for_prompt(date_str: str) -> str:
-                                    """Convert ISO date (YYYY-MM-DD) to MM/DD/YYYY format."""
-                                    if not date_str:
-                                        return "N/A"
-                                    # Extract date part (handle both ISO format and already formatted)
-                                    date_part = date_str.split("T")[0] if "T" in date_str else date_str.split(" ")[0]
-                                    try:
-                                        # Parse YYYY-MM-DD format
-                                        from datetime import datetime
-                                        dt = datetime.strptime(date_part, "%Y-%m-%d")
-                                        # Format as MM/DD/YYYY without leading zeros
-                                        month = str(dt.month)
-                                        day = str(dt.day)
-                                        return f"{month}/{day}/{dt.year}"
-                                    except (ValueError, AttributeError):
-                                        # If parsing fails, return as-is
-                                        return date_part
-                                
-                                first_date_str = format_date_for_prompt(first_date) if first_date else "N/A"
-                                last_date_str = format_date_for_prompt(last_date) if last_date else "N/A"
-                                date_range = f" from {first_date_str} - {last_date_str}"
-                            
-                            # Build message ID range
-                            msg_range = ""
-                            if min_id is not None and max_id is not None:
-                                msg_range = f"Messages {min_id} - {max_id}"
-                            elif min_id is not None:
-                                msg_range = f"Message {min_id}"
-                            elif max_id is not None:
-                                msg_range = f"Message {max_id}"
-                            
-                            # Format: "Summary of Messages X - Y from DATE1 - DATE2 (id "summary-123")\nContent"
-                            if msg_range and date_range:
-                                summary_lines.append(
-                                    f"Summary of {msg_range}{date_range} (id \"{summary_id}\")\n{content}"
-                                )
-                            elif msg_range:
-                                summary_lines.append(
-                                    f"Summary of {msg_range} (id \"{summary_id}\")\n{content}"
-                                )
-                            elif date_range:
-                                summary_lines.append(
-                                    f"Summary{date_range} (id \"{summary_id}\")\n{content}"
-                                )
-                            else:
-                                summary_lines.append(
-                                    f"Summary (id \"{summary_id}\")\n{content}"
-                                )
-                        
-                        return "\n\n".join(summary_lines) if summary_lines else ""
-                    else:
-                        # Return only the text content of summaries
-                        summary_texts = []
-                        for summary in summaries_list:
-                            content = summary.get("content", "").strip()
-                            if content:
-                                summary_texts.append(content)
-                        return "\n\n".join(summary_texts) if summary_texts else ""
+            return get_agent_content_cache().rendered(
+                "summaries",
+                self.agent_telegram_id,
+                channel_id,
+                ("json" if json_format else "text", include_metadata),
+                lambda: summaries.load_summaries(self.agent_telegram_id, channel_id),
+                lambda summaries_list: self._render_summaries(
+                    summaries_list, json_format, include_metadata
+                ),
+            )
         except Exception as exc:
             logger.warning(
                 f"{format_log_prefix_resolved(self.agent_config_name, None)} Failed to load summary content from MySQL: {exc}"
             )
         return ""
 
+    @staticmethod
+    def _render_summaries(summaries_list: list, json_format: bool, include_metadata: bool) -> str:
+        """Render summaries as JSON or prompt text (see load_summary_content)."""
+        if summaries_list:
+            if json_format:
+                return json.dumps(summaries_list, indent=2, ensure_ascii=False)
+            else:
+                if include_metadata:
+                    # Format summaries with full metadata for Task-Summarize role
+                    summary_lines = []
+                    for summary in summaries_list:
+                        content = summary.get("content", "").strip()
+                        if not content:
+                            continue
+
+                        # Build metadata line
+                        min_id = summary.get("min_message_id")
+                        max_id = summary.get("max_message_id")
+                        first_date = summary.get("first_message_date", "")
+                        last_date = summary.get("last_message_date", "")
+                        summary_id = summary.get("id", "")
+
+                        # Format date range (MM/DD/YYYY format)
+                        date_range = ""
+                        if first_date or last_date:
+                            def format_date_for_prompt(date_str: str) -> str:
+                                """Convert ISO date (YYYY-MM-DD) to MM/DD/YYYY format."""
+                                if not date_str:
+                                    return "N/A"
+                                # Extract date part (handle both ISO format and already formatted)
+                                date_part = date_str.split("T")[0] if "T" in date_str else date_str.split(" ")[0]
+                                try:
+                                    # Parse YYYY-MM-DD format
+                                    from datetime import datetime
+                                    dt = datetime.strptime(date_part, "%Y-%m-%d")
+                                    # Format as MM/DD/YYYY without leading zeros
+                                    month = str(dt.month)
+                                    day = str(dt.day)
+                                    return f"{month}/{day}/{dt.year}"
+                                except (ValueError, AttributeError):
+                                    # If parsing fails, return as-is
+                                    return date_part
+
+                            first_date_str = format_date_for_prompt(first_date) if first_date else "N/A"
+                            last_date_str = format_date_for_prompt(last_date) if last_date else "N/A"
+                            date_range = f" from {first_date_str} - {last_date_str}"
+
+                        # Build message ID range
+                        msg_range = ""
+                        if min_id is not None and max_id is not None:
+                            msg_range = f"Messages {min_id} - {max_id}"
+                        elif min_id is not None:
+                            msg_range = f"Message {min_id}"
+                        elif max_id is not None:
+                            msg_range = f"Message {max_id}"
+
+                        # Format: "Summary of Messages X - Y from DATE1 - DATE2 (id "summary-123")\nContent"
+                        if msg_range and date_range:
+                            summary_lines.append(
+                                f"Summary of {msg_range}{date_range} (id \"{summary_id}\")\n{content}"
+                            )
+                        elif msg_range:
+                            summary_lines.append(
+                                f"Summary of {msg_range} (id \"{summary_id}\")\n{content}"
+                            )
+                        elif date_range:
+                            summary_lines.append(
+                                f"Summary{date_range} (id \"{summary_id}\")\n{content}"
+                            )
+                        else:
+                            summary_lines.append(
+                                f"Summary (id \"{summary_id}\")\n{content}"
+                            )
+
+                    return "\n\n".join(summary_lines) if summary_lines else ""
+                else:
+                    # Return only the text content of summaries
+                    summary_texts = []
+                    for summary in summaries_list:
+                        content = summary.get("content", "").strip()
+                        if content:
+                            summary_texts.append(content)
+                    return "\n\n".join(summary_texts) if summary_texts else ""
+        return ""
+
     def get_channel_llm_model(self, channel_id: int) -> str | None:
         """
         Get the LLM model name for a specific channel from MySQL.
@@ -79,6 +79,7 @@ class AgentTelegramMixin:
         self._entity_cache_obj = None
         # Clear storage object so it is recreated with correct backend after authentication
         self._storage_obj = None
+        self._compiled_schedule = None
 
     async def is_muted(self, peer_id: int) -> bool:
         """
@@ -113,7 +114,8 @@ class AgentTelegramMixin:
         
         try:
             from db import conversation_gagged
-            override = conversation_gagged.get_conversation_gagged(self.agent_id, channel_id)
+            from db.aio import run_db
+            override = await run_db(conversation_gagged.get_conversation_gagged, self.agent_id, channel_id)
             if override is not None:
                 # Per-conversation override exists, use it
                 return override
@@ -15,6 +15,8 @@ from telethon.tl.types import (  # pyright: ignore[reportMissingImports]
     InputStickerSetShortName,
 )
 
+from media.media_catalog import mark_media_catalog_changed
+
 logger = logging.getLogger(__name__)
 
 
@@ -184,6 +186,7 @@ async def ensure_sticker_cache(agent, client):
                         f"{format_log_prefix_resolved(getattr(agent, 'name', 'agent'), None)} Registered sticker in {set_short}: {repr(name)}"
                     )
                 loaded.add(set_short)
+                mark_media_catalog_changed(agent)
             except Exception as e:
                 logger.exception(
                     f"{format_log_prefix_resolved(getattr(agent, 'name', 'agent'), None)} Failed to load sticker set '{set_short}': {e}"
@@ -285,6 +288,7 @@ async def ensure_saved_message_sticker_cache(agent, client):
             removed += 1
 
         agent._saved_message_sticker_keys = seen_keys
+        mark_media_catalog_changed(agent)
 
         if seen_keys:
             logger.debug(
@@ -390,6 +394,7 @@ async def ensure_media_cache(agent, client):
                 logger.debug(
                     f"{format_log_prefix_resolved(getattr(agent, 'name', 'agent'), None)} Removed media from cache: {unique_id_str}"
                 )
+        mark_media_catalog_changed(agent)
 
         if media_found > 0:
             logger.debug(
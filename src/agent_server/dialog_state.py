@@ -0,0 +1,228 @@
+# agent_server/dialog_state.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Incremental dialog state for the unread scan.
+
+Telegram updates (new messages, read receipts, reactions, unread marks) mark a
+dialog as changed and adjust its unread, mention and reaction counters. The
+periodic scan then fetches fresh state for just the changed dialogs with one
+GetPeerDialogsRequest per 100 peers, instead of walking every dialog with
+iter_dialogs. A full iter_dialogs scan still runs on the first scan after a
+(re)connect and every DIALOG_RECONCILE_INTERVAL_SECONDS to reconcile updates
+that were never delivered.
+
+A dialog still showing unread content after a scan is checked again on the
+next scan unless a received task is queued for it (it was skipped as gagged,
+muted or unable to send, or its received task ended without reading it), so
+those dialogs are rechecked as often as before. The admin console marks a
+dialog changed when it un-gags or unmutes it (see mark_dialog_changed).
+"""
+import logging
+import threading
+import weakref
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from telethon import utils as telethon_utils  # pyright: ignore[reportMissingImports]
+from telethon.tl.functions.messages import GetPeerDialogsRequest  # pyright: ignore[reportMissingImports]
+from telethon.tl.types import InputDialogPeer  # pyright: ignore[reportMissingImports]
+
+from config import DIALOG_RECONCILE_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# GetPeerDialogsRequest accepts at most 100 peers
+_PEER_DIALOGS_BATCH = 100
+
+
+@dataclass
+class DialogCounters:
+    """Last known unread state of one dialog."""
+
+    unread: int = 0
+    mentions: int = 0
+    reactions: int = 0
+    marked_unread: bool = False
+
+    def has_pending(self) -> bool:
+        return bool(self.unread or self.mentions or self.reactions or self.marked_unread)
+
+
+@dataclass
+class DialogView:
+    """
+    The parts of a Telethon Dialog the scan reads, built from a raw tl Dialog
+    returned by GetPeerDialogsRequest.
+    """
+
+    id: int
+    unread_count: int
+    unread_mentions_count: int
+    dialog: object  # raw telethon.tl.types.Dialog (unread_mark, unread_reactions_count)
+
+
+class DialogStateTracker:
+    """Per-agent counters and changed-dialog set, fed by Telegram update handlers."""
+
+    def __init__(self):
+        self._counters: dict[int, DialogCounters] = {}
+        self._changed: set[int] = set()
+        # Dialogs with pending content left to a queued received task (see recheck_pending)
+        self._awaiting_task: set[int] = set()
+        self._last_full_scan: datetime | None = None
+        # mark_changed may be called from admin console threads
+        self._changed_lock = threading.Lock()
+
+    def counters(self, dialog_id: int) -> DialogCounters:
+        """Return the tracked counters for a dialog (zeros if unknown)."""
+        return self._counters.get(dialog_id) or DialogCounters()
+
+    def _counters_for(self, dialog_id: int) -> DialogCounters:
+        return self._counters.setdefault(dialog_id, DialogCounters())
+
+    def note_new_message(self, dialog_id: int, mentioned: bool = False) -> None:
+        counters = self._counters_for(dialog_id)
+        counters.unread += 1
+        if mentioned:
+            counters.mentions += 1
+        self._changed.add(dialog_id)
+
+    def note_read(self, dialog_id: int, still_unread: int = 0) -> None:
+        counters = self._counters_for(dialog_id)
+        counters.unread = max(0, still_unread)
+        if not counters.unread:
+            counters.mentions = 0
+        counters.marked_unread = False
+        self._changed.add(dialog_id)
+
+    def note_reaction(self, dialog_id: int) -> None:
+        self._counters_for(dialog_id).reactions += 1
+        self._changed.add(dialog_id)
+
+    def note_unread_mark(self, dialog_id: int, marked: bool) -> None:
+        self._counters_for(dialog_id).marked_unread = marked
+        self._changed.add(dialog_id)
+
+    def record_dialog(self, dialog) -> None:
+        """Replace a dialog's counters with the values Telegram just reported."""
+        raw = getattr(dialog, "dialog", None)
+        reactions = getattr(raw, "unread_reactions_count", 0)
+        self._counters[dialog.id] = DialogCounters(
+            unread=dialog.unread_count or 0,
+            mentions=dialog.unread_mentions_count or 0,
+            reactions=reactions if isinstance(reactions, int) else 0,
+            marked_unread=getattr(raw, "unread_mark", False) is True,
+        )
+
+    def needs_full_scan(self, now: datetime) -> bool:
+        return (
+            self._last_full_scan is None
+            or (now - self._last_full_scan).total_seconds() >= DIALOG_RECONCILE_INTERVAL_SECONDS
+        )
+
+    def request_full_scan(self) -> None:
+        """Make the next scan walk every dialog."""
+        self._last_full_scan = None
+
+    def full_scan_completed(self, now: datetime) -> None:
+        self._last_full_scan = now
+
+    def mark_changed(self, dialog_id: int) -> None:
+        """Have the next scan check a dialog (safe to call from any thread)."""
+        with self._changed_lock:
+            self._changed.add(dialog_id)
+
+    def take_changed(self) -> set[int]:
+        """Return and clear the ids of dialogs changed since the previous call."""
+        with self._changed_lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def recheck_pending(self, scanned_ids: Iterable[int], has_received_task: Callable[[int], bool]) -> None:
+        """
+        After a scan, mark dialogs that still show pending content as changed.
+
+        Considers the dialogs just scanned and those left to a received task by
+        earlier scans. A dialog with a received task still queued is left to it
+        and considered again after the task is gone.
+        """
+        candidates = set(scanned_ids) | self._awaiting_task
+        self._awaiting_task = set()
+        for dialog_id in candidates:
+            if not self.counters(dialog_id).has_pending():
+                continue
+            if has_received_task(dialog_id):
+                self._awaiting_task.add(dialog_id)
+            else:
+                self.mark_changed(dialog_id)
+
+
+_trackers: "weakref.WeakKeyDictionary[object, DialogStateTracker]" = weakref.WeakKeyDictionary()
+
+
+def get_dialog_tracker(agent) -> DialogStateTracker:
+    """Return the agent's dialog state tracker, creating it on first use."""
+    tracker = _trackers.get(agent)
+    if tracker is None:
+        tracker = DialogStateTracker()
+        _trackers[agent] = tracker
+    return tracker
+
+
+def reset_dialog_tracker(agent) -> DialogStateTracker:
+    """Start a fresh tracker (e.g. for a new client, which may have missed updates)."""
+    tracker = DialogStateTracker()
+    _trackers[agent] = tracker
+    return tracker
+
+
+def mark_dialog_changed(agent, dialog_id: int) -> None:
+    """Have the agent's next scan check a dialog, e.g. after it was un-gagged or unmuted."""
+    tracker = _trackers.get(agent)
+    # Without a tracker the agent has not scanned yet, and its first scan is a full one
+    if tracker is not None:
+        tracker.mark_changed(dialog_id)
+
+
+def request_full_dialog_scan(agent) -> None:
+    """Have the agent's next scan walk every dialog, e.g. after its global gag changed."""
+    tracker = _trackers.get(agent)
+    if tracker is not None:
+        tracker.request_full_scan()
+
+
+async def fetch_changed_dialogs(client, tracker: DialogStateTracker, dialog_ids) -> list[DialogView]:
+    """
+    Fetch current state for dialogs whose tracked counters show pending content.
+
+    Dialogs whose counters are all clear (e.g. read on another device) are
+    dropped without an API call. If a peer cannot be resolved, a full scan is
+    requested so the dialog is reconciled there.
+    """
+    input_peers = []
+    for dialog_id in sorted(dialog_ids):
+        if not tracker.counters(dialog_id).has_pending():
+            continue
+        try:
+            input_peers.append(InputDialogPeer(peer=await client.get_input_entity(dialog_id)))
+        except Exception as e:
+            logger.debug(f"Could not resolve changed dialog {dialog_id}, scheduling a full scan: {e}")
+            tracker.request_full_scan()
+
+    views = []
+    for start in range(0, len(input_peers), _PEER_DIALOGS_BATCH):
+        result = await client(GetPeerDialogsRequest(peers=input_peers[start:start + _PEER_DIALOGS_BATCH]))
+        for raw in result.dialogs:
+            views.append(
+                DialogView(
+                    id=telethon_utils.get_peer_id(raw.peer),
+                    unread_count=raw.unread_count,
+                    unread_mentions_count=raw.unread_mentions_count,
+                    dialog=raw,
+                )
+            )
+    return views
@@ -8,18 +8,28 @@ import hashlib
 import logging
 
 from telethon import events  # pyright: ignore[reportMissingImports]
+from telethon import utils as telethon_utils  # pyright: ignore[reportMissingImports]
 from telethon.tl.types import (  # pyright: ignore[reportMissingImports]
+    DialogPeer,
     UpdateDialogFilter,
+    UpdateDialogUnreadMark,
+    UpdateMessageReactions,
     UpdateUserTyping,
 )
 
 from agent import Agent, all_agents
 from clock import clock
 from datetime import UTC
+from handlers.received_helpers.channel_details import (
+    CHANNEL_DETAILS_UPDATES,
+    channel_details_peer_id,
+    invalidate_channel_details,
+)
 from utils.formatting import format_log_prefix_resolved
 from typing_state import mark_partner_typing
 from .incoming import handle_incoming_message
 from .scan import scan_unread_messages
+from .dialog_state import reset_dialog_tracker
 from .auth import authenticate_agent
 
 logger = logging.getLogger(__name__)
@@ -70,10 +80,24 @@ async def run_telegram_loop(agent: Agent):
             logger.error(f"{format_log_prefix_resolved(agent.name, None)} No client available after authentication.")
             break
 
+        # A new client may have missed updates, so its first scan walks every dialog
+        dialog_tracker = reset_dialog_tracker(agent)
+
         @client.on(events.NewMessage(incoming=True))
-        async def handle(event):
+        async def handle(event, tracker=dialog_tracker):
+            tracker.note_new_message(event.chat_id, mentioned=bool(getattr(event.message, "mentioned", False)))
             await handle_incoming_message(agent, event)
 
+        @client.on(events.MessageRead(inbox=True))
+        async def handle_inbox_read(event, tracker=dialog_tracker):
+            still_unread = getattr(event.original_update, "still_unread_count", 0)
+            tracker.note_read(event.chat_id, still_unread if isinstance(still_unread, int) else 0)
+
+        @client.on(events.Raw(UpdateDialogUnreadMark))
+        async def handle_unread_mark(update, tracker=dialog_tracker):
+            if isinstance(update.peer, DialogPeer):
+                tracker.note_unread_mark(telethon_utils.get_peer_id(update.peer.peer), bool(update.unread))
+
         @client.on(events.Raw(UpdateUserTyping))
         async def handle_user_typing(update):
             user_id = getattr(update, "user_id", None)
@@ -87,22 +111,24 @@ async def run_telegram_loop(agent: Agent):
             # For DMs, we track the user_id as the partner who is typing.
             mark_partner_typing(agent.agent_id, user_id)
 
-        # NOTE: We do NOT have an UpdateMessageReactions event handler.
-        #
-        # Reactions are handled exclusively by the periodic scan (scan_unread_messages).
-        # We previously had an event-driven handler for UpdateMessageReactions, but
-        # production logs showed it consistently fired AFTER the periodic scan had
-        # already detected and processed the reaction. The event provided no value
-        # and only created duplicates that had to be blocked.
-        #
-        # The 10-second periodic scan interval provides sufficient responsiveness for
-        # reactions, especially given that reactions trigger responsiveness delays anyway.
-        #
-        # If Telegram improves their API delivery speed in the future, we can restore
-        # the event handler from git history (see commit f1a3e46 for removal rationale).
+        # Reactions only mark the dialog as changed; the periodic scan decides whether
+        # they are unread reactions on an agent message and creates the received task.
+        # An earlier handler that acted on UpdateMessageReactions directly usually ran
+        # after the scan had already handled the reaction and only produced duplicates
+        # (see commit f1a3e46).
+        @client.on(events.Raw(UpdateMessageReactions))
+        async def handle_reactions(update, tracker=dialog_tracker):
+            tracker.note_reaction(telethon_utils.get_peer_id(update.peer))
+
+        # Drop cached channel-details prompt sections when a peer's profile or membership changes
+        @client.on(events.Raw(CHANNEL_DETAILS_UPDATES))
+        async def handle_peer_details_update(update):
+            peer_id = channel_details_peer_id(update)
+            if peer_id is not None and agent.agent_id is not None:
+                invalidate_channel_details(agent.agent_id, peer_id)
 
         @client.on(events.Raw(UpdateDialogFilter))
-        async def handle_dialog_update(event):
+        async def handle_dialog_update(event, tracker=dialog_tracker):
             """
             This handler triggers when a dialog's properties change, such as
             being marked as unread. It serves as an event-driven trigger
@@ -112,7 +138,8 @@ async def run_telegram_loop(agent: Agent):
                 f"{format_log_prefix_resolved(agent.name, None)} Detected a dialog filter update. Triggering a scan."
             )
             # We don't need to inspect the event further; its existence is the trigger.
-            # We call the existing scan function to check for the unread mark.
+            # Reconcile every dialog rather than only those changed by updates.
+            tracker.request_full_scan()
             await scan_unread_messages(agent)
 
         try:
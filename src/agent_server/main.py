@@ -16,12 +16,15 @@ from prompt_loader import load_system_prompt
 from task_graph import WorkQueue
 from admin_console.app import start_admin_console
 from media.media_scratch import init_media_scratch
-from tick import run_tick_loop
+from tick import get_concurrent_runner, run_one_tick, run_one_tick_concurrent, run_tick_loop
 from config import (
     GOOGLE_GEMINI_API_KEY,
     GROK_API_KEY,
     OPENAI_API_KEY,
     OPENROUTER_API_KEY,
+    TICK_EVENT_DRIVEN,
+    TICK_MAX_CONCURRENT_TASKS,
+    TICK_MAX_IDLE_SECONDS,
 )
 
 from .auth import authenticate_all_agents
@@ -41,6 +44,9 @@ logging.getLogger("telethon.client.updates").setLevel(logging.WARNING)
 
 STATE_PATH = os.path.join(os.environ["CINDY_AGENT_STATE_DIR"], "work_queue.json")
 
+# Longest wait on shutdown for tasks the concurrent runner already started
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS = 60
+
 
 def _env_flag(name: str, default: bool) -> bool:
     value = os.getenv(name)
@@ -172,8 +178,16 @@ async def main():
             logger.warning("Failed to start telegram_id_to_name population: %s", e)
 
         # Now start all the main tasks
+        # TICK_MAX_CONCURRENT_TASKS > 1 lets several conversations progress at once
+        tick_fn = run_one_tick_concurrent if TICK_MAX_CONCURRENT_TASKS > 1 else run_one_tick
         tick_task = asyncio.create_task(
-            run_tick_loop(tick_interval_sec=2, state_file_path=STATE_PATH)
+            run_tick_loop(
+                tick_interval_sec=2,
+                state_file_path=STATE_PATH,
+                tick_fn=tick_fn,
+                event_driven=TICK_EVENT_DRIVEN,
+                max_idle_sec=TICK_MAX_IDLE_SECONDS,
+            )
         )
 
         telegram_tasks = [
@@ -201,5 +215,32 @@ async def main():
                 raise exc
 
     finally:
+        # Let tasks the concurrent runner already started finish (and log, and
+        # call their LLMs) before the writers and HTTP clients they use close
+        if TICK_MAX_CONCURRENT_TASKS > 1:
+            try:
+                await asyncio.wait_for(
+                    get_concurrent_runner().drain(), SHUTDOWN_DRAIN_TIMEOUT_SECONDS
+                )
+            except TimeoutError:
+                logger.warning(
+                    f"In-flight tasks still running after {SHUTDOWN_DRAIN_TIMEOUT_SECONDS}s; exiting anyway"
+                )
         if admin_server:
             admin_server.shutdown()
+        # Write any buffered task execution log rows before exiting
+        from db.task_log import close_task_log_writer
+        close_task_log_writer()
+        # Write pending media last-used touches
+        from db.media_metadata import close_media_last_used_tracker
+        close_media_last_used_tracker()
+        # Stop animated sticker render workers (only started if a TGS was converted)
+        try:
+            from media.tgs_converter import shutdown_tgs_render_pool
+        except Exception as e:
+            logger.debug(f"TGS converter unavailable at shutdown: {e}")
+        else:
+            shutdown_tgs_render_pool(wait=False)
+        # Close pooled keep-alive connections to LLM providers
+        from llm.http_pool import close_llm_http_clients
+        await close_llm_http_clients()
@@ -5,10 +5,12 @@
 #
 """Scan dialogs for unread messages, mentions, and reactions."""
 import logging
+from datetime import UTC
 
 from agent import Agent
 from clock import clock
 from schedule import get_agent_responsiveness
+from task_graph import WorkQueue
 from task_graph_helpers import insert_received_task_for_conversation
 from utils.formatting import format_log_prefix_resolved
 from utils.telegram import can_agent_send_to_channel, get_channel_name
@@ -23,10 +25,24 @@ from .caches import (
     ensure_media_cache,
     ensure_saved_message_sticker_cache,
 )
+from .dialog_state import fetch_changed_dialogs, get_dialog_tracker
 
 logger = logging.getLogger(__name__)
 
 
+async def _as_async_iter(items):
+    for item in items:
+        yield item
+
+
+def _has_received_task(agent_id: int, dialog_id: int) -> bool:
+    """True if a not yet finished received task is queued for the conversation."""
+    graph = WorkQueue.get_instance().graph_for_conversation(agent_id, dialog_id)
+    return graph is not None and any(
+        task.type == "received" and not task.status.is_completed() for task in graph.tasks
+    )
+
+
 async def scan_unread_messages(agent: Agent):
     if agent.is_disabled:
         return
@@ -58,121 +74,154 @@ async def scan_unread_messages(agent: Agent):
         return
     agent_id = agent.agent_id
 
-    async for dialog in client.iter_dialogs():
-        # Sleep 1/20 of a second (0.05s) between each dialog to avoid GetContactsRequest flood waits
-        await clock.sleep(0.05)
-
-        # Ignore Telegram system channel (777000)
-        if str(dialog.id) == str(TELEGRAM_SYSTEM_USER_ID):
+    # Walk every dialog only on the first scan after connecting and for periodic
+    # reconciliation; otherwise look only at dialogs changed by Telegram updates
+    tracker = get_dialog_tracker(agent)
+    scan_started = clock.now(UTC)
+    full_scan = tracker.needs_full_scan(scan_started)
+    changed_ids = tracker.take_changed()
+    if full_scan:
+        dialogs = client.iter_dialogs()
+    else:
+        try:
+            dialogs = _as_async_iter(await fetch_changed_dialogs(client, tracker, changed_ids))
+        except Exception as e:
             logger.debug(
-                f"{format_log_prefix_resolved(agent.name, None)} Skipping Telegram system channel ({TELEGRAM_SYSTEM_USER_ID}) in scan"
+                f"{format_log_prefix_resolved(agent.name, None)} Could not fetch {len(changed_ids)} changed dialog(s), "
+                f"falling back to a full scan: {e}"
             )
-            continue
+            full_scan = True
+            dialogs = client.iter_dialogs()
 
-        muted = await agent.is_muted(dialog.id)
-        gagged = await agent.is_conversation_gagged(dialog.id)
-        has_unread = not muted and dialog.unread_count > 0
-        has_mentions = dialog.unread_mentions_count > 0
+    scanned_ids = []
+    try:
+        async for dialog in dialogs:
+            # Sleep 1/20 of a second (0.05s) between each dialog to avoid GetContactsRequest flood waits
+            await clock.sleep(0.05)
+            tracker.record_dialog(dialog)
 
-        # If gagged, skip creating received tasks (but don't mark as read yet - that happens in received task handler)
-        if gagged:
-            dialog_name = await get_channel_name(agent, dialog.id)
-            logger.debug(
-                f"{format_log_prefix_resolved(agent.name, dialog_name)} Skipping received task creation for [{dialog_name}] - conversation is gagged"
-            )
-            continue
-
-        # If there are mentions, we must check if they are from a non-blocked user.
-        is_callout = False
-        if has_mentions:
-            async for message in client.iter_messages(
-                dialog.id, limit=5
-            ):
-                if message.mentioned and not await agent.is_blocked(message.sender_id):
-                    is_callout = True
-                    break
-
-        # When a conversation was explicitly marked unread, treat it as a callout.
-        is_marked_unread = getattr(dialog.dialog, "unread_mark", False)
-
-        # Check if unread reactions are on any agent message
-        # Only check if dialog indicates there are unread reactions (avoids expensive API call)
-        # Note: dialog.dialog.unread_reactions_count may not be available in all Telethon versions
-        unread_reactions_count = getattr(dialog.dialog, "unread_reactions_count", 0)
-        # Ensure it's an integer (MagicMock returns a mock object if attribute doesn't exist)
-        if not isinstance(unread_reactions_count, int):
-            unread_reactions_count = 0
-        reaction_message_id = None
-        if unread_reactions_count > 0:
-            # Only check if there are actually unread reactions indicated
-            # Get channel name first since we'll need it for logging
-            dialog_name = await get_channel_name(agent, dialog.id)
-            reaction_message_id = await get_agent_message_with_reactions(agent, dialog, dialog_name)
-            if reaction_message_id:
+            # Ignore Telegram system channel (777000)
+            if str(dialog.id) == str(TELEGRAM_SYSTEM_USER_ID):
                 logger.debug(
-                    f"{format_log_prefix_resolved(agent.name, dialog_name)} [REACTION-SCAN] Unread reaction found on agent message {reaction_message_id} "
-                    f"in [{dialog_name}] (chat_id={dialog.id}, unread_reactions_count={unread_reactions_count})"
+                    f"{format_log_prefix_resolved(agent.name, None)} Skipping Telegram system channel ({TELEGRAM_SYSTEM_USER_ID}) in scan"
                 )
+                continue
+            scanned_ids.append(dialog.id)
 
-        has_reactions_on_agent_message = reaction_message_id is not None
+            muted = await agent.is_muted(dialog.id)
+            gagged = await agent.is_conversation_gagged(dialog.id)
+            has_unread = not muted and dialog.unread_count > 0
+            has_mentions = dialog.unread_mentions_count > 0
 
-        # Check if this is a Contact Sign Up message in a single-message conversation
-        is_contact_signup_only = False
-        if has_unread and not is_callout and not is_marked_unread and not has_reactions_on_agent_message:
-            try:
-                # Get the most recent unread message
-                unread_messages = []
+            # If gagged, skip creating received tasks (but don't mark as read yet - that happens in received task handler)
+            if gagged:
+                dialog_name = await get_channel_name(agent, dialog.id)
+                logger.debug(
+                    f"{format_log_prefix_resolved(agent.name, dialog_name)} Skipping received task creation for [{dialog_name}] - conversation is gagged"
+                )
+                continue
+
+            # If there are mentions, we must check if they are from a non-blocked user.
+            is_callout = False
+            if has_mentions:
                 async for message in client.iter_messages(
-                    dialog.id, limit=min(dialog.unread_count, 1)
+                    dialog.id, limit=5
                 ):
-                    unread_messages.append(message)
-
-                if unread_messages:
-                    latest_message = unread_messages[0]
-                    if is_contact_signup_message(latest_message):
-                        # Check if conversation has only one message
-                        if await has_only_one_message(client, dialog.id):
-                            is_contact_signup_only = True
-                            dialog_name = await get_channel_name(agent, dialog.id)
-                            logger.info(
-                                f"{format_log_prefix_resolved(agent.name, dialog_name)} Skipping received task for [{dialog_name}] - Contact Sign Up message in single-message conversation"
-                            )
-                            # Mark the message as read but don't create a received task
-                            entity = await agent.get_cached_entity(dialog.id)
-                            if entity:
-                                await client.send_read_acknowledge(entity, clear_mentions=has_mentions, clear_reactions=has_reactions_on_agent_message)
-                                logger.debug(
-                                    f"{format_log_prefix_resolved(agent.name, dialog_name)} Marked Contact Sign Up message as read in [{dialog_name}]"
+                    if message.mentioned and not await agent.is_blocked(message.sender_id):
+                        is_callout = True
+                        break
+
+            # When a conversation was explicitly marked unread, treat it as a callout.
+            is_marked_unread = getattr(dialog.dialog, "unread_mark", False)
+
+            # Check if unread reactions are on any agent message
+            # Only check if dialog indicates there are unread reactions (avoids expensive API call)
+            # Note: dialog.dialog.unread_reactions_count may not be available in all Telethon versions
+            unread_reactions_count = getattr(dialog.dialog, "unread_reactions_count", 0)
+            # Ensure it's an integer (MagicMock returns a mock object if attribute doesn't exist)
+            if not isinstance(unread_reactions_count, int):
+                unread_reactions_count = 0
+            reaction_message_id = None
+            if unread_reactions_count > 0:
+                # Only check if there are actually unread reactions indicated
+                # Get channel name first since we'll need it for logging
+                dialog_name = await get_channel_name(agent, dialog.id)
+                reaction_message_id = await get_agent_message_with_reactions(agent, dialog, dialog_name)
+                if reaction_message_id:
+                    logger.debug(
+                        f"{format_log_prefix_resolved(agent.name, dialog_name)} [REACTION-SCAN] Unread reaction found on agent message {reaction_message_id} "
+                        f"in [{dialog_name}] (chat_id={dialog.id}, unread_reactions_count={unread_reactions_count})"
+                    )
+
+            has_reactions_on_agent_message = reaction_message_id is not None
+
+            # Check if this is a Contact Sign Up message in a single-message conversation
+            is_contact_signup_only = False
+            if has_unread and not is_callout and not is_marked_unread and not has_reactions_on_agent_message:
+                try:
+                    # Get the most recent unread message
+                    unread_messages = []
+                    async for message in client.iter_messages(
+                        dialog.id, limit=min(dialog.unread_count, 1)
+                    ):
+                        unread_messages.append(message)
+
+                    if unread_messages:
+                        latest_message = unread_messages[0]
+                        if is_contact_signup_message(latest_message):
+                            # Check if conversation has only one message
+                            if await has_only_one_message(client, dialog.id):
+                                is_contact_signup_only = True
+                                dialog_name = await get_channel_name(agent, dialog.id)
+                                logger.info(
+                                    f"{format_log_prefix_resolved(agent.name, dialog_name)} Skipping received task for [{dialog_name}] - Contact Sign Up message in single-message conversation"
                                 )
-            except Exception as e:
-                logger.debug(
-                    f"{format_log_prefix_resolved(agent.name, None)} Error checking for Contact Sign Up message in dialog {dialog.id}: {e}"
+                                # Mark the message as read but don't create a received task
+                                entity = await agent.get_cached_entity(dialog.id)
+                                if entity:
+                                    await client.send_read_acknowledge(entity, clear_mentions=has_mentions, clear_reactions=has_reactions_on_agent_message)
+                                    logger.debug(
+                                        f"{format_log_prefix_resolved(agent.name, dialog_name)} Marked Contact Sign Up message as read in [{dialog_name}]"
+                                    )
+                except Exception as e:
+                    logger.debug(
+                        f"{format_log_prefix_resolved(agent.name, None)} Error checking for Contact Sign Up message in dialog {dialog.id}: {e}"
+                    )
+
+            if (is_callout or has_unread or is_marked_unread or has_reactions_on_agent_message) and not is_contact_signup_only:
+                dialog_name = await get_channel_name(agent, dialog.id)
+                logger.info(
+                    f"{format_log_prefix_resolved(agent.name, dialog_name)} Found unread content in [{dialog_name}] "
+                    f"(unread: {dialog.unread_count}, mentions: {dialog.unread_mentions_count}, marked: {is_marked_unread}, reactions_on_agent_msg: {has_reactions_on_agent_message})"
                 )
 
-        if (is_callout or has_unread or is_marked_unread or has_reactions_on_agent_message) and not is_contact_signup_only:
-            dialog_name = await get_channel_name(agent, dialog.id)
-            logger.info(
-                f"{format_log_prefix_resolved(agent.name, dialog_name)} Found unread content in [{dialog_name}] "
-                f"(unread: {dialog.unread_count}, mentions: {dialog.unread_mentions_count}, marked: {is_marked_unread}, reactions_on_agent_msg: {has_reactions_on_agent_message})"
-            )
+                # Check if agent can send messages to this channel before creating received task
+                if not await can_agent_send_to_channel(agent, dialog.id):
+                    logger.debug(
+                        f"{format_log_prefix_resolved(agent.name, dialog_name)} Skipping received task for [{dialog_name}] - agent cannot send messages in this chat"
+                    )
+                    continue
 
-            # Check if agent can send messages to this channel before creating received task
-            if not await can_agent_send_to_channel(agent, dialog.id):
-                logger.debug(
-                    f"{format_log_prefix_resolved(agent.name, dialog_name)} Skipping received task for [{dialog_name}] - agent cannot send messages in this chat"
+                # Read receipts are now handled in handle_received with responsiveness delays
+                # Pass clear_mentions/clear_reactions flags so they can be cleared when marking as read
+                await insert_received_task_for_conversation(
+                    recipient_id=agent_id,
+                    channel_id=dialog.id,
+                    is_callout=is_callout or is_marked_unread,
+                    reaction_message_id=reaction_message_id,
+                    clear_mentions=has_mentions,
+                    clear_reactions=has_reactions_on_agent_message,
                 )
-                continue
+    except Exception:
+        # Dialogs not reached this time are reconciled by a full scan
+        tracker.request_full_scan()
+        raise
 
-            # Read receipts are now handled in handle_received with responsiveness delays
-            # Pass clear_mentions/clear_reactions flags so they can be cleared when marking as read
-            await insert_received_task_for_conversation(
-                recipient_id=agent_id,
-                channel_id=dialog.id,
-                is_callout=is_callout or is_marked_unread,
-                reaction_message_id=reaction_message_id,
-                clear_mentions=has_mentions,
-                clear_reactions=has_reactions_on_agent_message,
-            )
+    if full_scan:
+        tracker.full_scan_completed(scan_started)
+    # Dialogs still unread without a queued received task (skipped as gagged, muted or
+    # unable to send, or whose task ended without reading them) are checked next scan
+    tracker.recheck_pending(scanned_ids, lambda dialog_id: _has_received_task(agent_id, dialog_id))
 
     # Refresh photo cache from saved messages to pick up new photos and remove deleted ones
     if agent_id:
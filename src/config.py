@@ -105,6 +105,332 @@ def _parse_media_video_max_duration() -> int:
 MEDIA_VIDEO_MAX_DURATION_SECONDS: int = _parse_media_video_max_duration()
 
 
+# Download size caps (MB) per media kind; larger media is marked unsupported without downloading
+def _parse_media_download_max_mb(name: str, default: float) -> float:
+    """Parse a MEDIA_DOWNLOAD_MAX_MB_* setting with error handling."""
+    try:
+        value = float(os.environ.get(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+MEDIA_DOWNLOAD_MAX_MB_IMAGE: float = _parse_media_download_max_mb("MEDIA_DOWNLOAD_MAX_MB_IMAGE", 20)
+MEDIA_DOWNLOAD_MAX_MB_VIDEO: float = _parse_media_download_max_mb("MEDIA_DOWNLOAD_MAX_MB_VIDEO", 50)
+MEDIA_DOWNLOAD_MAX_MB_AUDIO: float = _parse_media_download_max_mb("MEDIA_DOWNLOAD_MAX_MB_AUDIO", 25)
+MEDIA_DOWNLOAD_MAX_MB_DOCUMENT: float = _parse_media_download_max_mb("MEDIA_DOWNLOAD_MAX_MB_DOCUMENT", 50)
+
+
+# Tick scheduler concurrency (1 = legacy mode: one task per tick across all conversations)
+def _parse_tick_max_concurrent_tasks() -> int:
+    """Parse TICK_MAX_CONCURRENT_TASKS with error handling."""
+    try:
+        value = int(os.environ.get("TICK_MAX_CONCURRENT_TASKS", "1"))
+        return value if value > 0 else 1
+    except ValueError:
+        return 1
+
+
+TICK_MAX_CONCURRENT_TASKS: int = _parse_tick_max_concurrent_tasks()
+
+
+def _parse_tick_max_concurrent_tasks_per_agent() -> int:
+    """Parse TICK_MAX_CONCURRENT_TASKS_PER_AGENT with error handling."""
+    try:
+        value = int(os.environ.get("TICK_MAX_CONCURRENT_TASKS_PER_AGENT", "4"))
+        return value if value > 0 else 4
+    except ValueError:
+        return 4
+
+
+TICK_MAX_CONCURRENT_TASKS_PER_AGENT: int = _parse_tick_max_concurrent_tasks_per_agent()
+
+
+# Event-driven tick loop: wake on new work or the next ready time instead of polling
+def _parse_tick_event_driven() -> bool:
+    """Parse TICK_EVENT_DRIVEN; anything other than an explicit false value enables it."""
+    value = os.environ.get("TICK_EVENT_DRIVEN", "true").strip().lower()
+    return value not in ("0", "false", "no", "off")
+
+
+TICK_EVENT_DRIVEN: bool = _parse_tick_event_driven()
+
+
+def _parse_tick_max_idle_seconds() -> float:
+    """Parse TICK_MAX_IDLE_SECONDS (longest event-driven sleep) with error handling."""
+    try:
+        value = float(os.environ.get("TICK_MAX_IDLE_SECONDS", "30"))
+        return value if value > 0 else 30.0
+    except ValueError:
+        return 30.0
+
+
+TICK_MAX_IDLE_SECONDS: float = _parse_tick_max_idle_seconds()
+
+
+# Work queue persistence: append change records to work_queue.json.journal instead of
+# rewriting work_queue.json on every save; compact after this many records
+def _parse_work_queue_journal() -> bool:
+    """Parse WORK_QUEUE_JOURNAL; only an explicit true value enables it."""
+    value = os.environ.get("WORK_QUEUE_JOURNAL", "false").strip().lower()
+    return value in ("1", "true", "yes", "on")
+
+
+WORK_QUEUE_JOURNAL: bool = _parse_work_queue_journal()
+
+
+def _parse_work_queue_journal_compact_records() -> int:
+    """Parse WORK_QUEUE_JOURNAL_COMPACT_RECORDS with error handling."""
+    try:
+        value = int(os.environ.get("WORK_QUEUE_JOURNAL_COMPACT_RECORDS", "1000"))
+        return value if value > 0 else 1000
+    except ValueError:
+        return 1000
+
+
+WORK_QUEUE_JOURNAL_COMPACT_RECORDS: int = _parse_work_queue_journal_compact_records()
+
+
+# Task execution log: rows are buffered and written in multi-row INSERTs once this many
+# are waiting or this many seconds have passed
+def _parse_task_log_batch_size() -> int:
+    """Parse TASK_LOG_BATCH_SIZE with error handling."""
+    try:
+        value = int(os.environ.get("TASK_LOG_BATCH_SIZE", "100"))
+        return value if value > 0 else 100
+    except ValueError:
+        return 100
+
+
+TASK_LOG_BATCH_SIZE: int = _parse_task_log_batch_size()
+
+
+def _parse_task_log_flush_interval_seconds() -> float:
+    """Parse TASK_LOG_FLUSH_INTERVAL_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("TASK_LOG_FLUSH_INTERVAL_SECONDS", "1"))
+        return value if value > 0 else 1.0
+    except ValueError:
+        return 1.0
+
+
+TASK_LOG_FLUSH_INTERVAL_SECONDS: float = _parse_task_log_flush_interval_seconds()
+
+
+# Unread scans only look at dialogs changed by Telegram updates; a full iter_dialogs
+# pass reconciles missed updates this often
+def _parse_dialog_reconcile_interval_seconds() -> float:
+    """Parse DIALOG_RECONCILE_INTERVAL_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("DIALOG_RECONCILE_INTERVAL_SECONDS", "600"))
+        return value if value > 0 else 600.0
+    except ValueError:
+        return 600.0
+
+
+DIALOG_RECONCILE_INTERVAL_SECONDS: float = _parse_dialog_reconcile_interval_seconds()
+
+
+# Media last_used_at touches are coalesced in memory and written this often
+def _parse_media_last_used_flush_interval_seconds() -> float:
+    """Parse MEDIA_LAST_USED_FLUSH_INTERVAL_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("MEDIA_LAST_USED_FLUSH_INTERVAL_SECONDS", "60"))
+        return value if value > 0 else 60.0
+    except ValueError:
+        return 60.0
+
+
+MEDIA_LAST_USED_FLUSH_INTERVAL_SECONDS: float = _parse_media_last_used_flush_interval_seconds()
+
+
+# In-process cache of MySQL media records and media-file existence checks
+def _parse_media_record_cache_max_entries() -> int:
+    """Parse MEDIA_RECORD_CACHE_MAX_ENTRIES with error handling (0 disables the cache)."""
+    try:
+        value = int(os.environ.get("MEDIA_RECORD_CACHE_MAX_ENTRIES", "20000"))
+        return value if value >= 0 else 20000
+    except ValueError:
+        return 20000
+
+
+def _parse_media_record_cache_ttl_seconds() -> float:
+    """Parse MEDIA_RECORD_CACHE_TTL_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("MEDIA_RECORD_CACHE_TTL_SECONDS", "600"))
+        return value if value >= 0 else 600.0
+    except ValueError:
+        return 600.0
+
+
+MEDIA_RECORD_CACHE_MAX_ENTRIES: int = _parse_media_record_cache_max_entries()
+MEDIA_RECORD_CACHE_TTL_SECONDS: float = _parse_media_record_cache_ttl_seconds()
+
+
+# In-process cache of agent content (notes, memories, plans, intentions, events, summaries)
+# used in system prompts; writes in this process invalidate it immediately
+def _parse_content_cache_max_entries() -> int:
+    """Parse CONTENT_CACHE_MAX_ENTRIES with error handling (0 disables the cache)."""
+    try:
+        value = int(os.environ.get("CONTENT_CACHE_MAX_ENTRIES", "10000"))
+        return value if value >= 0 else 10000
+    except ValueError:
+        return 10000
+
+
+def _parse_content_cache_ttl_seconds() -> float:
+    """Parse CONTENT_CACHE_TTL_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("CONTENT_CACHE_TTL_SECONDS", "600"))
+        return value if value >= 0 else 600.0
+    except ValueError:
+        return 600.0
+
+
+CONTENT_CACHE_MAX_ENTRIES: int = _parse_content_cache_max_entries()
+CONTENT_CACHE_TTL_SECONDS: float = _parse_content_cache_ttl_seconds()
+
+
+# Rendered channel-details prompt sections are reused for this long unless the entity changes
+def _parse_channel_details_cache_ttl_seconds() -> float:
+    """Parse CHANNEL_DETAILS_CACHE_TTL_SECONDS with error handling (0 disables the cache)."""
+    try:
+        value = float(os.environ.get("CHANNEL_DETAILS_CACHE_TTL_SECONDS", "1800"))
+        return value if value >= 0 else 1800.0
+    except ValueError:
+        return 1800.0
+
+
+CHANNEL_DETAILS_CACHE_TTL_SECONDS: float = _parse_channel_details_cache_ttl_seconds()
+
+
+# Media items described concurrently (downloads + LLM describe calls) across the process
+def _parse_media_describe_concurrency() -> int:
+    """Parse MEDIA_DESCRIBE_CONCURRENCY with error handling."""
+    try:
+        value = int(os.environ.get("MEDIA_DESCRIBE_CONCURRENCY", "4"))
+        return value if value >= 1 else 4
+    except ValueError:
+        return 4
+
+
+MEDIA_DESCRIBE_CONCURRENCY: int = _parse_media_describe_concurrency()
+
+
+# Animated sticker (TGS) rendering: worker processes for frame rendering, and overall timeout
+def _parse_tgs_render_workers() -> int:
+    """Parse TGS_RENDER_WORKERS with error handling (0 renders in-process on a thread)."""
+    default = min(4, os.cpu_count() or 1)
+    try:
+        value = int(os.environ.get("TGS_RENDER_WORKERS", str(default)))
+        return value if value >= 0 else default
+    except ValueError:
+        return default
+
+
+def _parse_tgs_render_timeout_seconds() -> float:
+    """Parse TGS_RENDER_TIMEOUT_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("TGS_RENDER_TIMEOUT_SECONDS", "120"))
+        return value if value > 0 else 120.0
+    except ValueError:
+        return 120.0
+
+
+TGS_RENDER_WORKERS: int = _parse_tgs_render_workers()
+TGS_RENDER_TIMEOUT_SECONDS: float = _parse_tgs_render_timeout_seconds()
+
+
+# Pooled HTTP clients shared by all LLM calls to a provider (see llm.http_pool)
+def _parse_llm_http_max_connections() -> int:
+    """Parse LLM_HTTP_MAX_CONNECTIONS (per provider) with error handling."""
+    try:
+        value = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "20"))
+        return value if value >= 1 else 20
+    except ValueError:
+        return 20
+
+
+def _parse_llm_http_max_keepalive_connections() -> int:
+    """Parse LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS (idle connections kept per provider) with error handling."""
+    try:
+        value = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        return value if value >= 0 else 10
+    except ValueError:
+        return 10
+
+
+def _parse_llm_http_keepalive_expiry_seconds() -> float:
+    """Parse LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+        return value if value >= 0 else 60.0
+    except ValueError:
+        return 60.0
+
+
+def _parse_llm_http2() -> bool:
+    """Parse LLM_HTTP2; anything other than an explicit false value enables HTTP/2 (needs h2)."""
+    value = os.environ.get("LLM_HTTP2", "true").strip().lower()
+    return value not in ("0", "false", "no", "off")
+
+
+LLM_HTTP_MAX_CONNECTIONS: int = _parse_llm_http_max_connections()
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = _parse_llm_http_max_keepalive_connections()
+LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = _parse_llm_http_keepalive_expiry_seconds()
+LLM_HTTP2: bool = _parse_llm_http2()
+
+
+# Prompt layout and provider-side prompt caching (see llm.prompt_cache)
+def _parse_prompt_stable_prefix() -> bool:
+    """Parse PROMPT_STABLE_PREFIX (stable-first prompt layout, off unless set to a true value)."""
+    value = os.environ.get("PROMPT_STABLE_PREFIX", "false").strip().lower()
+    return value in ("1", "true", "yes", "on")
+
+
+def _parse_gemini_context_cache() -> bool:
+    """Parse GEMINI_CONTEXT_CACHE (explicit cached content, off unless set to a true value)."""
+    value = os.environ.get("GEMINI_CONTEXT_CACHE", "false").strip().lower()
+    return value in ("1", "true", "yes", "on")
+
+
+def _parse_gemini_context_cache_ttl_seconds() -> float:
+    """Parse GEMINI_CONTEXT_CACHE_TTL_SECONDS with error handling (at least 300)."""
+    try:
+        value = float(os.environ.get("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "900"))
+        return value if value >= 300 else 900.0
+    except ValueError:
+        return 900.0
+
+
+def _parse_gemini_context_cache_min_tokens() -> int:
+    """Parse GEMINI_CONTEXT_CACHE_MIN_TOKENS (smallest prefix worth caching) with error handling."""
+    try:
+        value = int(os.environ.get("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "4096"))
+        return value if value >= 0 else 4096
+    except ValueError:
+        return 4096
+
+
+PROMPT_STABLE_PREFIX: bool = _parse_prompt_stable_prefix()
+GEMINI_CONTEXT_CACHE: bool = _parse_gemini_context_cache()
+GEMINI_CONTEXT_CACHE_TTL_SECONDS: float = _parse_gemini_context_cache_ttl_seconds()
+GEMINI_CONTEXT_CACHE_MIN_TOKENS: int = _parse_gemini_context_cache_min_tokens()
+
+
+# Prompt files are served from memory; check them for changes on disk at most this often
+def _parse_prompt_cache_check_interval_seconds() -> float:
+    """Parse PROMPT_CACHE_CHECK_INTERVAL_SECONDS with error handling (0 checks on every load)."""
+    try:
+        value = float(os.environ.get("PROMPT_CACHE_CHECK_INTERVAL_SECONDS", "5"))
+        return value if value >= 0 else 5.0
+    except ValueError:
+        return 5.0
+
+
+PROMPT_CACHE_CHECK_INTERVAL_SECONDS: float = _parse_prompt_cache_check_interval_seconds()
+
+
 # Typing behavior configuration
 def _parse_start_typing_delay() -> float:
     """Parse START_TYPING_DELAY with error handling."""
@@ -183,7 +509,7 @@ def _get_mysql_config():
             "database": os.environ.get("CINDY_AGENT_MYSQL_TEST_DATABASE"),
             "user": os.environ.get("CINDY_AGENT_MYSQL_TEST_USER"),
             "password": os.environ.get("CINDY_AGENT_MYSQL_TEST_PASSWORD"),
-            "pool_size": int(os.environ.get("CINDY_AGENT_MYSQL_TEST_POOL_SIZE", os.environ.get("CINDY_AGENT_MYSQL_POOL_SIZE", "5"))),
+            "pool_size": int(os.environ.get("CINDY_AGENT_MYSQL_TEST_POOL_SIZE", os.environ.get("CINDY_AGENT_MYSQL_POOL_SIZE", "10"))),
             "pool_timeout": int(os.environ.get("CINDY_AGENT_MYSQL_TEST_POOL_TIMEOUT", os.environ.get("CINDY_AGENT_MYSQL_POOL_TIMEOUT", "30"))),
         }
     else:
@@ -193,7 +519,7 @@ def _get_mysql_config():
             "database": os.environ.get("CINDY_AGENT_MYSQL_DATABASE"),
             "user": os.environ.get("CINDY_AGENT_MYSQL_USER"),
             "password": os.environ.get("CINDY_AGENT_MYSQL_PASSWORD"),
-            "pool_size": int(os.environ.get("CINDY_AGENT_MYSQL_POOL_SIZE", "5")),
+            "pool_size": int(os.environ.get("CINDY_AGENT_MYSQL_POOL_SIZE", "10")),
             "pool_timeout": int(os.environ.get("CINDY_AGENT_MYSQL_POOL_TIMEOUT", "30")),
         }
 
@@ -205,3 +531,53 @@ MYSQL_USER: str | None = _mysql_config["user"]
 MYSQL_PASSWORD: str | None = _mysql_config["password"]
 MYSQL_POOL_SIZE: int = _mysql_config["pool_size"]
 MYSQL_POOL_TIMEOUT: int = _mysql_config["pool_timeout"]
+
+
+# Connection pool health: ping a connection before reuse only when it has been idle this
+# long, and replace connections older than the max lifetime (0 disables recycling)
+def _parse_mysql_pool_idle_check_seconds() -> float:
+    """Parse CINDY_AGENT_MYSQL_POOL_IDLE_CHECK_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("CINDY_AGENT_MYSQL_POOL_IDLE_CHECK_SECONDS", "30"))
+        return value if value >= 0 else 30.0
+    except ValueError:
+        return 30.0
+
+
+MYSQL_POOL_IDLE_CHECK_SECONDS: float = _parse_mysql_pool_idle_check_seconds()
+
+
+def _parse_mysql_pool_max_lifetime_seconds() -> float:
+    """Parse CINDY_AGENT_MYSQL_POOL_MAX_LIFETIME_SECONDS with error handling."""
+    try:
+        value = float(os.environ.get("CINDY_AGENT_MYSQL_POOL_MAX_LIFETIME_SECONDS", "3600"))
+        return value if value >= 0 else 3600.0
+    except ValueError:
+        return 3600.0
+
+
+MYSQL_POOL_MAX_LIFETIME_SECONDS: float = _parse_mysql_pool_max_lifetime_seconds()
+
+
+# Pool connections left over for everything besides the run_db workers: the task log
+# and media last-used writer threads (2), admin console requests, and any blocking db
+# call still made on the event loop thread. Keep
+#   DB_EXECUTOR_THREADS + DB_BACKGROUND_WRITER_CONNECTIONS < CINDY_AGENT_MYSQL_POOL_SIZE
+# with room to spare, or a loop-thread call can wait for a connection and stall every agent.
+DB_BACKGROUND_WRITER_CONNECTIONS = 2
+_DB_RESERVED_CONNECTIONS = 5
+
+
+# Worker threads for db.aio.run_db (async callers of the blocking db modules);
+# defaults to the connection pool size minus the reserved connections above
+def _parse_db_executor_threads() -> int:
+    """Parse DB_EXECUTOR_THREADS with error handling."""
+    default = max(1, MYSQL_POOL_SIZE - _DB_RESERVED_CONNECTIONS)
+    try:
+        value = int(os.environ.get("DB_EXECUTOR_THREADS", str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+DB_EXECUTOR_THREADS: int = _parse_db_executor_threads()
@@ -7,10 +7,17 @@
 Database module for MySQL storage backend.
 """
 
-from db.connection import get_db_connection, close_db_connection_pool
+from db.connection import (
+    PoolTimeoutError,
+    close_db_connection_pool,
+    get_db_connection,
+    get_pool_metrics,
+)
 
 __all__ = [
     "get_db_connection",
     "close_db_connection_pool",
+    "get_pool_metrics",
+    "PoolTimeoutError",
 ]
 
@@ -10,6 +10,8 @@ Database operations for deleting all data associated with an agent.
 import logging
 
 from db.connection import get_db_connection
+from db.content_cache import forget_agent_content
+from db.events import forget_agent_events
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +113,8 @@ def delete_all_agent_data(agent_telegram_id: int) -> dict[str, int]:
             deleted_counts["events"] = cursor.rowcount
             
             conn.commit()
+            forget_agent_events(agent_telegram_id)
+            forget_agent_content(agent_telegram_id)
             
             total_deleted = sum(deleted_counts.values())
             logger.info(
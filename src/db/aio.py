@@ -0,0 +1,115 @@
+# src/db/aio.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Async access to the synchronous db modules.
+
+Every db module uses blocking pymysql calls. Coroutines on the agent loop (the
+tick, received handlers, media sources) must not call them directly, because a
+query blocks every agent's Telethon client for its full round-trip. Instead:
+
+    from db.aio import run_db
+    rows = await run_db(db_events.get_next_events_ordered, limit=50)
+
+run_db runs the call on a dedicated, bounded thread pool (DB_EXECUTOR_THREADS
+workers, defaulting to fewer than the connection pool size so the background
+writers and event loop callers still find a free connection). Calls that still open a connection on an event loop thread are
+timed by db.connection and reported here as loop stall time.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from config import DB_EXECUTOR_THREADS
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_offloaded_calls = 0
+_loop_blocking_calls = 0
+_loop_stall_seconds = 0.0
+_loop_stall_seconds_since_take = 0.0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the shared DB thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_THREADS, thread_name_prefix="db"
+                )
+    return _executor
+
+
+async def run_db[T](fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking db function on the DB thread pool and await its result.
+
+    Exceptions raised by fn propagate to the caller unchanged.
+    """
+    global _offloaded_calls
+    with _stats_lock:
+        _offloaded_calls += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+def on_event_loop_thread() -> bool:
+    """Return True if the current thread is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def record_loop_blocking(seconds: float) -> None:
+    """Record time a db call held a connection on an event loop thread."""
+    global _loop_blocking_calls, _loop_stall_seconds, _loop_stall_seconds_since_take
+    with _stats_lock:
+        _loop_blocking_calls += 1
+        _loop_stall_seconds += seconds
+        _loop_stall_seconds_since_take += seconds
+
+
+def take_loop_stall_seconds() -> float:
+    """Return loop stall time recorded since the previous call, and reset it."""
+    global _loop_stall_seconds_since_take
+    with _stats_lock:
+        seconds = _loop_stall_seconds_since_take
+        _loop_stall_seconds_since_take = 0.0
+    return seconds
+
+
+def get_db_async_metrics() -> dict[str, float | int]:
+    """Return cumulative counters for offloaded calls and loop-blocking calls."""
+    with _stats_lock:
+        return {
+            "offloaded_calls": _offloaded_calls,
+            "loop_blocking_calls": _loop_blocking_calls,
+            "loop_stall_seconds": _loop_stall_seconds,
+        }
+
+
+def shutdown_db_executor(wait: bool = True) -> None:
+    """Shut down the DB thread pool (a new one is created on next use)."""
+    global _executor
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -9,13 +9,19 @@ Database connection management with connection pooling.
 
 import logging
 import threading
+import time
 from contextlib import contextmanager
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from config import (
+    DB_BACKGROUND_WRITER_CONNECTIONS,
+    DB_EXECUTOR_THREADS,
     MYSQL_DATABASE,
     MYSQL_HOST,
     MYSQL_PASSWORD,
+    MYSQL_POOL_IDLE_CHECK_SECONDS,
+    MYSQL_POOL_MAX_LIFETIME_SECONDS,
     MYSQL_POOL_SIZE,
     MYSQL_POOL_TIMEOUT,
     MYSQL_PORT,
@@ -28,15 +34,75 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
-# Global connection pool
-_connection_pool: list["Connection"] = []
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled connection became available within MYSQL_POOL_TIMEOUT."""
+
+
+@dataclass
+class _PooledConnection:
+    conn: "Connection"
+    created_at: float  # time.monotonic()
+    last_used_at: float  # time.monotonic() when last returned to the pool
+
+
+# Global connection pool.
+# At most MYSQL_POOL_SIZE connections are open at once; callers wait (up to
+# MYSQL_POOL_TIMEOUT seconds) for one to be returned. The one exception is a
+# thread that already holds a connection: its nested checkouts may exceed the
+# cap, since making it wait on itself could never succeed. The cap must leave
+# room beyond the run_db workers and background writers (see config), since a
+# caller waiting on the event loop thread stalls every agent.
+_idle_connections: list[_PooledConnection] = []
 _pool_lock = threading.Lock()
+_pool_available = threading.Condition(_pool_lock)
 _pool_initialized = False
+_open_count = 0
+_in_use_count = 0
+_held = threading.local()
+
+_metrics = {
+    "checkouts": 0,
+    "checkout_seconds_total": 0.0,
+    "checkout_seconds_max": 0.0,
+    "waits": 0,
+    "wait_seconds_total": 0.0,
+    "timeouts": 0,
+    "liveness_checks": 0,
+    "connections_opened": 0,
+    "connections_closed": 0,
+}
+
+
+def _open_connection() -> "Connection":
+    """Open a new MySQL connection with the configured settings."""
+    import pymysql
+
+    return pymysql.connect(
+        host=MYSQL_HOST,
+        port=MYSQL_PORT,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DATABASE,
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=False,
+    )
+
+
+def _close_quietly(conn: "Connection") -> None:
+    """Close a connection, ignoring errors, and count it as closed."""
+    try:
+        conn.close()
+    except Exception:
+        pass
+    with _pool_lock:
+        _metrics["connections_closed"] += 1
 
 
 def _init_connection_pool() -> None:
     """Initialize the connection pool (thread-safe)."""
-    global _connection_pool, _pool_initialized
+    global _pool_initialized, _open_count
 
     # Use double-checked locking pattern for thread safety
     if _pool_initialized:
@@ -76,38 +142,151 @@ def _init_connection_pool() -> None:
                 )
 
         try:
-            import pymysql
-
-            # Create initial connections
-            for _ in range(MYSQL_POOL_SIZE):
-                conn = pymysql.connect(
-                    host=MYSQL_HOST,
-                    port=MYSQL_PORT,
-                    user=MYSQL_USER,
-                    password=MYSQL_PASSWORD,
-                    database=MYSQL_DATABASE,
-                    charset="utf8mb4",
-                    cursorclass=pymysql.cursors.DictCursor,
-                    autocommit=False,
-                )
-                _connection_pool.append(conn)
+            # Open one connection up front so bad configuration fails fast;
+            # the rest are opened on demand up to MYSQL_POOL_SIZE
+            now = time.monotonic()
+            _idle_connections.append(_PooledConnection(_open_connection(), now, now))
+            _open_count += 1
+            _metrics["connections_opened"] += 1
 
             _pool_initialized = True
             logger.info(
-                f"MySQL connection pool initialized with {MYSQL_POOL_SIZE} connections"
+                f"MySQL connection pool initialized (max {MYSQL_POOL_SIZE} connections)"
             )
+            if DB_EXECUTOR_THREADS + DB_BACKGROUND_WRITER_CONNECTIONS >= MYSQL_POOL_SIZE:
+                logger.warning(
+                    f"MySQL pool size {MYSQL_POOL_SIZE} leaves no connections beyond "
+                    f"{DB_EXECUTOR_THREADS} DB executor thread(s) and "
+                    f"{DB_BACKGROUND_WRITER_CONNECTIONS} background writer(s); admin console "
+                    "requests and event loop calls may wait for a connection. Raise "
+                    "CINDY_AGENT_MYSQL_POOL_SIZE or lower DB_EXECUTOR_THREADS."
+                )
         except Exception as e:
             logger.error(f"Failed to initialize MySQL connection pool: {e}")
             raise
 
 
+def _check_reusable(pooled: _PooledConnection, now: float) -> bool:
+    """
+    Return True if an idle connection can be handed out as is.
+
+    Connections past MYSQL_POOL_MAX_LIFETIME_SECONDS are recycled, and only
+    connections idle longer than MYSQL_POOL_IDLE_CHECK_SECONDS are pinged.
+    """
+    if MYSQL_POOL_MAX_LIFETIME_SECONDS and now - pooled.created_at >= MYSQL_POOL_MAX_LIFETIME_SECONDS:
+        logger.debug("Recycling MySQL connection past its max lifetime")
+        return False
+    if now - pooled.last_used_at >= MYSQL_POOL_IDLE_CHECK_SECONDS:
+        with _pool_lock:
+            _metrics["liveness_checks"] += 1
+        try:
+            pooled.conn.ping(reconnect=False)
+        except Exception:
+            logger.debug("Discarded dead MySQL connection")
+            return False
+    return True
+
+
+def _checkout() -> _PooledConnection:
+    """Take a connection from the pool, opening one or waiting if needed."""
+    global _open_count, _in_use_count
+
+    started_at = time.monotonic()
+    deadline = started_at + MYSQL_POOL_TIMEOUT
+    nested = getattr(_held, "count", 0) > 0
+    waited_from = None
+    with _pool_available:
+        while True:
+            if _idle_connections:
+                pooled = _idle_connections.pop()
+                break
+            if _open_count < MYSQL_POOL_SIZE or nested:
+                # Reserve a slot and open the connection outside the lock
+                _open_count += 1
+                pooled = None
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _metrics["timeouts"] += 1
+                raise PoolTimeoutError(
+                    f"Timed out after {MYSQL_POOL_TIMEOUT}s waiting for a MySQL connection "
+                    f"({MYSQL_POOL_SIZE} in use)"
+                )
+            if waited_from is None:
+                waited_from = time.monotonic()
+                _metrics["waits"] += 1
+            _pool_available.wait(remaining)
+        _in_use_count += 1
+        if waited_from is not None:
+            _metrics["wait_seconds_total"] += time.monotonic() - waited_from
+
+    try:
+        if pooled is not None and not _check_reusable(pooled, time.monotonic()):
+            # Keep the slot and replace the connection in it
+            _close_quietly(pooled.conn)
+            pooled = None
+        if pooled is None:
+            now = time.monotonic()
+            pooled = _PooledConnection(_open_connection(), now, now)
+            with _pool_lock:
+                _metrics["connections_opened"] += 1
+    except BaseException:
+        with _pool_available:
+            _open_count -= 1
+            _in_use_count -= 1
+            _pool_available.notify()
+        raise
+
+    elapsed = time.monotonic() - started_at
+    with _pool_lock:
+        _metrics["checkouts"] += 1
+        _metrics["checkout_seconds_total"] += elapsed
+        _metrics["checkout_seconds_max"] = max(_metrics["checkout_seconds_max"], elapsed)
+    _held.count = getattr(_held, "count", 0) + 1
+    return pooled
+
+
+def _release(pooled: _PooledConnection) -> None:
+    """Return a connection to the pool, or close it if it is broken or surplus."""
+    global _open_count, _in_use_count
+
+    _held.count -= 1
+    conn = pooled.conn
+    reusable = True
+    try:
+        # Roll back any open transaction so the next user starts clean and nothing
+        # uncommitted is committed by accident. Writes should already have committed;
+        # skip the round-trip when the server reports no transaction in progress.
+        from pymysql.constants import SERVER_STATUS
+
+        server_status = getattr(conn, "server_status", SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+        if server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            conn.rollback()
+    except Exception:
+        reusable = False
+
+    close = False
+    with _pool_available:
+        _in_use_count -= 1
+        if reusable and _pool_initialized and _open_count <= MYSQL_POOL_SIZE:
+            pooled.last_used_at = time.monotonic()
+            _idle_connections.append(pooled)
+        else:
+            _open_count -= 1
+            close = True
+        _pool_available.notify()
+    if close:
+        _close_quietly(conn)
+
+
 @contextmanager
 def get_db_connection():
     """
     Get a database connection from the pool.
     
-    Yields a connection that will be returned to the pool when done.
-    If pool is empty, creates a new connection.
+    Yields a connection that will be returned to the pool when done. Waits up
+    to MYSQL_POOL_TIMEOUT seconds when MYSQL_POOL_SIZE connections are already
+    in use, then raises PoolTimeoutError.
     
     Usage:
         with get_db_connection() as conn:
@@ -116,8 +295,6 @@ def get_db_connection():
             result = cursor.fetchall()
             conn.commit()
     """
-    global _connection_pool
-
     # Initialize pool if needed
     if not _pool_initialized:
         _init_connection_pool()
@@ -127,70 +304,54 @@ def get_db_connection():
             "MySQL connection pool not initialized. Check MySQL configuration."
         )
 
-    import pymysql
+    from db.aio import on_event_loop_thread, record_loop_blocking
 
-    conn = None
+    # Blocking use from a coroutine stalls the event loop; time it so it shows up
+    # in the per-tick stall metric (async callers should go through db.aio.run_db)
+    loop_started_at = time.perf_counter() if on_event_loop_thread() else None
+    pooled = None
     try:
-        with _pool_lock:
-            if _connection_pool:
-                conn = _connection_pool.pop()
-            else:
-                # Pool exhausted, create new connection
-                conn = pymysql.connect(
-                    host=MYSQL_HOST,
-                    port=MYSQL_PORT,
-                    user=MYSQL_USER,
-                    password=MYSQL_PASSWORD,
-                    database=MYSQL_DATABASE,
-                    charset="utf8mb4",
-                    cursorclass=pymysql.cursors.DictCursor,
-                    autocommit=False,
-                )
-                logger.debug("Created new MySQL connection (pool exhausted)")
-
-        yield conn
+        pooled = _checkout()
+        yield pooled.conn
 
     except Exception as e:
         logger.error(f"Database error: {e}")
         raise
     finally:
-        # Return connection to pool if it's still valid
-        if conn:
-            try:
-                # Always rollback to ensure clean state and prevent accidentally committing
-                # unintentional transactions. Safe to call multiple times if already rolled back.
-                # For read operations: rollback just cleans transaction state
-                # For write operations: they should have explicitly committed, so rollback does nothing
-                conn.rollback()
-                # Check if connection is still alive
-                conn.ping(reconnect=False)
-                with _pool_lock:
-                    if len(_connection_pool) < MYSQL_POOL_SIZE:
-                        _connection_pool.append(conn)
-                    else:
-                        # Pool is full, close the connection
-                        conn.close()
-                        logger.debug("Closed excess MySQL connection")
-            except Exception:
-                # Connection is dead or rollback failed, don't return to pool
-                try:
-                    conn.close()
-                except Exception:
-                    pass
-                logger.debug("Discarded dead MySQL connection")
+        if pooled is not None:
+            _release(pooled)
+        if loop_started_at is not None:
+            record_loop_blocking(time.perf_counter() - loop_started_at)
+
+
+def get_pool_metrics() -> dict[str, float | int]:
+    """
+    Return a snapshot of connection pool metrics.
+
+    Counts (max_size, open, in_use, idle) are current values. checkouts,
+    waits, timeouts, liveness_checks and connections_opened/closed (churn) are
+    cumulative, as are the checkout and wait times in seconds.
+    """
+    with _pool_lock:
+        metrics = dict(_metrics)
+        metrics.update(
+            max_size=MYSQL_POOL_SIZE,
+            open=_open_count,
+            in_use=_in_use_count,
+            idle=len(_idle_connections),
+        )
+    return metrics
 
 
 def close_db_connection_pool() -> None:
-    """Close all connections in the pool."""
-    global _connection_pool, _pool_initialized
+    """Close all idle connections in the pool; checked-out ones close when returned."""
+    global _pool_initialized, _open_count
 
     with _pool_lock:
-        for conn in _connection_pool:
-            try:
-                conn.close()
-            except Exception:
-                pass
-        _connection_pool.clear()
+        idle = list(_idle_connections)
+        _idle_connections.clear()
+        _open_count -= len(idle)
         _pool_initialized = False
-        logger.info("MySQL connection pool closed")
-
+    for pooled in idle:
+        _close_quietly(pooled.conn)
+    logger.info("MySQL connection pool closed")
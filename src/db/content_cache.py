@@ -0,0 +1,204 @@
+# src/db/content_cache.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+In-process cache of agent content used in system prompts.
+
+Every prompt build reads the agent's notes, global memories, channel plans,
+intentions, events and summaries, and each read used to run its own SELECT and
+re-serialize the rows to JSON. The rows only change through the save/delete
+functions in the db modules (used by the task handlers and the admin console,
+which runs in the same process), so AgentStorageMySQL reads them through this
+cache instead: rows are loaded once per (kind, agent, channel) and each
+rendered form of them (JSON block, summary text, events in a timezone) is kept
+next to the rows.
+
+The db write paths call invalidate_agent_content() after committing, so the
+next prompt sees the change. Writes by other processes become visible when an
+entry's TTL (CONTENT_CACHE_TTL_SECONDS) expires.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from config import CONTENT_CACHE_MAX_ENTRIES, CONTENT_CACHE_TTL_SECONDS
+
+# Content kinds and whether they are stored per channel
+CHANNEL_KINDS = ("notes", "plans", "events", "summaries")
+AGENT_KINDS = ("memories", "intentions")
+
+_Key = tuple[str, int, int | None]
+
+
+class _Entry:
+    __slots__ = ("expires_at", "rows", "rendered")
+
+    def __init__(self, expires_at: float, rows: list[dict[str, Any]]):
+        self.expires_at = expires_at
+        self.rows = rows
+        self.rendered: dict[Hashable, str] = {}
+
+
+class AgentContentCache:
+    """
+    Bounded LRU of content rows keyed by (kind, agent, channel), with renders.
+
+    Entries expire ttl_seconds after they were loaded. A load that overlaps an
+    invalidation is returned but not stored, so a write is never hidden by a
+    read that started before it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CONTENT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CONTENT_CACHE_TTL_SECONDS,
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[_Key, _Entry] = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl > 0
+
+    @staticmethod
+    def _key(kind: str, agent_telegram_id: int, channel_id: int | None) -> _Key:
+        return (kind, int(agent_telegram_id), None if kind in AGENT_KINDS else int(channel_id))
+
+    def _get_entry_locked(self, key: _Key, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _load_entry(self, key: _Key, load: Callable[[], list[dict[str, Any]]]) -> _Entry:
+        with self._lock:
+            generation = self._generation
+        entry = _Entry(time.monotonic() + self._ttl, load() or [])
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def rows(
+        self,
+        kind: str,
+        agent_telegram_id: int,
+        channel_id: int | None,
+        load: Callable[[], list[dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        """Return a copy of the rows, calling load() on a miss."""
+        if not self.enabled:
+            return load() or []
+        key = self._key(kind, agent_telegram_id, channel_id)
+        with self._lock:
+            entry = self._get_entry_locked(key, time.monotonic())
+            if entry is not None:
+                self.hits += 1
+                return copy.deepcopy(entry.rows)
+            self.misses += 1
+        return copy.deepcopy(self._load_entry(key, load).rows)
+
+    def rendered(
+        self,
+        kind: str,
+        agent_telegram_id: int,
+        channel_id: int | None,
+        variant: Hashable,
+        load: Callable[[], list[dict[str, Any]]],
+        render: Callable[[list[dict[str, Any]]], str],
+    ) -> str:
+        """
+        Return render(rows) for this variant, rendering once per loaded rows.
+
+        render must not modify the rows it is given.
+        """
+        if not self.enabled:
+            return render(load() or [])
+        key = self._key(kind, agent_telegram_id, channel_id)
+        with self._lock:
+            entry = self._get_entry_locked(key, time.monotonic())
+            if entry is not None:
+                text = entry.rendered.get(variant)
+                if text is not None:
+                    self.hits += 1
+                    return text
+            self.misses += 1
+        if entry is None:
+            entry = self._load_entry(key, load)
+        text = render(entry.rows)
+        with self._lock:
+            entry.rendered[variant] = text
+        return text
+
+    def invalidate(self, kind: str, agent_telegram_id: int, channel_id: int | None = None) -> None:
+        """Drop one cached collection after it was written."""
+        with self._lock:
+            self._entries.pop(self._key(kind, agent_telegram_id, channel_id), None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def invalidate_agent(self, agent_telegram_id: int) -> None:
+        """Drop every cached collection of an agent."""
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == int(agent_telegram_id)]:
+                del self._entries[key]
+            self._generation += 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def metrics(self) -> dict[str, float | int]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache = AgentContentCache()
+
+
+def get_agent_content_cache() -> AgentContentCache:
+    """Return the process-wide agent content cache."""
+    return _cache
+
+
+def invalidate_agent_content(kind: str, agent_telegram_id: int, channel_id: int | None = None) -> None:
+    """Forget cached content of one kind after it was saved or deleted."""
+    _cache.invalidate(kind, agent_telegram_id, channel_id)
+
+
+def forget_agent_content(agent_telegram_id: int) -> None:
+    """Forget all cached content of an agent (after deleting its data)."""
+    _cache.invalidate_agent(agent_telegram_id)
+
+
+def clear_agent_content_cache() -> None:
+    _cache.clear()
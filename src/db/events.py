@@ -7,16 +7,25 @@
 Database operations for events (scheduled actions).
 """
 
+import heapq
+import itertools
 import re
 import logging
-from datetime import datetime
+import threading
+import time
+from datetime import UTC, datetime
 from typing import Any
 
 from db.connection import get_db_connection
+from db.content_cache import invalidate_agent_content
 from db.datetime_util import normalize_datetime_for_mysql
 
 logger = logging.getLogger(__name__)
 
+# Reload the in-memory event index from MySQL this often, to pick up writes made
+# outside this process (e.g. by a separately running admin console)
+_EVENT_INDEX_RESYNC_SECONDS = 300
+
 # Interval: "N unit" with unit in minute(s), hour(s), day(s), week(s). Store as plural.
 _INTERVAL_PLURAL = {"minute": "minutes", "minutes": "minutes", "hour": "hours", "hours": "hours", "day": "days", "days": "days", "week": "weeks", "weeks": "weeks"}
 _INTERVAL_PATTERN = re.compile(r"^\s*([\d.]+)\s+(minute|minutes|hour|hours|day|days|week|weeks)\s*$", re.IGNORECASE)
@@ -204,6 +213,16 @@ def save_event(
                 (event_id, agent_telegram_id, channel_id, time_str, intent, norm_interval, occurrences),
             )
             conn.commit()
+            invalidate_agent_content("events", agent_telegram_id, channel_id)
+            _event_index.upsert({
+                "id": event_id,
+                "agent_telegram_id": int(agent_telegram_id),
+                "channel_id": int(channel_id),
+                "intent": intent or "",
+                "interval_value": norm_interval,
+                "occurrences": occurrences,
+                "time_utc": _parse_mysql_utc(time_str),
+            })
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to save event {event_id}: {e}")
@@ -250,6 +269,10 @@ def update_event_time_and_occurrences(
                     (time_str, event_id, agent_telegram_id, channel_id),
                 )
             conn.commit()
+            invalidate_agent_content("events", agent_telegram_id, channel_id)
+            _event_index.reschedule(
+                agent_telegram_id, channel_id, event_id, _parse_mysql_utc(time_str), occurrences
+            )
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to update event {event_id}: {e}")
@@ -268,6 +291,8 @@ def delete_event(agent_telegram_id: int, channel_id: int, event_id: str) -> None
                 (event_id, agent_telegram_id, channel_id),
             )
             conn.commit()
+            invalidate_agent_content("events", agent_telegram_id, channel_id)
+            _event_index.remove(agent_telegram_id, channel_id, event_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to delete event {event_id}: {e}")
@@ -276,6 +301,21 @@ def delete_event(agent_telegram_id: int, channel_id: int, event_id: str) -> None
             cursor.close()
 
 
+def _scheduler_event_from_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Convert an events row to the dict shape used by the tick's event scheduler."""
+    ev = {
+        "id": row["id"],
+        "agent_telegram_id": int(row["agent_telegram_id"]),
+        "channel_id": int(row["channel_id"]),
+        "intent": row["intent"] or "",
+        "interval_value": row.get("interval_value"),
+        "occurrences": int(row["occurrences"]) if row.get("occurrences") is not None else None,
+    }
+    if row["time_utc"]:
+        ev["time_utc"] = row["time_utc"]  # keep as datetime for comparison
+    return ev
+
+
 def get_next_events_ordered(limit: int = 50) -> list[dict[str, Any]]:
     """
     Return the next events ordered by time_utc ASC, up to limit.
@@ -295,20 +335,7 @@ def get_next_events_ordered(limit: int = 50) -> list[dict[str, Any]]:
             )
             rows = cursor.fetchall()
             conn.commit()
-            out = []
-            for row in rows:
-                ev = {
-                    "id": row["id"],
-                    "agent_telegram_id": int(row["agent_telegram_id"]),
-                    "channel_id": int(row["channel_id"]),
-                    "intent": row["intent"] or "",
-                    "interval_value": row.get("interval_value"),
-                    "occurrences": int(row["occurrences"]) if row.get("occurrences") is not None else None,
-                }
-                if row["time_utc"]:
-                    ev["time_utc"] = row["time_utc"]  # keep as datetime for comparison
-                out.append(ev)
-            return out
+            return [_scheduler_event_from_row(row) for row in rows]
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to get next events: {e}")
@@ -345,3 +372,307 @@ def channels_with_events(agent_telegram_id: int) -> set[int]:
             return {int(r["channel_id"]) for r in rows}
         finally:
             cursor.close()
+
+
+def _parse_mysql_utc(time_str: str) -> datetime:
+    """Parse a normalized MySQL DATETIME string (stored as UTC) into an aware datetime."""
+    return datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=UTC)
+
+
+def _as_aware_utc(value: datetime) -> datetime:
+    """DB stores UTC; the driver may return naive datetimes."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+class EventIndex:
+    """
+    In-memory copy of the events table, ordered by time_utc.
+
+    The tick asks it for due events instead of querying MySQL every tick. It is
+    filled from one full SELECT on first use (and every _EVENT_INDEX_RESYNC_SECONDS)
+    and kept current by save_event, update_event_time_and_occurrences,
+    delete_event, apply_fired_events and agent deletion. Events are kept in a
+    min-heap keyed by time_utc; superseded heap entries are skipped lazily.
+
+    Every write bumps a write generation. While a load is in progress (see
+    begin_load) writes are also recorded, and replace_all replays those made
+    after the load began, so a write that lands between the SELECT and
+    replace_all is not overwritten by the older rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: dict[tuple[int, int, str], dict[str, Any]] = {}
+        self._versions: dict[tuple[int, int, str], int] = {}
+        self._heap: list[tuple[datetime, int, tuple[int, int, str]]] = []
+        self._counter = itertools.count()
+        self._loaded_at: float | None = None
+        self._write_generation = 0
+        self._loads_in_progress = 0
+        self._writes_during_load: list[tuple[int, tuple]] = []
+
+    @staticmethod
+    def _key(agent_telegram_id: int, channel_id: int, event_id: str) -> tuple[int, int, str]:
+        return (int(agent_telegram_id), int(channel_id), str(event_id))
+
+    def is_fresh(self) -> bool:
+        """True if loaded and not yet due for a resync."""
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < _EVENT_INDEX_RESYNC_SECONDS
+        )
+
+    def begin_load(self) -> int:
+        """Start recording writes for a load; returns the generation to pass to replace_all."""
+        with self._lock:
+            self._loads_in_progress += 1
+            return self._write_generation
+
+    def end_load(self) -> None:
+        """Stop recording writes for a load started with begin_load (whether or not it succeeded)."""
+        with self._lock:
+            self._loads_in_progress -= 1
+            if not self._loads_in_progress:
+                self._writes_during_load.clear()
+
+    def replace_all(self, events: list[dict[str, Any]], replay_since: int | None = None) -> None:
+        """Replace the index contents with freshly loaded events.
+
+        With replay_since (from begin_load), writes made after the load began are
+        applied on top of the loaded rows.
+        """
+        with self._lock:
+            self._events.clear()
+            self._versions.clear()
+            self._heap.clear()
+            for ev in events:
+                self._upsert_locked(ev)
+            if replay_since is not None:
+                for generation, write in self._writes_during_load:
+                    if generation > replay_since:
+                        self._apply_locked(write)
+            self._loaded_at = time.monotonic()
+
+    def _write(self, write: tuple) -> None:
+        with self._lock:
+            self._write_generation += 1
+            if self._loads_in_progress:
+                self._writes_during_load.append((self._write_generation, write))
+            if self._loaded_at is not None:
+                self._apply_locked(write)
+
+    def _apply_locked(self, write: tuple) -> None:
+        op, *args = write
+        if op == "upsert":
+            self._upsert_locked(*args)
+        elif op == "reschedule":
+            self._reschedule_locked(*args)
+        elif op == "remove":
+            self._events.pop(args[0], None)
+            self._versions.pop(args[0], None)
+        else:  # remove_agent
+            for key in [k for k in self._events if k[0] == args[0]]:
+                del self._events[key]
+                del self._versions[key]
+
+    def upsert(self, event: dict[str, Any]) -> None:
+        """Insert or replace an event (applied once the index has been loaded)."""
+        self._write(("upsert", event))
+
+    def _upsert_locked(self, event: dict[str, Any]) -> None:
+        key = self._key(event["agent_telegram_id"], event["channel_id"], event["id"])
+        event = dict(event)
+        if event.get("time_utc") is None:
+            # No time: never due; keep it out of the heap
+            self._events.pop(key, None)
+            self._versions.pop(key, None)
+            return
+        event["time_utc"] = _as_aware_utc(event["time_utc"])
+        version = next(self._counter)
+        self._events[key] = event
+        self._versions[key] = version
+        heapq.heappush(self._heap, (event["time_utc"], version, key))
+
+    def reschedule(
+        self,
+        agent_telegram_id: int,
+        channel_id: int,
+        event_id: str,
+        time_utc: datetime,
+        occurrences: int | None = None,
+    ) -> None:
+        """Move an event to a new time (and occurrence count, if given)."""
+        key = self._key(agent_telegram_id, channel_id, event_id)
+        self._write(("reschedule", key, time_utc, occurrences))
+
+    def _reschedule_locked(self, key: tuple[int, int, str], time_utc: datetime, occurrences: int | None) -> None:
+        event = self._events.get(key)
+        if event is None:
+            return
+        event = dict(event, time_utc=time_utc)
+        if occurrences is not None:
+            event["occurrences"] = occurrences
+        self._upsert_locked(event)
+
+    def remove(self, agent_telegram_id: int, channel_id: int, event_id: str) -> None:
+        """Forget an event."""
+        self._write(("remove", self._key(agent_telegram_id, channel_id, event_id)))
+
+    def remove_agent(self, agent_telegram_id: int) -> None:
+        """Forget all of an agent's events."""
+        self._write(("remove_agent", int(agent_telegram_id)))
+
+    def _drop_stale_top_locked(self) -> None:
+        """Pop superseded entries off the top of the heap."""
+        while self._heap:
+            _, version, key = self._heap[0]
+            if self._versions.get(key) == version:
+                return
+            heapq.heappop(self._heap)
+
+    def due_events(self, now: datetime) -> list[dict[str, Any]]:
+        """Return copies of all events with time_utc <= now, soonest first."""
+        with self._lock:
+            popped = []
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                _, version, key = entry
+                if self._versions.get(key) == version:
+                    popped.append(entry)
+                    due.append(dict(self._events[key]))
+            # Due events stay indexed until they are rescheduled or removed
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+            return due
+
+    def next_time_after(self, now: datetime) -> datetime | None:
+        """Return the earliest time_utc strictly after now, or None."""
+        with self._lock:
+            self._drop_stale_top_locked()
+            if not self._heap:
+                return None
+            if self._heap[0][0] > now:
+                return self._heap[0][0]
+            later = [
+                when
+                for when, version, key in self._heap
+                if when > now and self._versions.get(key) == version
+            ]
+            return min(later, default=None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+
+_event_index = EventIndex()
+
+
+def loaded_event_index() -> EventIndex | None:
+    """Return the event index if it is loaded and fresh, else None (never touches MySQL)."""
+    return _event_index if _event_index.is_fresh() else None
+
+
+def get_event_index() -> EventIndex:
+    """
+    Return the in-memory event index, loading the whole events table if the
+    index is empty or due for its periodic resync (blocking; call via run_db).
+
+    Index writes made while the SELECT runs are replayed over its rows.
+    """
+    if not _event_index.is_fresh():
+        since = _event_index.begin_load()
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(
+                        """
+                        SELECT id, agent_telegram_id, channel_id, time_utc, intent, interval_value, occurrences
+                        FROM events
+                        """
+                    )
+                    rows = cursor.fetchall()
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    logger.error(f"Failed to load events index: {e}")
+                    raise
+                finally:
+                    cursor.close()
+            _event_index.replace_all([_scheduler_event_from_row(row) for row in rows], replay_since=since)
+        finally:
+            _event_index.end_load()
+        logger.debug(f"Loaded {len(rows)} event(s) into the event index")
+    return _event_index
+
+
+def forget_agent_events(agent_telegram_id: int) -> None:
+    """Drop an agent's events from the in-memory index (after deleting them in MySQL)."""
+    _event_index.remove_agent(agent_telegram_id)
+
+
+def apply_fired_events(
+    reschedules: list[tuple[int, int, str, datetime, int | None]],
+    deletes: list[tuple[int, int, str]],
+) -> None:
+    """
+    Write back the outcome of one pass of fired events in a single transaction.
+
+    Args:
+        reschedules: (agent_telegram_id, channel_id, event_id, new_time_utc, occurrences)
+            tuples; occurrences None leaves the stored count unchanged
+        deletes: (agent_telegram_id, channel_id, event_id) tuples
+    """
+    if not reschedules and not deletes:
+        return
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with_count = [
+                (new_time.strftime("%Y-%m-%d %H:%M:%S"), occurrences, event_id, agent_id, channel_id)
+                for agent_id, channel_id, event_id, new_time, occurrences in reschedules
+                if occurrences is not None
+            ]
+            time_only = [
+                (new_time.strftime("%Y-%m-%d %H:%M:%S"), event_id, agent_id, channel_id)
+                for agent_id, channel_id, event_id, new_time, occurrences in reschedules
+                if occurrences is None
+            ]
+            if with_count:
+                cursor.executemany(
+                    """
+                    UPDATE events
+                    SET time_utc = %s, occurrences = %s
+                    WHERE id = %s AND agent_telegram_id = %s AND channel_id = %s
+                    """,
+                    with_count,
+                )
+            if time_only:
+                cursor.executemany(
+                    """
+                    UPDATE events
+                    SET time_utc = %s
+                    WHERE id = %s AND agent_telegram_id = %s AND channel_id = %s
+                    """,
+                    time_only,
+                )
+            if deletes:
+                cursor.executemany(
+                    "DELETE FROM events WHERE id = %s AND agent_telegram_id = %s AND channel_id = %s",
+                    [(event_id, agent_id, channel_id) for agent_id, channel_id, event_id in deletes],
+                )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to write back fired events: {e}")
+            raise
+        finally:
+            cursor.close()
+    for agent_id, channel_id, event_id, new_time, occurrences in reschedules:
+        _event_index.reschedule(agent_id, channel_id, event_id, new_time, occurrences)
+        invalidate_agent_content("events", agent_id, channel_id)
+    for agent_id, channel_id, event_id in deletes:
+        _event_index.remove(agent_id, channel_id, event_id)
+        invalidate_agent_content("events", agent_id, channel_id)
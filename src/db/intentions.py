@@ -11,6 +11,7 @@ import logging
 from typing import Any
 
 from db.connection import get_db_connection
+from db.content_cache import invalidate_agent_content
 from db.datetime_util import normalize_datetime_for_mysql
 
 logger = logging.getLogger(__name__)
@@ -96,6 +97,7 @@ def save_intention(
                 (intention_id, agent_telegram_id, content, created_normalized),
             )
             conn.commit()
+            invalidate_agent_content("intentions", agent_telegram_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to save intention {intention_id}: {e}")
@@ -120,6 +122,7 @@ def delete_intention(agent_telegram_id: int, intention_id: str) -> None:
                 (intention_id, agent_telegram_id),
             )
             conn.commit()
+            invalidate_agent_content("intentions", agent_telegram_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to delete intention {intention_id}: {e}")
@@ -7,14 +7,24 @@
 Database operations for media metadata.
 """
 
+import atexit
 import logging
+import threading
 from typing import Any
 
+from config import MEDIA_LAST_USED_FLUSH_INTERVAL_SECONDS
 from db.connection import get_db_connection
 
 logger = logging.getLogger(__name__)
 
 
+def _invalidate_cached_record(unique_id: str) -> None:
+    """Drop a media item from the in-process record cache after a write."""
+    from media.media_record_cache import invalidate_media_record
+
+    invalidate_media_record(unique_id)
+
+
 def list_media_unique_ids(
     *,
     page: int,
@@ -134,6 +144,50 @@ def list_media_unique_ids(
     return MediaListingResult(unique_ids=unique_ids, total_count=total_count)
 
 
+_MEDIA_METADATA_COLUMNS = """
+    unique_id, kind, description, status, duration, mime_type,
+    media_file, sticker_set_name, sticker_name, is_emoji_set,
+    sticker_set_title, description_retry_count, last_used_at
+"""
+
+# Bound the IN (...) list so a batch never builds an oversized query
+_LOAD_MANY_CHUNK_SIZE = 500
+
+
+def _record_from_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Convert a media_metadata row to a media record, omitting empty fields."""
+    record = {
+        "unique_id": row["unique_id"],
+    }
+
+    if row["kind"]:
+        record["kind"] = row["kind"]
+    if row["description"]:
+        record["description"] = row["description"]
+    if row["status"]:
+        record["status"] = row["status"]
+    if row["duration"] is not None:
+        record["duration"] = row["duration"]
+    if row["mime_type"]:
+        record["mime_type"] = row["mime_type"]
+    if row["media_file"]:
+        record["media_file"] = row["media_file"]
+    if row["sticker_set_name"]:
+        record["sticker_set_name"] = row["sticker_set_name"]
+    if row["sticker_name"]:
+        record["sticker_name"] = row["sticker_name"]
+    if row["is_emoji_set"] is not None:
+        record["is_emoji_set"] = bool(row["is_emoji_set"])
+    if row["sticker_set_title"]:
+        record["sticker_set_title"] = row["sticker_set_title"]
+    if row.get("description_retry_count") is not None:
+        record["description_retry_count"] = int(row["description_retry_count"])
+    if row.get("last_used_at") is not None:
+        record["last_used_at"] = row["last_used_at"]
+
+    return record
+
+
 def load_media_metadata(unique_id: str) -> dict[str, Any] | None:
     """
     Load media metadata by unique ID.
@@ -148,10 +202,8 @@ def load_media_metadata(unique_id: str) -> dict[str, Any] | None:
         cursor = conn.cursor()
         try:
             cursor.execute(
-                """
-                SELECT unique_id, kind, description, status, duration, mime_type,
-                       media_file, sticker_set_name, sticker_name, is_emoji_set,
-                       sticker_set_title, description_retry_count, last_used_at
+                f"""
+                SELECT {_MEDIA_METADATA_COLUMNS}
                 FROM media_metadata
                 WHERE unique_id = %s
                 """,
@@ -162,38 +214,45 @@ def load_media_metadata(unique_id: str) -> dict[str, Any] | None:
             if not row:
                 return None
             
-            record = {
-                "unique_id": row["unique_id"],
-            }
-            
-            if row["kind"]:
-                record["kind"] = row["kind"]
-            if row["description"]:
-                record["description"] = row["description"]
-            if row["status"]:
-                record["status"] = row["status"]
-            if row["duration"] is not None:
-                record["duration"] = row["duration"]
-            if row["mime_type"]:
-                record["mime_type"] = row["mime_type"]
-            if row["media_file"]:
-                record["media_file"] = row["media_file"]
-            if row["sticker_set_name"]:
-                record["sticker_set_name"] = row["sticker_set_name"]
-            if row["sticker_name"]:
-                record["sticker_name"] = row["sticker_name"]
-            if row["is_emoji_set"] is not None:
-                record["is_emoji_set"] = bool(row["is_emoji_set"])
-            if row["sticker_set_title"]:
-                record["sticker_set_title"] = row["sticker_set_title"]
-            if row.get("description_retry_count") is not None:
-                record["description_retry_count"] = int(row["description_retry_count"])
-            if row.get("last_used_at") is not None:
-                record["last_used_at"] = row["last_used_at"]
-            
-            return record
+            return _record_from_row(row)
+        finally:
+            cursor.close()
+
+
+def load_media_metadata_many(unique_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Load media metadata for several unique IDs with one query per 500 IDs.
+
+    Args:
+        unique_ids: Media unique IDs (duplicates and empty values are ignored)
+
+    Returns:
+        Dict mapping unique_id to its metadata dictionary; IDs not found are absent
+    """
+    ids = list(dict.fromkeys(uid for uid in unique_ids if uid))
+    if not ids:
+        return {}
+
+    records: dict[str, dict[str, Any]] = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            for start in range(0, len(ids), _LOAD_MANY_CHUNK_SIZE):
+                chunk = ids[start:start + _LOAD_MANY_CHUNK_SIZE]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"""
+                    SELECT {_MEDIA_METADATA_COLUMNS}
+                    FROM media_metadata
+                    WHERE unique_id IN ({placeholders})
+                    """,
+                    chunk,
+                )
+                for row in cursor.fetchall():
+                    records[row["unique_id"]] = _record_from_row(row)
         finally:
             cursor.close()
+    return records
 
 
 def save_media_metadata(record: dict[str, Any]) -> None:
@@ -246,6 +305,7 @@ def save_media_metadata(record: dict[str, Any]) -> None:
                 ),
             )
             conn.commit()
+            _invalidate_cached_record(unique_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to save media metadata {unique_id}: {e}")
@@ -287,6 +347,7 @@ def update_sticker_set_metadata(
                 (sticker_set_name, sticker_set_title, unique_id),
             )
             conn.commit()
+            _invalidate_cached_record(unique_id)
             if cursor.rowcount > 0:
                 logger.debug(
                     f"Patched sticker_set_name for {unique_id}: {sticker_set_name}"
@@ -330,6 +391,228 @@ def update_media_last_used(unique_id: str) -> None:
             cursor.close()
 
 
+def update_media_last_used_many(unique_ids: list[str]) -> None:
+    """
+    Update last_used_at for several media items in one statement per 500 IDs.
+
+    Args:
+        unique_ids: Media unique IDs to update (empty values are ignored)
+
+    Raises:
+        Exception: If the update fails (after rolling back)
+    """
+    ids = list(dict.fromkeys(str(uid) for uid in unique_ids if uid and str(uid).strip()))
+    if not ids:
+        return
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            for start in range(0, len(ids), _LOAD_MANY_CHUNK_SIZE):
+                chunk = ids[start:start + _LOAD_MANY_CHUNK_SIZE]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"""
+                    UPDATE media_metadata
+                    SET last_used_at = CURRENT_TIMESTAMP
+                    WHERE unique_id IN ({placeholders})
+                    """,
+                    chunk,
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+# Pending touches kept while the database is unavailable; further touches are dropped
+_LAST_USED_MAX_PENDING = 100000
+# Seconds to wait before retrying a failed write
+_LAST_USED_RETRY_DELAY = 5.0
+
+
+class MediaLastUsedTracker:
+    """
+    Collects media last-used touches in memory and writes them periodically.
+
+    Prompt building touches every sticker and history media item on every
+    received task. touch() only adds the unique_id to a set, so repeated
+    touches between flushes coalesce into one row update. A background thread
+    writes the set every MEDIA_LAST_USED_FLUSH_INTERVAL_SECONDS with
+    update_media_last_used_many (one UPDATE ... WHERE unique_id IN (...) per
+    500 IDs). last_used_at therefore lags real use by at most one interval,
+    which is far below the day-granularity cutoffs of unused-media cleanup.
+    A failed write is merged back into the pending set and retried.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = MEDIA_LAST_USED_FLUSH_INTERVAL_SECONDS,
+        max_pending: int = _LAST_USED_MAX_PENDING,
+        retry_delay: float = _LAST_USED_RETRY_DELAY,
+        update_many=None,
+    ):
+        self._flush_interval = flush_interval
+        self._retry_delay = retry_delay
+        self._max_pending = max_pending
+        self._update_many = update_many or update_media_last_used_many
+        self._pending: set[str] = set()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._flush_requested = False
+        self._in_flight = False
+        self.touches = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.touches_dropped = 0
+
+    def touch(self, unique_ids) -> None:
+        """Record use of one unique_id or an iterable of them; never blocks on the database."""
+        if isinstance(unique_ids, str):
+            unique_ids = (unique_ids,)
+        with self._cond:
+            for unique_id in unique_ids:
+                if not unique_id or not str(unique_id).strip():
+                    continue
+                self.touches += 1
+                if self._stopping or (
+                    len(self._pending) >= self._max_pending and unique_id not in self._pending
+                ):
+                    self.touches_dropped += 1
+                    continue
+                self._pending.add(str(unique_id))
+            if self._pending and self._thread is None and not self._stopping:
+                self._thread = threading.Thread(
+                    target=self._run, name="media-last-used", daemon=True
+                )
+                self._thread.start()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Write all pending touches now.
+
+        Returns False if the write failed (the touches stay pending for the next
+        attempt) or did not finish within timeout.
+        """
+        with self._cond:
+            if self._thread is None:
+                return not self._pending
+            failures_before = self.failed_flushes
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: (not self._pending and not self._in_flight)
+                or self.failed_flushes != failures_before,
+                timeout,
+            )
+            self._flush_requested = False
+            return not self._pending and not self._in_flight
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting touches, write what is pending and stop the writer thread."""
+        with self._cond:
+            self._stopping = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _take_pending(self) -> list[str] | None:
+        """Wait until a flush is due and take the pending set; None means stop."""
+        with self._cond:
+            while True:
+                self._cond.wait_for(
+                    lambda: self._stopping or (self._flush_requested and self._pending),
+                    self._flush_interval,
+                )
+                if self._pending:
+                    batch = sorted(self._pending)
+                    self._pending.clear()
+                    self._in_flight = True
+                    return batch
+                self._cond.notify_all()
+                if self._stopping:
+                    return None
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_pending()
+            if batch is None:
+                return
+            try:
+                self._update_many(batch)
+                failed = False
+            except Exception as e:
+                failed = True
+                logger.warning(f"Failed to update last_used_at for {len(batch)} media item(s): {e}")
+            with self._cond:
+                self._in_flight = False
+                if not failed:
+                    self.rows_written += len(batch)
+                    self.flushes += 1
+                else:
+                    self.failed_flushes += 1
+                    if self._stopping:
+                        # Shutting down: one attempt only
+                        self.touches_dropped += len(batch) + len(self._pending)
+                        self._pending.clear()
+                    else:
+                        room = self._max_pending - len(self._pending)
+                        requeue = batch[:room] if room > 0 else []
+                        self._pending.update(requeue)
+                        self.touches_dropped += len(batch) - len(requeue)
+                self._cond.notify_all()
+                if failed and not self._stopping:
+                    # Back off before retrying, even if a flush is requested meanwhile
+                    self._cond.wait_for(lambda: self._stopping, min(self._flush_interval, self._retry_delay))
+
+
+_last_used_tracker: MediaLastUsedTracker | None = None
+_last_used_tracker_lock = threading.Lock()
+
+
+def get_media_last_used_tracker() -> MediaLastUsedTracker:
+    """Return the process-wide media last-used tracker, creating it on first use."""
+    global _last_used_tracker
+    if _last_used_tracker is None:
+        with _last_used_tracker_lock:
+            if _last_used_tracker is None:
+                _last_used_tracker = MediaLastUsedTracker()
+                atexit.register(close_media_last_used_tracker)
+    return _last_used_tracker
+
+
+def touch_media_last_used(unique_ids) -> None:
+    """
+    Record that media was used (in prompts, inject_media_descriptions).
+
+    Deferred counterpart of update_media_last_used: accepts one unique_id or an
+    iterable, and the write happens in a later batched UPDATE.
+    """
+    get_media_last_used_tracker().touch(unique_ids)
+
+
+def flush_media_last_used(timeout: float = 5.0) -> bool:
+    """Write pending last-used touches now; returns False on timeout."""
+    if _last_used_tracker is None:
+        return True
+    return _last_used_tracker.flush(timeout)
+
+
+def close_media_last_used_tracker(timeout: float = 5.0) -> None:
+    """Flush and stop the last-used tracker (called on shutdown and at exit)."""
+    global _last_used_tracker
+    with _last_used_tracker_lock:
+        tracker = _last_used_tracker
+        _last_used_tracker = None
+    if tracker is not None:
+        tracker.close(timeout)
+
+
 def find_unused_media_unique_ids(cutoff_days: int = 7) -> list[str]:
     """
     Return media unique_ids whose last_used_at is older than cutoff_days
@@ -339,6 +622,8 @@ def find_unused_media_unique_ids(cutoff_days: int = 7) -> list[str]:
         cutoff_days: Age threshold in days (minimum 1)
     """
     days = max(1, int(cutoff_days))
+    # Include touches from this process that have not been written yet
+    flush_media_last_used()
     with get_db_connection() as conn:
         cursor = conn.cursor()
         try:
@@ -369,6 +654,7 @@ def delete_media_metadata(unique_id: str) -> None:
         try:
             cursor.execute("DELETE FROM media_metadata WHERE unique_id = %s", (unique_id,))
             conn.commit()
+            _invalidate_cached_record(unique_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to delete media metadata {unique_id}: {e}")
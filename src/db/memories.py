@@ -11,6 +11,7 @@ import logging
 from typing import Any
 
 from db.connection import get_db_connection
+from db.content_cache import invalidate_agent_content
 from db.datetime_util import normalize_datetime_for_mysql
 
 logger = logging.getLogger(__name__)
@@ -122,6 +123,7 @@ def save_memory(
                 ),
             )
             conn.commit()
+            invalidate_agent_content("memories", agent_telegram_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to save memory {memory_id}: {e}")
@@ -146,6 +148,7 @@ def delete_memory(agent_telegram_id: int, memory_id: str) -> None:
                 (memory_id, agent_telegram_id),
             )
             conn.commit()
+            invalidate_agent_content("memories", agent_telegram_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to delete memory {memory_id}: {e}")
@@ -11,6 +11,7 @@ import logging
 from typing import Any
 
 from db.connection import get_db_connection
+from db.content_cache import invalidate_agent_content
 from db.datetime_util import normalize_datetime_for_mysql
 
 logger = logging.getLogger(__name__)
@@ -106,6 +107,7 @@ def save_note(
                 ),
             )
             conn.commit()
+            invalidate_agent_content("notes", agent_telegram_id, channel_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to save note {note_id}: {e}")
@@ -131,6 +133,7 @@ def delete_note(agent_telegram_id: int, channel_id: int, note_id: str) -> None:
                 (note_id, agent_telegram_id, channel_id),
             )
             conn.commit()
+            invalidate_agent_content("notes", agent_telegram_id, channel_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to delete note {note_id}: {e}")
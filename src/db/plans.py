@@ -11,6 +11,7 @@ import logging
 from typing import Any
 
 from db.connection import get_db_connection
+from db.content_cache import invalidate_agent_content
 from db.datetime_util import normalize_datetime_for_mysql
 
 logger = logging.getLogger(__name__)
@@ -99,6 +100,7 @@ def save_plan(
                 (plan_id, agent_telegram_id, channel_id, content, created_normalized),
             )
             conn.commit()
+            invalidate_agent_content("plans", agent_telegram_id, channel_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to save plan {plan_id}: {e}")
@@ -124,6 +126,7 @@ def delete_plan(agent_telegram_id: int, channel_id: int, plan_id: str) -> None:
                 (plan_id, agent_telegram_id, channel_id),
             )
             conn.commit()
+            invalidate_agent_content("plans", agent_telegram_id, channel_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to delete plan {plan_id}: {e}")
@@ -12,6 +12,7 @@ import logging
 from typing import Any
 
 from db.connection import get_db_connection
+from db.content_cache import invalidate_agent_content
 from db.datetime_util import normalize_datetime_for_mysql
 
 logger = logging.getLogger(__name__)
@@ -199,6 +200,7 @@ def save_summary(
                 ),
             )
             conn.commit()
+            invalidate_agent_content("summaries", agent_telegram_id, channel_id)
             logger.debug(f"Successfully saved summary {summary_id} for agent {agent_telegram_id}, channel {channel_id}")
         except Exception as e:
             conn.rollback()
@@ -231,6 +233,7 @@ def delete_summary(agent_telegram_id: int, channel_id: int, summary_id: str) ->
                 (summary_id, agent_telegram_id, channel_id),
             )
             conn.commit()
+            invalidate_agent_content("summaries", agent_telegram_id, channel_id)
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to delete summary {summary_id}: {e}")
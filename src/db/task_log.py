@@ -8,16 +8,32 @@ Task execution log database operations.
 Logs all task executions with timestamps, action kinds, and details.
 """
 
+import atexit
 import json
 import logging
+import threading
+import time
+from collections import deque
 from datetime import UTC, datetime, timedelta
 from typing import Any, Optional
 
 from clock import clock
+from config import TASK_LOG_BATCH_SIZE, TASK_LOG_FLUSH_INTERVAL_SECONDS
 from db.connection import get_db_connection
 
 logger = logging.getLogger(__name__)
 
+_INSERT_TASK_LOG_SQL = """
+    INSERT INTO task_execution_log
+    (timestamp, agent_telegram_id, channel_telegram_id, action_kind, task_identifier, action_details, failure_message)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Rows held in memory while the database is unavailable; the oldest are dropped beyond this
+_TASK_LOG_MAX_BUFFERED_ROWS = 10000
+# Longest wait between retries of a failed batch
+_TASK_LOG_MAX_RETRY_DELAY_SECONDS = 30.0
+
 
 def log_task_execution(
     agent_telegram_id: int,
@@ -42,11 +58,7 @@ def log_task_execution(
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """
-                INSERT INTO task_execution_log
-                (timestamp, agent_telegram_id, channel_telegram_id, action_kind, task_identifier, action_details, failure_message)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """,
+                _INSERT_TASK_LOG_SQL,
                 (
                     clock.now(UTC),
                     agent_telegram_id,
@@ -64,6 +76,215 @@ def log_task_execution(
         # Don't raise - logging failures shouldn't break task execution
 
 
+def _insert_task_log_rows(rows: list[tuple]) -> None:
+    """Insert task log rows (in _INSERT_TASK_LOG_SQL column order) as one multi-row INSERT."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # pymysql rewrites executemany on INSERT ... VALUES into a single multi-row INSERT
+        cursor.executemany(_INSERT_TASK_LOG_SQL, rows)
+        conn.commit()
+        cursor.close()
+
+
+class TaskLogWriter:
+    """
+    Buffers task_execution_log rows and writes them in batches on a background thread.
+
+    enqueue() only appends to an in-memory buffer, so callers on the tick path
+    never wait for the database. The writer thread flushes when TASK_LOG_BATCH_SIZE
+    rows are waiting or TASK_LOG_FLUSH_INTERVAL_SECONDS have passed. A failed batch
+    goes back to the front of the buffer and is retried with exponential backoff;
+    while the database stays down the buffer is capped at
+    _TASK_LOG_MAX_BUFFERED_ROWS, dropping the oldest rows.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = TASK_LOG_BATCH_SIZE,
+        flush_interval: float = TASK_LOG_FLUSH_INTERVAL_SECONDS,
+        max_buffered: int = _TASK_LOG_MAX_BUFFERED_ROWS,
+        insert_rows=None,
+    ):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_buffered = max_buffered
+        self._insert_rows = insert_rows or _insert_task_log_rows
+        self._rows: deque[tuple] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._flush_requested = False
+        self._in_flight = 0
+        self._retry_delay = 0.0
+        self.rows_written = 0
+        self.batches_written = 0
+        self.failed_batches = 0
+        self.rows_dropped = 0
+
+    def enqueue(self, row: tuple) -> None:
+        """Buffer a row for writing; never blocks on the database."""
+        with self._cond:
+            if self._stopping:
+                logger.debug("Task log writer is closed; dropping row")
+                self.rows_dropped += 1
+                return
+            if len(self._rows) >= self._max_buffered:
+                self._rows.popleft()
+                self.rows_dropped += 1
+                if self.rows_dropped % 1000 == 1:
+                    logger.warning(
+                        f"Task log buffer full ({self._max_buffered} rows); dropped {self.rows_dropped} row(s) so far"
+                    )
+            self._rows.append(row)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="task-log-writer", daemon=True
+                )
+                self._thread.start()
+            if len(self._rows) >= self._batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write all buffered rows now. Returns False if they were not written within timeout."""
+        with self._cond:
+            if self._thread is None:
+                return not self._rows
+            self._flush_requested = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(
+                lambda: not self._rows and not self._in_flight, timeout
+            )
+            self._flush_requested = False
+            return done
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting rows, write what is buffered and stop the writer thread."""
+        with self._cond:
+            self._stopping = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _next_batch(self) -> list[tuple] | None:
+        """Wait until a batch is due and take it from the buffer; None means stop."""
+        with self._cond:
+            while True:
+                delay = self._retry_delay or self._flush_interval
+                deadline = time.monotonic() + delay
+                while not self._stopping:
+                    if not self._retry_delay and (
+                        (self._flush_requested and self._rows)
+                        or len(self._rows) >= self._batch_size
+                    ):
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._rows:
+                    count = min(self._batch_size, len(self._rows))
+                    batch = [self._rows.popleft() for _ in range(count)]
+                    self._in_flight = len(batch)
+                    return batch
+                self._cond.notify_all()
+                if self._stopping:
+                    return None
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._insert_rows(batch)
+                failed = False
+            except Exception as e:
+                failed = True
+                logger.error(f"Failed to write {len(batch)} task log row(s): {e}")
+            with self._cond:
+                self._in_flight = 0
+                if not failed:
+                    self._retry_delay = 0.0
+                    self.rows_written += len(batch)
+                    self.batches_written += 1
+                elif self._stopping:
+                    # Shutting down: one attempt only, don't hold up exit retrying
+                    self.failed_batches += 1
+                    self.rows_dropped += len(batch) + len(self._rows)
+                    self._rows.clear()
+                else:
+                    self.failed_batches += 1
+                    room = self._max_buffered - len(self._rows)
+                    requeue = batch[-room:] if room > 0 else []
+                    self.rows_dropped += len(batch) - len(requeue)
+                    self._rows.extendleft(reversed(requeue))
+                    self._retry_delay = min(
+                        max(1.0, self._retry_delay * 2), _TASK_LOG_MAX_RETRY_DELAY_SECONDS
+                    )
+                self._cond.notify_all()
+
+
+_writer: TaskLogWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_task_log_writer() -> TaskLogWriter:
+    """Return the process-wide task log writer, creating it on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = TaskLogWriter()
+                atexit.register(close_task_log_writer)
+    return _writer
+
+
+def enqueue_task_execution(
+    agent_telegram_id: int,
+    channel_telegram_id: int,
+    action_kind: str,
+    action_details: str | None = None,
+    failure_message: str | None = None,
+    task_identifier: str | None = None,
+) -> None:
+    """
+    Queue a task execution log row for a batched background write.
+
+    Same arguments as log_task_execution. The timestamp is taken now, not when
+    the row is written. Use this on the tick and LLM paths; log_task_execution
+    writes synchronously.
+    """
+    get_task_log_writer().enqueue(
+        (
+            clock.now(UTC),
+            agent_telegram_id,
+            channel_telegram_id,
+            action_kind,
+            task_identifier,
+            action_details,
+            failure_message,
+        )
+    )
+
+
+def flush_task_log(timeout: float = 5.0) -> bool:
+    """Write buffered task log rows now; returns False on timeout."""
+    if _writer is None:
+        return True
+    return _writer.flush(timeout)
+
+
+def close_task_log_writer(timeout: float = 5.0) -> None:
+    """Flush and stop the task log writer (called on shutdown and at exit)."""
+    global _writer
+    with _writer_lock:
+        writer = _writer
+        _writer = None
+    if writer is not None:
+        writer.close(timeout)
+
+
 def get_task_logs(
     agent_telegram_id: int,
     channel_telegram_id: int,
@@ -346,6 +567,7 @@ def _build_cost_entry(row: dict[str, Any]) -> dict[str, Any]:
         "operation": details_obj.get("operation"),
         "model_name": details_obj.get("model_name"),
         "input_tokens": details_obj.get("input_tokens"),
+        "cached_input_tokens": details_obj.get("cached_input_tokens"),
         "output_tokens": details_obj.get("output_tokens"),
         "cost": cost,
     }
@@ -12,7 +12,8 @@ receives a new message. The main handler function `handle_received()` orchestrat
 1. Responsiveness delay management (based on agent schedule)
 2. Message fetching and media description injection
 3. Conversation summarization (if needed)
-4. System prompt building with all context
+4. System prompt building with all context (independent stages run concurrently
+   and their timings go to the task log)
 5. LLM query with retrieval augmentation loop
 6. Task parsing and scheduling
 7. Read acknowledgment and online status management
@@ -34,9 +35,10 @@ from telethon.tl.types import User  # pyright: ignore[reportMissingImports]
 from agent import get_agent_for_id
 from clock import clock
 from config import CONFIG_DIRECTORIES, FETCHED_RESOURCE_LIFETIME_SECONDS
+from db.aio import run_db
 from handlers.registry import register_task_handler
 from pathlib import Path
-from schedule import get_responsiveness, get_wake_time, days_remaining
+from schedule import CompiledSchedule, get_responsiveness, get_wake_time, days_remaining
 from schedule_extension import extend_schedule
 from utils import (
     get_dialog_name,
@@ -56,6 +58,7 @@ from handlers.received_helpers.prompt_builder import (
     build_complete_system_prompt,
     is_conversation_start,
 )
+from handlers.received_helpers.prompt_pipeline import StageTimings, run_stages
 from handlers.received_helpers.summarization import (
     get_highest_summarized_message_id,
     count_unsummarized_messages,
@@ -76,9 +79,11 @@ from handlers.received_helpers.url_fetching import (
     format_error_html,
 )
 from media.media_injector import (
+    collect_media_unique_ids,
     inject_media_descriptions,
 )
 from media.media_source import get_default_media_source_chain
+from media.sources import PrefetchedMediaSource
 from task_graph import TaskGraph, TaskNode, TaskStatus
 from task_graph_helpers import make_wait_task
 # Telegram type imports moved to handlers.received_helpers.channel_details
@@ -298,7 +303,7 @@ async def fetch_url(url: str, agent=None, channel_name: str | None = None) -> tu
 # LLM query functions moved to handlers.received_helpers.llm_query
 
 
-def _calculate_responsiveness_delay(agent, schedule: dict) -> int:
+def _calculate_responsiveness_delay(agent, schedule: "dict | CompiledSchedule") -> int:
     """
     Calculate the responsiveness-based delay in seconds based on the agent's schedule.
     
@@ -306,7 +311,7 @@ def _calculate_responsiveness_delay(agent, schedule: dict) -> int:
     
     Args:
         agent: Agent instance
-        schedule: Schedule dictionary
+        schedule: Schedule dictionary or the agent's CompiledSchedule
         
     Returns:
         Delay in seconds (0 if no delay needed)
@@ -401,8 +406,8 @@ async def _apply_responsiveness_delay(
         if not existing_delay_task_id:
             # No existing delay task, create one if needed
             try:
-                schedule = agent._load_schedule()
-                if schedule:
+                schedule = agent._get_compiled_schedule()
+                if schedule.has_schedule:
                     delay_seconds = _calculate_responsiveness_delay(agent, schedule)
                     
                     if delay_seconds > 0:
@@ -441,6 +446,7 @@ async def _process_retrieval_loop(
     graph: TaskGraph,
     parse_llm_reply_fn,
     channel_name: str | None = None,
+    history_items=None,
 ) -> list[TaskNode]:
     """
     Process the LLM retrieval loop with message history and retrieval augmentation.
@@ -463,12 +469,15 @@ async def _process_retrieval_loop(
         graph: The task graph
         parse_llm_reply_fn: Function to parse LLM reply into tasks
         channel_name: Optional channel name for logging
+        history_items: Message history already processed from messages_for_history
+            (handle_received builds it alongside the system prompt)
         
     Returns:
         List of TaskNode objects generated by the LLM
     """
     # Process message history (only unsummarized messages)
-    history_items = await process_message_history(messages_for_history, agent, media_chain)
+    if history_items is None:
+        history_items = await process_message_history(messages_for_history, agent, media_chain)
 
     # Create a simple wrapper that injects fetch_url from closure
     async def process_retrieve_with_fetch(tasks, *, agent, channel_id, graph, retrieved_urls, retrieved_contents, fetch_url_fn, channel_name=None):
@@ -761,8 +770,7 @@ async def handle_received(task: TaskNode, graph: TaskGraph, work_queue=None):
     # Check and extend schedule if needed (only for active agents processing received tasks)
     if agent.daily_schedule_description:
         try:
-            schedule = agent._load_schedule()
-            days_rem = days_remaining(schedule)
+            days_rem = days_remaining(agent._get_compiled_schedule())
             
             if days_rem < 2:
                 logger.info(
@@ -781,29 +789,43 @@ async def handle_received(task: TaskNode, graph: TaskGraph, work_queue=None):
     # Get appropriate LLM instance
     llm = get_channel_llm(agent, channel_id_int, channel_name)
 
+    # Time each stage from here to the LLM request; independent stages run
+    # concurrently, so the total is the critical path rather than the sum
+    timings = StageTimings()
+
     # Get the entity first to ensure it's resolved, then fetch messages
     # This ensures Telethon can resolve the entity properly
-    entity = await agent.get_cached_entity(channel_id_int)
+    with timings.stage("resolve_entity"):
+        entity = await agent.get_cached_entity(channel_id_int)
     if not entity:
         raise ValueError(f"Cannot resolve entity for channel_id {channel_id_int}")
-    
-    # For new DM conversations, ensure the user is added to contacts
-    # This helps with future entity resolution
-    if isinstance(entity, User) and channel_id_int > 0:
-        await _ensure_user_in_contacts(agent, client, entity, channel_name)
-
-    # Check if summaries exist to determine how many messages to fetch
-    # If no summaries exist, fetch messages based on chat type:
-    # - Groups/channels: 150 messages
-    # - DMs: 200 messages
-    # Otherwise, fetch 100 messages for normal operation
-    highest_summarized_id = get_highest_summarized_message_id(agent, channel_id_int, channel_name)
-    if highest_summarized_id is None:
-        is_group = is_group_or_channel(entity)
-        message_limit = 150 if is_group else 200
-    else:
-        message_limit = 100
-    messages = await client.get_messages(entity, limit=message_limit)
+
+    async def fetch_messages():
+        # Check if summaries exist to determine how many messages to fetch
+        # If no summaries exist, fetch messages based on chat type:
+        # - Groups/channels: 150 messages
+        # - DMs: 200 messages
+        # Otherwise, fetch 100 messages for normal operation
+        with timings.stage("highest_summarized_id"):
+            highest_summarized_id = await run_db(
+                get_highest_summarized_message_id, agent, channel_id_int, channel_name
+            )
+        if highest_summarized_id is None:
+            message_limit = 150 if is_group_or_channel(entity) else 200
+        else:
+            message_limit = 100
+        with timings.stage("get_messages"):
+            messages = await client.get_messages(entity, limit=message_limit)
+        return highest_summarized_id, messages
+
+    async def ensure_contact():
+        # For new DM conversations, ensure the user is added to contacts
+        # This helps with future entity resolution
+        if isinstance(entity, User) and channel_id_int > 0:
+            with timings.stage("ensure_contact"):
+                await _ensure_user_in_contacts(agent, client, entity, channel_name)
+
+    (highest_summarized_id, messages), _ = await run_stages(fetch_messages(), ensure_contact())
 
     # If "Reset Context On First Message" is enabled, clear summaries and plans if this is the first message
     if agent.reset_context_on_first_message and is_conversation_start(agent, messages, highest_summarized_id):
@@ -818,10 +840,17 @@ async def handle_received(task: TaskNode, graph: TaskGraph, work_queue=None):
         # Re-check highest summarized ID after clearing
         highest_summarized_id = None
 
-    media_chain = get_default_media_source_chain()
-    messages = await inject_media_descriptions(
-        messages, agent=agent, peer_id=channel_id
-    )
+    # Resolve cached descriptions for all media in the history with one batch lookup
+    with timings.stage("media_descriptions"):
+        media_chain = await PrefetchedMediaSource.prefetch(
+            get_default_media_source_chain(),
+            collect_media_unique_ids(messages),
+            agent=agent,
+            update_last_used=True,
+        )
+        messages = await inject_media_descriptions(
+            messages, agent=agent, peer_id=channel_id, media_chain=media_chain
+        )
 
     # Check if summarization is needed (highest_summarized_id already fetched above)
     unsummarized_count = count_unsummarized_messages(messages, highest_summarized_id)
@@ -831,17 +860,20 @@ async def handle_received(task: TaskNode, graph: TaskGraph, work_queue=None):
         logger.info(
             f"{log_prefix} {unsummarized_count} unsummarized messages detected, performing summarization for channel {channel_id_int}"
         )
-        await perform_summarization(
-            agent=agent,
-            channel_id=channel_id_int,
-            messages=messages,
-            media_chain=media_chain,
-            highest_summarized_id=highest_summarized_id,
-            parse_llm_reply_fn=parse_llm_reply,
-            channel_name=channel_name,
-        )
-        # Re-fetch highest summarized ID after summarization
-        highest_summarized_id = get_highest_summarized_message_id(agent, channel_id_int, channel_name)
+        with timings.stage("summarization"):
+            await perform_summarization(
+                agent=agent,
+                channel_id=channel_id_int,
+                messages=messages,
+                media_chain=media_chain,
+                highest_summarized_id=highest_summarized_id,
+                parse_llm_reply_fn=parse_llm_reply,
+                channel_name=channel_name,
+            )
+            # Re-fetch highest summarized ID after summarization
+            highest_summarized_id = await run_db(
+                get_highest_summarized_message_id, agent, channel_id_int, channel_name
+            )
 
     # Get conversation context
     is_callout = task.params.get("callout", False)
@@ -886,21 +918,32 @@ async def handle_received(task: TaskNode, graph: TaskGraph, work_queue=None):
     # Limit to most recent 50 unsummarized messages (but keep at least 20 if available)
     messages_for_history = unsummarized_messages[:50] if len(unsummarized_messages) > 50 else unsummarized_messages
     
-    # Build complete system prompt (includes summaries)
-    system_prompt = await build_complete_system_prompt(
-        agent,
-        channel_id,
-        messages,  # Use full messages for context start check, but summaries are already loaded
-        media_chain,
-        is_group,
-        channel_name,
-        dialog,
-        target_msg,
-        xsend_intent_param,
-        reaction_messages=reaction_messages,
-        graph=graph,
-        highest_summarized_id=highest_summarized_id,
+    # Build complete system prompt (includes summaries) and the message history together
+    system_prompt, history_items = await run_stages(
+        timings.timed(
+            "system_prompt",
+            build_complete_system_prompt(
+                agent,
+                channel_id,
+                messages,  # Use full messages for context start check, but summaries are already loaded
+                media_chain,
+                is_group,
+                channel_name,
+                dialog,
+                target_msg,
+                xsend_intent_param,
+                reaction_messages=reaction_messages,
+                graph=graph,
+                highest_summarized_id=highest_summarized_id,
+                timings=timings,
+            ),
+        ),
+        timings.timed(
+            "message_history",
+            process_message_history(messages_for_history, agent, media_chain),
+        ),
     )
+    timings.log(log_prefix, task)
 
     # Run LLM with retrieval augmentation
     now_iso = clock.now(UTC).isoformat(timespec="seconds")
@@ -919,6 +962,7 @@ async def handle_received(task: TaskNode, graph: TaskGraph, work_queue=None):
         graph,
         parse_llm_reply_fn=parse_llm_reply,
         channel_name=channel_name,
+        history_items=history_items,
     )
 
     # Schedule output tasks
@@ -4,19 +4,171 @@
 # Licensed under the MIT License. See LICENSE.md for details.
 #
 import logging
+import threading
+import time
+from collections import OrderedDict
 
+from config import CHANNEL_DETAILS_CACHE_TTL_SECONDS
 from media.media_format import format_media_sentence
+from media.sources.base import MediaStatus
 from telegram_media import get_unique_id
 from telethon import utils as tg_utils  # pyright: ignore[reportMissingImports]
 from telethon.tl.functions.channels import GetFullChannelRequest  # pyright: ignore[reportMissingImports]
 from telethon.tl.functions.messages import GetFullChatRequest  # pyright: ignore[reportMissingImports]
 from telethon.tl.functions.users import GetFullUserRequest  # pyright: ignore[reportMissingImports]
-from telethon.tl.types import Channel, Chat, User  # pyright: ignore[reportMissingImports]
+from telethon.tl.types import (  # pyright: ignore[reportMissingImports]
+    Channel,
+    Chat,
+    PeerChannel,
+    PeerChat,
+    PeerUser,
+    UpdateChannel,
+    UpdateChannelParticipant,
+    UpdateChat,
+    UpdateChatParticipant,
+    UpdateChatParticipantAdd,
+    UpdateChatParticipantDelete,
+    UpdateChatParticipants,
+    UpdateUser,
+    UpdateUserName,
+    UpdateUserPhone,
+    User,
+)
 from utils import format_username
 
 logger = logging.getLogger(__name__)
 
 
+class ChannelDetailsCache:
+    """
+    Rendered channel-details sections per (agent, peer), so prompt builds skip
+    the GetFull*Request and get_profile_photos RPCs.
+
+    Each entry carries a fingerprint of the entity as the agent already has it
+    (type, names, username, phone, title, participant count, profile photo id,
+    chat version); a different fingerprint is a miss. Entries expire after
+    CHANNEL_DETAILS_CACHE_TTL_SECONDS, because bios, birthdays and full-chat
+    fields change without touching the entity, and are dropped when the
+    agent's client receives a user/chat/channel update for the peer.
+    """
+
+    MAX_ENTRIES = 5000
+
+    def __init__(self, ttl_seconds: float = CHANNEL_DETAILS_CACHE_TTL_SECONDS):
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        # (agent_id, peer_id) -> (expires_at, fingerprint, section)
+        self._entries: OrderedDict[tuple[int, int], tuple[float, tuple, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, agent_id: int, peer_id: int, fingerprint: tuple) -> str | None:
+        if self._ttl <= 0:
+            return None
+        key = (agent_id, peer_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic() or entry[1] != fingerprint:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, agent_id: int, peer_id: int, fingerprint: tuple, section: str) -> None:
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            key = (agent_id, peer_id)
+            self._entries[key] = (time.monotonic() + self._ttl, fingerprint, section)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, agent_id: int, peer_id: int) -> None:
+        with self._lock:
+            self._entries.pop((agent_id, peer_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_details_cache = ChannelDetailsCache()
+
+
+def get_channel_details_cache() -> ChannelDetailsCache:
+    """Return the process-wide channel details cache."""
+    return _details_cache
+
+
+def invalidate_channel_details(agent_id: int, peer_id: int) -> None:
+    """Forget an agent's cached details for a peer (after a Telegram update about it)."""
+    _details_cache.invalidate(agent_id, peer_id)
+
+
+# Telegram updates that mean a peer's details (names, photo, bio, membership) changed
+CHANNEL_DETAILS_UPDATES = (
+    UpdateUser,
+    UpdateUserName,
+    UpdateUserPhone,
+    UpdateChat,
+    UpdateChatParticipants,
+    UpdateChatParticipant,
+    UpdateChatParticipantAdd,
+    UpdateChatParticipantDelete,
+    UpdateChannel,
+    UpdateChannelParticipant,
+)
+
+
+def channel_details_peer_id(update) -> int | None:
+    """Return the peer id whose channel details an update affects, or None."""
+    if isinstance(update, (UpdateUser, UpdateUserName, UpdateUserPhone)):
+        return tg_utils.get_peer_id(PeerUser(update.user_id))
+    if isinstance(update, UpdateChatParticipants):
+        chat_id = getattr(update.participants, "chat_id", None)
+        return tg_utils.get_peer_id(PeerChat(chat_id)) if chat_id is not None else None
+    if isinstance(update, (UpdateChat, UpdateChatParticipant, UpdateChatParticipantAdd, UpdateChatParticipantDelete)):
+        return tg_utils.get_peer_id(PeerChat(update.chat_id))
+    if isinstance(update, (UpdateChannel, UpdateChannelParticipant)):
+        return tg_utils.get_peer_id(PeerChannel(update.channel_id))
+    return None
+
+
+class _BuildOutcome:
+    """Whether a details build saw everything it asked for (only complete builds are cached)."""
+
+    __slots__ = ("complete",)
+
+    def __init__(self):
+        self.complete = True
+
+
+def _entity_fingerprint(entity, channel_name) -> tuple:
+    """Fields of the entity the section depends on, readable without any RPC."""
+    photo = getattr(entity, "photo", None)
+    usernames = getattr(entity, "usernames", None) or ()
+    return (
+        type(entity).__name__,
+        getattr(photo, "photo_id", None),
+        getattr(entity, "version", None),
+        getattr(entity, "first_name", None),
+        getattr(entity, "last_name", None),
+        getattr(entity, "username", None),
+        tuple(getattr(u, "username", None) for u in usernames),
+        getattr(entity, "phone", None),
+        getattr(entity, "title", None),
+        getattr(entity, "participants_count", None),
+        getattr(entity, "megagroup", None),
+        getattr(entity, "broadcast", None),
+        getattr(entity, "forum", None),
+        channel_name,
+    )
+
+
 def _format_optional(value):
     if value is None:
         return None
@@ -74,7 +226,7 @@ def _append_detail(lines: list[str], label: str, value):
     lines.append(f"- {label}: {display_value}")
 
 
-async def _describe_profile_photo(agent, entity, media_chain):
+async def _describe_profile_photo(agent, entity, media_chain, outcome: _BuildOutcome | None = None):
     """
     Retrieve a formatted description for the first profile photo of an entity.
 
@@ -87,6 +239,8 @@ async def _describe_profile_photo(agent, entity, media_chain):
         photos = await agent.client.get_profile_photos(entity, limit=1)
     except Exception as e:
         logger.debug(f"Failed to fetch profile photos for entity {getattr(entity, 'id', None)}: {e}")
+        if outcome is not None:
+            outcome.complete = False
         return "Unable to retrieve profile photo (error)"
 
     if not photos:
@@ -95,6 +249,7 @@ async def _describe_profile_photo(agent, entity, media_chain):
     photo = photos[0]
     unique_id = get_unique_id(photo)
     description = None
+    record = None
 
     if unique_id and media_chain:
         try:
@@ -114,16 +269,23 @@ async def _describe_profile_photo(agent, entity, media_chain):
         except Exception as e:
             logger.debug(f"Media chain lookup failed for profile photo {unique_id}: {e}")
 
+    if outcome is not None and (
+        not isinstance(record, dict) or MediaStatus.is_temporary_failure(record.get("status"))
+    ):
+        # Not described yet (budget or a temporary failure); build again next time
+        outcome.complete = False
     return format_media_sentence("profile photo", description) if description else None
 
 
-async def _build_user_channel_details(agent, dialog, media_chain, fallback_name):
+async def _build_user_channel_details(agent, dialog, media_chain, fallback_name, outcome: _BuildOutcome | None = None):
     full_user = None
     try:
         input_user = await agent.client.get_input_entity(dialog)
         full_user = await agent.client(GetFullUserRequest(input_user))
     except Exception as e:
         logger.debug(f"Failed to fetch full user info for {dialog.id}: {e}")
+        if outcome is not None:
+            outcome.complete = False
 
     first_name = getattr(dialog, "first_name", None)
     last_name = getattr(dialog, "last_name", None)
@@ -133,7 +295,7 @@ async def _build_user_channel_details(agent, dialog, media_chain, fallback_name)
     else:
         full_name = fallback_name or _format_optional(getattr(dialog, "username", None))
 
-    profile_photo_desc = await _describe_profile_photo(agent, dialog, media_chain)
+    profile_photo_desc = await _describe_profile_photo(agent, dialog, media_chain, outcome)
     bio = getattr(full_user, "about", None) if full_user else None
     birthday_obj = getattr(full_user, "birthday", None) if full_user else None
     phone = getattr(dialog, "phone", None)
@@ -154,7 +316,7 @@ async def _build_user_channel_details(agent, dialog, media_chain, fallback_name)
     return details
 
 
-async def _build_group_channel_details(agent, dialog, media_chain, channel_id):
+async def _build_group_channel_details(agent, dialog, media_chain, channel_id, outcome: _BuildOutcome | None = None):
     """
     Build details for basic group chats (Chat entities).
     """
@@ -164,6 +326,8 @@ async def _build_group_channel_details(agent, dialog, media_chain, channel_id):
         full_chat = getattr(full_chat_result, "full_chat", None)
     except Exception as e:
         logger.debug(f"Failed to fetch full chat info for {dialog.id}: {e}")
+        if outcome is not None:
+            outcome.complete = False
 
     about = getattr(full_chat, "about", None) if full_chat else None
 
@@ -176,7 +340,7 @@ async def _build_group_channel_details(agent, dialog, media_chain, channel_id):
     if participant_count is None:
         participant_count = getattr(dialog, "participants_count", None)
 
-    profile_photo_desc = await _describe_profile_photo(agent, dialog, media_chain)
+    profile_photo_desc = await _describe_profile_photo(agent, dialog, media_chain, outcome)
 
     details = [
         "- Type: Group",
@@ -191,7 +355,7 @@ async def _build_group_channel_details(agent, dialog, media_chain, channel_id):
     return details
 
 
-async def _build_channel_entity_details(agent, dialog, media_chain):
+async def _build_channel_entity_details(agent, dialog, media_chain, outcome: _BuildOutcome | None = None):
     """
     Build details for channels and supergroups (Channel entities).
     """
@@ -202,6 +366,8 @@ async def _build_channel_entity_details(agent, dialog, media_chain):
         full_channel = getattr(full_result, "full_chat", None)
     except Exception as e:
         logger.debug(f"Failed to fetch full channel info for {dialog.id}: {e}")
+        if outcome is not None:
+            outcome.complete = False
 
     about = getattr(full_channel, "about", None) if full_channel else None
     participant_count = getattr(full_channel, "participants_count", None)
@@ -221,7 +387,7 @@ async def _build_channel_entity_details(agent, dialog, media_chain):
     else:
         channel_type = "Channel"
 
-    profile_photo_desc = await _describe_profile_photo(agent, dialog, media_chain)
+    profile_photo_desc = await _describe_profile_photo(agent, dialog, media_chain, outcome)
 
     details = [
         f"- Type: {channel_type}",
@@ -265,12 +431,22 @@ async def build_channel_details_section(
     if entity is None:
         return ""
 
+    # Serve the rendered section while the entity looks the same (no RPCs)
+    agent_id = getattr(agent, "agent_id", None)
+    cache_key = None
+    if isinstance(agent_id, int) and isinstance(entity, (User, Chat, Channel)):
+        cache_key = (agent_id, tg_utils.get_peer_id(entity), _entity_fingerprint(entity, channel_name))
+        section = _details_cache.get(*cache_key)
+        if section is not None:
+            return section
+
+    outcome = _BuildOutcome()
     if isinstance(entity, User):
-        detail_lines = await _build_user_channel_details(agent, entity, media_chain, channel_name)
+        detail_lines = await _build_user_channel_details(agent, entity, media_chain, channel_name, outcome)
     elif isinstance(entity, Chat):
-        detail_lines = await _build_group_channel_details(agent, entity, media_chain, channel_id)
+        detail_lines = await _build_group_channel_details(agent, entity, media_chain, channel_id, outcome)
     elif isinstance(entity, Channel):
-        detail_lines = await _build_channel_entity_details(agent, entity, media_chain)
+        detail_lines = await _build_channel_entity_details(agent, entity, media_chain, outcome)
     else:
         profile_photo_desc = await _describe_profile_photo(agent, entity, media_chain)
         detail_lines = [
@@ -279,7 +455,7 @@ async def build_channel_details_section(
             f"- Profile photo: {profile_photo_desc}",
         ]
 
-    if not detail_lines:
-        return ""
-
-    return "\n".join(["# Channel Details", "", *detail_lines])
+    section = "\n".join(["# Channel Details", "", *detail_lines]) if detail_lines else ""
+    if cache_key is not None and outcome.complete:
+        _details_cache.put(*cache_key, section)
+    return section
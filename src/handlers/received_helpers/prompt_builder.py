@@ -3,15 +3,20 @@
 # Copyright (c) 2025-2026 Cindy's World LLC and contributors
 # Licensed under the MIT License. See LICENSE.md for details.
 #
+import json
 import logging
 from datetime import UTC
 from zoneinfo import ZoneInfo
 
+import config
+from db.aio import run_db
 from handlers.received_helpers.channel_details import build_channel_details_section
+from handlers.received_helpers.prompt_pipeline import StageTimings, run_stages
+from llm.prompt_cache import SystemPrompt
 from utils import get_dialog_name
 from utils.formatting import format_log_prefix, format_log_prefix_resolved
 from schedule import get_current_activity
-from telegram_media import get_unique_id
+from media.media_catalog import get_media_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -237,10 +242,13 @@ async def build_complete_system_prompt(
     reaction_messages=None,
     graph=None,
     highest_summarized_id: int | None = None,
+    timings: StageTimings | None = None,
 ) -> str:
     """
     Build the complete system prompt with all sections.
 
+    Sections are fetched concurrently and each fetch is recorded in timings.
+
     Args:
         agent: The agent instance
         channel_id: The conversation ID
@@ -254,51 +262,83 @@ async def build_complete_system_prompt(
         reaction_msg: Optional reaction message
         graph: Optional TaskGraph to check for context resources
         highest_summarized_id: Highest message ID that has been summarized, or None
+        timings: Optional StageTimings of the received task to record stages in
 
     Returns:
         Complete system prompt string
     """
-    # Get base system prompt with context-appropriate instructions
-    specific_instructions = await build_specific_instructions(
-        agent=agent,
-        channel_id=channel_id,
-        messages=messages,
-        target_msg=target_msg,
-        xsend_intent=xsend_intent,
-        reaction_messages=reaction_messages,
-        highest_summarized_id=highest_summarized_id,
-    )
-    system_prompt = agent.get_system_prompt(channel_name, specific_instructions, channel_id=channel_id)
+    timings = timings or StageTimings()
     log_prefix = await format_log_prefix(agent.name, channel_name)
+    stable_layout = config.PROMPT_STABLE_PREFIX
+
+    # The sections below don't depend on each other, so they are fetched
+    # concurrently (blocking db reads on the DB thread pool) and assembled in
+    # prompt order afterwards.
+    has_task_summarize = "Task-Summarize" in getattr(agent, "role_prompt_names", [])
+    (
+        specific_instructions,
+        sticker_list,
+        memory_content,
+        intentions_section,
+        event_content,
+        channel_details,
+        summary_content,
+    ) = await run_stages(
+        timings.timed(
+            "specific_instructions",
+            build_specific_instructions(
+                agent=agent,
+                channel_id=channel_id,
+                messages=messages,
+                target_msg=target_msg,
+                xsend_intent=xsend_intent,
+                reaction_messages=reaction_messages,
+                highest_summarized_id=highest_summarized_id,
+            ),
+        ),
+        timings.timed("stickers", _build_sticker_list(agent, media_chain)),
+        timings.timed("memories", run_db(agent._load_memory_content, channel_id)),
+        timings.timed(
+            "intentions",
+            run_db(agent.get_intentions_section, channel_name, channel_id=channel_id)
+            if stable_layout
+            else _none(),
+        ),
+        timings.timed("events", run_db(agent._load_event_content, channel_id)),
+        timings.timed(
+            "channel_details",
+            build_channel_details_section(
+                agent=agent,
+                channel_id=channel_id,
+                dialog=dialog,
+                media_chain=media_chain,
+                channel_name=channel_name,
+            ),
+        ),
+        timings.timed(
+            "summaries",
+            agent._load_summary_content(
+                channel_id, json_format=False, include_metadata=has_task_summarize
+            ),
+        ),
+    )
+
+    # With PROMPT_STABLE_PREFIX, sections go from most to least stable so the
+    # prefix up to the media section is identical between turns and can be
+    # cached by the provider; per-turn sections (plan, intentions, specific
+    # instructions) move after it.
+    if stable_layout:
+        system_prompt = agent.get_stable_system_prompt(channel_name, channel_id=channel_id)
+    else:
+        system_prompt = agent.get_system_prompt(channel_name, specific_instructions, channel_id=channel_id)
 
     # Check if schedule.json is in context (as valid content, not an error)
     # If so, add Task-Schedule.md to the prompt after role prompts
-    if graph is not None:
-        fetched_resources = graph.context.get("fetched_resources", {})
-        schedule_url = "file:schedule.json"
-        
-        if schedule_url in fetched_resources:
-            schedule_content = fetched_resources[schedule_url]
-            # Validate that it's valid JSON (not an error message)
-            try:
-                import json
-                schedule_data = json.loads(schedule_content)
-                if isinstance(schedule_data, dict):
-                    # Valid schedule content - add Task-Schedule.md
-                    from prompt_loader import load_system_prompt
-                    task_schedule_prompt = load_system_prompt("Task-Schedule")
-                    system_prompt += f"\n\n{task_schedule_prompt}"
-                    logger.info(
-                        f"{log_prefix} Added Task-Schedule.md to prompt (schedule.json found in context)"
-                    )
-            except (json.JSONDecodeError, ValueError, TypeError):
-                # Not valid JSON - likely an error message, don't add Task-Schedule
-                logger.debug(
-                    f"{log_prefix} schedule.json in context but not valid JSON, skipping Task-Schedule.md"
-                )
-
-    # Build sticker list
-    sticker_list = await _build_sticker_list(agent, media_chain)
+    task_schedule_prompt = _task_schedule_prompt(graph, log_prefix)
+    if task_schedule_prompt and not stable_layout:
+        system_prompt += f"\n\n{task_schedule_prompt}"
+
+    # Add sticker list
     if sticker_list:
         system_prompt += f"\n\n# Stickers you may send using a `sticker` task\n\n{sticker_list}\n\n"
         system_prompt += "You may also send any sticker you've seen in chat or know about in any other way using the sticker set name and sticker name.\n"
@@ -317,8 +357,11 @@ async def build_complete_system_prompt(
             "```\n"
         )
 
+    stable_prefix_len = len(system_prompt)
+    if stable_layout and task_schedule_prompt:
+        system_prompt += f"\n\n{task_schedule_prompt}"
+
     # Add memory content
-    memory_content = agent._load_memory_content(channel_id)
     if memory_content:
         system_prompt += f"\n\n{memory_content}\n"
         logger.info(
@@ -327,8 +370,11 @@ async def build_complete_system_prompt(
     else:
         logger.info(f"{log_prefix} No memory content found for channel {channel_id}")
 
+    # Channel plan and intentions (at the start of the prompt in the legacy layout)
+    if intentions_section:
+        system_prompt += f"\n\n{intentions_section}\n"
+
     # Add events (scheduled actions) for this channel; times in agent timezone
-    event_content = agent._load_event_content(channel_id)
     if event_content:
         system_prompt += (
             "\n\n# Events\n\nThe following future events are scheduled for this channel:\n\n```json\n"
@@ -348,20 +394,11 @@ async def build_complete_system_prompt(
     if activity_section:
         system_prompt += activity_section
 
-    channel_details = await build_channel_details_section(
-        agent=agent,
-        channel_id=channel_id,
-        dialog=dialog,
-        media_chain=media_chain,
-        channel_name=channel_name,
-    )
     if channel_details:
         system_prompt += f"\n\n{channel_details}"
 
     # Add conversation summary immediately before the conversation history
-    # Check if Task-Summarize role is present - if so, include full metadata
-    has_task_summarize = "Task-Summarize" in getattr(agent, "role_prompt_names", [])
-    summary_content = await agent._load_summary_content(channel_id, json_format=False, include_metadata=has_task_summarize)
+    # (with full metadata if the Task-Summarize role is present)
     if summary_content:
         system_prompt += f"\n\n# Summary of earlier conversation\n\n{summary_content}\n"
         logger.info(
@@ -373,38 +410,44 @@ async def build_complete_system_prompt(
     if specific_instructions:
         system_prompt += f"\n\n{specific_instructions}\n"
 
+    if stable_layout:
+        return SystemPrompt(system_prompt, stable_prefix_len)
     return system_prompt
 
 
-async def _is_sticker_sendable(agent, doc) -> bool:
-    """
-    Test if a sticker can be sent by checking for premium requirements.
+async def _none() -> None:
+    return None
 
-    According to Telegram API documentation, premium stickers are identified by
-    the presence of a videoSize of type=f in the sticker's main document.
 
-    Args:
-        agent: Agent instance
-        doc: Sticker document from Telegram API
+def _task_schedule_prompt(graph, log_prefix: str) -> str | None:
+    """Return Task-Schedule.md when valid schedule.json content is in the graph's context."""
+    if graph is None:
+        return None
+    fetched_resources = graph.context.get("fetched_resources", {})
+    schedule_url = "file:schedule.json"
+    if schedule_url not in fetched_resources:
+        return None
 
-    Returns:
-        True if sticker can be sent, False if it requires premium
-    """
+    schedule_content = fetched_resources[schedule_url]
+    # Validate that it's valid JSON (not an error message)
     try:
-        # Check for premium indicator: videoSize with type=f
-        video_thumbs = getattr(doc, "video_thumbs", None)
-        if video_thumbs:
-            for video_size in video_thumbs:
-                video_type = getattr(video_size, "type", None)
-                if video_type == "f":
-                    return False
-
-        # No premium indicators found
-        return True
+        schedule_data = json.loads(schedule_content)
+    except (json.JSONDecodeError, ValueError, TypeError):
+        # Not valid JSON - likely an error message, don't add Task-Schedule
+        logger.debug(
+            f"{log_prefix} schedule.json in context but not valid JSON, skipping Task-Schedule.md"
+        )
+        return None
+    if not isinstance(schedule_data, dict):
+        return None
 
-    except Exception as e:
-        logger.exception(f"Error checking sticker sendability: {e}")
-        return True
+    # Valid schedule content - add Task-Schedule.md
+    from prompt_loader import load_system_prompt
+    task_schedule_prompt = load_system_prompt("Task-Schedule")
+    logger.info(
+        f"{log_prefix} Added Task-Schedule.md to prompt (schedule.json found in context)"
+    )
+    return task_schedule_prompt
 
 
 async def _build_sticker_list(agent, media_chain) -> str | None:
@@ -412,6 +455,9 @@ async def _build_sticker_list(agent, media_chain) -> str | None:
     Build a formatted list of available stickers with descriptions.
     Filters out premium stickers that the agent cannot send.
 
+    The list comes from the agent's media catalog, which only re-resolves
+    stickers that were added, changed or are still missing a description.
+
     Args:
         agent: Agent instance with configured stickers
         media_chain: Media source chain for description lookups
@@ -422,57 +468,8 @@ async def _build_sticker_list(agent, media_chain) -> str | None:
     if not agent.stickers:
         return None
 
-    lines: list[str] = []
-    filtered_count = 0
-
-    # Check if premium filtering is enabled (based on agent's premium status)
-    filter_premium = getattr(agent, "filter_premium_stickers", True)
-
-    if filter_premium:
-        logger.debug("Premium sticker filtering enabled for non-premium agent")
-    else:
-        logger.debug("Premium sticker filtering disabled for premium agent")
-
     try:
-        for set_short, name in sorted(agent.stickers.keys()):
-            try:
-                # Get the document from the configured stickers
-                doc = agent.stickers.get((set_short, name))
-                if doc:
-                    # Check if sticker is sendable (not premium) if filtering is enabled
-                    if filter_premium and not await _is_sticker_sendable(
-                        agent, doc
-                    ):
-                        filtered_count += 1
-                        continue
-
-                    # Get unique_id from document
-                    _uid = get_unique_id(doc)
-
-                    # Use agent's media source chain
-                    cache_record = await media_chain.get(
-                        unique_id=_uid,
-                        agent=agent,
-                        doc=doc,
-                        kind="sticker",
-                        sticker_set_name=set_short,
-                        sticker_name=name,
-                        update_last_used=True,
-                    )
-                    desc = cache_record.get("description") if cache_record else None
-                else:
-                    desc = None
-            except Exception as e:
-                logger.exception(f"Failed to process sticker {set_short}::{name}: {e}")
-                desc = None
-            if desc:
-                lines.append(f"- {set_short} :: {name} - {desc}")
-            else:
-                lines.append(f"- {set_short} :: {name}")
-
-        if filtered_count > 0:
-            logger.debug(f"Filtered out {filtered_count} premium stickers")
-
+        lines = await get_media_catalog(agent).sticker_lines(agent, media_chain)
     except Exception as e:
         # If anything unexpected occurs, fall back to names-only list
         logger.warning(
@@ -487,6 +484,7 @@ async def get_media_list_json(agent, media_chain) -> list[dict]:
     """
     Build a list of available media (photos, audio, video, stickers, etc.) as
     JSON-serializable dicts. Uses agent.media with fallback to agent.photos.
+    Served from the agent's media catalog (also behind file:media.json).
 
     Each item has: media_id (unique_id), media_type (kind), description (optional).
 
@@ -501,43 +499,13 @@ async def get_media_list_json(agent, media_chain) -> list[dict]:
     if not media_cache:
         return []
 
-    result: list[dict] = []
-
     try:
-        for unique_id_str in sorted(media_cache.keys()):
-            try:
-                media_obj = media_cache[unique_id_str]
-                _uid = get_unique_id(media_obj)
-
-                cache_record = await media_chain.get(
-                    unique_id=_uid,
-                    agent=agent,
-                    doc=media_obj,
-                    kind=None,
-                    update_last_used=True,
-                )
-                desc = cache_record.get("description") if cache_record else None
-                kind = cache_record.get("kind", "document") if cache_record else "document"
-            except Exception as e:
-                logger.exception(f"Failed to process media {unique_id_str}: {e}")
-                desc = None
-                kind = "document"
-
-            item: dict = {
-                "media_id": unique_id_str,
-                "media_type": kind,
-            }
-            if desc is not None:
-                item["description"] = desc
-            result.append(item)
-
+        return await get_media_catalog(agent).media_items(agent, media_chain)
     except Exception as e:
         logger.warning(
             "Failed to build media list, returning minimal data: %s", e
         )
-        result = [
+        return [
             {"media_id": uid, "media_type": "document"}
             for uid in sorted(media_cache.keys())
         ]
-
-    return result
@@ -0,0 +1,94 @@
+# src/handlers/received_helpers/prompt_pipeline.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Concurrent stages and stage timings for building a received task's prompt.
+
+handle_received and build_complete_system_prompt run independent stages (the
+contact check and message fetch, each prompt section, the system prompt and
+the message history) side by side with run_stages(), so the time to the LLM
+request is the critical path rather than the sum of every step. StageTimings
+records how long each stage took and stores the result in the received task's
+params, so it appears in the details of the task's own task log row.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def _first_error(group: BaseExceptionGroup) -> BaseException:
+    error = group.exceptions[0]
+    while isinstance(error, BaseExceptionGroup):
+        error = error.exceptions[0]
+    return error
+
+
+async def run_stages(*stages: Awaitable[Any]) -> list[Any]:
+    """
+    Run awaitables concurrently in a TaskGroup and return their results in order.
+
+    If a stage fails the others are cancelled and the first error is raised
+    as is (not wrapped in an ExceptionGroup), so callers and the tick's retry
+    handling see the same exception types as when the stages ran one by one.
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(stage) for stage in stages]
+    except BaseExceptionGroup as group:
+        raise _first_error(group) from None
+    return [task.result() for task in tasks]
+
+
+class StageTimings:
+    """Wall-clock duration of each named stage, measured from one start time."""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._finished: float | None = None
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage name (repeated stages add up)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    async def timed(self, name: str, awaitable: Awaitable[Any]) -> Any:
+        """Await awaitable as stage name and return its result."""
+        with self.stage(name):
+            return await awaitable
+
+    def finish(self) -> float:
+        """Stop the overall clock (at the LLM request) and return the total in ms."""
+        if self._finished is None:
+            self._finished = time.perf_counter()
+        return (self._finished - self._started) * 1000
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total_ms": round(self.finish(), 1),
+            "stages": {name: round(ms, 1) for name, ms in self.stages.items()},
+        }
+
+    def log(self, log_prefix: str, task: Any) -> None:
+        """Log the timings and store them as the task's prompt_timings param.
+
+        The tick loop writes task params into the details of the task's log
+        row when it completes, so the timings need no row of their own.
+        """
+        details = self.as_dict()
+        stages = " ".join(f"{name}={ms}ms" for name, ms in details["stages"].items())
+        logger.info(f"{log_prefix} PROMPT_TIMING total={details['total_ms']}ms {stages}")
+        task.params["prompt_timings"] = details
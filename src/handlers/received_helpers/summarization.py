@@ -560,8 +560,9 @@ async def trigger_summarization_directly(agent, channel_id: int, parse_llm_reply
     Raises:
         RuntimeError: If agent client is not connected or entity cannot be resolved
     """
-    from media.media_injector import inject_media_descriptions
+    from media.media_injector import collect_media_unique_ids, inject_media_descriptions
     from media.media_source import get_default_media_source_chain
+    from media.sources import PrefetchedMediaSource
     
     client = agent.client
     if not client or not client.is_connected():
@@ -580,9 +581,14 @@ async def trigger_summarization_directly(agent, channel_id: int, parse_llm_reply
     messages = await client.get_messages(entity, limit=message_limit)
     
     # Get media chain and inject media descriptions
-    media_chain = get_default_media_source_chain()
+    media_chain = await PrefetchedMediaSource.prefetch(
+        get_default_media_source_chain(),
+        collect_media_unique_ids(messages),
+        agent=agent,
+        update_last_used=True,
+    )
     messages = await inject_media_descriptions(
-        messages, agent=agent, peer_id=channel_id
+        messages, agent=agent, peer_id=channel_id, media_chain=media_chain
     )
     
     # Get highest summarized ID
@@ -260,12 +260,12 @@ async def process_retrieve_tasks(
             
             # Log the retrieve task execution
             try:
-                from db.task_log import log_task_execution, format_action_details
+                from db.task_log import enqueue_task_execution, format_action_details
                 action_details = format_action_details(
                     "retrieve",
                     retrieve_task.params
                 )
-                log_task_execution(
+                enqueue_task_execution(
                     agent_telegram_id=agent.agent_id,
                     channel_telegram_id=channel_id,
                     action_kind="retrieve",
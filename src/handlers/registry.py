@@ -28,7 +28,7 @@ def _get_task_log_module():
             # Create a dummy module with no-op functions
             class DummyTaskLog:
                 @staticmethod
-                def log_task_execution(*args, **kwargs):
+                def enqueue_task_execution(*args, **kwargs):
                     pass
                 @staticmethod
                 def format_action_details(*args, **kwargs):
@@ -136,7 +136,7 @@ def _log_task_dispatch(task_type: str, args: tuple) -> None:
         )
         
         # Log to database
-        task_log.log_task_execution(
+        task_log.enqueue_task_execution(
             agent_telegram_id=agent_id,
             channel_telegram_id=channel_id,
             action_kind=task_type,
@@ -169,7 +169,7 @@ def _log_immediate_task_dispatch(task, agent, channel_id: int) -> None:
         )
         
         # Log to database
-        task_log.log_task_execution(
+        task_log.enqueue_task_execution(
             agent_telegram_id=agent_id,
             channel_telegram_id=channel_id,
             action_kind=task_type,
@@ -133,6 +133,14 @@ def format_text_as_pretty_json_if_possible(text: str) -> str:
         return text
 
 
+def openai_cached_input_tokens(usage: Any) -> int:
+    """Prompt tokens served from the provider's cache (usage.prompt_tokens_details.cached_tokens)."""
+    from .usage_logging import cached_token_count
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    return cached_token_count(getattr(details, "cached_tokens", None))
+
+
 # --- Base LLM class ---
 
 
@@ -179,6 +187,7 @@ class LLM(ABC):
                         operation=operation,
                         channel_name=channel_name,
                         channel_telegram_id=channel_telegram_id,
+                        cached_input_tokens=openai_cached_input_tokens(response.usage),
                     )
             except Exception as e:
                 # Don't fail the request if usage logging fails
@@ -258,7 +267,7 @@ class LLM(ABC):
         Raises on failures so the scheduler's retry policy can handle it.
 
         Args:
-            image_bytes: The image data as bytes
+            image_bytes: The image data as bytes or a read-only buffer such as a memory-mapped file
             agent: Optional agent object for usage logging context
             mime_type: Optional MIME type of the image
             timeout_s: Optional timeout in seconds for the request
@@ -282,7 +291,7 @@ class LLM(ABC):
         Raises on failures so the scheduler's retry policy can handle it.
 
         Args:
-            video_bytes: The video data as bytes
+            video_bytes: The video data as bytes or a read-only buffer such as a memory-mapped file
             agent: Optional agent object for usage logging context
             mime_type: Optional MIME type of the video
             duration: Video duration in seconds (optional, used for validation)
@@ -307,7 +316,7 @@ class LLM(ABC):
         Raises on failures so the scheduler's retry policy can handle it.
 
         Args:
-            audio_bytes: The audio data as bytes
+            audio_bytes: The audio data as bytes or a read-only buffer such as a memory-mapped file
             agent: Optional agent object for usage logging context
             mime_type: Optional MIME type of the audio
             duration: Audio duration in seconds (optional, used for validation)
@@ -3,7 +3,6 @@
 # Copyright (c) 2025-2026 Cindy's World LLC and contributors
 # Licensed under the MIT License. See LICENSE.md for details.
 #
-import asyncio
 import base64
 import copy
 import json
@@ -14,7 +13,6 @@ from collections.abc import Iterable
 from typing import Any
 
 import httpx  # pyright: ignore[reportMissingImports]
-from google import genai  # pyright: ignore[reportMissingImports]
 from google.genai.types import (  # pyright: ignore[reportMissingImports]
     FinishReason,
     GenerateContentConfig,
@@ -32,6 +30,8 @@ from media.mime_utils import (
 
 from .base import LLM, ChatMsg, MsgPart
 from .exceptions import RetryableLLMError
+from .http_pool import PooledSDKClient, get_genai_client, get_llm_http_client
+from .prompt_cache import get_gemini_context_cache, split_system_prompt
 from .task_schema import get_task_response_schema_dict
 
 logger = logging.getLogger(__name__)
@@ -62,9 +62,20 @@ from .utils import format_string_for_logging as _format_string_for_logging
 from llm.base import extract_gemini_response_text as _extract_response_text
 
 
+def _prepend_user_text(contents: list[dict[str, object]], text: str) -> list[dict[str, object]]:
+    """Put text at the start of the conversation, in the first turn if it is a user turn."""
+    if contents and contents[0].get("role") == "user":
+        first = contents[0]
+        return [{**first, "parts": [{"text": text}, *(first.get("parts") or [])]}] + contents[1:]
+    return [{"role": "user", "parts": [{"text": text}]}] + contents
+
+
 class GeminiLLM(LLM):
     prompt_name = "Instructions"
 
+    # Pooled google-genai client for this API key (see llm.http_pool)
+    client = PooledSDKClient(lambda llm: get_genai_client(llm.api_key))
+
     def __init__(
         self,
         model: str | None = None,
@@ -84,7 +95,6 @@ class GeminiLLM(LLM):
             raise ValueError(
                 "Missing model specification. Either pass 'model' parameter or set GEMINI_MODEL environment variable."
             )
-        self.client = genai.Client(api_key=self.api_key)
         self.history_size = 100
 
         # Configure safety settings to disable content filtering
@@ -145,7 +155,7 @@ class GeminiLLM(LLM):
             total_output_tokens = output_tokens + thinking_tokens
             
             if input_tokens or total_output_tokens:
-                from .usage_logging import log_llm_usage
+                from .usage_logging import cached_token_count, log_llm_usage
                 log_llm_usage(
                     agent=agent,
                     model_name=model_name,
@@ -154,6 +164,7 @@ class GeminiLLM(LLM):
                     operation=operation,
                     channel_name=channel_name,
                     channel_telegram_id=channel_telegram_id,
+                    cached_input_tokens=cached_token_count(usage.get("cachedContentTokenCount")),
                 )
         except Exception as e:
             # Don't fail the request if usage logging fails
@@ -193,7 +204,7 @@ class GeminiLLM(LLM):
                 thinking_tokens = int(getattr(usage, "thoughts_token_count", None) or 0)
                 total_output_tokens = output_tokens + thinking_tokens
                 
-                from .usage_logging import log_llm_usage
+                from .usage_logging import cached_token_count, log_llm_usage
                 log_llm_usage(
                     agent=agent,
                     model_name=model_name,
@@ -202,6 +213,9 @@ class GeminiLLM(LLM):
                     operation=operation,
                     channel_name=channel_name,
                     channel_telegram_id=channel_telegram_id,
+                    cached_input_tokens=cached_token_count(
+                        getattr(usage, "cached_content_token_count", None)
+                    ),
                 )
         except Exception as e:
             # Don't fail the request if usage logging fails
@@ -374,12 +388,11 @@ class GeminiLLM(LLM):
         timeout = timeout_s or 30.0
 
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    url, json=payload, headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                body = response.content
+            response = await get_llm_http_client("gemini").post(
+                url, json=payload, headers={"Content-Type": "application/json"}, timeout=timeout
+            )
+            response.raise_for_status()
+            body = response.content
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             error_msg = f"Gemini HTTP {status_code}: {e.response.text}"
@@ -568,12 +581,11 @@ class GeminiLLM(LLM):
         timeout = timeout_s or 60.0
 
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    url, json=payload, headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                body = response.content
+            response = await get_llm_http_client("gemini").post(
+                url, json=payload, headers={"Content-Type": "application/json"}, timeout=timeout
+            )
+            response.raise_for_status()
+            body = response.content
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             error_msg = f"Gemini HTTP {status_code}: {e.response.text}"
@@ -722,12 +734,11 @@ class GeminiLLM(LLM):
         timeout = timeout_s or 60.0
 
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    url, json=payload, headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                body = response.content
+            response = await get_llm_http_client("gemini").post(
+                url, json=payload, headers={"Content-Type": "application/json"}, timeout=timeout
+            )
+            response.raise_for_status()
+            body = response.content
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             error_msg = f"Gemini HTTP {status_code}: {e.response.text}"
@@ -846,19 +857,34 @@ class GeminiLLM(LLM):
             model_name = model or self.model_name
             from .task_schema import get_task_response_schema_dict
             schema_dict = get_task_response_schema_dict(allowed_task_types=allowed_task_types)
-            config = GenerateContentConfig(
-                system_instruction=system_instruction,
-                safety_settings=self.safety_settings,
-                response_mime_type="application/json",
-                response_json_schema=copy.deepcopy(schema_dict),
-            )
+            config_kwargs = {
+                "safety_settings": self.safety_settings,
+                "response_mime_type": "application/json",
+                "response_json_schema": copy.deepcopy(schema_dict),
+            }
+            cached_content = await self._context_cache_name(client, model_name, system_instruction)
+            if cached_content:
+                # The stable prefix lives in the cached content; a request naming cached
+                # content cannot also set system_instruction, so the rest of the system
+                # prompt opens the conversation instead
+                _, prompt_rest = split_system_prompt(system_instruction)
+                config_kwargs["cached_content"] = cached_content
+                if prompt_rest.strip():
+                    contents_norm = _prepend_user_text(contents_norm, prompt_rest.strip())
+            else:
+                config_kwargs["system_instruction"] = system_instruction
 
-            response = await asyncio.to_thread(
-                client.models.generate_content,
-                model=model_name,
-                contents=contents_norm,
-                config=config,
-            )
+            try:
+                response = await client.aio.models.generate_content(
+                    model=model_name,
+                    contents=contents_norm,
+                    config=GenerateContentConfig(**config_kwargs),
+                )
+            except Exception:
+                if cached_content:
+                    # Expired or deleted server-side: recreate it on the retry
+                    get_gemini_context_cache().invalidate(cached_content)
+                raise
 
             # Check for prohibited content before extraction
             # Check both prompt_feedback.block_reason and candidate.finish_reason
@@ -928,6 +954,17 @@ class GeminiLLM(LLM):
                 # Re-raise non-retryable errors as-is
                 raise
 
+    async def _context_cache_name(
+        self, client: Any, model_name: str, system_instruction: str | None
+    ) -> str | None:
+        """Return Gemini cached content holding the prompt's stable prefix (GEMINI_CONTEXT_CACHE), if any."""
+        if not config.GEMINI_CONTEXT_CACHE:
+            return None
+        stable_prefix, _ = split_system_prompt(system_instruction)
+        if not stable_prefix:
+            return None
+        return await get_gemini_context_cache().get_or_create(client, model_name, stable_prefix)
+
     def _mk_text_part(self, text: str) -> dict[str, str]:
         """Create a Gemini text part."""
         return {"text": text}
@@ -1116,8 +1153,7 @@ class GeminiLLM(LLM):
             safety_settings=self.safety_settings,
         )
 
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+        response = await client.aio.models.generate_content(
             model=model_name,
             contents=[
                 {
@@ -1193,9 +1229,7 @@ class GeminiLLM(LLM):
                 "parts": [{"text": "⟦special⟧ Please respond to the instructions provided."}]
             }]
 
-            import asyncio
-            response = await asyncio.to_thread(
-                client.models.generate_content,
+            response = await client.aio.models.generate_content(
                 model=model_name,
                 contents=contents,
                 config=config,
@@ -12,7 +12,6 @@ from collections.abc import Iterable
 from typing import Any
 
 import httpx  # pyright: ignore[reportMissingImports]
-from openai import AsyncOpenAI  # pyright: ignore[reportMissingImports]
 
 from config import GROK_API_KEY, GROK_MODEL
 from media.mime_utils import (
@@ -27,7 +26,10 @@ from .base import (
     MsgPart,
     format_openai_response_object_for_logging,
     format_text_as_pretty_json_if_possible,
+    openai_cached_input_tokens,
 )
+from .http_pool import PooledSDKClient, get_openai_client
+from .prompt_cache import prompt_cache_key, split_system_prompt
 from .task_schema import get_task_response_schema_dict
 from .utils import format_string_for_logging as _format_string_for_logging
 
@@ -50,6 +52,11 @@ _TASK_RESPONSE_SCHEMA_DICT = get_task_response_schema_dict()
 class GrokLLM(LLM):
     prompt_name = "Instructions"
 
+    # Grok uses OpenAI-compatible API at https://api.x.ai/v1 (pooled client, see llm.http_pool)
+    client = PooledSDKClient(
+        lambda llm: get_openai_client("grok", llm.api_key, base_url="https://api.x.ai/v1")
+    )
+
     def __init__(
         self,
         model: str | None = None,
@@ -69,8 +76,6 @@ class GrokLLM(LLM):
             raise ValueError(
                 "Missing model specification. Either pass 'model' parameter or set GROK_MODEL environment variable."
             )
-        # Grok uses OpenAI-compatible API at https://api.x.ai/v1
-        self.client = AsyncOpenAI(api_key=self.api_key, base_url="https://api.x.ai/v1")
         self.history_size = 100
 
     def _log_usage_from_openai_response(
@@ -108,6 +113,7 @@ class GrokLLM(LLM):
                     channel_name=channel_name,
                     channel_telegram_id=channel_telegram_id,
                     cost_usd=cost_usd,
+                    cached_input_tokens=openai_cached_input_tokens(usage),
                 )
                 return
         except Exception as e:
@@ -476,6 +482,12 @@ class GrokLLM(LLM):
             }
             if response_format is not None:
                 create_kwargs["response_format"] = response_format
+            # xAI routes requests with the same conversation id to the same prompt cache
+            stable_prefix, _ = split_system_prompt(system_prompt)
+            if stable_prefix:
+                create_kwargs["extra_headers"] = {
+                    "x-grok-conv-id": prompt_cache_key(stable_prefix, model_name)
+                }
             response = await self.client.chat.completions.create(**create_kwargs)
 
             # Optional comprehensive logging for debugging
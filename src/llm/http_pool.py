@@ -0,0 +1,146 @@
+# src/llm/http_pool.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Shared, pooled HTTP clients for LLM providers.
+
+LLM instances are cheap and created often (one per agent, and a new one for
+every media description via get_media_llm). Each used to open its own HTTP
+client, and GeminiLLM.describe_* opened a fresh httpx.AsyncClient per call,
+so requests paid a TCP/TLS handshake instead of reusing a warm connection.
+
+This module keeps one httpx.AsyncClient per provider (keep-alive, HTTP/2 when
+the h2 package is installed, limits from LLM_HTTP_*), plus the SDK clients
+built on top of it (google-genai, AsyncOpenAI) per provider and API key.
+httpx connections belong to the event loop that opened them, so clients are
+kept per running loop: the agent loop shares one set, and the admin console's
+short-lived loops get their own, dropped with the loop.
+
+LLM classes declare `client = PooledSDKClient(factory)`; assigning llm.client
+(as tests do) overrides the pooled client for that instance.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+import httpx  # pyright: ignore[reportMissingImports]
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_enabled() -> bool:
+    # httpx raises ImportError for http2=True without h2, so only ask when it is importable
+    return config.LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _pool_for_loop() -> dict[tuple, Any]:
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = {}
+        _pools[loop] = pool
+    return pool
+
+
+def get_llm_http_client(provider: str) -> httpx.AsyncClient:
+    """Return the pooled HTTP client for provider on the running event loop."""
+    pool = _pool_for_loop()
+    key = ("http", provider)
+    client = pool.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=_http2_enabled(),
+            limits=httpx.Limits(
+                max_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+        pool[key] = client
+        # SDK clients wrap the previous HTTP client; rebuild them on next use
+        for sdk_key in [k for k in pool if k[0] == "sdk" and k[1] == provider]:
+            del pool[sdk_key]
+        logger.debug(f"Opened pooled HTTP client for {provider} (http2={_http2_enabled()})")
+    return client
+
+
+def _get_sdk_client(provider: str, api_key: str, base_url: str | None, build: Callable) -> Any:
+    pool = _pool_for_loop()
+    http_client = get_llm_http_client(provider)
+    key = ("sdk", provider, api_key, base_url)
+    client = pool.get(key)
+    if client is None:
+        client = build(http_client)
+        pool[key] = client
+    return client
+
+
+def get_openai_client(provider: str, api_key: str, base_url: str | None = None) -> Any:
+    """Return a pooled AsyncOpenAI client (OpenAI, Grok, OpenRouter) for the running loop."""
+    from openai import AsyncOpenAI  # pyright: ignore[reportMissingImports]
+
+    return _get_sdk_client(
+        provider,
+        api_key,
+        base_url,
+        lambda http_client: AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client),
+    )
+
+
+def get_genai_client(api_key: str) -> Any:
+    """Return a pooled google-genai client whose async API (client.aio) uses the pooled HTTP client."""
+    from google import genai  # pyright: ignore[reportMissingImports]
+    from google.genai.types import HttpOptions  # pyright: ignore[reportMissingImports]
+
+    return _get_sdk_client(
+        "gemini",
+        api_key,
+        None,
+        lambda http_client: genai.Client(
+            api_key=api_key, http_options=HttpOptions(httpx_async_client=http_client)
+        ),
+    )
+
+
+class PooledSDKClient:
+    """
+    Descriptor for LLM.client: resolves to the provider's pooled SDK client on
+    the running loop. Assigning the attribute on an instance overrides it
+    (a non-data descriptor, so the instance dict wins).
+    """
+
+    def __init__(self, factory: Callable[[Any], Any]):
+        self._factory = factory
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self._factory(obj)
+
+
+async def close_llm_http_clients() -> None:
+    """Close the pooled clients of the running loop (call on shutdown)."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.pop(loop, None)
+    if not pool:
+        return
+    for key, client in pool.items():
+        if key[0] != "http":
+            continue
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing pooled HTTP client for {key[1]}: {e}")
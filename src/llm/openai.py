@@ -12,7 +12,6 @@ from collections.abc import Iterable
 from typing import Any
 
 import httpx  # pyright: ignore[reportMissingImports]
-from openai import AsyncOpenAI  # pyright: ignore[reportMissingImports]
 
 from config import OPENAI_API_KEY
 from media.mime_utils import (
@@ -28,6 +27,8 @@ from .base import (
     format_openai_response_object_for_logging,
     format_text_as_pretty_json_if_possible,
 )
+from .http_pool import PooledSDKClient, get_openai_client
+from .prompt_cache import prompt_cache_key, split_system_prompt
 from .task_schema import get_task_response_schema_dict
 from .utils import format_string_for_logging as _format_string_for_logging
 
@@ -100,6 +101,9 @@ def _normalize_schema_for_openai_strict(schema: dict[str, Any]) -> dict[str, Any
 class OpenAILLM(LLM):
     prompt_name = "Instructions"
 
+    # OpenAI uses standard OpenAI API at https://api.openai.com/v1 (pooled client, see llm.http_pool)
+    client = PooledSDKClient(lambda llm: get_openai_client("openai", llm.api_key))
+
     def __init__(
         self,
         model: str | None = None,
@@ -117,8 +121,6 @@ class OpenAILLM(LLM):
             raise ValueError(
                 "Missing model specification. Must pass 'model' parameter for OpenAI models."
             )
-        # OpenAI uses standard OpenAI API at https://api.openai.com/v1
-        self.client = AsyncOpenAI(api_key=self.api_key)
         self.history_size = 100
 
     def is_mime_type_supported_by_llm(self, mime_type: str) -> bool:
@@ -509,6 +511,12 @@ class OpenAILLM(LLM):
             }
             if response_format is not None:
                 create_kwargs["response_format"] = response_format
+            # Route requests sharing a stable prompt prefix to the same prompt cache
+            stable_prefix, _ = split_system_prompt(system_prompt)
+            if stable_prefix:
+                create_kwargs["extra_body"] = {
+                    "prompt_cache_key": prompt_cache_key(stable_prefix, model_name)
+                }
             response = await self.client.chat.completions.create(**create_kwargs)
 
             # Optional comprehensive logging for debugging
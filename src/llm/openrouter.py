@@ -10,8 +10,6 @@ import os
 from collections.abc import Iterable
 from typing import Any
 
-from openai import AsyncOpenAI  # pyright: ignore[reportMissingImports]
-
 from config import OPENROUTER_API_KEY
 from media.mime_utils import (
     detect_mime_type_from_bytes,
@@ -20,6 +18,8 @@ from media.mime_utils import (
 )
 
 from .base import LLM, ChatMsg, MsgPart
+from .http_pool import PooledSDKClient, get_openai_client
+from .prompt_cache import split_system_prompt
 from .utils import format_string_for_logging as _format_string_for_logging
 
 logger = logging.getLogger(__name__)
@@ -36,6 +36,11 @@ OPENROUTER_DEBUG_LOGGING: bool = os.environ.get("OPENROUTER_DEBUG_LOGGING", "").
 class OpenRouterLLM(LLM):
     prompt_name = "Instructions"
 
+    # OpenRouter uses OpenAI-compatible API at https://openrouter.ai/api/v1 (pooled client, see llm.http_pool)
+    client = PooledSDKClient(
+        lambda llm: get_openai_client("openrouter", llm.api_key, base_url="https://openrouter.ai/api/v1")
+    )
+
     def __init__(
         self,
         model: str | None = None,
@@ -53,11 +58,6 @@ class OpenRouterLLM(LLM):
             raise ValueError(
                 "Missing model specification. Must pass 'model' parameter for OpenRouter models."
             )
-        # OpenRouter uses OpenAI-compatible API at https://openrouter.ai/api/v1
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url="https://openrouter.ai/api/v1",
-        )
         self.history_size = 100
 
         # Safety settings for Gemini models (OpenRouter format uses "BLOCK_NONE" instead of "OFF")
@@ -71,6 +71,22 @@ class OpenRouterLLM(LLM):
         model_lower = model_name.lower()
         return model_lower.startswith("google/") or "gemini" in model_lower
 
+    def _needs_cache_breakpoint(self, model_name: str) -> bool:
+        """Check if the model only caches prompts up to an explicit cache_control breakpoint."""
+        return model_name.lower().startswith("anthropic/") or self._is_gemini_model(model_name)
+
+    def _mark_stable_prefix(self, messages: list[dict[str, Any]], system_prompt: str | None) -> None:
+        """Split the system message at the stable prefix and put a cache breakpoint after it."""
+        stable_prefix, rest = split_system_prompt(system_prompt)
+        if not stable_prefix or not messages or messages[0].get("role") != "system":
+            return
+        content: list[dict[str, Any]] = [
+            {"type": "text", "text": stable_prefix, "cache_control": {"type": "ephemeral"}}
+        ]
+        if rest:
+            content.append({"type": "text", "text": rest})
+        messages[0]["content"] = content
+
     def is_mime_type_supported_by_llm(self, mime_type: str) -> bool:
         """
         Check if a MIME type is supported by the LLM for media description.
@@ -448,6 +464,10 @@ class OpenRouterLLM(LLM):
             # OpenRouter requires provider-specific parameters to be passed via extra_body
             if self._is_gemini_model(model_name):
                 create_kwargs["extra_body"] = {"safety_settings": self.safety_settings}
+
+            # Anthropic and Gemini models cache only up to an explicit breakpoint
+            if self._needs_cache_breakpoint(model_name):
+                self._mark_stable_prefix(messages, system_prompt)
             
             response = await self.client.chat.completions.create(**create_kwargs)
 
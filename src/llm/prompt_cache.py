@@ -0,0 +1,158 @@
+# src/llm/prompt_cache.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Provider-side prompt caching for stable system-prompt prefixes.
+
+With PROMPT_STABLE_PREFIX, build_complete_system_prompt orders the system
+prompt from most to least stable (instructions and role prompts, stickers,
+then memories and per-turn data) and returns a SystemPrompt that records where
+the stable prefix ends. Providers use that boundary to reuse the prefix:
+- OpenAI and Grok cache repeated prefixes automatically; requests carry a
+  cache key derived from the prefix so they are routed to the same cache.
+- OpenRouter gets a cache_control breakpoint after the prefix for models
+  that need one (Anthropic, Gemini).
+- Gemini (2.5+) caches repeated prefixes implicitly. With
+  GEMINI_CONTEXT_CACHE, the prefix is also stored as explicit cached content
+  (GeminiContextCache), keyed by model and prefix hash.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import weakref
+from typing import Any
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class SystemPrompt(str):
+    """System prompt text whose first stable_prefix_len characters rarely change between turns."""
+
+    stable_prefix_len: int
+
+    def __new__(cls, text: str, stable_prefix_len: int = 0):
+        prompt = super().__new__(cls, text)
+        prompt.stable_prefix_len = max(0, min(stable_prefix_len, len(text)))
+        return prompt
+
+
+def split_system_prompt(system_prompt: str | None) -> tuple[str, str]:
+    """Return (stable prefix, rest); the prefix is empty for plain strings."""
+    text = str(system_prompt or "")
+    boundary = getattr(system_prompt, "stable_prefix_len", 0)
+    return text[:boundary], text[boundary:]
+
+
+def prompt_cache_key(prefix: str, model: str | None = None) -> str:
+    """Stable identifier for a prompt prefix (and model)."""
+    digest = hashlib.sha256()
+    if model:
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(prefix.encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class GeminiContextCache:
+    """Explicit Gemini cached contents for stable prefixes, created on first use and reused until expiry."""
+
+    # Forget entries this long before Gemini deletes them, so a request never names a dead cache
+    EXPIRY_MARGIN_SECONDS = 60.0
+
+    def __init__(self):
+        self._entries: dict[str, tuple[str, float]] = {}  # key -> (cache name, expires at)
+        self._failed: dict[str, float] = {}  # key -> do not retry before
+        self._locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.created = 0
+        self.hits = 0
+
+    def _lock_for_loop(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[loop] = lock
+        return lock
+
+    def _lookup(self, key: str, now: float) -> str | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        return None
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        for key in [k for k, retry_at in self._failed.items() if retry_at <= now]:
+            del self._failed[key]
+
+    async def get_or_create(self, client: Any, model: str, prefix: str) -> str | None:
+        """
+        Return the cached-content name for prefix on model, creating it if needed.
+
+        Returns None when the prefix is too short to cache or creation failed
+        (failures are not retried for one TTL).
+        """
+        if len(prefix) // 4 < config.GEMINI_CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        key = prompt_cache_key(prefix, model)
+        name = self._lookup(key, time.monotonic())
+        if name is not None:
+            self.hits += 1
+            return name
+        if self._failed.get(key, 0.0) > time.monotonic():
+            return None
+
+        async with self._lock_for_loop():
+            now = time.monotonic()
+            name = self._lookup(key, now)
+            if name is not None:
+                self.hits += 1
+                return name
+            ttl = config.GEMINI_CONTEXT_CACHE_TTL_SECONDS
+            try:
+                from google.genai.types import (  # pyright: ignore[reportMissingImports]
+                    CreateCachedContentConfig,
+                )
+
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config=CreateCachedContentConfig(
+                        system_instruction=prefix,
+                        ttl=f"{int(ttl)}s",
+                        display_name=f"prompt-prefix-{key[:16]}",
+                    ),
+                )
+            except Exception as e:
+                logger.info(f"Gemini context cache not created for {model} (prefix {key[:8]}): {e}")
+                self._failed[key] = now + ttl
+                return None
+            self._prune(now)
+            self._entries[key] = (cached.name, now + ttl - self.EXPIRY_MARGIN_SECONDS)
+            self.created += 1
+            logger.debug(f"Created Gemini context cache {cached.name} for prefix {key[:8]}")
+            return cached.name
+
+    def invalidate(self, name: str) -> None:
+        """Forget a cached content (e.g. after a request naming it failed)."""
+        for key in [k for k, (entry_name, _) in self._entries.items() if entry_name == name]:
+            del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "created": self.created, "hits": self.hits}
+
+
+_gemini_context_cache = GeminiContextCache()
+
+
+def get_gemini_context_cache() -> GeminiContextCache:
+    """Return the process-wide Gemini context cache registry."""
+    return _gemini_context_cache
@@ -23,6 +23,10 @@ _pricing_cache: dict[str, tuple[float, float]] = {}
 # Default pricing for unknown models (conservative estimate)
 DEFAULT_PRICING = (1.00, 3.00)  # $1 per 1M input, $3 per 1M output
 
+# Input tokens served from a provider prompt cache are billed at a discount; a quarter
+# of the input price is the common rate (Gemini, Grok) and an upper bound for OpenAI
+CACHED_INPUT_PRICE_FACTOR = 0.25
+
 
 def get_model_pricing(model_name: str) -> tuple[float, float]:
     """
@@ -63,18 +67,27 @@ def get_model_pricing(model_name: str) -> tuple[float, float]:
     return DEFAULT_PRICING
 
 
+def cached_token_count(value: Any) -> int:
+    """Return a provider's cached-token count, treating missing or non-integer values as 0."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        return 0
+    return max(value, 0)
+
+
 def calculate_cost(
     model_name: str,
     input_tokens: int,
-    output_tokens: int
+    output_tokens: int,
+    cached_input_tokens: int = 0,
 ) -> float:
     """
     Calculate the estimated cost for an LLM invocation.
     
     Args:
         model_name: The model name
-        input_tokens: Number of input tokens
+        input_tokens: Number of input tokens (including cached ones)
         output_tokens: Number of output tokens
+        cached_input_tokens: Input tokens served from the provider's prompt cache
         
     Returns:
         Estimated cost in dollars (to the hundredth of a cent, e.g., 0.0012)
@@ -82,7 +95,9 @@ def calculate_cost(
     input_price, output_price = get_model_pricing(model_name)
     
     # Calculate cost per token (price per 1M tokens)
-    input_cost = (input_tokens / 1_000_000) * input_price
+    cached_input_tokens = min(max(cached_input_tokens, 0), input_tokens)
+    billed_input_tokens = (input_tokens - cached_input_tokens) + cached_input_tokens * CACHED_INPUT_PRICE_FACTOR
+    input_cost = (billed_input_tokens / 1_000_000) * input_price
     output_cost = (output_tokens / 1_000_000) * output_price
     
     return input_cost + output_cost
@@ -97,6 +112,7 @@ def log_llm_usage(
     channel_name: Optional[str] = None,
     channel_telegram_id: Optional[int] = None,
     cost_usd: Optional[float] = None,
+    cached_input_tokens: int = 0,
 ) -> None:
     """
     Log LLM usage with token counts and estimated cost.
@@ -115,6 +131,8 @@ def log_llm_usage(
         cost_usd: Optional precise cost in USD. When provided (e.g. from Grok's
             cost_in_usd_ticks), this value is used instead of calculating cost from
             token counts and model pricing.
+        cached_input_tokens: Input tokens (included in input_tokens) that the provider
+            served from its prompt cache; billed at CACHED_INPUT_PRICE_FACTOR.
     """
     agent_name = str(getattr(agent, "name", None) or "unknown-agent")
     agent_telegram_id = getattr(agent, "agent_id", None)
@@ -127,7 +145,7 @@ def log_llm_usage(
     if cost_usd is not None:
         cost = cost_usd
     else:
-        cost = calculate_cost(model_name, input_tokens, output_tokens)
+        cost = calculate_cost(model_name, input_tokens, output_tokens, cached_input_tokens)
     
     # Format cost to the hundredth of a cent (4 decimal places)
     cost_str = f"${cost:.4f}"
@@ -139,6 +157,8 @@ def log_llm_usage(
         f"output_tokens={output_tokens}",
         f"cost={cost_str}",
     ]
+    if cached_input_tokens:
+        parts.insert(2, f"cached_input_tokens={cached_input_tokens}")
     
     if operation:
         parts.insert(0, f"operation={operation}")
@@ -150,18 +170,19 @@ def log_llm_usage(
     # Persist to task execution logs when attribution context is available.
     if agent_telegram_id is not None:
         try:
-            from db.task_log import log_task_execution
+            from db.task_log import enqueue_task_execution
 
             action_details = json.dumps(
                 {
                     "operation": operation,
                     "model_name": model_name,
                     "input_tokens": input_tokens,
+                    "cached_input_tokens": cached_input_tokens,
                     "output_tokens": output_tokens,
                     "cost": cost,
                 }
             )
-            log_task_execution(
+            enqueue_task_execution(
                 agent_telegram_id=agent_telegram_id,
                 channel_telegram_id=channel_telegram_id or agent_telegram_id,
                 action_kind="llm_usage",
@@ -0,0 +1,321 @@
+# src/media/media_catalog.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Per-agent catalog of sendable stickers and media with their descriptions.
+
+The system prompt lists every configured sticker with its description, and
+file:media.json lists every media item in Saved Messages. Both used to sort the
+agent's dicts, check sendability and look up each description on every prompt,
+although the result only changes when the sticker/media caches are refreshed
+or a description is written.
+
+AgentMediaCatalog keeps one entry per sticker key and media ID and renders the
+sticker section and media list once per change. On each request it only:
+- diffs agent.stickers / agent.media when the agent caches were marked changed
+  (mark_media_catalog_changed) or the dicts were replaced,
+- re-resolves entries whose unique_id was invalidated in the media record cache
+  since the last request (description edits, newly generated descriptions), and
+- retries entries that do not have a final description yet.
+Entries that are no longer looked up still count as used: each request touches
+their last_used_at through the coalescing tracker, so unused-media cleanup
+never removes configured stickers and media. When nothing changed, building
+the sticker section is that touch plus a few attribute reads.
+"""
+
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+from telegram_media import get_unique_id
+
+from .media_record_cache import get_media_record_cache
+from .sources import MediaStatus, PrefetchedMediaSource
+
+logger = logging.getLogger(__name__)
+
+
+def is_sticker_sendable(doc) -> bool:
+    """
+    Test if a sticker can be sent by checking for premium requirements.
+
+    According to Telegram API documentation, premium stickers are identified by
+    the presence of a videoSize of type=f in the sticker's main document.
+
+    Returns:
+        True if sticker can be sent, False if it requires premium
+    """
+    try:
+        # Check for premium indicator: videoSize with type=f
+        video_thumbs = getattr(doc, "video_thumbs", None)
+        if video_thumbs:
+            for video_size in video_thumbs:
+                video_type = getattr(video_size, "type", None)
+                if video_type == "f":
+                    return False
+
+        # No premium indicators found
+        return True
+
+    except Exception as e:
+        logger.exception(f"Error checking sticker sendability: {e}")
+        return True
+
+
+@dataclass
+class CatalogEntry:
+    """One sticker or media item and what is known about its description."""
+
+    doc: Any
+    unique_id: str | None
+    description: str | None = None
+    kind: str | None = None
+    # True once the chain gave a final answer (description or permanent failure)
+    resolved: bool = False
+    sendable: bool = True
+
+
+def _is_final(record: dict[str, Any] | None) -> bool:
+    if not record:
+        return False
+    if record.get("description"):
+        return True
+    return not MediaStatus.is_temporary_failure(record.get("status"))
+
+
+class _Section:
+    """Entries for one agent dict (stickers or media) plus change tracking."""
+
+    def __init__(self):
+        self.entries: dict[Any, CatalogEntry] = {}
+        self.source_id: int | None = None
+        self.source_len = -1
+        self.synced_version = -1
+        self.dirty = True
+
+    def needs_diff(self, source: dict, version: int) -> bool:
+        return (
+            id(source) != self.source_id
+            or len(source) != self.source_len
+            or version != self.synced_version
+        )
+
+    def diff(self, source: dict, version: int, make_entry) -> None:
+        """Add, replace or drop entries so they match source (by key and unique_id)."""
+        for key in [k for k in self.entries if k not in source]:
+            del self.entries[key]
+            self.dirty = True
+        for key, doc in source.items():
+            entry = self.entries.get(key)
+            if entry is not None and entry.doc is doc:
+                continue
+            new_entry = make_entry(key, doc)
+            if entry is not None and entry.unique_id == new_entry.unique_id and entry.resolved:
+                # Same media under a refreshed document object: keep its description
+                new_entry.description = entry.description
+                new_entry.kind = entry.kind
+                new_entry.resolved = True
+            self.entries[key] = new_entry
+            self.dirty = True
+        self.source_id = id(source)
+        self.source_len = len(source)
+        self.synced_version = version
+
+    def invalidate(self, unique_ids: set[str] | None) -> None:
+        """Mark entries for changed unique_ids (None: all) for re-resolution."""
+        for entry in self.entries.values():
+            if unique_ids is None or entry.unique_id in unique_ids:
+                entry.resolved = False
+
+    def pending(self) -> list[tuple[Any, CatalogEntry]]:
+        return [
+            (key, entry)
+            for key, entry in self.entries.items()
+            if entry.sendable and entry.unique_id and not entry.resolved
+        ]
+
+    def resolved_unique_ids(self) -> list[str]:
+        return [
+            entry.unique_id
+            for entry in self.entries.values()
+            if entry.sendable and entry.unique_id and entry.resolved
+        ]
+
+
+class AgentMediaCatalog:
+    """Sticker section and media list for one agent, rebuilt incrementally."""
+
+    def __init__(self):
+        self.version = 0  # bumped by mark_media_catalog_changed
+        self._stickers = _Section()
+        self._media = _Section()
+        self._filter_premium: bool | None = None
+        self._record_generation = get_media_record_cache().generation
+        self._sticker_lines: list[str] | None = None
+        self._media_items: list[dict] | None = None
+
+    def _apply_record_invalidations(self) -> None:
+        record_cache = get_media_record_cache()
+        changed = record_cache.changed_since(self._record_generation)
+        self._record_generation = record_cache.generation
+        if changed == set():
+            return
+        self._stickers.invalidate(changed)
+        self._media.invalidate(changed)
+
+    @staticmethod
+    def _touch_last_used(unique_ids: list[str]) -> None:
+        """Mark resolved entries used; pending ones are touched by their chain lookup."""
+        if not unique_ids:
+            return
+        try:
+            from db import media_metadata
+
+            media_metadata.touch_media_last_used(unique_ids)
+        except Exception as e:
+            logger.debug(f"Failed to touch last_used_at for media catalog entries: {e}")
+
+    async def _resolve(self, section: _Section, pending, media_chain, agent, lookup_args) -> None:
+        """Look up descriptions for pending entries with one batch plus per-item gets."""
+        chain = await PrefetchedMediaSource.prefetch(
+            media_chain,
+            [entry.unique_id for _, entry in pending],
+            agent=agent,
+            update_last_used=True,
+        )
+        for key, entry in pending:
+            try:
+                record = await chain.get(
+                    unique_id=entry.unique_id,
+                    agent=agent,
+                    doc=entry.doc,
+                    update_last_used=True,
+                    **lookup_args(key),
+                )
+            except Exception as e:
+                logger.exception(f"Failed to look up media catalog entry {key}: {e}")
+                record = None
+            description = record.get("description") if record else None
+            kind = record.get("kind") if record else None
+            if (description, kind) != (entry.description, entry.kind):
+                section.dirty = True
+            entry.description = description
+            entry.kind = kind
+            entry.resolved = _is_final(record)
+
+    async def sticker_lines(self, agent, media_chain) -> list[str]:
+        """Return the '- set :: name - description' lines for the agent's sendable stickers."""
+        stickers = agent.stickers
+        filter_premium = getattr(agent, "filter_premium_stickers", True)
+        section = self._stickers
+        if filter_premium != self._filter_premium:
+            # Sendability depends on the agent's premium status: recheck every sticker
+            section.entries.clear()
+            section.synced_version = -1
+            self._filter_premium = filter_premium
+
+        def make_entry(key, doc):
+            set_short, name = key
+            entry = CatalogEntry(doc=doc, unique_id=None)
+            try:
+                if doc:
+                    # Check if sticker is sendable (not premium) if filtering is enabled
+                    if filter_premium and not is_sticker_sendable(doc):
+                        entry.sendable = False
+                        return entry
+                    entry.unique_id = get_unique_id(doc)
+            except Exception as e:
+                logger.exception(f"Failed to process sticker {set_short}::{name}: {e}")
+            if not entry.unique_id:
+                entry.resolved = True
+            return entry
+
+        if section.needs_diff(stickers, self.version):
+            section.diff(stickers, self.version, make_entry)
+        self._apply_record_invalidations()
+
+        self._touch_last_used(section.resolved_unique_ids())
+        pending = section.pending()
+        if pending:
+            await self._resolve(
+                section,
+                pending,
+                media_chain,
+                agent,
+                lambda key: {"kind": "sticker", "sticker_set_name": key[0], "sticker_name": key[1]},
+            )
+
+        if section.dirty or self._sticker_lines is None:
+            lines = []
+            filtered_count = 0
+            for (set_short, name), entry in sorted(section.entries.items(), key=lambda item: item[0]):
+                if not entry.sendable:
+                    filtered_count += 1
+                    continue
+                if entry.description:
+                    lines.append(f"- {set_short} :: {name} - {entry.description}")
+                else:
+                    lines.append(f"- {set_short} :: {name}")
+            if filtered_count > 0:
+                logger.debug(f"Filtered out {filtered_count} premium stickers")
+            self._sticker_lines = lines
+            section.dirty = False
+        return self._sticker_lines
+
+    async def media_items(self, agent, media_chain) -> list[dict]:
+        """Return media.json items (media_id, media_type, description) for the agent's media."""
+        media_cache = getattr(agent, "media", None) or getattr(agent, "photos", {})
+        section = self._media
+
+        def make_entry(media_id, media_obj):
+            try:
+                unique_id = get_unique_id(media_obj)
+            except Exception:
+                unique_id = None
+            return CatalogEntry(doc=media_obj, unique_id=unique_id or media_id)
+
+        if section.needs_diff(media_cache, self.version):
+            section.diff(media_cache, self.version, make_entry)
+        self._apply_record_invalidations()
+
+        self._touch_last_used(section.resolved_unique_ids())
+        pending = section.pending()
+        if pending:
+            await self._resolve(section, pending, media_chain, agent, lambda key: {"kind": None})
+
+        if section.dirty or self._media_items is None:
+            items = []
+            for media_id in sorted(section.entries):
+                entry = section.entries[media_id]
+                item: dict = {
+                    "media_id": media_id,
+                    "media_type": entry.kind or "document",
+                }
+                if entry.description is not None:
+                    item["description"] = entry.description
+                items.append(item)
+            self._media_items = items
+            section.dirty = False
+        return [dict(item) for item in self._media_items]
+
+
+_catalogs: "weakref.WeakKeyDictionary[object, AgentMediaCatalog]" = weakref.WeakKeyDictionary()
+
+
+def get_media_catalog(agent) -> AgentMediaCatalog:
+    """Return the agent's media catalog, creating it on first use."""
+    catalog = _catalogs.get(agent)
+    if catalog is None:
+        catalog = AgentMediaCatalog()
+        _catalogs[agent] = catalog
+    return catalog
+
+
+def mark_media_catalog_changed(agent) -> None:
+    """Tell the agent's catalog that agent.stickers or agent.media may have changed."""
+    catalog = _catalogs.get(agent)
+    if catalog is not None:
+        catalog.version += 1
@@ -3,7 +3,9 @@
 # Copyright (c) 2025-2026 Cindy's World LLC and contributors
 # Licensed under the MIT License. See LICENSE.md for details.
 #
+import asyncio
 import logging
+import weakref
 from collections.abc import Sequence
 from datetime import UTC
 from typing import Any
@@ -12,6 +14,7 @@ from telethon.errors.rpcerrorlist import StickersetInvalidError
 from telethon.tl.functions.messages import GetStickerSetRequest
 from telethon.tl.types import InputStickerSetID
 
+from config import MEDIA_DESCRIBE_CONCURRENCY
 from llm.base import MsgPart
 from telegram_media import get_unique_id, iter_media_parts
 from utils.telegram import get_channel_name  # for sender/channel names
@@ -22,7 +25,9 @@ from .media_format import (
     format_media_sentence,
     format_sticker_sentence,
 )
+from .media_budget import get_remaining_description_budget
 from .media_source import get_default_media_source_chain
+from .sources import MediaStatus
 
 logger = logging.getLogger(__name__)
 
@@ -304,19 +309,44 @@ async def _resolve_sender_and_channel(
 # ---------- main ----------
 
 
+def collect_media_unique_ids(messages: Sequence[Any]) -> list[str]:
+    """Return the unique IDs of all media items in messages, in first-seen order."""
+    unique_ids: dict[str, None] = {}
+    try:
+        for msg in messages:
+            try:
+                items = iter_media_parts(msg) or []
+            except Exception:
+                continue
+            for it in items:
+                if it.unique_id:
+                    unique_ids[it.unique_id] = None
+    except TypeError:
+        pass
+    return list(unique_ids)
+
+
 async def inject_media_descriptions(
-    messages: Sequence[Any], agent: Any | None = None, peer_id: int | None = None
+    messages: Sequence[Any],
+    agent: Any | None = None,
+    peer_id: int | None = None,
+    media_chain=None,
 ) -> Sequence[Any]:
     """
     Process media items in messages using the media source chain.
 
     This function processes all media items in the given messages and ensures
     they have descriptions cached using the media source chain architecture.
+    Items run concurrently, at most MEDIA_DESCRIBE_CONCURRENCY at a time across
+    the process, so several uncached items cost about one describe latency.
+    Each unique_id is processed once per call.
 
     Args:
         messages: Sequence of Telethon messages to process
         agent: Agent instance
         peer_id: Telegram peer ID (user_id for DMs, channel_id for groups)
+        media_chain: Media source chain to use (e.g. a PrefetchedMediaSource for
+                    these messages). If None, uses the default global chain.
 
     Returns the messages unchanged. Prompt creation happens where the cache is read.
     """
@@ -325,7 +355,8 @@ async def inject_media_descriptions(
 
     # Get the global media source chain
     # This includes: global curated -> AI cache -> budget -> AI gen
-    media_chain = get_default_media_source_chain()
+    if media_chain is None:
+        media_chain = get_default_media_source_chain()
 
     client = getattr(agent, "client", None)
     llm = getattr(agent, "llm", None)
@@ -333,9 +364,11 @@ async def inject_media_descriptions(
     if not client or not llm:
         return messages
 
+    # Collect media items in the order received (newest→oldest from get_messages);
+    # the first occurrence of a unique_id is the one that gets processed
+    jobs: list[tuple[Any, Any]] = []
+    seen_ids: set[str] = set()
     try:
-        # Process messages in order received (newest→oldest from get_messages)
-        # This prioritizes recent message media for budget consumption
         for msg in messages:
             try:
                 items = iter_media_parts(msg)
@@ -350,91 +383,145 @@ async def inject_media_descriptions(
                 if not getattr(it, "file_ref", None):
                     logger.debug(f"media: no file_ref for {it.unique_id}")
                     continue
-
-                # Process using the media source chain
-                try:
-                    # Get sticker metadata if applicable (for both regular and animated stickers)
-                    sticker_set_name = None
-                    sticker_set_title = None
-                    sticker_name = None
-                    if it.is_sticker():
-                        sticker_set_name, sticker_set_title = await _maybe_get_sticker_set_metadata(
-                            agent, it
-                        )
-                        # Fallback to MediaItem values from iter_media_parts (document attributes)
-                        # when API resolution fails - e.g. InputStickerSetShortName has short_name
-                        # on the attribute, but GetStickerSetRequest might fail
-                        if not sticker_set_name:
-                            sticker_set_name = getattr(it, "sticker_set_name", None)
-                        if not sticker_set_title:
-                            sticker_set_title = getattr(it, "sticker_set_title", None)
-                        sticker_name = getattr(it, "sticker_name", None)
-
-                    # Get provenance metadata
-                    media_ts = None
-                    if getattr(msg, "date", None):
-                        try:
-                            media_ts = msg.date.astimezone(UTC).isoformat()
-                        except Exception:
-                            media_ts = None
-                    (
-                        sender_id,
-                        sender_name,
-                        chan_id,
-                        chan_name,
-                    ) = await _resolve_sender_and_channel(agent, msg)
-
-                    # Use peer_id as fallback when message doesn't have chat_id/peer_id
-                    # (e.g. StoryMessageWrapper for channel stories). Ensures LLM usage
-                    # for media description is charged to the channel where content appears.
-                    if chan_id is None and peer_id is not None:
-                        chan_id = peer_id
-                        if chan_name is None:
-                            chan_name = await get_channel_name(agent, chan_id)
-
-                    # Process using the media source chain
-                    # The chain handles: cache lookup, budget, AI generation, disk caching
-                    record = await media_chain.get(
-                        unique_id=it.unique_id,
-                        agent=agent,
-                        doc=it.file_ref,
-                        kind=(
-                            it.kind.value if hasattr(it.kind, "value") else str(it.kind)
-                        ),
-                        mime_type=it.mime,
-                        sticker_set_name=sticker_set_name,
-                        sticker_set_title=sticker_set_title,
-                        sticker_name=sticker_name,
-                        sender_id=sender_id,
-                        sender_name=sender_name,
-                        channel_id=chan_id,
-                        channel_name=chan_name,
-                        media_ts=media_ts,
-                        duration=getattr(it, "duration", None),
-                        update_last_used=True,
-                    )
-
-                    if record:
-                        desc = record.get("description")
-                        status = record.get("status")
-                        if desc:
-                            logger.debug(f"media: got description for {it.unique_id}")
-                        else:
-                            logger.debug(
-                                f"media: no description for {it.unique_id} (status={status})"
-                            )
-
-                except Exception as e:
-                    logger.exception(
-                        f"media: processing failed for {it.unique_id}: {e}"
-                    )
-
+                if it.unique_id in seen_ids:
+                    continue
+                seen_ids.add(it.unique_id)
+                jobs.append((msg, it))
     except TypeError:
         logger.debug("media: injector got non-iterable history chunk; passing through")
+        return messages
+
+    if not jobs:
+        return messages
+
+    # Items without a usable cached record go through budget/AI generation. The
+    # newest of them are described first so they get the remaining per-tick
+    # budget; older ones follow once those have claimed it (and then get
+    # budget-exhausted records, as when processed one at a time).
+    try:
+        cached = await media_chain.get_many([it.unique_id for _, it in jobs], agent=agent)
+    except Exception as e:
+        logger.debug(f"media: batch cache probe failed: {e}")
+        cached = {}
+    uncached = [
+        job
+        for job in jobs
+        if job[1].unique_id not in cached
+        or MediaStatus.is_temporary_failure(cached[job[1].unique_id].get("status"))
+    ]
+    budget = get_remaining_description_budget()
+    uncached_ids = {id(job) for job in uncached}
+    first_wave = [job for job in jobs if id(job) not in uncached_ids] + uncached[:budget]
+    second_wave = uncached[budget:]
+
+    semaphore = _describe_semaphore()
+
+    async def _run(job):
+        async with semaphore:
+            await _describe_media_item(media_chain, agent, peer_id, *job)
+
+    for wave in (first_wave, second_wave):
+        if wave:
+            await asyncio.gather(*(_run(job) for job in wave))
 
     return messages
 
 
+def _describe_semaphore() -> asyncio.Semaphore:
+    """Process-wide bound on concurrent media describes (one semaphore per event loop)."""
+    loop = asyncio.get_running_loop()
+    semaphore = _describe_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MEDIA_DESCRIBE_CONCURRENCY)
+        _describe_semaphores[loop] = semaphore
+    return semaphore
+
+
+_describe_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _describe_media_item(media_chain, agent, peer_id, msg, it) -> None:
+    """Run one media item through the chain (cache lookup, budget, download, AI description)."""
+    try:
+        # Get sticker metadata if applicable (for both regular and animated stickers)
+        sticker_set_name = None
+        sticker_set_title = None
+        sticker_name = None
+        if it.is_sticker():
+            sticker_set_name, sticker_set_title = await _maybe_get_sticker_set_metadata(
+                agent, it
+            )
+            # Fallback to MediaItem values from iter_media_parts (document attributes)
+            # when API resolution fails - e.g. InputStickerSetShortName has short_name
+            # on the attribute, but GetStickerSetRequest might fail
+            if not sticker_set_name:
+                sticker_set_name = getattr(it, "sticker_set_name", None)
+            if not sticker_set_title:
+                sticker_set_title = getattr(it, "sticker_set_title", None)
+            sticker_name = getattr(it, "sticker_name", None)
+
+        # Get provenance metadata
+        media_ts = None
+        if getattr(msg, "date", None):
+            try:
+                media_ts = msg.date.astimezone(UTC).isoformat()
+            except Exception:
+                media_ts = None
+        (
+            sender_id,
+            sender_name,
+            chan_id,
+            chan_name,
+        ) = await _resolve_sender_and_channel(agent, msg)
+
+        # Use peer_id as fallback when message doesn't have chat_id/peer_id
+        # (e.g. StoryMessageWrapper for channel stories). Ensures LLM usage
+        # for media description is charged to the channel where content appears.
+        if chan_id is None and peer_id is not None:
+            chan_id = peer_id
+            if chan_name is None:
+                chan_name = await get_channel_name(agent, chan_id)
+
+        # Process using the media source chain
+        # The chain handles: cache lookup, budget, AI generation, disk caching
+        record = await media_chain.get(
+            unique_id=it.unique_id,
+            agent=agent,
+            doc=it.file_ref,
+            kind=(
+                it.kind.value if hasattr(it.kind, "value") else str(it.kind)
+            ),
+            mime_type=it.mime,
+            sticker_set_name=sticker_set_name,
+            sticker_set_title=sticker_set_title,
+            sticker_name=sticker_name,
+            sender_id=sender_id,
+            sender_name=sender_name,
+            channel_id=chan_id,
+            channel_name=chan_name,
+            media_ts=media_ts,
+            duration=getattr(it, "duration", None),
+            update_last_used=True,
+        )
+
+        if record:
+            desc = record.get("description")
+            status = record.get("status")
+            if desc:
+                logger.debug(f"media: got description for {it.unique_id}")
+            else:
+                logger.debug(
+                    f"media: no description for {it.unique_id} (status={status})"
+                )
+
+    except Exception as e:
+        logger.exception(
+            f"media: processing failed for {it.unique_id}: {e}"
+        )
+
+
 async def format_message_for_prompt(
     msg: Any, *, agent, media_chain=None
 ) -> list[MsgPart]:
@@ -0,0 +1,242 @@
+# src/media/media_record_cache.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+In-process LRU+TTL cache of MySQL media records and media-file existence.
+
+Media metadata rows almost never change after they are written, yet every
+prompt looks up the same stickers and history media again. MySQLMediaSource
+answers from this cache before querying MySQL, and cached_media_file_exists
+remembers which records have their media file on disk so a hit does not stat
+or glob state/media each time.
+
+Writes through the db layer (save_media_metadata, delete_media_metadata,
+update_sticker_set_metadata) and MediaService.delete_media_files invalidate the
+affected entries, which covers the agent server and the admin console running
+in the same process. Writes by other processes (scripts) become visible when an
+entry's TTL expires.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+from config import MEDIA_RECORD_CACHE_MAX_ENTRIES, MEDIA_RECORD_CACHE_TTL_SECONDS
+
+# Recent invalidations kept for changed_since(); older readers rebuild everything
+_CHANGE_LOG_SIZE = 4096
+
+
+def _estimate_record_bytes(record: dict[str, Any]) -> int:
+    """Rough memory footprint of a flat media record (dict plus keys and values)."""
+    size = sys.getsizeof(record)
+    for key, value in record.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class MediaRecordCache:
+    """
+    Bounded LRU of media records and positive file-existence results.
+
+    Entries expire ttl_seconds after they were stored. Only positive
+    file-existence results are kept: a missing file is usually downloaded
+    moments later, so a cached "missing" answer would mostly be wrong.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MEDIA_RECORD_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = MEDIA_RECORD_CACHE_TTL_SECONDS,
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        # unique_id -> (expires_at, record, estimated bytes)
+        self._records: OrderedDict[str, tuple[float, dict[str, Any], int]] = OrderedDict()
+        # (directory, unique_id, media_file) -> expires_at
+        self._files: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+        self._record_bytes = 0
+        self.record_hits = 0
+        self.record_misses = 0
+        self.file_hits = 0
+        self.file_misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped on every invalidation so derived caches (sticker catalogs) can catch up
+        self.generation = 0
+        self._change_log: deque[tuple[int, str]] = deque(maxlen=_CHANGE_LOG_SIZE)
+        self._cleared_generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl > 0
+
+    def _drop_record_locked(self, unique_id: str) -> None:
+        entry = self._records.pop(unique_id, None)
+        if entry is not None:
+            self._record_bytes -= entry[2]
+
+    def get_record(self, unique_id: str) -> dict[str, Any] | None:
+        """Return a copy of the cached record, or None on a miss or expiry."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._records.get(unique_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._drop_record_locked(unique_id)
+                self.record_misses += 1
+                return None
+            self._records.move_to_end(unique_id)
+            self.record_hits += 1
+            return entry[1].copy()
+
+    def get_records(self, unique_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Return copies of the cached records among unique_ids."""
+        records = {}
+        for unique_id in unique_ids:
+            if unique_id in records:
+                continue
+            record = self.get_record(unique_id)
+            if record is not None:
+                records[unique_id] = record
+        return records
+
+    def put_record(self, unique_id: str, record: dict[str, Any], loaded_at_generation: int | None = None) -> None:
+        """
+        Store a copy of a record loaded from MySQL.
+
+        Pass the generation read before the load: if unique_id was invalidated
+        (or the cache cleared) since, the record may predate that write and is
+        not stored.
+        """
+        if not self.enabled or not unique_id:
+            return
+        stored = record.copy()
+        size = _estimate_record_bytes(stored)
+        with self._lock:
+            if loaded_at_generation is not None:
+                changed = self._changed_since_locked(loaded_at_generation)
+                if changed is None or unique_id in changed:
+                    return
+            self._drop_record_locked(unique_id)
+            self._records[unique_id] = (time.monotonic() + self._ttl, stored, size)
+            self._record_bytes += size
+            while len(self._records) > self._max_entries:
+                _, entry = self._records.popitem(last=False)
+                self._record_bytes -= entry[2]
+                self.evictions += 1
+
+    def file_exists(self, directory: str, unique_id: str, media_file: str) -> bool:
+        """Return True if a media file was recently confirmed on disk for this record."""
+        if not self.enabled:
+            return False
+        key = (directory, unique_id, media_file)
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._files.get(key)
+            if expires_at is None or expires_at <= now:
+                if expires_at is not None:
+                    del self._files[key]
+                self.file_misses += 1
+                return False
+            self._files.move_to_end(key)
+            self.file_hits += 1
+            return True
+
+    def remember_file_exists(self, directory: str, unique_id: str, media_file: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (directory, unique_id, media_file)
+            self._files[key] = time.monotonic() + self._ttl
+            self._files.move_to_end(key)
+            while len(self._files) > self._max_entries:
+                self._files.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, unique_id: str) -> None:
+        """Drop the record and file-existence entries for one unique_id."""
+        with self._lock:
+            self._drop_record_locked(unique_id)
+            for key in [k for k in self._files if k[1] == unique_id]:
+                del self._files[key]
+            self.invalidations += 1
+            self.generation += 1
+            self._change_log.append((self.generation, unique_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._files.clear()
+            self._record_bytes = 0
+            self.invalidations += 1
+            self.generation += 1
+            self._cleared_generation = self.generation
+
+    def changed_since(self, generation: int) -> set[str] | None:
+        """
+        Return unique_ids invalidated after generation, or None if that is no
+        longer known (cache cleared or change log overflowed).
+        """
+        with self._lock:
+            return self._changed_since_locked(generation)
+
+    def _changed_since_locked(self, generation: int) -> set[str] | None:
+        if generation >= self.generation:
+            return set()
+        if generation < self._cleared_generation:
+            return None
+        if not self._change_log or self._change_log[0][0] > generation + 1:
+            return None
+        return {uid for gen, uid in self._change_log if gen > generation}
+
+    def metrics(self) -> dict[str, float | int]:
+        """Return hit rates, sizes and estimated memory use."""
+        with self._lock:
+            record_lookups = self.record_hits + self.record_misses
+            file_lookups = self.file_hits + self.file_misses
+            return {
+                "records": len(self._records),
+                "files": len(self._files),
+                "record_bytes": self._record_bytes,
+                "bytes": self._record_bytes
+                + sys.getsizeof(self._records)
+                + sys.getsizeof(self._files),
+                "record_hits": self.record_hits,
+                "record_misses": self.record_misses,
+                "record_hit_rate": self.record_hits / record_lookups if record_lookups else 0.0,
+                "file_hits": self.file_hits,
+                "file_misses": self.file_misses,
+                "file_hit_rate": self.file_hits / file_lookups if file_lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache = MediaRecordCache()
+
+
+def get_media_record_cache() -> MediaRecordCache:
+    """Return the process-wide media record cache."""
+    return _cache
+
+
+def invalidate_media_record(unique_id: str) -> None:
+    """Forget cached state for a media item after its metadata or files change."""
+    _cache.invalidate(unique_id)
+
+
+def clear_media_record_cache() -> None:
+    """Forget all cached media state (bulk updates such as sticker set renames)."""
+    _cache.clear()
+
+
+def get_media_record_cache_metrics() -> dict[str, float | int]:
+    return _cache.metrics()
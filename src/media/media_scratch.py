@@ -6,6 +6,7 @@
 import logging
 import os
 import shutil
+import uuid
 from pathlib import Path
 
 from config import MEDIA_SCRATCH_DIRECTORY
@@ -31,14 +32,32 @@ def init_media_scratch():
     except Exception as e:
         logger.error(f"Failed to initialize media scratch directory: {e}")
 
+def _scratch_directory() -> Path:
+    scratch_dir = Path(MEDIA_SCRATCH_DIRECTORY)
+    if not scratch_dir.exists():
+        scratch_dir.mkdir(parents=True, exist_ok=True)
+    return scratch_dir
+
+
 def get_scratch_file(filename: str) -> Path:
     """
     Get a path for a file in the scratch directory.
     Ensures the scratch directory exists.
     """
-    scratch_dir = Path(MEDIA_SCRATCH_DIRECTORY)
-    if not scratch_dir.exists():
-        scratch_dir.mkdir(parents=True, exist_ok=True)
-    
-    return scratch_dir / filename
+    return _scratch_directory() / filename
+
+
+def get_media_download_path(unique_id: str) -> Path:
+    """
+    Get the shared scratch path that AIChainMediaSource streams media for unique_id to.
+    Only the chain's single-flight generation uses it; the chain removes it when done.
+    """
+    return _scratch_directory() / f"{unique_id}.download"
+
 
+def new_media_download_path(unique_id: str) -> Path:
+    """
+    Get a scratch path for media for unique_id that no other call uses.
+    The caller owns the file and must remove it.
+    """
+    return _scratch_directory() / f"{unique_id}.{uuid.uuid4().hex}.download"
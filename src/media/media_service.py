@@ -23,6 +23,7 @@ from typing import Any
 
 from media.state_path import is_state_media_directory
 from media.file_resolver import find_media_file
+from media.media_record_cache import invalidate_media_record
 from media.media_sources import get_directory_media_source
 
 logger = logging.getLogger(__name__)
@@ -115,6 +116,7 @@ class MediaService:
                 p.unlink(missing_ok=True)
             except Exception as e:
                 logger.debug("Failed to delete media file %s: %s", p, e)
+        invalidate_media_record(unique_id)
 
     def list_unique_ids(
         self,
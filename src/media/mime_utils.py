@@ -39,7 +39,11 @@ def detect_mime_type_from_bytes(data: bytes) -> str:
     """
     Detect MIME type from file bytes.
     Returns the most appropriate MIME type based on file signatures.
+    Accepts any bytes-like object (e.g. a memory-mapped media file).
     """
+    # Every signature below lies within the first 16 bytes
+    data = bytes(data[:16])
+
     # Image formats
     if data.startswith(b"\x89PNG\r\n\x1a\n"):  # PNG (strict check)
         return "image/png"
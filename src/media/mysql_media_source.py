@@ -12,6 +12,7 @@ import logging
 from pathlib import Path
 from typing import Any
 
+from media.media_record_cache import get_media_record_cache
 from media.sources.base import MediaSource
 
 logger = logging.getLogger(__name__)
@@ -47,7 +48,8 @@ class MySQLMediaSource(MediaSource):
         **metadata,
     ) -> dict[str, Any] | None:
         """
-        Retrieve a media description record from MySQL by its unique ID.
+        Retrieve a media description record by its unique ID, from the
+        in-process record cache or MySQL.
         
         Args:
             unique_id: The Telegram file unique ID
@@ -63,17 +65,58 @@ class MySQLMediaSource(MediaSource):
         """
         try:
             from db import media_metadata
-            record = media_metadata.load_media_metadata(unique_id)
+            from db.aio import run_db
+            record_cache = get_media_record_cache()
+            record = record_cache.get_record(unique_id)
+            if record is None:
+                # An invalidation during the load means the row may be stale; don't cache it
+                generation = record_cache.generation
+                record = await run_db(media_metadata.load_media_metadata, unique_id)
+                if record:
+                    record_cache.put_record(unique_id, record, loaded_at_generation=generation)
             if record:
                 logger.debug(f"MySQLMediaSource: cache hit for {unique_id}")
                 if metadata.get("update_last_used"):
-                    media_metadata.update_media_last_used(unique_id)
+                    media_metadata.touch_media_last_used(unique_id)
                 return record
         except Exception as e:
             logger.debug(f"MySQLMediaSource: error loading {unique_id}: {e}")
         
         return None
 
+    async def get_many(
+        self,
+        unique_ids: list[str],
+        agent: Any = None,
+        **metadata,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Retrieve several media records, querying MySQL once (IN (...)) for the
+        IDs not in the in-process record cache.
+
+        When metadata has update_last_used, all hits are touched in the
+        last-used tracker.
+        """
+        try:
+            from db import media_metadata
+            from db.aio import run_db
+            record_cache = get_media_record_cache()
+            records = record_cache.get_records(unique_ids)
+            missing = [uid for uid in dict.fromkeys(unique_ids) if uid not in records]
+            if missing:
+                generation = record_cache.generation
+                loaded = await run_db(media_metadata.load_media_metadata_many, missing)
+                for uid, record in loaded.items():
+                    record_cache.put_record(uid, record, loaded_at_generation=generation)
+                records.update(loaded)
+            if records and metadata.get("update_last_used"):
+                media_metadata.touch_media_last_used(list(records))
+            logger.debug(f"MySQLMediaSource: batch lookup hit {len(records)} of {len(unique_ids)}")
+            return records
+        except Exception as e:
+            logger.debug(f"MySQLMediaSource: error loading batch of {len(unique_ids)}: {e}")
+            return {}
+
     async def put(
         self,
         unique_id: str,
@@ -153,6 +196,7 @@ class MySQLMediaSource(MediaSource):
         # Store metadata in MySQL
         try:
             from db import media_metadata
+            from db.aio import run_db
             
             # Filter record to only include core/media-specific fields
             filtered_record = self._filter_core_fields(record)
@@ -162,7 +206,7 @@ class MySQLMediaSource(MediaSource):
             if media_filename:
                 filtered_record["media_file"] = media_filename
             
-            media_metadata.save_media_metadata(filtered_record)
+            await run_db(media_metadata.save_media_metadata, filtered_record)
             logger.debug(f"MySQLMediaSource: cached {unique_id} to MySQL")
         except Exception as e:
             logger.error(f"MySQLMediaSource: failed to cache {unique_id} to MySQL: {e}")
@@ -0,0 +1,109 @@
+# src/media/single_flight.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Process-wide single-flight for media description generation.
+
+The same sticker, GIF or forwarded photo often arrives in several
+conversations (or for several agents) at once. Each received task misses the
+cache and would download the media, convert TGS and pay for an LLM describe
+call. AIChainMediaSource runs its generation step through media_single_flight:
+the first caller for a unique_id does the work, and concurrent callers for the
+same unique_id wait for it and share the record it stored.
+"""
+
+import asyncio
+import logging
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class MediaSingleFlight:
+    """Runs at most one generation per unique_id at a time on each event loop."""
+
+    def __init__(self):
+        self._flights: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Future]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.leaders = 0
+        self.shared = 0
+        self.llm_calls_saved = 0
+
+    def _flights_for_loop(self) -> dict[str, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        flights = self._flights.get(loop)
+        if flights is None:
+            flights = {}
+            self._flights[loop] = flights
+        return flights
+
+    async def run(
+        self,
+        unique_id: str,
+        generate: Callable[[], Awaitable[dict[str, Any] | None]],
+    ) -> dict[str, Any] | None:
+        """
+        Return generate()'s record, or the record of a generation already in
+        flight for unique_id. Followers get a copy; if the leader was cancelled,
+        a follower runs the generation itself.
+        """
+        # Imported here: media.sources imports this module through ai_chain
+        from .sources.base import MediaStatus
+
+        flights = self._flights_for_loop()
+        while (flight := flights.get(unique_id)) is not None:
+            try:
+                record = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if flight.cancelled():
+                    continue
+                raise
+            self.shared += 1
+            if record and record.get("status") == MediaStatus.GENERATED.value:
+                self.llm_calls_saved += 1
+            logger.debug(f"MediaSingleFlight: shared in-flight generation for {unique_id}")
+            return record.copy() if record else record
+
+        flight = asyncio.get_running_loop().create_future()
+        flights[unique_id] = flight
+        self.leaders += 1
+        try:
+            record = await generate()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # Mark retrieved so an unawaited flight does not log "exception never retrieved"
+            flight.exception()
+            raise
+        else:
+            flight.set_result(record.copy() if record else record)
+            return record
+        finally:
+            if flights.get(unique_id) is flight:
+                del flights[unique_id]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "shared": self.shared,
+            "llm_calls_saved": self.llm_calls_saved,
+        }
+
+
+_single_flight = MediaSingleFlight()
+
+
+def get_media_single_flight() -> MediaSingleFlight:
+    """Return the process-wide media generation single-flight."""
+    return _single_flight
+
+
+def get_media_single_flight_stats() -> dict[str, int]:
+    return _single_flight.stats()
@@ -25,6 +25,7 @@ from .composite import CompositeMediaSource
 from .directory import DirectoryMediaSource
 from .helpers import make_error_record
 from .nothing import NothingMediaSource
+from .prefetched import PrefetchedMediaSource
 from .unsupported import UnsupportedFormatMediaSource
 
 __all__ = [
@@ -37,6 +38,7 @@ __all__ = [
     "MediaStatus",
     "MEDIA_FILE_EXTENSIONS",
     "NothingMediaSource",
+    "PrefetchedMediaSource",
     "UnsupportedFormatMediaSource",
     "fallback_sticker_description",
     "get_describe_timeout_secs",
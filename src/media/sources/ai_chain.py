@@ -16,6 +16,7 @@ This source manages the flow between:
 """
 
 import asyncio
+import contextlib
 import glob as glob_module
 import inspect
 import logging
@@ -23,10 +24,18 @@ from pathlib import Path
 from typing import Any
 
 from config import STATE_DIRECTORY
-from telegram_download import download_media_bytes
+from telegram_download import download_media_to_file, media_file_view
 
+from ..media_record_cache import get_media_record_cache
+from ..media_scratch import get_media_download_path, new_media_download_path
 from ..mime_utils import get_file_extension_from_mime_or_bytes
-from .base import MediaSource, MediaStatus, get_max_description_retries
+from ..single_flight import get_media_single_flight
+from .base import (
+    MediaSource,
+    MediaStatus,
+    get_max_description_retries,
+    get_media_download_limit_bytes,
+)
 from .directory import DirectoryMediaSource
 
 logger = logging.getLogger(__name__)
@@ -36,6 +45,33 @@ logger = logging.getLogger(__name__)
 DOWNLOAD_MEDIA_TIMEOUT_SECONDS = 20.0
 
 
+def cached_media_file_exists(cache_dir: Path, unique_id: str, record: dict[str, Any]) -> bool:
+    """
+    Check whether the media file for a cached record is on disk in cache_dir.
+
+    Prefers the record's media_file (handles any extension the writer emits) and
+    falls back to globbing unique_id.* (excluding .json and partial .tmp writes).
+    Positive answers are remembered in the media record cache.
+    """
+    media_file_name = record.get("media_file")
+    record_cache = get_media_record_cache()
+    cache_key = (str(cache_dir), unique_id, media_file_name or "")
+    if record_cache.file_exists(*cache_key):
+        return True
+    if media_file_name:
+        media_path = cache_dir / media_file_name
+        if media_path.exists() and media_path.is_file():
+            record_cache.remember_file_exists(*cache_key)
+            return True
+    escaped = glob_module.escape(unique_id)
+    for path in cache_dir.glob(f"{escaped}.*"):
+        suf = path.suffix.lower()
+        if suf != ".json" and suf != ".tmp":
+            record_cache.remember_file_exists(*cache_key)
+            return True
+    return False
+
+
 class AIChainMediaSource(MediaSource):
     """
     Orchestrates caching and chaining of media sources with proper temporary failure handling.
@@ -74,6 +110,46 @@ class AIChainMediaSource(MediaSource):
         self.budget_source = budget_source
         self.ai_source = ai_source
 
+    def _cache_dir(self) -> Path:
+        """Directory holding media files for cached records."""
+        if isinstance(self.cache_source, DirectoryMediaSource):
+            return self.cache_source.directory
+        # MySQL keeps metadata only; media files are always stored on disk
+        directory_source = getattr(self.cache_source, "directory_source", None)
+        if directory_source is not None:
+            return directory_source.directory
+        return Path(STATE_DIRECTORY) / "media"
+
+    async def _download_media_file(
+        self, agent: Any, doc: Any, kind: str | None, download_path: Path
+    ) -> Path:
+        """
+        Stream the media for doc to download_path and return the path.
+
+        _generate passes the AI source the same path, so a file it just
+        downloaded is reused instead of being downloaded again.
+        """
+        if not download_path.exists():
+            await asyncio.wait_for(
+                download_media_to_file(
+                    agent.client,
+                    doc,
+                    download_path,
+                    max_bytes=get_media_download_limit_bytes(kind, getattr(doc, "mime_type", None)),
+                ),
+                timeout=DOWNLOAD_MEDIA_TIMEOUT_SECONDS,
+            )
+        return download_path
+
+    async def get_many(
+        self,
+        unique_ids: list[str],
+        agent: Any = None,
+        **metadata,
+    ) -> dict[str, dict[str, Any]]:
+        """Batch cache probe; IDs not in the cache are left to get()."""
+        return await self.cache_source.get_many(unique_ids, agent=agent, **metadata)
+
     async def _store_record(
         self,
         unique_id: str,
@@ -139,44 +215,28 @@ class AIChainMediaSource(MediaSource):
             if not MediaStatus.is_temporary_failure(status):
                 # Check if media file exists - may have metadata but no file
                 # Prefer media_file from record (handles .flac, .zip, .bin etc.)
-                cache_dir = None
-                if isinstance(self.cache_source, DirectoryMediaSource):
-                    cache_dir = self.cache_source.directory
-                else:
-                    cache_dir = Path(STATE_DIRECTORY) / "media"
-                media_file_exists = False
-                if cache_dir:
-                    # Prefer media_file from record (handles any extension the writer emits)
-                    media_file_name = cached_record.get("media_file")
-                    if media_file_name:
-                        media_path = cache_dir / media_file_name
-                        if media_path.exists() and media_path.is_file():
-                            media_file_exists = True
-                    if not media_file_exists:
-                        # Fallback: glob for unique_id.* (exclude .json and .tmp)
-                        escaped = glob_module.escape(unique_id)
-                        for path in cache_dir.glob(f"{escaped}.*"):
-                            suf = path.suffix.lower()
-                            if suf != ".json" and suf != ".tmp":
-                                media_file_exists = True
-                                break
+                media_file_exists = cached_media_file_exists(
+                    self._cache_dir(), unique_id, cached_record
+                )
                 if not media_file_exists and doc is not None and agent is not None:
+                    # Not under the single-flight, so each call downloads to its own file
+                    download_path = new_media_download_path(unique_id)
                     try:
                         logger.debug(
                             "AIChainMediaSource: downloading missing media file for cached %s",
                             unique_id,
                         )
-                        media_bytes = await asyncio.wait_for(
-                            download_media_bytes(agent.client, doc),
-                            timeout=DOWNLOAD_MEDIA_TIMEOUT_SECONDS,
+                        await self._download_media_file(
+                            agent, doc, cached_record.get("kind"), download_path
                         )
                         mime_type = getattr(doc, "mime_type", None)
-                        file_extension = get_file_extension_from_mime_or_bytes(
-                            mime_type, media_bytes
-                        )
-                        await self._store_record(
-                            unique_id, cached_record, media_bytes, file_extension, agent
-                        )
+                        with media_file_view(download_path) as media_bytes:
+                            file_extension = get_file_extension_from_mime_or_bytes(
+                                mime_type, media_bytes
+                            )
+                            await self._store_record(
+                                unique_id, cached_record, media_bytes, file_extension, agent
+                            )
                     except asyncio.TimeoutError:
                         logger.warning(
                             "AIChainMediaSource: download timed out for cached %s",
@@ -188,6 +248,8 @@ class AIChainMediaSource(MediaSource):
                             unique_id,
                             e,
                         )
+                    finally:
+                        download_path.unlink(missing_ok=True)
                 return cached_record
 
             # If it's a temporary failure, we only retry if we have a document
@@ -204,12 +266,55 @@ class AIChainMediaSource(MediaSource):
                 )
                 return cached_record
 
+        if doc is None:
+            # Lookup-only: nothing is downloaded or described, so nothing to share
+            return await self._generate(unique_id, agent, doc, cached_record, **metadata)
+
+        # Concurrent requests for the same media wait for one generation
+        return await get_media_single_flight().run(
+            unique_id,
+            lambda: self._generate(unique_id, agent, doc, cached_record, **metadata),
+        )
+
+    async def _generate(
+        self,
+        unique_id: str,
+        agent: Any,
+        doc: Any,
+        cached_record: dict[str, Any] | None,
+        **metadata,
+    ) -> dict[str, Any] | None:
+        """Run the unsupported/budget/AI sources, download the media file and store the result."""
+        with contextlib.ExitStack() as views:
+            if doc is not None:
+                # Remove the streamed download once stored (runs after views are closed)
+                views.callback(get_media_download_path(unique_id).unlink, missing_ok=True)
+            return await self._generate_and_store(
+                unique_id, agent, doc, cached_record, views, **metadata
+            )
+
+    async def _generate_and_store(
+        self,
+        unique_id: str,
+        agent: Any,
+        doc: Any,
+        cached_record: dict[str, Any] | None,
+        views: contextlib.ExitStack,
+        **metadata,
+    ) -> dict[str, Any] | None:
         # 3. Chain through sources
         record = None
 
+        download_path = get_media_download_path(unique_id)
         for source in [self.unsupported_source, self.budget_source, self.ai_source]:
             # Always pass doc to sources - they can decide whether to use it
-            record = await source.get(unique_id, agent, doc, **metadata)
+            if source is self.ai_source and doc is not None:
+                # The AI source streams to our download path, which _generate removes
+                record = await source.get(
+                    unique_id, agent, doc, download_path=download_path, **metadata
+                )
+            else:
+                record = await source.get(unique_id, agent, doc, **metadata)
             if record:
                 break
 
@@ -222,36 +327,11 @@ class AIChainMediaSource(MediaSource):
         # Always check if media file exists on disk, even for cached records
         # (records might have _on_disk=True but no actual media file)
         # Note: Media files are always stored on disk, even when MySQL is used for metadata
-        # Prefer media_file from record; fallback glob handles any extension
-        media_file_exists = False
-        
-        # Determine the cache directory to check
-        cache_dir = None
-        if isinstance(self.cache_source, DirectoryMediaSource):
-            cache_dir = self.cache_source.directory
-        else:
-            # For MySQLMediaSource or other sources, check the default AI cache directory
-            # (media files are always stored on disk, not in MySQL)
-            cache_dir = Path(STATE_DIRECTORY) / "media"
-        
-        if cache_dir:
-            # Prefer media_file from record (handles any extension the writer emits)
-            for rec in (cached_record, record):
-                if rec:
-                    media_file_name = rec.get("media_file")
-                    if media_file_name:
-                        media_path = cache_dir / media_file_name
-                        if media_path.exists() and media_path.is_file():
-                            media_file_exists = True
-                            break
-            if not media_file_exists:
-                # Fallback: glob for unique_id.* (exclude .json and .tmp - .tmp is partial write)
-                escaped = glob_module.escape(unique_id)
-                for path in cache_dir.glob(f"{escaped}.*"):
-                    suf = path.suffix.lower()
-                    if suf != ".json" and suf != ".tmp":
-                        media_file_exists = True
-                        break
+        cache_dir = self._cache_dir()
+        records = [rec for rec in (cached_record, record) if rec] or [{}]
+        media_file_exists = any(
+            cached_media_file_exists(cache_dir, unique_id, rec) for rec in records
+        )
 
         # Download media if we have a doc and media file doesn't exist
         # Always attempt download if we have doc, regardless of budget status or _on_disk flag
@@ -262,10 +342,11 @@ class AIChainMediaSource(MediaSource):
                         unique_id,
                         DOWNLOAD_MEDIA_TIMEOUT_SECONDS,
                     )
-                    media_bytes = await asyncio.wait_for(
-                        download_media_bytes(agent.client, doc),
-                        timeout=DOWNLOAD_MEDIA_TIMEOUT_SECONDS,
+                    await self._download_media_file(
+                        agent, doc, metadata.get("kind"), download_path
                     )
+                    # Stored from a memory-mapped view rather than a copy in memory
+                    media_bytes = views.enter_context(media_file_view(download_path))
 
                     # Get file extension from MIME type or by detecting from bytes
                     mime_type = getattr(doc, "mime_type", None)
@@ -360,7 +441,7 @@ class AIChainMediaSource(MediaSource):
         if record and metadata.get("update_last_used"):
             try:
                 from db import media_metadata
-                media_metadata.update_media_last_used(unique_id)
+                media_metadata.touch_media_last_used(unique_id)
             except Exception as e:
                 logger.debug(f"AIChainMediaSource: failed to update last_used for {unique_id}: {e}")
 
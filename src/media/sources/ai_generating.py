@@ -15,7 +15,9 @@ This source always succeeds (never returns None). It either:
 Caching is handled by the calling AIChainMediaSource.
 """
 
+import contextlib
 import logging
+import mmap
 import time
 from datetime import UTC
 from pathlib import Path
@@ -26,9 +28,9 @@ import httpx  # pyright: ignore[reportMissingImports]
 from clock import clock
 from llm.exceptions import RetryableLLMError
 from llm.media_helper import get_media_llm
-from telegram_download import download_media_bytes
+from telegram_download import MediaTooLargeError, download_media_to_file, media_file_view
 
-from ..media_scratch import get_scratch_file
+from ..media_scratch import get_scratch_file, new_media_download_path
 from ..mime_utils import (
     classify_media_from_bytes_and_hints,
     detect_mime_type_from_bytes,
@@ -38,7 +40,14 @@ from ..mime_utils import (
     is_tgs_mime_type,
     normalize_mime_type,
 )
-from .base import MediaSource, MediaStatus, MEDIA_FILE_EXTENSIONS, _needs_video_analysis, get_describe_timeout_secs
+from .base import (
+    MediaSource,
+    MediaStatus,
+    MEDIA_FILE_EXTENSIONS,
+    _needs_video_analysis,
+    get_describe_timeout_secs,
+    get_media_download_limit_bytes,
+)
 from .helpers import make_error_record
 
 logger = logging.getLogger(__name__)
@@ -80,8 +89,29 @@ class AIGeneratingMediaSource(MediaSource):
 
         Returns a dict with description or error record, or None if doc is not available.
         Caches successful results and unsupported formats to disk.
+
+        A download_path keyword names the file to stream doc to; the caller then
+        owns that file. Without it the download goes to a private scratch file
+        that is removed before returning.
         """
+        # Memory-mapped media views are closed once the description is done
+        with contextlib.ExitStack() as views:
+            return await self._describe(
+                unique_id, agent, doc, kind, sticker_set_name, sticker_name, views, **metadata
+            )
 
+    async def _describe(
+        self,
+        unique_id: str,
+        agent: Any,
+        doc: Any,
+        kind: str | None,
+        sticker_set_name: str | None,
+        sticker_name: str | None,
+        views: contextlib.ExitStack,
+        download_path: Path | None = None,
+        **metadata,
+    ) -> dict[str, Any] | None:
         if agent is None:
             raise ValueError("AIGeneratingMediaSource: agent is required but was None")
 
@@ -124,13 +154,15 @@ class AIGeneratingMediaSource(MediaSource):
                     if detected_mime_type:
                         metadata["mime_type"] = detected_mime_type
 
-        # Check if media file already exists in cache before downloading
-        data: bytes | None = None
+        # Check if media file already exists in cache before downloading.
+        # Media is memory-mapped rather than read, so large videos and voice notes
+        # are paged in from disk instead of being copied onto the heap.
+        data: bytes | mmap.mmap | None = None
         for ext in MEDIA_FILE_EXTENSIONS:
             cached_file = self.cache_directory / f"{unique_id}{ext}"
             if cached_file.exists():
                 try:
-                    data = cached_file.read_bytes()
+                    data = views.enter_context(media_file_view(cached_file))
                     logger.debug(
                         f"AIGeneratingMediaSource: using cached media file for {unique_id} from {cached_file}"
                     )
@@ -141,10 +173,38 @@ class AIGeneratingMediaSource(MediaSource):
                     )
                     data = None
         
-        # Download media bytes only if not found in cache
+        # Download media only if not found in cache, streaming it to disk
         if data is None:
             try:
-                data = await download_media_bytes(client, doc)
+                if hasattr(doc, "read_bytes"):
+                    # doc is a Path: map the file in place
+                    data = views.enter_context(media_file_view(doc))
+                else:
+                    # AIChainMediaSource passes its own download_path, stores that file
+                    # into the media cache and removes it; other callers get a private
+                    # file that is removed once the views are closed
+                    if download_path is None:
+                        download_path = new_media_download_path(unique_id)
+                        views.callback(download_path.unlink, missing_ok=True)
+                    await download_media_to_file(
+                        client,
+                        doc,
+                        download_path,
+                        max_bytes=get_media_download_limit_bytes(kind, metadata.get("mime_type")),
+                    )
+                    data = views.enter_context(media_file_view(download_path))
+            except MediaTooLargeError as e:
+                logger.info(f"AIGeneratingMediaSource: not downloading {unique_id}: {e}")
+                return make_error_record(
+                    unique_id,
+                    MediaStatus.UNSUPPORTED,
+                    str(e),
+                    kind=kind,
+                    sticker_set_name=sticker_set_name,
+                    sticker_name=sticker_name,
+                    agent=agent,
+                    **metadata,
+                )
             except Exception as e:
                 logger.exception(
                     f"AIGeneratingMediaSource: download failed for {unique_id}: {e}"
@@ -184,7 +244,7 @@ class AIGeneratingMediaSource(MediaSource):
             has_audio_attribute=has_audio_attribute,
             has_sticker_attribute=has_sticker_attribute,
         )
-        detected_mime_type = normalize_mime_type(detect_mime_type_from_bytes(data))
+        detected_mime_type = normalize_mime_type(detect_mime_type_from_bytes(data[:1024]))
         metadata["mime_type"] = final_mime_type
 
         # For TGS files (animated stickers), convert to video first
@@ -192,21 +252,22 @@ class AIGeneratingMediaSource(MediaSource):
         is_converted_tgs = False
         if is_tgs_mime_type(final_mime_type):
             try:
-                from ..tgs_converter import convert_tgs_to_video
+                from ..tgs_converter import convert_tgs_to_video_async
 
                 # Save TGS data to scratch file
                 tgs_path = get_scratch_file(f"{unique_id}.tgs")
                 tgs_path.write_bytes(data)
 
-                # Convert TGS to video
+                # Convert TGS to video off the event loop (cached by unique_id)
                 # Use 4 fps for efficiency - AI samples key frames anyway
-                video_file_path = convert_tgs_to_video(
+                video_file_path = await convert_tgs_to_video_async(
                     tgs_path,
                     tgs_path.with_suffix(".mp4"),
                     width=512,
                     height=512,
                     duration=metadata.get("duration"),
                     target_fps=4.0,
+                    unique_id=unique_id,
                 )
 
                 # Read the video data
@@ -229,7 +290,11 @@ class AIGeneratingMediaSource(MediaSource):
                 )
 
             except Exception as e:
-                logger.error(f"TGS to video conversion failed for {unique_id}: {e}")
+                # A timeout means the machine was busy, not that the sticker is unrenderable
+                timed_out = isinstance(e, TimeoutError)
+                logger.error(
+                    f"TGS to video conversion {'timed out' if timed_out else 'failed'} for {unique_id}: {e}"
+                )
                 # Clean up temporary files
                 if "tgs_path" in locals() and tgs_path and tgs_path.exists():
                     tgs_path.unlink()
@@ -238,8 +303,8 @@ class AIGeneratingMediaSource(MediaSource):
                 # Return error
                 return make_error_record(
                     unique_id,
-                    MediaStatus.PERMANENT_FAILURE,
-                    f"TGS conversion failed: {str(e)[:100]}",
+                    MediaStatus.TEMPORARY_FAILURE if timed_out else MediaStatus.PERMANENT_FAILURE,
+                    "TGS conversion timed out" if timed_out else f"TGS conversion failed: {str(e)[:100]}",
                     kind=effective_kind,
                     sticker_set_name=sticker_set_name,
                     sticker_name=sticker_name,
@@ -15,7 +15,14 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from typing import Any
 
-from ..mime_utils import is_tgs_mime_type, is_video_mime_type
+import config
+
+from ..mime_utils import (
+    is_audio_mime_type,
+    is_image_mime_type,
+    is_tgs_mime_type,
+    is_video_mime_type,
+)
 
 # Media file extensions supported by the system
 # Must include all extensions get_file_extension_from_mime_or_bytes can produce
@@ -114,6 +121,30 @@ class MediaSource(ABC):
         """
         ...
 
+    async def get_many(
+        self,
+        unique_ids: list[str],
+        agent: Any = None,
+        **metadata,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Look up several already-known media records at once.
+
+        This is a cache probe: it never downloads, generates descriptions, or
+        consumes description budget. Sources backed by a cache override it to
+        resolve all IDs in one pass; the default knows nothing, so callers fall
+        back to get() for every ID.
+
+        Args:
+            unique_ids: The Telegram file unique IDs
+            agent: The agent instance
+            **metadata: Metadata applied to every lookup (e.g. update_last_used)
+
+        Returns:
+            Dict mapping unique_id to record for the IDs this source has cached.
+        """
+        return {}
+
 
 # Helper functions for checking media types (works with string kind values from records)
 def _needs_video_analysis(kind: str | None, mime_type: str | None) -> bool:
@@ -181,3 +212,16 @@ def get_max_description_retries() -> int:
     """Get the max retry count for temporary description failures."""
     return MAX_DESCRIPTION_RETRIES
 
+
+def get_media_download_limit_bytes(kind: str | None, mime_type: str | None = None) -> int:
+    """Get the download size cap for media of this kind (MIME type decides for documents)."""
+    if kind in ("photo", "sticker") or (kind in (None, "document") and is_image_mime_type(mime_type)):
+        limit_mb = config.MEDIA_DOWNLOAD_MAX_MB_IMAGE
+    elif kind in ("video", "animation", "gif") or is_video_mime_type(mime_type):
+        limit_mb = config.MEDIA_DOWNLOAD_MAX_MB_VIDEO
+    elif kind == "audio" or is_audio_mime_type(mime_type):
+        limit_mb = config.MEDIA_DOWNLOAD_MAX_MB_AUDIO
+    else:
+        limit_mb = config.MEDIA_DOWNLOAD_MAX_MB_DOCUMENT
+    return int(limit_mb * 1024 * 1024)
+
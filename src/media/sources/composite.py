@@ -79,6 +79,36 @@ class CompositeMediaSource(MediaSource):
         # All sources returned None
         return None
 
+    async def get_many(
+        self,
+        unique_ids: list[str],
+        agent: Any = None,
+        **metadata,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Look up several media records by asking each source, in order, for the
+        IDs that earlier sources did not resolve.
+        """
+        remaining = list(dict.fromkeys(uid for uid in unique_ids if uid))
+        records: dict[str, dict[str, Any]] = {}
+        for i, source in enumerate(self.sources):
+            if not remaining:
+                break
+            try:
+                found = await source.get_many(remaining, agent=agent, **metadata)
+            except Exception as e:
+                logger.warning(
+                    f"CompositeMediaSource: source {i} ({type(source).__name__}) raised error for "
+                    f"batch of {len(remaining)}: {e}"
+                )
+                continue
+            for unique_id in remaining:
+                record = found.get(unique_id)
+                if record is not None:
+                    records[unique_id] = record
+            remaining = [uid for uid in remaining if uid not in records]
+        return records
+
     async def put(
         self,
         unique_id: str,
@@ -21,6 +21,7 @@ from typing import Any
 
 from clock import clock
 from config import CONFIG_DIRECTORIES, STATE_DIRECTORY
+from media.media_record_cache import invalidate_media_record
 from media.state_path import get_resolved_state_media_path
 
 from ..mime_utils import is_tgs_mime_type
@@ -364,6 +365,27 @@ class DirectoryMediaSource(MediaSource):
         )
         return None
 
+    async def get_many(
+        self,
+        unique_ids: list[str],
+        agent: Any = None,
+        **metadata,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Look up several IDs with one pass over the in-memory cache.
+
+        Hits go through get() so fallback descriptions and metadata merges
+        behave exactly as for single lookups; misses cost nothing.
+        """
+        with self._lock:
+            hits = [uid for uid in dict.fromkeys(unique_ids) if uid in self._mem_cache]
+        records: dict[str, dict[str, Any]] = {}
+        for unique_id in hits:
+            record = await self.get(unique_id, agent=agent, **metadata)
+            if record is not None:
+                records[unique_id] = record
+        return records
+
     def put(
         self,
         unique_id: str,
@@ -448,6 +470,7 @@ class DirectoryMediaSource(MediaSource):
             logger.debug(
                 f"DirectoryMediaSource: updated in-memory cache for {unique_id}"
             )
+            invalidate_media_record(unique_id)
 
         except Exception as e:
             logger.exception(
@@ -494,6 +517,7 @@ class DirectoryMediaSource(MediaSource):
                     if media_path.exists():
                         media_path.unlink()
                         break
+        invalidate_media_record(unique_id)
 
     def move_record_to(
         self, unique_id: str, target_source: "DirectoryMediaSource"
@@ -551,5 +575,6 @@ class DirectoryMediaSource(MediaSource):
 
                 target_source._mem_cache[unique_id] = updated_record
                 self._mem_cache.pop(unique_id, None)
+        invalidate_media_record(unique_id)
 
 
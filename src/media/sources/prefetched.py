@@ -0,0 +1,129 @@
+# src/media/sources/prefetched.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+Media source that serves one prompt's lookups from a batch fetched up front.
+
+Building a prompt looks up every configured sticker and every media item in
+100-200 messages of history, one get() at a time. PrefetchedMediaSource wraps
+a chain, resolves all of those IDs with a single get_many() (one MySQL query
+plus one pass over the curated directory caches), and answers the per-item
+get() calls from that batch where doing so returns what the chain would.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any
+
+from ..state_path import get_resolved_state_media_path
+from .ai_chain import AIChainMediaSource, cached_media_file_exists
+from .base import MediaSource, MediaStatus
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchedMediaSource(MediaSource):
+    """
+    Wraps a media source with records prefetched by get_many().
+
+    Lookup-only calls (doc=None) for prefetched IDs are answered from the batch.
+    Calls with a document are answered from the batch only when the chain would
+    return the cached record unchanged: the record is not a temporary failure
+    and its media file is already on disk. Everything else (misses, retries,
+    missing media files, curated records that may merge new metadata) goes to
+    the wrapped source.
+    """
+
+    def __init__(self, source: MediaSource, records: dict[str, dict[str, Any]]):
+        self.source = source
+        self._records = dict(records)
+        self._media_dir: Path | None = None
+
+    @classmethod
+    async def prefetch(
+        cls,
+        source: MediaSource,
+        unique_ids: list[str],
+        agent: Any = None,
+        **metadata,
+    ) -> "PrefetchedMediaSource":
+        """Fetch records for unique_ids in one batch and wrap source with them."""
+        records: dict[str, dict[str, Any]] = {}
+        ids = list(dict.fromkeys(uid for uid in unique_ids if uid))
+        if ids:
+            try:
+                records = await source.get_many(ids, agent=agent, **metadata)
+            except Exception as e:
+                logger.debug(f"PrefetchedMediaSource: batch lookup of {len(ids)} failed: {e}")
+        return cls(source, records)
+
+    def _cache_dir(self) -> Path | None:
+        """Directory the wrapped chain keeps media files in (the state media path by default)."""
+        if self._media_dir is None:
+            chain = _find_ai_chain(self.source)
+            self._media_dir = chain._cache_dir() if chain else get_resolved_state_media_path()
+        return self._media_dir
+
+    def _can_serve(self, unique_id: str, record: dict[str, Any], doc: Any) -> bool:
+        if doc is None:
+            return True
+        if MediaStatus.is_temporary_failure(record.get("status")):
+            return False
+        cache_dir = self._cache_dir()
+        if cache_dir is None:
+            return False
+        return cached_media_file_exists(cache_dir, unique_id, record)
+
+    async def get(
+        self,
+        unique_id: str,
+        agent: Any = None,
+        doc: Any = None,
+        **metadata,
+    ) -> dict[str, Any] | None:
+        record = self._records.get(unique_id)
+        if record is not None and self._can_serve(unique_id, record, doc):
+            return record.copy()
+        # The wrapped source may generate or update the record; look it up there from now on
+        self._records.pop(unique_id, None)
+        return await self.source.get(unique_id, agent=agent, doc=doc, **metadata)
+
+    async def get_many(
+        self,
+        unique_ids: list[str],
+        agent: Any = None,
+        **metadata,
+    ) -> dict[str, dict[str, Any]]:
+        records = {uid: self._records[uid].copy() for uid in unique_ids if uid in self._records}
+        missing = [uid for uid in dict.fromkeys(unique_ids) if uid not in records]
+        if missing:
+            records.update(await self.source.get_many(missing, agent=agent, **metadata))
+        return records
+
+    async def put(
+        self,
+        unique_id: str,
+        record: dict[str, Any],
+        media_bytes: bytes = None,
+        file_extension: str = None,
+        agent: Any = None,
+    ) -> None:
+        self._records.pop(unique_id, None)
+        await self.source.put(unique_id, record, media_bytes, file_extension, agent)
+
+    def refresh_cache(self) -> None:
+        if hasattr(self.source, "refresh_cache"):
+            self.source.refresh_cache()
+
+
+def _find_ai_chain(source: MediaSource) -> AIChainMediaSource | None:
+    """Return the AIChainMediaSource in source (itself or inside a composite), if any."""
+    if isinstance(source, AIChainMediaSource):
+        return source
+    for inner in getattr(source, "sources", ()):
+        chain = _find_ai_chain(inner)
+        if chain is not None:
+            return chain
+    return None
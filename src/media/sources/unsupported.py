@@ -16,13 +16,20 @@ from typing import Any
 
 from clock import clock
 from llm.media_helper import get_media_llm
+from telegram_download import declared_media_size
 
 from ..mime_utils import normalize_mime_type
 import logging
 
 import config
 
-from .base import MediaSource, MediaStatus, _needs_video_analysis, fallback_sticker_description
+from .base import (
+    MediaSource,
+    MediaStatus,
+    _needs_video_analysis,
+    fallback_sticker_description,
+    get_media_download_limit_bytes,
+)
 from .helpers import make_error_record
 
 logger = logging.getLogger(__name__)
@@ -122,6 +129,22 @@ class UnsupportedFormatMediaSource(MediaSource):
         if doc is None:
             return None
 
+        # Check the size Telegram reports against the download cap for this kind
+        size = declared_media_size(doc)
+        max_bytes = get_media_download_limit_bytes(kind, metadata.get("mime_type"))
+        if size is not None and size > max_bytes:
+            logger.info(f"Media {unique_id} is too large to download: {size} bytes (max {max_bytes})")
+            return make_error_record(
+                unique_id,
+                MediaStatus.UNSUPPORTED,
+                f"too large to download ({size / (1024 * 1024):.1f}MB, max {max_bytes / (1024 * 1024):.0f}MB)",
+                kind=kind,
+                sticker_set_name=sticker_set_name,
+                sticker_name=sticker_name,
+                agent=agent,
+                **metadata,
+            )
+
         try:
             # Use normalized MIME type from metadata if available, otherwise from doc
             # (metadata may have been normalized earlier in this function)
@@ -9,8 +9,14 @@ TGS to Video Converter
 Converts Telegram animated stickers (TGS files) to video format for LLM analysis.
 TGS files are gzip-compressed Lottie animations. This module:
 1. Uses python-lottie to parse TGS and export SVG frames
-2. Uses cairosvg to convert SVG frames to PNG
-3. Uses imageio with bundled ffmpeg to create MP4 video
+2. Uses cairosvg to rasterize SVG frames straight into a preallocated numpy
+   frame stack (no PNG round trip) and composites the stack onto white at once
+3. Uses imageio with bundled ffmpeg to stream the frames into an MP4 video
+
+Frames are rendered in parallel in a pool of worker processes
+(TGS_RENDER_WORKERS), and convert_tgs_to_video_async runs the conversion off
+the event loop with a timeout. Converted videos are cached by unique_id in
+state/tgs_video so re-describing a sticker does not render it again.
 
 Requirements:
 - Cairo library must be installed on the system
@@ -18,20 +24,280 @@ Requirements:
   - Ubuntu: sudo apt-get install libcairo2-dev
 """
 
+import asyncio
+import atexit
+import functools
 import io
+import itertools
 import logging
+import multiprocessing
+import shutil
+import sys
 import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
-import cairosvg
 import imageio
 import numpy as np
 from lottie.exporters import svg
 from lottie.parsers import tgs
-from PIL import Image
+
+from config import TGS_RENDER_TIMEOUT_SECONDS, TGS_RENDER_WORKERS
+
+from .tgs_video_cache import cached_tgs_video_path, store_cached_tgs_video
 
 logger = logging.getLogger(__name__)
 
+# Byte positions of the colour channels in cairo's native-endian ARGB32 pixels
+_CAIRO_RGB = [2, 1, 0] if sys.byteorder == "little" else [1, 2, 3]
+_CAIRO_ALPHA = 3 if sys.byteorder == "little" else 0
+
+# Frames rendered per batch: bounds memory and lets encoding start before rendering ends
+_FRAME_BATCH_SIZE = 16
+
+# Timeouts after which a sticker is treated as unrenderable instead of retried
+_MAX_RENDER_TIMEOUTS = 2
+# Stickers whose timeouts are remembered (oldest forgotten first)
+_RENDER_TIMEOUTS_MAX_ENTRIES = 1000
+
+_render_pool: ProcessPoolExecutor | None = None
+_render_pool_lock = threading.Lock()
+_render_timeouts: OrderedDict[str, int] = OrderedDict()
+_render_timeouts_lock = threading.Lock()
+
+
+def _get_render_pool() -> ProcessPoolExecutor | None:
+    """Return the frame rendering process pool, or None when TGS_RENDER_WORKERS is 0."""
+    global _render_pool
+    if TGS_RENDER_WORKERS <= 0:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: the agent process has running threads (event loop, DB pool), unsafe to fork
+            _render_pool = ProcessPoolExecutor(
+                max_workers=TGS_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _render_pool
+
+
+def shutdown_tgs_render_pool(wait: bool = True) -> None:
+    """Shut down the frame rendering pool (a new one is created on next use)."""
+    global _render_pool
+    with _render_pool_lock:
+        pool = _render_pool
+        _render_pool = None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Processes that never call shutdown_tgs_render_pool (admin console, scripts) still stop the workers
+atexit.register(shutdown_tgs_render_pool, wait=False)
+
+
+def _load_animation(tgs_filepath: Path | str, width: int, height: int):
+    animation = tgs.parse_tgs(str(tgs_filepath))
+    animation.width = width
+    animation.height = height
+    return animation
+
+
+@functools.cache
+def _array_surface_type():
+    """
+    Return a cairosvg surface class that rasterizes into a caller-provided
+    (height, width, 4) uint8 array.
+
+    cairo is loaded on the first render, so the rest of this module (frame
+    planning, compositing, encoding) imports without the system library.
+    """
+    import cairocffi
+    from cairosvg.surface import PNGSurface
+
+    class _ArraySurface(PNGSurface):
+        def _create_surface(self, width, height):
+            target = self.output
+            height_px, width_px = target.shape[:2]
+            surface = cairocffi.ImageSurface.create_for_data(
+                target, cairocffi.FORMAT_ARGB32, width_px, height_px, width_px * 4
+            )
+            return surface, width_px, height_px
+
+        def finish(self):
+            # Pixels are already in the target array; there is no PNG to write
+            self.cairo.finish()
+
+    return _ArraySurface
+
+
+def _rasterize_svg(svg_data: bytes, target: np.ndarray) -> None:
+    """Rasterize an SVG document into target as premultiplied cairo ARGB32 pixels."""
+    from cairosvg.parser import Tree
+
+    height, width = target.shape[:2]
+    _array_surface_type()(
+        Tree(bytestring=svg_data), target, 96, output_width=width, output_height=height
+    ).finish()
+
+
+def _composite_on_white(stack: np.ndarray) -> np.ndarray:
+    """
+    Composite a (frames, height, width, 4) stack of premultiplied cairo ARGB32
+    pixels onto white and return it as (frames, height, width, 3) RGB.
+
+    With premultiplied colour, "over white" is colour + (255 - alpha), which
+    cannot exceed 255, so the whole stack is composited in uint8 in one pass.
+    """
+    rgb = stack[..., _CAIRO_RGB]
+    rgb += 255 - stack[..., _CAIRO_ALPHA : _CAIRO_ALPHA + 1]
+    return rgb
+
+
+def _render_frames(
+    animation, frame_numbers: list[int], width: int, height: int, deadline: float | None = None
+) -> np.ndarray:
+    """
+    Render the given absolute frame numbers of a loaded animation as an RGB frame stack.
+
+    Raises:
+        TimeoutError: If time.monotonic() passes deadline before the last frame
+    """
+    stack = np.zeros((len(frame_numbers), height, width, 4), dtype=np.uint8)
+    for index, frame in enumerate(frame_numbers):
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"TGS rendering exceeded its deadline after {index} frames")
+        # Export frame as SVG to a string buffer
+        svg_buffer = io.StringIO()
+        svg.export_svg(animation, svg_buffer, frame=frame)
+
+        # Rasterize straight into this frame's slot of the stack
+        _rasterize_svg(svg_buffer.getvalue().encode("utf-8"), stack[index])
+    return _composite_on_white(stack)
+
+
+def _render_frame_chunk(
+    tgs_filepath: str, width: int, height: int, frame_numbers: list[int]
+) -> np.ndarray:
+    """Worker-process entry point: render a slice of frames."""
+    return _render_frames(_load_animation(tgs_filepath, width, height), frame_numbers, width, height)
+
+
+def _frame_batches(frame_numbers: list[int], batch_count: int) -> list[list[int]]:
+    """Split frame_numbers into at least batch_count contiguous batches of at most _FRAME_BATCH_SIZE."""
+    batch_size = max(1, min(_FRAME_BATCH_SIZE, -(-len(frame_numbers) // max(1, batch_count))))
+    return [frame_numbers[i:i + batch_size] for i in range(0, len(frame_numbers), batch_size)]
+
+
+def _iter_frames_in_pool(
+    pool: ProcessPoolExecutor,
+    tgs_filepath: Path,
+    width: int,
+    height: int,
+    frame_numbers: list[int],
+    deadline: float | None,
+) -> Iterator[np.ndarray]:
+    """Render contiguous batches in parallel and yield them in frame order as they finish."""
+    futures = deque(
+        pool.submit(_render_frame_chunk, str(tgs_filepath), width, height, batch)
+        for batch in _frame_batches(frame_numbers, TGS_RENDER_WORKERS)
+    )
+    try:
+        while futures:
+            remaining = max(0.0, deadline - time.monotonic()) if deadline else None
+            # Drop each batch's future once consumed so rendered frames are not kept alive
+            yield futures.popleft().result(timeout=remaining)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _plan_frames(animation, width: int, height: int, duration: float | None, target_fps: float) -> list[int]:
+    """Return the absolute frame numbers sampled at target_fps within duration."""
+    # Get animation properties
+    fps = animation.frame_rate
+    total_frames = int(animation.out_point - animation.in_point)
+    anim_duration = total_frames / fps if fps > 0 else 0
+
+    logger.info(
+        f"TGS animation: {total_frames} frames, {fps} fps, "
+        f"{anim_duration:.2f}s duration, {width}x{height} size"
+    )
+
+    # Calculate how many frames to render
+    if duration and duration < anim_duration:
+        max_frames = int(duration * fps)
+        frames_to_render = min(total_frames, max_frames)
+    else:
+        frames_to_render = total_frames
+
+    # Calculate frame skip interval to achieve target FPS
+    # This dramatically speeds up conversion since AI only needs key frames
+    frame_skip = max(1, int(fps / target_fps))
+
+    logger.info(
+        f"Sampling frames: original {fps} fps → target {target_fps} fps "
+        f"(rendering every {frame_skip} frames)"
+    )
+    return [frame_num + animation.in_point for frame_num in range(0, frames_to_render, frame_skip)]
+
+
+def iter_tgs_frame_batches(
+    tgs_filepath: Path,
+    width: int = 512,
+    height: int = 512,
+    duration: float | None = None,
+    target_fps: float = 4.0,
+    timeout: float | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    Render a TGS file and yield its sampled frames in order, in batches.
+
+    Each batch is a (frames, height, width, 3) uint8 RGB array composited onto
+    white. Batches render in the process pool when available, so the caller
+    can encode one batch while later ones are still rendering.
+
+    timeout bounds the whole render, in the pool and in-process alike (the
+    in-process loop checks it between frames, so a conversion on a thread
+    stops soon after its caller gives up).
+
+    Raises:
+        TimeoutError: If rendering does not finish within timeout
+        ValueError: If rendering fails
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    try:
+        # Load the TGS animation
+        animation = _load_animation(tgs_filepath, width, height)
+        frame_numbers = _plan_frames(animation, width, height, duration, target_fps)
+        if not frame_numbers:
+            return
+
+        # Render sampled frames, in parallel worker processes when available
+        pool = _get_render_pool() if len(frame_numbers) > 1 else None
+        rendered = 0
+        if pool is not None:
+            try:
+                for batch in _iter_frames_in_pool(pool, tgs_filepath, width, height, frame_numbers, deadline):
+                    rendered += len(batch)
+                    yield batch
+            except BrokenProcessPool as e:
+                logger.warning(f"TGS render pool failed, rendering in-process: {e}")
+                shutdown_tgs_render_pool(wait=False)
+        for batch in _frame_batches(frame_numbers[rendered:], 1):
+            yield _render_frames(animation, batch, width, height, deadline)
+
+        logger.info(f"Successfully rendered {len(frame_numbers)} frames from TGS file")
+
+    except TimeoutError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to render TGS to frames: {e}") from e
+
 
 def render_tgs_to_frames(
     tgs_filepath: Path,
@@ -39,7 +305,8 @@ def render_tgs_to_frames(
     height: int = 512,
     duration: float | None = None,
     target_fps: float = 4.0,
-) -> tuple[list[np.ndarray], float]:
+    timeout: float | None = None,
+) -> tuple[np.ndarray, float]:
     """
     Render a TGS file to individual frames using python-lottie and cairosvg.
 
@@ -50,86 +317,53 @@ def render_tgs_to_frames(
         duration: Maximum duration in seconds (None for full animation)
         target_fps: Target frames per second for output video (default: 4.0)
                    Lower values speed up conversion with minimal impact on AI analysis
+        timeout: Maximum seconds to spend rendering (None waits indefinitely)
 
     Returns:
-        Tuple of (list of frames as numpy arrays, target_fps)
+        Tuple of ((frames, height, width, 3) RGB array composited on white, target_fps)
 
     Raises:
         ValueError: If rendering fails
     """
-    try:
-        # Load the TGS animation
-        animation = tgs.parse_tgs(str(tgs_filepath))
-
-        # Set dimensions
-        animation.width = width
-        animation.height = height
-
-        # Get animation properties
-        fps = animation.frame_rate
-        total_frames = int(animation.out_point - animation.in_point)
-        anim_duration = total_frames / fps if fps > 0 else 0
-
-        logger.info(
-            f"TGS animation: {total_frames} frames, {fps} fps, "
-            f"{anim_duration:.2f}s duration, {width}x{height} size"
-        )
-
-        # Calculate how many frames to render
-        if duration and duration < anim_duration:
-            max_frames = int(duration * fps)
-            frames_to_render = min(total_frames, max_frames)
-        else:
-            frames_to_render = total_frames
-
-        # Calculate frame skip interval to achieve target FPS
-        # This dramatically speeds up conversion since AI only needs key frames
-        frame_skip = max(1, int(fps / target_fps))
-
-        logger.info(
-            f"Sampling frames: original {fps} fps → target {target_fps} fps "
-            f"(rendering every {frame_skip} frames)"
-        )
-
-        # Render sampled frames
-        frames = []
-        frame_indices = list(range(0, frames_to_render, frame_skip))
-        log_interval = max(1, len(frame_indices) // 10)  # Log every 10%
-
-        for i, frame_num in enumerate(frame_indices):
-            if i % log_interval == 0:
-                logger.info(f"Rendering frame {i + 1}/{len(frame_indices)}...")
-
-            # Export frame as SVG to a string buffer
-            svg_buffer = io.StringIO()
-            svg.export_svg(animation, svg_buffer, frame=frame_num + animation.in_point)
-            svg_data = svg_buffer.getvalue()
-
-            # Convert SVG to PNG using cairosvg
-            png_data = cairosvg.svg2png(
-                bytestring=svg_data.encode("utf-8"),
-                output_width=width,
-                output_height=height,
-            )
-
-            # Convert PNG bytes to numpy array
-            pil_image = Image.open(io.BytesIO(png_data))
-            frame_array = np.array(pil_image)
-
-            frames.append(frame_array)
-
-        logger.info(
-            f"Successfully rendered {len(frames)} frames from TGS file "
-            f"(sampled from {frames_to_render} total frames)"
-        )
-        return frames, target_fps
-
-    except Exception as e:
-        raise ValueError(f"Failed to render TGS to frames: {e}") from e
+    batches = list(iter_tgs_frame_batches(tgs_filepath, width, height, duration, target_fps, timeout))
+    if not batches:
+        return np.zeros((0, height, width, 3), dtype=np.uint8), target_fps
+    return np.concatenate(batches), target_fps
+
+
+def _composite_straight_on_white(frames: np.ndarray) -> np.ndarray:
+    """Composite a stack of straight-alpha RGBA frames onto white in one vectorized pass."""
+    alpha = frames[..., 3:4].astype(np.uint16)
+    rgb = frames[..., :3] * alpha + 255 * (255 - alpha)
+    return ((rgb + 127) // 255).astype(np.uint8)
+
+
+def _write_video(batches: Iterable[np.ndarray], output_path: Path, fps: float) -> int:
+    """Stream RGB frame batches into an MP4 and return the number of frames written."""
+    # Wait for the first frames before opening the writer, so no input leaves no file behind
+    batches = iter(batches)
+    first = next((batch for batch in batches if len(batch)), None)
+    if first is None:
+        raise ValueError("No frames to convert to video")
+
+    written = 0
+    # Write video using imageio's ffmpeg writer, one frame at a time
+    with imageio.get_writer(
+        str(output_path),
+        fps=fps,
+        codec="libx264",
+        pixelformat="yuv420p",
+        quality=8,
+    ) as writer:
+        for batch in itertools.chain([first], batches):
+            for frame in batch:
+                writer.append_data(frame)
+                written += 1
+    return written
 
 
 def create_video_from_frames(
-    frames: list[np.ndarray],
+    frames: list[np.ndarray] | np.ndarray,
     output_path: Path,
     fps: float = 30.0,
 ) -> Path:
@@ -137,7 +371,8 @@ def create_video_from_frames(
     Create an MP4 video from frame arrays using imageio.
 
     Args:
-        frames: List of frames as numpy arrays (RGB or RGBA format)
+        frames: Frames as a list or (frames, height, width, channels) array of
+                RGB or straight-alpha RGBA pixels (RGBA is composited onto white)
         output_path: Path where the MP4 video should be saved
         fps: Frames per second
 
@@ -148,35 +383,17 @@ def create_video_from_frames(
         ValueError: If video creation fails
     """
     try:
-        if not frames:
+        if len(frames) == 0:
             raise ValueError("No frames to convert to video")
 
-        # Convert RGBA frames to RGB if needed
-        rgb_frames = []
-        for frame in frames:
-            if frame.shape[2] == 4:  # Has alpha channel
-                # Composite onto white background
-                alpha = frame[:, :, 3:4] / 255.0
-                rgb = frame[:, :, :3]
-                white_bg = np.ones_like(rgb) * 255
-                composited = (rgb * alpha + white_bg * (1 - alpha)).astype(np.uint8)
-                rgb_frames.append(composited)
-            else:
-                rgb_frames.append(frame[:, :, :3])
-
-        # Write video using imageio's ffmpeg writer
-        imageio.mimsave(
-            str(output_path),
-            rgb_frames,
-            fps=fps,
-            codec="libx264",
-            pixelformat="yuv420p",
-            quality=8,
-        )
+        stack = np.asarray(frames)
+        if stack.shape[-1] == 4:  # Has alpha channel
+            stack = _composite_straight_on_white(stack)
+        else:
+            stack = stack[..., :3]
 
-        logger.info(
-            f"Created video from {len(rgb_frames)} frames at {fps} fps: {output_path}"
-        )
+        written = _write_video([stack], output_path, fps)
+        logger.info(f"Created video from {written} frames at {fps} fps: {output_path}")
         return output_path
 
     except Exception as e:
@@ -190,10 +407,14 @@ def convert_tgs_to_video(
     height: int = 512,
     duration: float | None = None,
     target_fps: float = 4.0,
+    timeout: float | None = None,
 ) -> Path:
     """
     Convert a TGS file to MP4 video.
 
+    Frames are streamed from the renderer into the encoder batch by batch, so
+    the whole animation is never held in memory at once.
+
     Args:
         tgs_filepath: Path to the input TGS file
         output_path: Path where the MP4 video should be saved
@@ -201,26 +422,114 @@ def convert_tgs_to_video(
         height: Video height in pixels
         duration: Maximum duration in seconds (None for full animation)
         target_fps: Target frames per second for output video (default: 4.0)
+        timeout: Maximum seconds to wait for frame rendering
 
     Returns:
         Path to the created MP4 file
 
     Raises:
+        TimeoutError: If frame rendering exceeds timeout
         ValueError: If conversion fails at any step
     """
     try:
-        # Render TGS to frames
-        frames, fps = render_tgs_to_frames(
-            tgs_filepath, width, height, duration, target_fps
+        written = _write_video(
+            iter_tgs_frame_batches(tgs_filepath, width, height, duration, target_fps, timeout),
+            output_path,
+            target_fps,
         )
+        logger.info(f"Created video from {written} frames at {target_fps} fps: {output_path}")
+        return output_path
 
-        # Create video from frames
-        return create_video_from_frames(frames, output_path, fps)
-
+    except TimeoutError:
+        raise
     except Exception as e:
         raise ValueError(f"Failed to convert TGS to video: {e}") from e
 
 
+def _convert_tgs_to_video_cached(
+    tgs_filepath: Path,
+    output_path: Path,
+    width: int,
+    height: int,
+    duration: float | None,
+    target_fps: float,
+    unique_id: str | None,
+    timeout: float | None,
+) -> Path:
+    cached_path = (
+        cached_tgs_video_path(unique_id, width, height, duration, target_fps) if unique_id else None
+    )
+    if cached_path is not None and cached_path.is_file():
+        shutil.copyfile(cached_path, output_path)
+        cached_path.touch()
+        logger.info(f"Using cached TGS video for {unique_id}")
+        return output_path
+    video_path = convert_tgs_to_video(
+        tgs_filepath, output_path, width, height, duration, target_fps, timeout
+    )
+    if cached_path is not None:
+        store_cached_tgs_video(video_path, cached_path)
+    return video_path
+
+
+async def convert_tgs_to_video_async(
+    tgs_filepath: Path,
+    output_path: Path,
+    width: int = 512,
+    height: int = 512,
+    duration: float | None = None,
+    target_fps: float = 4.0,
+    unique_id: str | None = None,
+    timeout: float = TGS_RENDER_TIMEOUT_SECONDS,
+) -> Path:
+    """
+    Convert a TGS file to MP4 without blocking the event loop.
+
+    The conversion runs on a worker thread (frames render in the process pool,
+    encoding on the thread). When unique_id is given, a video cached for the
+    same sticker and settings is copied to output_path instead of rendering.
+
+    A sticker that times out _MAX_RENDER_TIMEOUTS times is reported as a
+    ValueError (a permanent failure) instead of being rendered again.
+
+    Raises:
+        TimeoutError: If conversion takes longer than timeout seconds
+        ValueError: If conversion fails or keeps timing out
+    """
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(
+                _convert_tgs_to_video_cached,
+                tgs_filepath,
+                output_path,
+                width,
+                height,
+                duration,
+                target_fps,
+                unique_id,
+                timeout,
+            ),
+            timeout,
+        )
+    except TimeoutError:
+        if unique_id is None:
+            raise
+        attempts = _note_render_timeout(unique_id)
+        if attempts >= _MAX_RENDER_TIMEOUTS:
+            raise ValueError(f"rendering timed out {attempts} times (limit {timeout:g}s)") from None
+        raise
+
+
+def _note_render_timeout(unique_id: str) -> int:
+    """Count a render timeout for unique_id and return how many it has had."""
+    with _render_timeouts_lock:
+        attempts = _render_timeouts.pop(unique_id, 0) + 1
+        _render_timeouts[unique_id] = attempts
+        while len(_render_timeouts) > _RENDER_TIMEOUTS_MAX_ENTRIES:
+            _render_timeouts.popitem(last=False)
+    return attempts
+
+
 def convert_tgs_to_video_temp(
     tgs_filepath: Path,
     width: int = 512,
@@ -0,0 +1,47 @@
+# src/media/tgs_video_cache.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""
+On-disk cache of MP4 videos converted from TGS animated stickers.
+
+Rendering a sticker takes seconds of CPU, and the same sticker is converted
+again whenever its description is regenerated (retries, admin "refresh from
+AI"). Videos are stored in state/tgs_video, keyed by unique_id and the render
+settings, and the oldest files are dropped beyond a fixed count.
+"""
+
+import logging
+import shutil
+from pathlib import Path
+
+from config import STATE_DIRECTORY
+
+logger = logging.getLogger(__name__)
+
+TGS_VIDEO_CACHE_DIRECTORY = Path(STATE_DIRECTORY) / "tgs_video"
+# Oldest cached videos are removed beyond this many files
+_TGS_VIDEO_CACHE_MAX_FILES = 2000
+
+
+def cached_tgs_video_path(
+    unique_id: str, width: int, height: int, duration: float | None, target_fps: float
+) -> Path:
+    """Return the cache path for a sticker converted with the given settings."""
+    duration_part = f"{duration:g}s" if duration else "full"
+    return TGS_VIDEO_CACHE_DIRECTORY / f"{unique_id}-{width}x{height}-{target_fps:g}fps-{duration_part}.mp4"
+
+
+def store_cached_tgs_video(video_path: Path, cached_path: Path) -> None:
+    """Copy a converted video into the cache and drop the oldest entries beyond the limit."""
+    try:
+        cached_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cached_path.with_name(f"{cached_path.name}.tmp")
+        shutil.copyfile(video_path, temp_path)
+        temp_path.replace(cached_path)
+        cached = sorted(cached_path.parent.glob("*.mp4"), key=lambda p: p.stat().st_mtime)
+        for stale in cached[:-_TGS_VIDEO_CACHE_MAX_FILES]:
+            stale.unlink(missing_ok=True)
+    except Exception as e:
+        logger.debug(f"Could not cache converted TGS video {cached_path.name}: {e}")
@@ -3,10 +3,165 @@
 # Copyright (c) 2025-2026 Cindy's World LLC and contributors
 # Licensed under the MIT License. See LICENSE.md for details.
 #
+"""
+Prompt file loading.
+
+Every prompts/*.md file across CONFIG_DIRECTORIES is indexed once and served
+from memory (the first directory containing a name wins). The index is
+revalidated at most every PROMPT_CACHE_CHECK_INTERVAL_SECONDS: a changed
+prompts directory (file added, removed or renamed) rebuilds it and a changed
+file mtime or size reloads that file. Admin console edits call
+invalidate_prompt_cache() so they apply immediately.
+
+cached_render() memoizes text built from prompts (such as an agent's base
+system prompt after template substitution); entries are dropped whenever a
+prompt changes.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from pathlib import Path
 
+import config
 from config import CONFIG_DIRECTORIES
 
+logger = logging.getLogger(__name__)
+
+
+class PromptRegistry:
+    """In-memory index of prompt files with mtime-based invalidation."""
+
+    # Rendered prompts kept (roughly one per active agent and channel)
+    RENDER_CACHE_MAX_ENTRIES = 512
+
+    def __init__(self):
+        # Agent tasks and admin console request threads both load prompts
+        self._lock = threading.Lock()
+        self._directories: tuple[str, ...] | None = None
+        self._dir_stamps: dict[Path, int | None] = {}
+        self._files: dict[str, tuple[Path, tuple[int, int], str]] = {}  # name -> (path, stamp, text)
+        self._checked_at = 0.0
+        self._rendered: OrderedDict[Hashable, str] = OrderedDict()
+        self.generation = 0
+
+    @staticmethod
+    def _stamp(path: Path) -> tuple[int, int] | None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _rebuild(self, directories: tuple[str, ...]) -> None:
+        dir_stamps: dict[Path, int | None] = {}
+        files: dict[str, tuple[Path, tuple[int, int], str]] = {}
+        for config_dir in directories:
+            prompts_dir = Path(config_dir) / "prompts"
+            stamp = self._stamp(prompts_dir)
+            dir_stamps[prompts_dir] = stamp[0] if stamp else None
+            if stamp is None or not prompts_dir.is_dir():
+                continue
+            for file_path in sorted(prompts_dir.glob("*.md")):
+                if file_path.stem in files:
+                    continue
+                file_stamp = self._stamp(file_path)
+                if file_stamp is None:
+                    continue
+                try:
+                    text = file_path.read_text().strip()
+                except OSError as e:
+                    logger.warning(f"Could not read prompt {file_path}: {e}")
+                    continue
+                files[file_path.stem] = (file_path, file_stamp, text)
+        self._directories = directories
+        self._dir_stamps = dir_stamps
+        self._files = files
+        self._changed()
+        logger.debug(f"Indexed {len(files)} prompt files")
+
+    def _changed(self) -> None:
+        self.generation += 1
+        self._rendered.clear()
+
+    def _revalidate(self) -> None:
+        """Rebuild or reload whatever changed on disk since the index was built."""
+        for prompts_dir, dir_mtime in self._dir_stamps.items():
+            stamp = self._stamp(prompts_dir)
+            if (stamp[0] if stamp else None) != dir_mtime:
+                self._rebuild(self._directories or ())
+                return
+        changed = False
+        for name, (file_path, file_stamp, _) in list(self._files.items()):
+            stamp = self._stamp(file_path)
+            if stamp is None:
+                self._rebuild(self._directories or ())
+                return
+            if stamp != file_stamp:
+                try:
+                    text = file_path.read_text().strip()
+                except OSError as e:
+                    logger.warning(f"Could not reload prompt {file_path}: {e}")
+                    continue
+                self._files[name] = (file_path, stamp, text)
+                changed = True
+        if changed:
+            self._changed()
+
+    def _ensure_fresh(self) -> None:
+        directories = tuple(CONFIG_DIRECTORIES)
+        now = time.monotonic()
+        if directories != self._directories:
+            self._rebuild(directories)
+        elif now - self._checked_at >= config.PROMPT_CACHE_CHECK_INTERVAL_SECONDS:
+            self._revalidate()
+        else:
+            return
+        self._checked_at = now
+
+    def load(self, prompt_name: str) -> str:
+        with self._lock:
+            self._ensure_fresh()
+            entry = self._files.get(prompt_name)
+        if entry is None:
+            searched_dirs = [str(Path(d) / "prompts") for d in CONFIG_DIRECTORIES]
+            raise RuntimeError(
+                f"Prompt file '{prompt_name}.md' not found in any of the following directories: {searched_dirs}"
+            )
+        return entry[2]
+
+    def names(self) -> list[str]:
+        with self._lock:
+            self._ensure_fresh()
+            return sorted(self._files)
+
+    def render(self, key: Hashable, build: Callable[[], str]) -> str:
+        with self._lock:
+            self._ensure_fresh()
+            text = self._rendered.get(key)
+            if text is not None:
+                self._rendered.move_to_end(key)
+                return text
+            generation = self.generation
+        # build() loads prompts itself, so it runs outside the lock
+        text = build()
+        with self._lock:
+            if self.generation == generation:
+                self._rendered[key] = text
+                while len(self._rendered) > self.RENDER_CACHE_MAX_ENTRIES:
+                    self._rendered.popitem(last=False)
+        return text
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._directories = None
+            self._changed()
+
+
+_registry = PromptRegistry()
+
 
 def load_system_prompt(prompt_name: str):
     """
@@ -15,36 +170,25 @@ def load_system_prompt(prompt_name: str):
     Args:
         prompt_name: Name of the prompt file (without .md extension)
     """
-    # Search all config directories
-    config_path = CONFIG_DIRECTORIES
-
-    for config_dir in config_path:
-        path = Path(config_dir)
-        if not path.exists() or not path.is_dir():
-            continue
-
-        # Try global prompts
-        prompts_dir_path = path / "prompts"
-        if prompts_dir_path.exists() and prompts_dir_path.is_dir():
-            file_path = prompts_dir_path / f"{prompt_name}.md"
-            if file_path.exists():
-                return file_path.read_text().strip()
-
-    # If we get here, the prompt wasn't found in any config directory
-    searched_dirs = [str(Path(d) / "prompts") for d in config_path]
-    raise RuntimeError(
-        f"Prompt file '{prompt_name}.md' not found in any of the following directories: {searched_dirs}"
-    )
+    return _registry.load(prompt_name)
 
 
 def get_available_system_prompts():
     """
     Returns a list of all available system prompt names.
     """
-    prompts = set()
-    for config_dir in CONFIG_DIRECTORIES:
-        prompts_dir = Path(config_dir) / "prompts"
-        if prompts_dir.exists() and prompts_dir.is_dir():
-            for f in prompts_dir.glob("*.md"):
-                prompts.add(f.stem)
-    return sorted(list(prompts))
+    return _registry.names()
+
+
+def cached_render(key: Hashable, build: Callable[[], str]) -> str:
+    """
+    Return build() memoized under key until any prompt file changes.
+
+    key must capture every input of build() other than prompt file contents.
+    """
+    return _registry.render(key, build)
+
+
+def invalidate_prompt_cache() -> None:
+    """Drop all cached prompts (call after editing prompt files)."""
+    _registry.invalidate()
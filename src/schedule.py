@@ -9,8 +9,10 @@ Schedule management for agents with daily schedules.
 
 import json
 import logging
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from itertools import accumulate
 from typing import TYPE_CHECKING
 
 from clock import clock
@@ -72,14 +74,73 @@ class ScheduleActivity:
         }
 
 
+class CompiledSchedule:
+    """
+    A schedule with its activities parsed and sorted once, for repeated time lookups.
+
+    Lookups use bisect over the sorted start times, so checking responsiveness
+    costs O(log n) instead of re-parsing every activity. Agents keep one of
+    these cached (see AgentStorageMixin._get_compiled_schedule) and drop it
+    whenever the schedule is saved.
+    """
+
+    def __init__(self, schedule: dict | None):
+        self.has_schedule = bool(schedule)
+        activities = []
+        for act_data in (schedule or {}).get("activities") or []:
+            try:
+                activities.append(ScheduleActivity.from_dict(act_data))
+            except Exception as e:
+                logger.warning(f"Failed to parse activity: {e}")
+                continue
+        activities.sort(key=lambda a: a.start_time)
+        self.activities: list[ScheduleActivity] = activities
+        self._start_times = [act.start_time for act in activities]
+        # Running maximum of end times. The first index where it reaches `now` is the
+        # earliest-starting activity that has not yet ended.
+        self._max_end_times = list(accumulate((act.end_time for act in activities), max))
+        # _next_awake[i] is the index of the first activity at or after i with responsiveness > 0
+        self._next_awake = [len(activities)] * (len(activities) + 1)
+        for i in range(len(activities) - 1, -1, -1):
+            self._next_awake[i] = i if activities[i].responsiveness > 0 else self._next_awake[i + 1]
+        self.latest_end: datetime | None = self._max_end_times[-1] if activities else None
+
+    def _started_count(self, now: datetime) -> int:
+        """Number of activities with start_time <= now."""
+        return bisect_right(self._start_times, now)
+
+    def current_activity(self, now: datetime | None = None) -> ScheduleActivity | None:
+        """Return the earliest-starting activity with start_time <= now <= end_time, or None."""
+        if now is None:
+            now = clock.now(UTC)
+        index = bisect_left(self._max_end_times, now)
+        if index < self._started_count(now):
+            return self.activities[index]
+        return None
+
+    def next_activity(self, now: datetime | None = None) -> ScheduleActivity | None:
+        """Return the first activity starting after now, or None."""
+        if now is None:
+            now = clock.now(UTC)
+        index = self._started_count(now)
+        return self.activities[index] if index < len(self.activities) else None
+
+
+def _compiled(schedule: "dict | CompiledSchedule | None") -> CompiledSchedule:
+    """Return schedule as a CompiledSchedule, compiling a raw schedule dict if needed."""
+    if isinstance(schedule, CompiledSchedule):
+        return schedule
+    return CompiledSchedule(schedule)
+
+
 def get_current_activity(
-    schedule: dict | None, now: datetime | None = None
+    schedule: "dict | CompiledSchedule | None", now: datetime | None = None
 ) -> tuple[ScheduleActivity | None, timedelta | None, ScheduleActivity | None]:
     """
     Get the current activity, time remaining, and next activity.
     
     Args:
-        schedule: Schedule dictionary with activities list, or None
+        schedule: Schedule dictionary with activities list, a CompiledSchedule, or None
         now: Current time (defaults to clock.now(UTC))
     
     Returns:
@@ -94,29 +155,8 @@ def get_current_activity(
     if now is None:
         now = clock.now(UTC)
     
-    activities = schedule.get("activities", [])
-    if not activities:
-        return (None, None, None)
-    
-    # Parse activities into ScheduleActivity objects
-    schedule_activities = []
-    for act_data in activities:
-        try:
-            act = ScheduleActivity.from_dict(act_data)
-            schedule_activities.append(act)
-        except Exception as e:
-            logger.warning(f"Failed to parse activity: {e}")
-            continue
-    
-    # Sort by start_time
-    schedule_activities.sort(key=lambda a: a.start_time)
-    
-    # Find current activity (now is between start_time and end_time)
-    current_activity = None
-    for act in schedule_activities:
-        if act.start_time <= now <= act.end_time:
-            current_activity = act
-            break
+    compiled = _compiled(schedule)
+    current_activity = compiled.current_activity(now)
     
     # Calculate time remaining
     time_remaining = None
@@ -125,24 +165,17 @@ def get_current_activity(
         if time_remaining.total_seconds() < 0:
             time_remaining = None
     
-    # Find next activity (start_time > now)
-    next_activity = None
-    for act in schedule_activities:
-        if act.start_time > now:
-            next_activity = act
-            break
-    
-    return (current_activity, time_remaining, next_activity)
+    return (current_activity, time_remaining, compiled.next_activity(now))
 
 
 def get_responsiveness(
-    schedule: dict | None, now: datetime | None = None
+    schedule: "dict | CompiledSchedule | None", now: datetime | None = None
 ) -> int:
     """
     Get the agent's current responsiveness based on schedule.
     
     Args:
-        schedule: Schedule dictionary with activities list, or None
+        schedule: Schedule dictionary with activities list, a CompiledSchedule, or None
         now: Current time (defaults to clock.now(UTC))
     
     Returns:
@@ -151,7 +184,7 @@ def get_responsiveness(
     if schedule is None:
         return 100
     
-    current_activity, _, _ = get_current_activity(schedule, now)
+    current_activity = _compiled(schedule).current_activity(now)
     if current_activity is None:
         return 100
     
@@ -171,24 +204,26 @@ def get_agent_responsiveness(
     Returns:
         Responsiveness value (0-100). Returns 100 if agent is None, has no
         schedule, or schedule cannot be loaded.
+
+    Uses the agent's cached compiled schedule, so repeated calls (every tick,
+    for every graph) do not touch storage.
     """
     if agent is None or not getattr(agent, "daily_schedule_description", None):
         return 100
     try:
-        schedule = agent._load_schedule()
-        return get_responsiveness(schedule, now)
+        return get_responsiveness(agent._get_compiled_schedule(), now)
     except Exception:
         return 100
 
 
 def get_wake_time(
-    schedule: dict | None, now: datetime | None = None
+    schedule: "dict | CompiledSchedule | None", now: datetime | None = None
 ) -> datetime | None:
     """
     Get the time when the agent will wake up (next activity with responsiveness > 0).
     
     Args:
-        schedule: Schedule dictionary with activities list, or None
+        schedule: Schedule dictionary with activities list, a CompiledSchedule, or None
         now: Current time (defaults to clock.now(UTC))
     
     Returns:
@@ -200,37 +235,52 @@ def get_wake_time(
     if now is None:
         now = clock.now(UTC)
     
-    current_activity, _, _ = get_current_activity(schedule, now)
+    compiled = _compiled(schedule)
+    current_activity = compiled.current_activity(now)
     
     # If not asleep (responsiveness > 0), no wake time needed
     if current_activity is None or current_activity.responsiveness > 0:
         return None
     
     # Find next activity with responsiveness > 0
-    activities = schedule.get("activities", [])
-    schedule_activities = []
-    for act_data in activities:
-        try:
-            act = ScheduleActivity.from_dict(act_data)
-            schedule_activities.append(act)
-        except Exception:
-            continue
-    
-    schedule_activities.sort(key=lambda a: a.start_time)
-    
-    for act in schedule_activities:
-        if act.start_time > now and act.responsiveness > 0:
-            return act.start_time
+    index = compiled._next_awake[compiled._started_count(now)]
+    if index < len(compiled.activities):
+        return compiled.activities[index].start_time
     
     return None
 
 
-def days_remaining(schedule: dict | None, now: datetime | None = None) -> float:
+def get_agent_wake_time(
+    agent: "Agent | None", now: datetime | None = None
+) -> datetime | None:
+    """
+    Get the earliest time an asleep agent's responsiveness may rise above 0.
+
+    That is the end of the current (asleep) activity or the start of the next
+    awake one, whichever comes first. Returns None if the agent is not asleep
+    or its schedule cannot be loaded.
+    """
+    if agent is None or not getattr(agent, "daily_schedule_description", None):
+        return None
+    try:
+        compiled = agent._get_compiled_schedule()
+    except Exception:
+        return None
+    current_activity = compiled.current_activity(now)
+    if current_activity is None or current_activity.responsiveness > 0:
+        return None
+    wake_time = get_wake_time(compiled, now)
+    if wake_time is None:
+        return current_activity.end_time
+    return min(current_activity.end_time, wake_time)
+
+
+def days_remaining(schedule: "dict | CompiledSchedule | None", now: datetime | None = None) -> float:
     """
     Calculate how many days of schedule remain from now.
     
     Args:
-        schedule: Schedule dictionary with activities list, or None
+        schedule: Schedule dictionary with activities list, a CompiledSchedule, or None
         now: Current time (defaults to clock.now(UTC))
     
     Returns:
@@ -242,20 +292,7 @@ def days_remaining(schedule: dict | None, now: datetime | None = None) -> float:
     if now is None:
         now = clock.now(UTC)
     
-    activities = schedule.get("activities", [])
-    if not activities:
-        return 0.0
-    
-    # Find the latest end_time
-    latest_end = None
-    for act_data in activities:
-        try:
-            act = ScheduleActivity.from_dict(act_data)
-            if latest_end is None or act.end_time > latest_end:
-                latest_end = act.end_time
-        except Exception:
-            continue
-    
+    latest_end = _compiled(schedule).latest_end
     if latest_end is None:
         return 0.0
     
@@ -3,6 +3,10 @@
 # Copyright (c) 2025-2026 Cindy's World LLC and contributors
 # Licensed under the MIT License. See LICENSE.md for details.
 #
+import asyncio
+import bisect
+import hashlib
+import heapq
 import json
 import logging
 import os
@@ -14,12 +18,16 @@ from enum import Enum
 
 from agent import get_agent_for_id
 from clock import clock
-from typing_state import is_partner_typing
+from typing_state import is_partner_typing, partner_typing_expires_at
 from utils.formatting import format_log_prefix_resolved
 
 logger = logging.getLogger(__name__)
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
 
+# Longest a graph with nothing to run stays parked (skipped by round-robin) without a
+# change through mark_dirty / add_task; a safety net for edits that bypass them
+_PARKED_GRAPH_RECHECK_SECONDS = 30
+
 
 class TaskStatusEncoder(json.JSONEncoder):
     """Custom JSON encoder that handles TaskStatus enums."""
@@ -199,6 +207,12 @@ class TaskGraph:
     id: str
     context: dict
     tasks: list[TaskNode] = field(default_factory=list)
+    # id -> node index kept in sync by add_task; rebuilt if `tasks` is replaced or edited directly
+    _nodes_by_id: dict[str, TaskNode] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed_tasks: list[TaskNode] | None = field(default=None, init=False, repr=False, compare=False)
+    _indexed_task_count: int = field(default=0, init=False, repr=False, compare=False)
+    # The WorkQueue this graph is indexed in, so add_task can update its task index
+    _work_queue: "WorkQueue | None" = field(default=None, init=False, repr=False, compare=False)
 
     def completed_ids(self):
         return {
@@ -232,11 +246,17 @@ class TaskGraph:
         return updated
 
     def pending_tasks(self, now: datetime):
-        self.cancel_tasks_blocked_by_terminal_dependencies()
+        if self.cancel_tasks_blocked_by_terminal_dependencies():
+            self._mark_dirty()
         done = self.completed_ids()
         pending: list[TaskNode] = []
         for task in self.tasks:
-            if not task.is_ready(done, now):
+            converting_delay = task.type == "wait" and "until" not in task.params
+            ready = task.is_ready(done, now)
+            if converting_delay and "until" in task.params:
+                # is_ready() fixed the wait's deadline; persist it so a restart keeps it
+                self._mark_dirty(task)
+            if not ready:
                 continue
             if task.type == "received" and self._is_received_blocked_by_typing():
                 continue
@@ -260,14 +280,73 @@ class TaskGraph:
 
         return is_partner_typing(agent_id, channel_id)
 
-    def get_node(self, node_id: str) -> TaskNode | None:
+    def next_ready_time(self, now: datetime) -> datetime | None:
+        """Return the earliest future time at which a blocked task may become ready.
+
+        Considers the `until` of unblocked wait tasks and, for received tasks held
+        back by a typing partner, when that typing observation expires. Returns
+        None when nothing in the graph is waiting on the clock.
+        """
+        done = self.completed_ids()
+        earliest = None
         for task in self.tasks:
-            if task.id == node_id:
-                return task
-        return None
+            if task.status != TaskStatus.PENDING:
+                continue
+            if not all(dep in done for dep in task.depends_on):
+                continue
+            candidate = None
+            if task.type == "wait":
+                until = task.params.get("until")
+                if until:
+                    try:
+                        candidate = datetime.strptime(until.strip(), ISO_FORMAT)
+                    except ValueError:
+                        candidate = None
+            elif task.type == "received" and self._is_received_blocked_by_typing():
+                candidate = partner_typing_expires_at(
+                    self.context.get("agent_id"), self.context.get("channel_id")
+                )
+            if candidate is not None and candidate > now:
+                if earliest is None or candidate < earliest:
+                    earliest = candidate
+        return earliest
+
+    def conversation_key(self) -> tuple:
+        """Return the key identifying this graph's conversation for scheduling.
+
+        Graphs without both agent_id and channel_id fall back to their graph id.
+        """
+        agent_id = self.context.get("agent_id")
+        channel_id = self.context.get("channel_id")
+        if agent_id is None or channel_id is None:
+            return ("graph", self.id)
+        return (agent_id, channel_id)
+
+    def _mark_dirty(self, task: TaskNode | None = None):
+        if self._work_queue is not None:
+            self._work_queue.mark_dirty(self, task)
+
+    def _node_index(self) -> dict[str, TaskNode]:
+        if self._indexed_tasks is not self.tasks or self._indexed_task_count != len(self.tasks):
+            nodes: dict[str, TaskNode] = {}
+            for task in self.tasks:
+                # Keep the first node for a duplicated id, matching a linear search
+                nodes.setdefault(task.id, task)
+            self._nodes_by_id = nodes
+            self._indexed_tasks = self.tasks
+            self._indexed_task_count = len(self.tasks)
+        return self._nodes_by_id
+
+    def get_node(self, node_id: str) -> TaskNode | None:
+        return self._node_index().get(node_id)
 
     def add_task(self, task: TaskNode):
+        nodes = self._node_index()
         self.tasks.append(task)
+        nodes.setdefault(task.id, task)
+        self._indexed_task_count = len(self.tasks)
+        if self._work_queue is not None:
+            self._work_queue._index_task(self, task)
 
 
 @dataclass
@@ -276,99 +355,589 @@ class WorkQueue:
     _lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
     _last_index: int = field(default=0, init=False, repr=False)
     _state_file_path: str | None = field(default=None, init=False, repr=False)
+    # Min-heap of future times at which some task may become ready (see schedule_wakeup)
+    _ready_heap: list[datetime] = field(default_factory=list, init=False, repr=False, compare=False)
+    _ready_times: set[datetime] = field(default_factory=set, init=False, repr=False, compare=False)
+    # Wakeup signal for the event-driven tick loop (see notify / wait_for_work)
+    _wakeup_event: asyncio.Event | None = field(default=None, init=False, repr=False, compare=False)
+    _wakeup_loop: asyncio.AbstractEventLoop | None = field(default=None, init=False, repr=False, compare=False)
+    _wakeup_requested: bool = field(default=False, init=False, repr=False, compare=False)
+    # Secondary indexes over _task_graphs, rebuilt lazily if the list is replaced directly
+    # Each queued graph has a slot number that only changes when slots are renumbered; its
+    # position in _task_graphs is its slot minus the removed slots before it (see _position_of)
+    _slots: dict[int, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _removed_slots: list[int] = field(default_factory=list, init=False, repr=False, compare=False)
+    _next_slot: int = field(default=0, init=False, repr=False, compare=False)
+    _graphs_by_task_id: dict[str, list[TaskGraph]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _graphs_by_conversation: dict[tuple, list[TaskGraph]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _graphs_by_agent: dict[object, list[TaskGraph]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed_graphs: list[TaskGraph] | None = field(default=None, init=False, repr=False, compare=False)
+    _indexed_graph_count: int = field(default=0, init=False, repr=False, compare=False)
+    # Journaled persistence (see enable_journal / save): pending changes since the last save,
+    # keyed by graph id -> ("put_graph", graph) | ("remove_graph", None), plus per-task upserts
+    _journal_enabled: bool = field(default=False, init=False, repr=False, compare=False)
+    _journal_compact_threshold: int = field(default=1000, init=False, repr=False, compare=False)
+    _journal_record_count: int = field(default=0, init=False, repr=False, compare=False)
+    _needs_snapshot: bool = field(default=True, init=False, repr=False, compare=False)
+    # Digest of the snapshot the journal extends; written as the journal's first record
+    _snapshot_digest: str | None = field(default=None, init=False, repr=False, compare=False)
+    _pending_graph_ops: dict[str, tuple] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _pending_task_puts: dict[tuple[str, str], tuple] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # Round-robin visits only due graphs: the slots of graphs that may have a runnable task,
+    # in queue order. A graph found with nothing to run is parked (by id) until its next ready
+    # time, a change reported through mark_dirty, or _PARKED_GRAPH_RECHECK_SECONDS
+    _due_slots: list[int] = field(default_factory=list, init=False, repr=False, compare=False)
+    _parked: dict[int, datetime] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _park_heap: list[tuple] = field(default_factory=list, init=False, repr=False, compare=False)
+    _park_seq: int = field(default=0, init=False, repr=False, compare=False)
+    # Graphs (by id) the tick's housekeeping acts on, kept current by mark_dirty, add_graph and
+    # remove so the tick never scans the whole queue: graphs whose tasks are all terminal, and
+    # graphs with a pending typing/online wait (see completed_graphs / indicator_graphs)
+    _completed: dict[int, TaskGraph] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indicator_waits: dict[int, TaskGraph] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @staticmethod
+    def _conversation_index_key(context: dict) -> tuple:
+        return (context.get("agent_id"), context.get("channel_id"))
+
+    def _ensure_indexes(self):
+        """Rebuild the secondary indexes if _task_graphs was replaced or edited directly."""
+        if (
+            self._indexed_graphs is self._task_graphs
+            and self._indexed_graph_count == len(self._task_graphs)
+        ):
+            return
+        self._parked = {}
+        self._park_heap = []
+        self._completed = {}
+        self._indicator_waits = {}
+        self._renumber_slots()
+        self._graphs_by_task_id = {}
+        self._graphs_by_conversation = {}
+        self._graphs_by_agent = {}
+        for graph in self._task_graphs:
+            self._index_graph(graph)
+        self._indexed_graphs = self._task_graphs
+        self._indexed_graph_count = len(self._task_graphs)
+        # The list was replaced or edited outside the tracked paths; the journal can't describe it
+        self._needs_snapshot = True
+
+    def _index_graph(self, graph: TaskGraph):
+        graph._work_queue = self
+        for task in graph.tasks:
+            self._graphs_by_task_id.setdefault(task.id, []).append(graph)
+        self._graphs_by_conversation.setdefault(
+            self._conversation_index_key(graph.context), []
+        ).append(graph)
+        self._graphs_by_agent.setdefault(graph.context.get("agent_id"), []).append(graph)
+        self._track_housekeeping(graph)
+
+    def _track_housekeeping(self, graph: TaskGraph):
+        """Update whether graph is complete or has a pending typing/online wait."""
+        key = id(graph)
+        if all(task.status.is_completed() for task in graph.tasks):
+            self._completed[key] = graph
+        else:
+            self._completed.pop(key, None)
+        if any(_is_indicator_wait(task) for task in graph.tasks):
+            self._indicator_waits[key] = graph
+        else:
+            self._indicator_waits.pop(key, None)
+
+    def _unindex_graph(self, graph: TaskGraph):
+        for task in graph.tasks:
+            _discard_from_index(self._graphs_by_task_id, task.id, graph)
+        _discard_from_index(
+            self._graphs_by_conversation, self._conversation_index_key(graph.context), graph
+        )
+        _discard_from_index(self._graphs_by_agent, graph.context.get("agent_id"), graph)
+        if graph._work_queue is self:
+            graph._work_queue = None
+
+    def _index_task(self, graph: TaskGraph, task: TaskNode):
+        """Record a task added to a graph that is already in the queue."""
+        with self._lock:
+            self._ensure_indexes()
+            if id(graph) not in self._slots:
+                return
+            graphs = self._graphs_by_task_id.setdefault(task.id, [])
+            if not any(g is graph for g in graphs):
+                graphs.append(graph)
+            self.mark_dirty(graph, task)
+
+    def _renumber_slots(self):
+        self._slots = {id(graph): slot for slot, graph in enumerate(self._task_graphs)}
+        self._removed_slots = []
+        self._next_slot = len(self._task_graphs)
+        self._due_slots = [
+            slot for slot, graph in enumerate(self._task_graphs) if id(graph) not in self._parked
+        ]
+
+    def _position_of(self, graph: TaskGraph) -> int | None:
+        """Return the index of graph in _task_graphs, or None if it is not queued."""
+        slot = self._slots.get(id(graph))
+        if slot is None:
+            return None
+        return slot - bisect.bisect_left(self._removed_slots, slot)
+
+    def _graph_at_slot(self, slot: int) -> tuple[int, TaskGraph]:
+        """Return (position, graph) for a queued graph's slot."""
+        position = slot - bisect.bisect_left(self._removed_slots, slot)
+        return position, self._task_graphs[position]
+
+    def _discard_due_slot(self, slot: int):
+        index = bisect.bisect_left(self._due_slots, slot)
+        if index < len(self._due_slots) and self._due_slots[index] == slot:
+            del self._due_slots[index]
+
+    def _park(self, graph: TaskGraph, until: datetime):
+        """Skip graph in round-robin until `until` or until it is reported changed."""
+        slot = self._slots.get(id(graph))
+        if slot is None or id(graph) in self._parked:
+            return
+        self._discard_due_slot(slot)
+        self._parked[id(graph)] = until
+        self._park_seq += 1
+        heapq.heappush(self._park_heap, (until, self._park_seq, graph))
+
+    def _unpark(self, graph: TaskGraph):
+        if self._parked.pop(id(graph), None) is None:
+            return
+        slot = self._slots.get(id(graph))
+        if slot is not None:
+            bisect.insort(self._due_slots, slot)
+
+    def _release_parked(self, now: datetime):
+        """Make graphs whose park time has passed due again."""
+        heap = self._park_heap
+        while heap and heap[0][0] <= now:
+            until, _, graph = heapq.heappop(heap)
+            # Skip entries superseded by an unpark (and possibly a later park)
+            if self._parked.get(id(graph)) == until:
+                self._unpark(graph)
+
+    def _due_graphs(self, now: datetime):
+        """Yield (position, graph) for due graphs in round-robin order from _last_index."""
+        self._release_parked(now)
+        # Copy: callers park graphs while iterating
+        due = list(self._due_slots)
+        if not due:
+            return
+        cursor = self._task_graphs[self._last_index % len(self._task_graphs)]
+        start = bisect.bisect_left(due, self._slots[id(cursor)])
+        for i in range(len(due)):
+            yield self._graph_at_slot(due[(start + i) % len(due)])
+
+    def _park_until_ready(self, graph: TaskGraph, now: datetime):
+        """Park a graph with nothing to run, waking the tick loop when a task may become ready."""
+        # Also catches graphs completed by edits that bypassed mark_dirty
+        self._track_housekeeping(graph)
+        recheck_at = now + timedelta(seconds=_PARKED_GRAPH_RECHECK_SECONDS)
+        ready_at = graph.next_ready_time(now)
+        if ready_at is not None:
+            self.schedule_wakeup(ready_at)
+            recheck_at = min(recheck_at, ready_at)
+        self._park(graph, recheck_at)
+
+    def _park_unschedulable(self, graph: TaskGraph, now: datetime):
+        """Park a graph whose agent is disabled or asleep until the agent may wake."""
+        recheck_at = now + timedelta(seconds=_PARKED_GRAPH_RECHECK_SECONDS)
+        try:
+            from schedule import get_agent_wake_time
+
+            wake_at = get_agent_wake_time(get_agent_for_id(graph.context.get("agent_id")), now)
+        except Exception:
+            wake_at = None
+        if wake_at is not None:
+            recheck_at = min(recheck_at, max(wake_at, now))
+        self._park(graph, recheck_at)
+
+    def _remove_at(self, position: int):
+        """Remove the graph at `position`, keeping the other graphs in order.
+
+        Later graphs keep their slot numbers, so removal does not rewrite their
+        positions; slots are renumbered once removals pile up. _last_index moves
+        with the graphs so round-robin resumes where it left off.
+        """
+        graphs = self._task_graphs
+        graph = graphs.pop(position)
+        slot = self._slots.pop(id(graph))
+        self._discard_due_slot(slot)
+        self._parked.pop(id(graph), None)
+        self._completed.pop(id(graph), None)
+        self._indicator_waits.pop(id(graph), None)
+        bisect.insort(self._removed_slots, slot)
+        if len(self._removed_slots) > max(64, len(graphs) // 8):
+            self._renumber_slots()
+        if position < self._last_index:
+            self._last_index -= 1
+        self._unindex_graph(graph)
+        self._indexed_graph_count = len(graphs)
+        if self._journal_enabled:
+            self._pending_graph_ops[graph.id] = ("remove_graph", None)
+
+    def _remove_graphs(self, graphs):
+        """Remove several queued graphs, from the back so earlier positions stay valid."""
+        positions = [self._position_of(graph) for graph in graphs]
+        for position in sorted(positions, reverse=True):
+            self._remove_at(position)
 
     def remove_all(self, predicate):
         with self._lock:
             self._task_graphs = [
                 g for g in self._task_graphs if not predicate(g.context)
             ]
+            self._needs_snapshot = True
 
     def remove(self, graph: TaskGraph):
         with self._lock:
-            self._task_graphs = [g for g in self._task_graphs if not g == graph]
+            self._ensure_indexes()
+            position = self._position_of(graph)
+            if position is not None and self._task_graphs[position] is graph:
+                self._remove_at(position)
+
+    def remove_conversation(self, agent_id, channel_id):
+        """Remove every graph for the (agent_id, channel_id) conversation."""
+        with self._lock:
+            self._ensure_indexes()
+            self._remove_graphs(self._graphs_by_conversation.get((agent_id, channel_id), ()))
+
+    def _is_graph_schedulable(self, graph: TaskGraph, now: datetime) -> bool:
+        """Return False if the graph's agent is disabled or asleep (without a bypass task)."""
+        # Skip graphs for agents that are asleep (responsiveness 0)
+        # Exception: xsend tasks bypass schedule delays and are processed immediately
+        agent_id = graph.context.get("agent_id")
+        if not agent_id:
+            return True
+        try:
+            from agent import get_agent_for_id
+            from schedule import get_agent_responsiveness
+            agent = get_agent_for_id(agent_id)
+            if agent and agent.is_disabled:
+                # Skip graphs for disabled agents
+                # They will eventually be cleaned up by run_one_tick when selected,
+                # but skipping them here prevents them from clogging the round-robin.
+                return False
+            responsiveness = get_agent_responsiveness(agent, now)
+            if responsiveness <= 0:
+                # Check if there are any xsend-triggered received tasks
+                # xsend tasks bypass schedule delays and should be processed immediately
+                has_bypass_task = False
+                for task in graph.tasks:
+                    if (
+                        task.type == "received"
+                        and not task.status.is_completed()
+                        and task.params.get("xsend_intent")
+                    ):
+                        has_bypass_task = True
+                        break
+                if not has_bypass_task:
+                    # Agent is asleep and no bypass tasks, skip this graph
+                    channel_id = graph.context.get("channel_id")
+                    logger.debug(
+                        f"{format_log_prefix_resolved(agent.name, None)} "
+                        f"Skipping graph {graph.id} (channel {channel_id}) - agent responsiveness is {responsiveness}"
+                    )
+                    return False
+        except Exception:
+            # If we can't check responsiveness, proceed normally
+            pass
+        return True
 
     def round_robin_one_task(self) -> TaskNode | None:
         with self._lock:
             now = clock.now(UTC)
+            self._ensure_indexes()
             if not self._task_graphs:
                 return None
 
-            start = self._last_index % len(self._task_graphs)
-            for i in range(len(self._task_graphs)):
-                index = (start + i) % len(self._task_graphs)
-                graph = self._task_graphs[index]
-                
-                # Skip graphs for agents that are asleep (responsiveness 0)
-                # Exception: xsend tasks bypass schedule delays and are processed immediately
-                agent_id = graph.context.get("agent_id")
-                if agent_id:
-                    try:
-                        from agent import get_agent_for_id
-                        from schedule import get_agent_responsiveness
-                        agent = get_agent_for_id(agent_id)
-                        if agent and agent.is_disabled:
-                            # Skip graphs for disabled agents
-                            # They will eventually be cleaned up by run_one_tick when selected,
-                            # but skipping them here prevents them from clogging the round-robin.
-                            continue
-                        responsiveness = get_agent_responsiveness(agent, now)
-                        if responsiveness <= 0:
-                            # Check if there are any xsend-triggered received tasks
-                            # xsend tasks bypass schedule delays and should be processed immediately
-                            has_bypass_task = False
-                            for task in graph.tasks:
-                                if (
-                                    task.type == "received"
-                                    and not task.status.is_completed()
-                                    and task.params.get("xsend_intent")
-                                ):
-                                    has_bypass_task = True
-                                    break
-                            if not has_bypass_task:
-                                # Agent is asleep and no bypass tasks, skip this graph
-                                channel_id = graph.context.get("channel_id")
-                                logger.debug(
-                                    f"{format_log_prefix_resolved(agent.name, None)} "
-                                    f"Skipping graph {graph.id} (channel {channel_id}) - agent responsiveness is {responsiveness}"
-                                )
-                                continue
-                    except Exception:
-                        # If we can't check responsiveness, proceed normally
-                        pass
-                
+            for index, graph in self._due_graphs(now):
+                if not self._is_graph_schedulable(graph, now):
+                    self._park_unschedulable(graph, now)
+                    continue
+
                 tasks = graph.pending_tasks(now)
                 if tasks:
                     self._last_index = (index + 1) % len(self._task_graphs)
                     return tasks[0]
+                self._park_until_ready(graph, now)
             return None
 
+    def round_robin_tasks(
+        self,
+        max_tasks: int,
+        *,
+        busy_conversations: set | None = None,
+        agent_task_counts: dict | None = None,
+        max_tasks_per_agent: int | None = None,
+    ) -> list[tuple[TaskNode, TaskGraph]]:
+        """Select up to `max_tasks` runnable tasks, at most one per conversation.
+
+        Uses the same fairness and eligibility rules as `round_robin_one_task`, but
+        keeps walking the queue after the first hit so that several conversations
+        can run at once. Both visit only due graphs: graphs found with nothing to
+        run, or whose agent is asleep or disabled, are parked until they may be
+        ready again (see _park_until_ready), so a tick costs the same however many
+        graphs are waiting.
+
+        Args:
+            max_tasks: Maximum number of tasks to return.
+            busy_conversations: Conversation keys (see `TaskGraph.conversation_key`)
+                that already have a task in flight; their graphs are skipped.
+            agent_task_counts: Number of in-flight tasks per agent id.
+            max_tasks_per_agent: Upper bound on in-flight tasks per agent, or None.
+
+        Returns:
+            List of (task, graph) pairs in round-robin order.
+        """
+        selected: list[tuple[TaskNode, TaskGraph]] = []
+        if max_tasks <= 0:
+            return selected
+
+        busy = set(busy_conversations or ())
+        agent_counts = dict(agent_task_counts or {})
+
+        with self._lock:
+            now = clock.now(UTC)
+            self._ensure_indexes()
+            if not self._task_graphs:
+                return selected
+
+            for index, graph in self._due_graphs(now):
+                key = graph.conversation_key()
+                if key in busy:
+                    continue
+
+                agent_id = graph.context.get("agent_id")
+                if (
+                    max_tasks_per_agent is not None
+                    and agent_counts.get(agent_id, 0) >= max_tasks_per_agent
+                ):
+                    continue
+
+                if not self._is_graph_schedulable(graph, now):
+                    self._park_unschedulable(graph, now)
+                    continue
+
+                tasks = graph.pending_tasks(now)
+                if not tasks:
+                    self._park_until_ready(graph, now)
+                    continue
+
+                selected.append((tasks[0], graph))
+                busy.add(key)
+                agent_counts[agent_id] = agent_counts.get(agent_id, 0) + 1
+                self._last_index = (index + 1) % len(self._task_graphs)
+                if len(selected) >= max_tasks:
+                    break
+            return selected
+
+    def schedule_wakeup(self, when: datetime):
+        """Record a future time at which the tick loop should run again."""
+        with self._lock:
+            if when in self._ready_times:
+                return
+            self._ready_times.add(when)
+            heapq.heappush(self._ready_heap, when)
+
+    def next_wakeup_time(self, now: datetime) -> datetime | None:
+        """Drop wakeups that are already due and return the earliest future one."""
+        with self._lock:
+            while self._ready_heap and self._ready_heap[0] <= now:
+                self._ready_times.discard(heapq.heappop(self._ready_heap))
+            return self._ready_heap[0] if self._ready_heap else None
+
+    def notify(self):
+        """Wake the event-driven tick loop right away. Safe to call from any thread."""
+        self._wakeup_requested = True
+        loop = self._wakeup_loop
+        event = self._wakeup_event
+        if loop is None or event is None or loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            event.set()
+        else:
+            loop.call_soon_threadsafe(event.set)
+
+    async def wait_for_work(self, timeout: float) -> bool:
+        """Sleep until notify() is called or `timeout` seconds pass.
+
+        Returns True if woken by a notification, False on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        if self._wakeup_event is None or self._wakeup_loop is not loop:
+            self._wakeup_event = asyncio.Event()
+            self._wakeup_loop = loop
+
+        woken = self._wakeup_requested
+        if not woken and timeout > 0:
+            try:
+                await asyncio.wait_for(self._wakeup_event.wait(), timeout)
+                woken = True
+            except TimeoutError:
+                woken = False
+        self._wakeup_requested = False
+        self._wakeup_event.clear()
+        return woken
+
     def _serialize(self) -> str:
         return json.dumps(
-            [
-                {
-                    "id": graph.id,
-                    "context": graph.context,
-                    "nodes": [task.__dict__ for task in graph.tasks],
-                }
-                for graph in self._task_graphs
-            ],
+            [_graph_to_dict(graph) for graph in self._task_graphs],
             indent=2,
             cls=TaskStatusEncoder,
         )
 
+    def enable_journal(self, compact_threshold: int = 1000):
+        """Switch save() to append-only journaling.
+
+        In journal mode, save() appends one compact JSON record per changed graph or
+        task to `<state file>.journal` instead of rewriting the whole state file.
+        Once `compact_threshold` records have accumulated (or a change can't be
+        expressed as records), the next save() writes a full snapshot and
+        truncates the journal.
+        """
+        with self._lock:
+            self._journal_enabled = True
+            self._journal_compact_threshold = compact_threshold
+            self._needs_snapshot = True
+
+    def mark_dirty(self, graph: TaskGraph, task: TaskNode | None = None):
+        """Record that a queued graph (or one of its tasks) changed since the last save.
+
+        Also makes round-robin check the graph again if it was parked and refreshes
+        the tick's housekeeping sets. Changes made through add_graph, remove,
+        TaskGraph.add_task and the tick are tracked automatically.
+        """
+        if graph._work_queue is not self:
+            return
+        with self._lock:
+            self._unpark(graph)
+            self._track_housekeeping(graph)
+            if not self._journal_enabled:
+                return
+            op = self._pending_graph_ops.get(graph.id)
+            if op is not None and op[0] == "put_graph":
+                return
+            if task is None:
+                self._pending_graph_ops[graph.id] = ("put_graph", graph)
+            else:
+                self._pending_task_puts[(graph.id, task.id)] = (graph, task)
+
+    def _journal_records(self) -> list[dict]:
+        records = []
+        for graph_id, (op, graph) in self._pending_graph_ops.items():
+            if op == "put_graph":
+                records.append({"op": "put_graph", "graph": _graph_to_dict(graph)})
+            else:
+                records.append({"op": "remove_graph", "graph_id": graph_id})
+        for (graph_id, _), (_graph, task) in self._pending_task_puts.items():
+            if graph_id in self._pending_graph_ops:
+                continue
+            records.append({"op": "put_task", "graph_id": graph_id, "task": task.__dict__})
+        return records
+
+    def _clear_pending_changes(self):
+        self._pending_graph_ops = {}
+        self._pending_task_puts = {}
+
+    def _append_journal(self, save_path: str):
+        records = self._journal_records()
+        self._clear_pending_changes()
+        if not records:
+            return
+        self._journal_record_count += len(records)
+        journal = save_path + ".journal"
+        if not os.path.exists(journal):
+            # Tie a new journal to its snapshot so a stale journal is never replayed
+            records.insert(0, {"op": "snapshot", "digest": self._snapshot_digest})
+        lines = "".join(
+            json.dumps(record, separators=(",", ":"), cls=TaskStatusEncoder) + "\n"
+            for record in records
+        )
+        with open(journal, "a") as f:
+            f.write(lines)
+
+    def _write_snapshot(self, save_path: str):
+        data = self._serialize()
+        backup = save_path + ".bak"
+        tmp = save_path + ".tmp"
+        if os.path.exists(save_path):
+            shutil.copy2(save_path, backup)
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, save_path)
+        self._snapshot_digest = _snapshot_digest(data.encode())
+        # The snapshot now includes everything the journal described. If we crash before
+        # the journal is removed, its snapshot record no longer matches and load skips it.
+        journal = save_path + ".journal"
+        if os.path.exists(journal):
+            os.remove(journal)
+        self._journal_record_count = 0
+        self._needs_snapshot = False
+        self._clear_pending_changes()
+
+    def compact(self, path: str | None = None):
+        """Write a full snapshot and truncate the journal."""
+        save_path = path or self._state_file_path
+        if save_path is None:
+            raise ValueError("No file path provided and _state_file_path is not set")
+        with self._lock:
+            self._ensure_indexes()
+            self._write_snapshot(save_path)
+
     def add_graph(self, graph: TaskGraph):
         with self._lock:
+            self._ensure_indexes()
             self._task_graphs.append(graph)
+            self._slots[id(graph)] = self._next_slot
+            # The newest slot is the largest, so appending keeps _due_slots sorted
+            self._due_slots.append(self._next_slot)
+            self._next_slot += 1
+            self._index_graph(graph)
+            self._indexed_graph_count = len(self._task_graphs)
+            self.mark_dirty(graph)
+        self.notify()
+
+    def completed_graphs(self) -> list[TaskGraph]:
+        """Return the queued graphs whose tasks are all terminal, without scanning the queue."""
+        with self._lock:
+            self._ensure_indexes()
+            graphs = []
+            for key, graph in list(self._completed.items()):
+                if all(task.status.is_completed() for task in graph.tasks):
+                    graphs.append(graph)
+                else:
+                    # Reopened by an edit that bypassed mark_dirty
+                    del self._completed[key]
+            return graphs
+
+    def indicator_graphs(self) -> list[TaskGraph]:
+        """Return the queued graphs with a pending wait task that has typing or online set."""
+        with self._lock:
+            self._ensure_indexes()
+            return list(self._indicator_waits.values())
 
     def graph_containing(self, task: TaskNode):
         with self._lock:
-            for graph in self._task_graphs:
+            self._ensure_indexes()
+            candidates = self._graphs_by_task_id.get(task.id, ())
+            for graph in candidates:
+                if graph.get_node(task.id) is task:
+                    return graph
+            for graph in candidates:
                 if task in graph.tasks:
                     return graph
             return None
 
     def save(self, path: str | None = None):
         """Saves the current state of the work queue to a file.
+
+        In journal mode (see enable_journal) this appends only the changes since
+        the last save, compacting into a full snapshot when the journal grows.
         
         Args:
             path: Optional file path. If not provided, uses the stored _state_file_path.
@@ -379,73 +948,45 @@ class WorkQueue:
             raise ValueError("No file path provided and _state_file_path is not set")
         
         with self._lock:
-            data = self._serialize()
-            backup = save_path + ".bak"
-            tmp = save_path + ".tmp"
-            if os.path.exists(save_path):
-                shutil.copy2(save_path, backup)
-            with open(tmp, "w") as f:
-                f.write(data)
-            os.replace(tmp, save_path)
+            self._ensure_indexes()
+            if (
+                self._journal_enabled
+                and not self._needs_snapshot
+                and self._journal_record_count < self._journal_compact_threshold
+            ):
+                self._append_journal(save_path)
+            else:
+                self._write_snapshot(save_path)
 
     @classmethod
     def _load(cls, path: str):
         """Private method to load WorkQueue from a file. Use get_instance() instead."""
-        if not os.path.exists(path):
-            instance = cls()
-            instance._state_file_path = path
-            return instance
-
-        with open(path) as f:
-            content = f.read()
-
-        content = content.strip()
-        if not content:
-            instance = cls()
-            instance._state_file_path = path
-            return instance
-
-        parsed = json.loads(content)
-        if isinstance(parsed, dict):
-            graphs_data = parsed.get("task_graphs", [])
-        elif isinstance(parsed, list):
-            graphs_data = parsed
-        else:
-            logger.warning(
-                "Unexpected JSON structure in work queue file; defaulting to empty queue."
-            )
-            graphs_data = []
-
-        graphs = []
-        for graph_data in graphs_data or []:
-            tasks = []
-            for task_data in graph_data.get("nodes", []):
-                task_dict = dict(task_data)
-                task_identifier = task_dict.get("id")
-                status_value = task_dict.get("status")
-
-                if status_value == TaskStatus.ACTIVE.value:
-                    task_dict["status"] = TaskStatus.PENDING
-                    logger.info(
-                        f"Reverted active task {task_identifier} to pending on load."
-                    )
-                elif status_value is None:
-                    task_dict["status"] = TaskStatus.PENDING
+        graphs_data = []
+        digest = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                raw = f.read()
+            digest = _snapshot_digest(raw)
+            content = raw.decode().strip()
+            if content:
+                parsed = json.loads(content)
+                if isinstance(parsed, dict):
+                    graphs_data = parsed.get("task_graphs", [])
+                elif isinstance(parsed, list):
+                    graphs_data = parsed
                 else:
-                    task_dict["status"] = _normalize_task_status(
-                        status_value, task_identifier
+                    logger.warning(
+                        "Unexpected JSON structure in work queue file; defaulting to empty queue."
                     )
 
-                tasks.append(TaskNode(**task_dict))
+        graphs_by_id: dict[str, TaskGraph] = {}
+        for graph_data in graphs_data or []:
+            graph = _graph_from_dict(graph_data)
+            graphs_by_id[graph.id] = graph
 
-            graphs.append(
-                TaskGraph(
-                    id=graph_data["id"],
-                    context=graph_data["context"],
-                    tasks=tasks,
-                )
-            )
-        instance = cls(_task_graphs=graphs)
+        _replay_journal(path + ".journal", graphs_by_id, digest)
+
+        instance = cls(_task_graphs=list(graphs_by_id.values()))
         instance._state_file_path = path
         return instance
 
@@ -453,34 +994,153 @@ class WorkQueue:
         self, agent_id: int, channel_id: int
     ) -> TaskGraph | None:
         with self._lock:
-            for graph in self._task_graphs:
-                if (
-                    graph.context.get("agent_id") == agent_id
-                    and graph.context.get("channel_id") == channel_id
-                ):
-                    return graph
-            return None
+            self._ensure_indexes()
+            graphs = self._graphs_by_conversation.get((agent_id, channel_id))
+            # Index lists are in insertion order, so this is the earliest-added graph
+            return graphs[0] if graphs else None
+
+    def graphs_for_agent(self, agent_id) -> list[TaskGraph]:
+        """Return the graphs whose context has the given agent_id."""
+        with self._lock:
+            self._ensure_indexes()
+            return list(self._graphs_by_agent.get(agent_id, ()))
 
     def clear_tasks_for_agent(self, agent_id: int | None = None, agent_config_name: str | None = None, agent_display_name: str | None = None):
         """Remove all task graphs belonging to a specific agent."""
         with self._lock:
-            new_graphs = []
-            for g in self._task_graphs:
-                match = False
-                if agent_id is not None and g.context.get("agent_id") == agent_id:
-                    match = True
-                if agent_config_name is not None and g.context.get("agent_config_name") == agent_config_name:
-                    match = True
-                if agent_display_name is not None and g.context.get("agent_name") == agent_display_name:
-                    match = True
-                
-                if not match:
-                    new_graphs.append(g)
-            
-            self._task_graphs = new_graphs
+            self._ensure_indexes()
+            matches = {}
+            if agent_id is not None:
+                for g in self._graphs_by_agent.get(agent_id, ()):
+                    matches[id(g)] = g
+            # Names are not indexed; this admin-only path scans for them
+            if agent_config_name is not None or agent_display_name is not None:
+                for g in self._task_graphs:
+                    if agent_config_name is not None and g.context.get("agent_config_name") == agent_config_name:
+                        matches[id(g)] = g
+                    if agent_display_name is not None and g.context.get("agent_name") == agent_display_name:
+                        matches[id(g)] = g
+
+            self._remove_graphs(matches.values())
             self.save()
 
 
+def _is_indicator_wait(task: TaskNode) -> bool:
+    """True for a pending wait task that shows the agent typing or online."""
+    return (
+        task.type == "wait"
+        and task.status == TaskStatus.PENDING
+        and bool(task.params.get("typing") or task.params.get("online"))
+    )
+
+
+def _graph_to_dict(graph: TaskGraph) -> dict:
+    return {
+        "id": graph.id,
+        "context": graph.context,
+        "nodes": [task.__dict__ for task in graph.tasks],
+    }
+
+
+def _task_from_dict(task_data: dict) -> TaskNode:
+    task_dict = dict(task_data)
+    task_identifier = task_dict.get("id")
+    status_value = task_dict.get("status")
+
+    if status_value == TaskStatus.ACTIVE.value:
+        task_dict["status"] = TaskStatus.PENDING
+        logger.info(
+            f"Reverted active task {task_identifier} to pending on load."
+        )
+    elif status_value is None:
+        task_dict["status"] = TaskStatus.PENDING
+    else:
+        task_dict["status"] = _normalize_task_status(
+            status_value, task_identifier
+        )
+
+    return TaskNode(**task_dict)
+
+
+def _graph_from_dict(graph_data: dict) -> TaskGraph:
+    return TaskGraph(
+        id=graph_data["id"],
+        context=graph_data["context"],
+        tasks=[_task_from_dict(task_data) for task_data in graph_data.get("nodes", [])],
+    )
+
+
+def _snapshot_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _replay_journal(
+    journal_path: str, graphs_by_id: dict[str, TaskGraph], snapshot_digest: str | None
+):
+    """Apply journal records on top of the snapshot's graphs, in order.
+
+    A journal starts with a "snapshot" record naming the snapshot it extends. If that
+    is not the snapshot on disk (a crash after compacting but before the journal was
+    removed), its records are older than the snapshot and the journal is ignored.
+    """
+    if not os.path.exists(journal_path):
+        return
+    applied = 0
+    with open(journal_path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                op = record["op"]
+                if op == "snapshot":
+                    if record.get("digest") != snapshot_digest:
+                        logger.warning(
+                            f"Ignoring stale work queue journal {journal_path}; "
+                            "the snapshot already includes its changes"
+                        )
+                        return
+                    continue
+                if op == "put_graph":
+                    graph = _graph_from_dict(record["graph"])
+                    graphs_by_id[graph.id] = graph
+                elif op == "remove_graph":
+                    graphs_by_id.pop(record["graph_id"], None)
+                elif op == "put_task":
+                    graph = graphs_by_id.get(record["graph_id"])
+                    if graph is None:
+                        continue
+                    task = _task_from_dict(record["task"])
+                    for i, existing in enumerate(graph.tasks):
+                        if existing.id == task.id:
+                            graph.tasks[i] = task
+                            break
+                    else:
+                        graph.tasks.append(task)
+                else:
+                    logger.warning(f"Unknown work queue journal op '{op}' at line {line_number}")
+                    continue
+                applied += 1
+            except (ValueError, KeyError, TypeError) as e:
+                # A crash mid-append can leave a partial last line
+                logger.warning(f"Skipping unreadable work queue journal line {line_number}: {e}")
+    if applied:
+        logger.info(f"Replayed {applied} work queue journal record(s) from {journal_path}")
+
+
+def _discard_from_index(index: dict, key, graph: TaskGraph):
+    graphs = index.get(key)
+    if not graphs:
+        return
+    for i, g in enumerate(graphs):
+        if g is graph:
+            del graphs[i]
+            break
+    if not graphs:
+        del index[key]
+
+
 # Singleton instance (outside dataclass)
 _work_queue_instance: WorkQueue | None = None
 _work_queue_lock: threading.Lock = threading.Lock()
@@ -494,13 +1154,20 @@ def _get_work_queue_instance() -> WorkQueue:
             # Double-check locking pattern
             if _work_queue_instance is None:
                 import os
-                from config import STATE_DIRECTORY
+
+                from config import (
+                    STATE_DIRECTORY,
+                    WORK_QUEUE_JOURNAL,
+                    WORK_QUEUE_JOURNAL_COMPACT_RECORDS,
+                )
                 state_path = os.path.join(STATE_DIRECTORY, "work_queue.json")
-                if os.path.exists(state_path):
+                if os.path.exists(state_path) or os.path.exists(state_path + ".journal"):
                     _work_queue_instance = WorkQueue._load(state_path)
                 else:
                     _work_queue_instance = WorkQueue()
                     _work_queue_instance._state_file_path = state_path
+                if WORK_QUEUE_JOURNAL:
+                    _work_queue_instance.enable_journal(WORK_QUEUE_JOURNAL_COMPACT_RECORDS)
     return _work_queue_instance
 
 
@@ -210,6 +210,7 @@ async def insert_received_task_for_conversation(
                                 task.params["clear_reactions"] = True
                                 updated = True
                             if updated:
+                                work_queue.mark_dirty(old_graph, task)
                                 work_queue.save()
                                 logger.debug(f"{log_prefix} Updated flags on existing task {task.id}")
                             return
@@ -241,6 +242,7 @@ async def insert_received_task_for_conversation(
                         f"{task.id} (status: {task.status}) already exists for conversation {channel_id}"
                     )
                     # Save the work queue state after updating existing task params                    
+                    work_queue.mark_dirty(old_graph, task)
                     try:
                         work_queue.save()
                         logger.debug(f"{log_prefix} Saved work queue state after updating task {task.id}")
@@ -331,12 +333,7 @@ async def insert_received_task_for_conversation(
             # if preserved_tasks:
             #     logger.info(f"Preserving {len(preserved_tasks)} callout tasks from old graph.")
 
-        def conversation_matcher(ctx):
-            return (
-                ctx.get("channel_id") == channel_id_int and ctx.get("agent_id") == agent_id_int
-            )
-
-        work_queue.remove_all(conversation_matcher)
+        work_queue.remove_conversation(agent_id_int, channel_id_int)
 
         agent = get_agent_for_id(recipient_id)
         if not agent:
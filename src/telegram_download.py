@@ -4,18 +4,156 @@
 # Licensed under the MIT License. See LICENSE.md for details.
 #
 import asyncio
+import contextlib
 import io
+import mmap
 import os
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Any
 
 
-async def download_media_bytes(client: Any, file_ref: Any) -> bytes:
+class MediaTooLargeError(ValueError):
+    """Media is larger than the download size limit (known before or found during download)."""
+
+    def __init__(self, size: int, max_bytes: int):
+        self.size = size
+        self.max_bytes = max_bytes
+        super().__init__(
+            f"media too large ({size / (1024 * 1024):.1f}MB, max {max_bytes / (1024 * 1024):.0f}MB)"
+        )
+
+
+def declared_media_size(file_ref: Any) -> int | None:
+    """Return the size Telegram reports for a document (or message media), if known."""
+    for obj in (file_ref, getattr(file_ref, "document", None), getattr(file_ref, "file", None)):
+        size = getattr(obj, "size", None) if obj is not None else None
+        if isinstance(size, int) and not isinstance(size, bool):
+            return size
+    return None
+
+
+def check_media_size(file_ref: Any, max_bytes: int | None) -> None:
+    """Raise MediaTooLargeError when the declared size already exceeds max_bytes."""
+    size = declared_media_size(file_ref)
+    if max_bytes is not None and size is not None and size > max_bytes:
+        raise MediaTooLargeError(size, max_bytes)
+
+
+class _LimitedWriter:
+    """File-like target that counts bytes written and stops the download past max_bytes."""
+
+    def __init__(self, target, max_bytes: int | None):
+        self._target = target
+        self._max_bytes = max_bytes
+        self.written = 0
+
+    def write(self, data) -> int:
+        self.written += len(data)
+        if self._max_bytes is not None and self.written > self._max_bytes:
+            raise MediaTooLargeError(self.written, self._max_bytes)
+        return self._target.write(data)
+
+    def flush(self) -> None:
+        self._target.flush()
+
+
+async def _download_into(client: Any, file_ref: Any, writer: _LimitedWriter) -> bool:
+    """Stream media into writer using the client's download_media/download_file; True if written."""
+    for method_name in ("download_media", "download_file"):
+        method = getattr(client, method_name, None)
+        if not callable(method):
+            continue
+        res = method(file_ref, file=writer)  # many clients accept file-like target
+        if asyncio.iscoroutine(res):
+            res = await res
+
+        # Some SDKs return the content instead of writing it
+        if isinstance(res, (bytes, bytearray)):
+            writer.write(res)
+            return True
+        if isinstance(res, io.BytesIO):
+            writer.write(res.getbuffer())
+            return True
+        if writer.written:
+            return True
+
+        # Some SDKs return a filesystem path; copy it in chunks if so.
+        if isinstance(res, str) and os.path.exists(res):
+            with open(res, "rb") as f:
+                while chunk := f.read(1024 * 1024):
+                    writer.write(chunk)
+            return True
+    return False
+
+
+async def download_media_to_file(
+    client: Any, file_ref: Any, path: Path, max_bytes: int | None = None
+) -> int:
+    """
+    Stream media from Telegram into path and return its size in bytes.
+
+    Chunks are written to path.tmp as they arrive and renamed into place when
+    complete, so readers never see a partial file and the media is never held
+    in memory in full. A Path file_ref is copied from disk.
+
+    Raises:
+        MediaTooLargeError: If the declared or downloaded size exceeds max_bytes
+        NotImplementedError: If the client has no supported download method
+    """
+    check_media_size(file_ref, max_bytes)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            writer = _LimitedWriter(f, max_bytes)
+            if hasattr(file_ref, "read_bytes") and callable(file_ref.read_bytes):
+                with open(file_ref, "rb") as source:
+                    while chunk := source.read(1024 * 1024):
+                        writer.write(chunk)
+            elif not await _download_into(client, file_ref, writer):
+                raise NotImplementedError("No supported download method on client for media bytes")
+        temp_path.replace(path)
+        return writer.written
+    except BaseException:
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+        raise
+
+
+@contextlib.contextmanager
+def media_file_view(path: Path) -> Iterator[bytes | mmap.mmap]:
+    """
+    Yield a read-only memory-mapped view of a media file.
+
+    The view supports len(), slicing and the buffer protocol (base64, writes),
+    so it can stand in for the file's bytes without copying it onto the heap.
+    Empty files yield b"" (they cannot be mapped).
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield view
+        finally:
+            view.close()
+
+
+async def download_media_bytes(client: Any, file_ref: Any, max_bytes: int | None = None) -> bytes:
     """
     Download media bytes from Telegram in a duck-typed way.
     Prefers in-memory buffers (BytesIO) to avoid empty files or unknown paths.
 
-    Also supports reading from disk when file_ref is a Path object.
+    Also supports reading from disk when file_ref is a Path object. Large media
+    should use download_media_to_file instead.
+
+    Raises:
+        MediaTooLargeError: If the declared or downloaded size exceeds max_bytes
     """
+    check_media_size(file_ref, max_bytes)
+
     # Special case: if file_ref is a Path object, read directly from disk
     if hasattr(file_ref, "read_bytes") and callable(file_ref.read_bytes):
         return file_ref.read_bytes()
@@ -24,7 +162,7 @@ async def download_media_bytes(client: Any, file_ref: Any) -> bytes:
     dm = getattr(client, "download_media", None)
     if callable(dm):
         buf = io.BytesIO()
-        res = dm(file_ref, file=buf)  # many clients accept file-like target
+        res = dm(file_ref, file=_LimitedWriter(buf, max_bytes))  # many clients accept file-like target
         if asyncio.iscoroutine(res):
             res = await res
 
@@ -48,7 +186,7 @@ async def download_media_bytes(client: Any, file_ref: Any) -> bytes:
     df = getattr(client, "download_file", None)
     if callable(df):
         buf = io.BytesIO()
-        res = df(file_ref, file=buf)  # many clients accept file-like target
+        res = df(file_ref, file=_LimitedWriter(buf, max_bytes))  # many clients accept file-like target
         if asyncio.iscoroutine(res):
             res = await res
 
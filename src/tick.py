@@ -18,9 +18,13 @@ from telethon.tl.types import SendMessageTypingAction, SendMessageCancelAction
 
 from agent import get_agent_for_id
 from clock import clock
+from db.aio import take_loop_stall_seconds
+from db.connection import get_pool_metrics
 from exceptions import ShutdownException
 from llm.exceptions import RetryableLLMError
 from media.media_budget import reset_description_budget
+from media.media_record_cache import get_media_record_cache_metrics
+from media.single_flight import get_media_single_flight_stats
 from handlers.registry import dispatch_task
 from task_graph import TaskStatus, WorkQueue
 from task_graph_helpers import insert_received_task_for_conversation
@@ -29,6 +33,9 @@ from utils.telegram import get_channel_name
 
 logger = logging.getLogger(__name__)
 
+# Warn when blocking database calls on the event loop add up to this much in one tick
+_DB_LOOP_STALL_WARN_SEC = 0.1
+
 
 def _is_temporary_error(e: Exception) -> bool:
     """Return True if the exception is a temporary/retryable error that does not need a stack trace."""
@@ -37,11 +44,12 @@ def _is_temporary_error(e: Exception) -> bool:
     return str(e).startswith("Temporary error:")
 
 
-# Lazy import for task logging to avoid circular dependencies
+# Lazy import for task logging to avoid circular dependencies.
+# Rows are queued for the batched background writer, so logging never waits on MySQL.
 def _log_task_failure(graph, task, error_msg: str):
     """Log a task failure to the database."""
     try:
-        from db.task_log import log_task_execution, format_action_details
+        from db.task_log import enqueue_task_execution, format_action_details
         
         agent_id = graph.context.get("agent_id")
         channel_id = graph.context.get("channel_id")
@@ -60,7 +68,7 @@ def _log_task_failure(graph, task, error_msg: str):
         )
         
         # Log the failure
-        log_task_execution(
+        enqueue_task_execution(
             agent_telegram_id=agent_id,
             channel_telegram_id=channel_id,
             action_kind=task.type,
@@ -75,7 +83,7 @@ def _log_task_failure(graph, task, error_msg: str):
 def _log_task_completion(graph, task):
     """Log a successful task completion to the database."""
     try:
-        from db.task_log import log_task_execution, format_action_details
+        from db.task_log import enqueue_task_execution, format_action_details
         
         agent_id = graph.context.get("agent_id")
         channel_id = graph.context.get("channel_id")
@@ -94,7 +102,7 @@ def _log_task_completion(graph, task):
         )
         
         # Log the completion
-        log_task_execution(
+        enqueue_task_execution(
             agent_telegram_id=agent_id,
             channel_telegram_id=channel_id,
             action_kind=task.type,
@@ -114,8 +122,8 @@ def is_graph_complete(graph) -> bool:
 
 def remove_completed_graphs(work_queue: WorkQueue) -> int:
     """Remove fully terminal graphs and return how many were removed."""
-    with work_queue._lock:
-        completed_graphs = [g for g in work_queue._task_graphs if is_graph_complete(g)]
+    # Tracked by the queue, so an idle tick does not walk every graph
+    completed_graphs = work_queue.completed_graphs()
 
     for graph in completed_graphs:
         work_queue.remove(graph)
@@ -123,18 +131,34 @@ def remove_completed_graphs(work_queue: WorkQueue) -> int:
     return len(completed_graphs)
 
 
+# Telegram shows a typing action for a few seconds; re-send it at this cadence while waiting
+_TYPING_REFRESH_INTERVAL_SEC = 2
+_last_typing_refresh: datetime | None = None
+
+
+def _typing_refresh_due(now: datetime) -> bool:
+    """Throttle typing indicators so back-to-back ticks don't resend them."""
+    global _last_typing_refresh
+    if _last_typing_refresh is not None:
+        elapsed = (now - _last_typing_refresh).total_seconds()
+        if 0 <= elapsed < _TYPING_REFRESH_INTERVAL_SEC:
+            return False
+    _last_typing_refresh = now
+    return True
+
+
 async def trigger_typing_indicators():
     """
     Check for pending wait tasks with typing=True or online=True and trigger typing indicators.
     For typing=True tasks, only trigger if unblocked. For online=True tasks, trigger while the task is pending
     (regardless of dependencies or wait time), to show the agent is online during the wait period.
+    Only graphs the queue tracks as having such a wait task are visited.
     """
-    clock.now(UTC)
+    now = clock.now(UTC)
     work_queue = WorkQueue.get_instance()
+    refresh_needed = False
 
-    # Acquire lock to safely get a snapshot of the graphs list
-    with work_queue._lock:
-        graphs_snapshot = list(work_queue._task_graphs)
+    graphs_snapshot = work_queue.indicator_graphs()
 
     for graph in graphs_snapshot:
         agent_id = graph.context.get("agent_id")
@@ -180,6 +204,8 @@ async def trigger_typing_indicators():
 
                 typing = task.params.get("typing", False)
                 online = task.params.get("online", False)
+                if (typing or online) and task.is_unblocked(completed_ids):
+                    refresh_needed = True
 
                 # For typing=True: send typing action if task is unblocked
                 if typing and task.is_unblocked(completed_ids):
@@ -216,38 +242,46 @@ async def trigger_typing_indicators():
         except Exception as e:
             logger.debug(f"Error checking typing indicators for agent {agent_id}: {e}")
 
+    if refresh_needed:
+        # Keep the event-driven loop ticking while indicators need refreshing
+        work_queue.schedule_wakeup(now + timedelta(seconds=_TYPING_REFRESH_INTERVAL_SEC))
+
 
 async def _process_due_events():
     """
-    At the start of each tick: compute the global next event (soonest across non-gagged channels).
-    If that event's time has passed, fire it (insert received task with xsend_intent),
-    then reschedule or delete the event.
+    At the start of each tick: fire every due event (insert a received task with
+    xsend_intent), then reschedule or delete the fired events in one transaction.
+
+    Due events come from the in-memory event index (db.events.EventIndex), so a
+    tick with nothing due does no MySQL work. Events for gagged conversations,
+    disabled agents, or unknown agents stay due and are retried next tick. At most
+    one event fires per conversation per pass, because a second intent would
+    overwrite the first on the conversation's pending received task.
     """
     try:
         from db import events as db_events
+        from db.aio import run_db
     except Exception as e:
         logger.debug(f"Event tick: could not import db.events: {e}")
         return
-    try:
-        candidates = db_events.get_next_events_ordered(limit=50)
-    except Exception as e:
-        logger.debug(f"Event tick: could not get next events (table may not exist): {e}")
-        return
+    index = db_events.loaded_event_index()
+    if index is None:
+        try:
+            index = await run_db(db_events.get_event_index)
+        except Exception as e:
+            logger.debug(f"Event tick: could not load events (table may not exist): {e}")
+            return
     now_utc = clock.now(UTC)
-    if not hasattr(now_utc, "tzinfo"):
+    if now_utc.tzinfo is None:
         now_utc = now_utc.replace(tzinfo=UTC)
-    if not candidates:
-        return
-    for ev in candidates:
+
+    reschedules = []
+    deletes = []
+    fired_conversations = set()
+    for ev in index.due_events(now_utc):
         agent_id = ev["agent_telegram_id"]
         channel_id = ev["channel_id"]
-        time_utc = ev.get("time_utc")
-        if not time_utc:
-            continue
-        # DB stores UTC; driver may return naive datetime — make aware for comparison with now_utc
-        if not hasattr(time_utc, "tzinfo") or time_utc.tzinfo is None:
-            time_utc = time_utc.replace(tzinfo=UTC)
-        if time_utc > now_utc:
+        if (agent_id, channel_id) in fired_conversations:
             continue
         try:
             agent = get_agent_for_id(agent_id)
@@ -260,7 +294,7 @@ async def _process_due_events():
             logger.debug(f"Event tick: skip event {ev.get('id')} agent {agent_id} channel {channel_id}: {e}")
             continue
         event_id = ev["id"]
-        intent = ev.get("intent") or ""
+        time_utc = ev["time_utc"]
         interval_value = ev.get("interval_value")
         occurrences = ev.get("occurrences")
         channel_name = await get_channel_name(agent, channel_id)
@@ -269,13 +303,15 @@ async def _process_due_events():
             await insert_received_task_for_conversation(
                 recipient_id=str(agent_id),
                 channel_id=str(channel_id),
-                xsend_intent=intent,
+                xsend_intent=ev.get("intent") or "",
                 bypass_gagged=True,
             )
             logger.info(f"{log_prefix} Fired event {event_id} (xsend_intent)")
         except Exception as e:
+            # Leave the event due so it is retried next tick
             logger.exception(f"{log_prefix} Failed to insert received task for event {event_id}: {e}")
-            return
+            continue
+        fired_conversations.add((agent_id, channel_id))
         interval_seconds = db_events.parse_interval_seconds(interval_value) if interval_value else None
         should_reschedule = (
             interval_seconds is not None
@@ -285,36 +321,26 @@ async def _process_due_events():
         if should_reschedule:
             new_time_utc = time_utc + timedelta(seconds=interval_seconds)
             new_occurrences = (occurrences - 1) if occurrences is not None else None
-            try:
-                db_events.update_event_time_and_occurrences(
-                    agent_id, channel_id, event_id, new_time_utc, occurrences=new_occurrences
-                )
-                logger.info(f"{log_prefix} Rescheduled event {event_id} to {new_time_utc}")
-            except Exception as e:
-                logger.exception(f"{log_prefix} Failed to reschedule event {event_id}: {e}")
+            reschedules.append((agent_id, channel_id, event_id, new_time_utc, new_occurrences))
+            logger.info(f"{log_prefix} Rescheduling event {event_id} to {new_time_utc}")
         else:
-            try:
-                db_events.delete_event(agent_id, channel_id, event_id)
-                logger.info(f"{log_prefix} Deleted event {event_id} after fire")
-            except Exception as e:
-                logger.exception(f"{log_prefix} Failed to delete event {event_id}: {e}")
-        return
+            deletes.append((agent_id, channel_id, event_id))
+            logger.info(f"{log_prefix} Deleting event {event_id} after fire")
 
+    if reschedules or deletes:
+        try:
+            await run_db(db_events.apply_fired_events, reschedules, deletes)
+        except Exception as e:
+            # The fired events are still due in MySQL and in the index, as before
+            logger.exception(f"Event tick: failed to write back {len(reschedules) + len(deletes)} fired event(s): {e}")
 
+    next_time = index.next_time_after(now_utc)
+    if next_time is not None:
+        WorkQueue.get_instance().schedule_wakeup(next_time)
 
 
-async def run_one_tick(work_queue=None, state_file_path: str = None):
-    """
-    Run one tick of the task processing loop.
-    
-    Args:
-        work_queue: Optional WorkQueue instance (for backward compatibility with tests).
-                   If None, uses WorkQueue.get_instance().
-        state_file_path: Optional path to save state file.
-    """
-    clock.now(UTC)
-    if work_queue is None:
-        work_queue = WorkQueue.get_instance()
+async def _begin_tick(work_queue: WorkQueue, state_file_path: str | None):
+    """Per-tick housekeeping shared by the sequential and concurrent schedulers."""
     # Update stored path if provided (always update when explicitly provided)
     if state_file_path:
         if work_queue._state_file_path and work_queue._state_file_path != state_file_path:
@@ -333,19 +359,40 @@ async def run_one_tick(work_queue=None, state_file_path: str = None):
 
     # Check and extend schedules if needed (non-blocking)
     # Trigger typing indicators for pending wait tasks
-    await trigger_typing_indicators()
+    if _typing_refresh_due(clock.now(UTC)):
+        await trigger_typing_indicators()
+
+
+def _cleanup_completed_graphs(work_queue: WorkQueue, state_file_path: str | None):
+    """Remove terminal graphs when there is nothing to run, saving if anything changed."""
+    removed_count = remove_completed_graphs(work_queue)
+    if removed_count:
+        logger.info(f"Removed {removed_count} completed graph(s) with no runnable task.")
+        if state_file_path:
+            work_queue.save(state_file_path)
+            logger.debug("Work queue state saved after completed-graph cleanup")
+    else:
+        logger.debug("No tasks ready to run.")
+
+
+async def run_one_tick(work_queue=None, state_file_path: str = None):
+    """
+    Run one tick of the task processing loop.
+    
+    Args:
+        work_queue: Optional WorkQueue instance (for backward compatibility with tests).
+                   If None, uses WorkQueue.get_instance().
+        state_file_path: Optional path to save state file.
+    """
+    clock.now(UTC)
+    if work_queue is None:
+        work_queue = WorkQueue.get_instance()
+    await _begin_tick(work_queue, state_file_path)
 
     task = work_queue.round_robin_one_task()
 
     if not task:
-        removed_count = remove_completed_graphs(work_queue)
-        if removed_count:
-            logger.info(f"Removed {removed_count} completed graph(s) with no runnable task.")
-            if state_file_path:
-                work_queue.save(state_file_path)
-                logger.debug("Work queue state saved after completed-graph cleanup")
-        else:
-            logger.debug("No tasks ready to run.")
+        _cleanup_completed_graphs(work_queue, state_file_path)
         return
 
     graph = work_queue.graph_containing(task)
@@ -353,6 +400,15 @@ async def run_one_tick(work_queue=None, state_file_path: str = None):
         logger.warning(f"Task {task.id} found but no matching graph.")
         return
 
+    await _execute_task(work_queue, task, graph, state_file_path)
+
+
+async def _execute_task(work_queue: WorkQueue, task, graph, state_file_path: str | None):
+    """
+    Run a single selected task to completion: mark it active, dispatch it, then
+    mark it done (or hand it to `TaskNode.failed` for retry), remove the graph if
+    it is complete, and save the queue when a state file path is given.
+    """
     agent_id = graph.context.get("agent_id")
     channel_id = graph.context.get("channel_id")
     agent = None
@@ -381,6 +437,7 @@ async def run_one_tick(work_queue=None, state_file_path: str = None):
 
     try:
         task.status = TaskStatus.ACTIVE
+        work_queue.mark_dirty(graph, task)
         # Only save if explicitly requested via parameter, not based on _state_file_path
         # This prevents tests from accidentally writing to the persisted state file
         if state_file_path:
@@ -415,6 +472,9 @@ async def run_one_tick(work_queue=None, state_file_path: str = None):
         should_retry = getattr(e, "is_retryable", True)
         task.failed(graph, retryable=should_retry)
 
+    # Handlers may have changed any part of the graph (statuses, params, context)
+    work_queue.mark_dirty(graph)
+
     if is_graph_complete(graph):
         work_queue.remove(graph)
         logger.info(f"{log_prefix} Graph {graph.id} completed and removed.")
@@ -425,22 +485,153 @@ async def run_one_tick(work_queue=None, state_file_path: str = None):
         work_queue.save(state_file_path)
         logger.debug(f"{log_prefix} Work queue state saved")
 
+    # Finishing a task can unblock the next one in this graph; tick again right away
+    work_queue.notify()
+
+
+class ConcurrentTaskRunner:
+    """
+    Scheduler mode that keeps up to `max_tasks` tasks running at once.
+
+    Each tick selects new work with `WorkQueue.round_robin_tasks`, skipping
+    conversations that already have a task in flight, and starts each selected
+    task as a background asyncio task. Tasks run through the same
+    `_execute_task` path as `run_one_tick`, so status transitions, retries and
+    saves are unchanged; only the number of conversations progressing at once
+    differs.
+    """
+
+    def __init__(self, max_tasks: int, max_tasks_per_agent: int | None = None):
+        self.max_tasks = max_tasks
+        self.max_tasks_per_agent = max_tasks_per_agent
+        # conversation key -> (agent_id, asyncio.Task)
+        self._in_flight: dict[tuple, tuple] = {}
+
+    @property
+    def in_flight_count(self) -> int:
+        return len(self._in_flight)
+
+    def _agent_task_counts(self) -> dict:
+        counts: dict = {}
+        for agent_id, _ in self._in_flight.values():
+            counts[agent_id] = counts.get(agent_id, 0) + 1
+        return counts
+
+    def _on_task_done(self, key: tuple, done: asyncio.Task):
+        entry = self._in_flight.get(key)
+        if entry and entry[1] is done:
+            del self._in_flight[key]
+        if done.cancelled():
+            return
+        exc = done.exception()
+        if exc is not None:
+            logger.error(f"Concurrent task for conversation {key} raised: {exc!r}")
+
+    async def tick(self, work_queue=None, state_file_path: str = None):
+        """Run one scheduling pass: housekeeping, then start as many tasks as limits allow."""
+        clock.now(UTC)
+        if work_queue is None:
+            work_queue = WorkQueue.get_instance()
+        await _begin_tick(work_queue, state_file_path)
+
+        free_slots = self.max_tasks - len(self._in_flight)
+        selected = work_queue.round_robin_tasks(
+            free_slots,
+            busy_conversations=set(self._in_flight),
+            agent_task_counts=self._agent_task_counts(),
+            max_tasks_per_agent=self.max_tasks_per_agent,
+        )
+
+        if not selected:
+            if not self._in_flight:
+                _cleanup_completed_graphs(work_queue, state_file_path)
+            return
+
+        for task, graph in selected:
+            key = graph.conversation_key()
+            running = asyncio.create_task(
+                _execute_task(work_queue, task, graph, state_file_path),
+                name=f"task-{task.id}",
+            )
+            self._in_flight[key] = (graph.context.get("agent_id"), running)
+            running.add_done_callback(lambda done, key=key: self._on_task_done(key, done))
+
+    async def drain(self):
+        """Wait for all in-flight tasks to finish (used on shutdown and in tests)."""
+        while self._in_flight:
+            await asyncio.gather(
+                *(running for _, running in list(self._in_flight.values())),
+                return_exceptions=True,
+            )
+
+
+_concurrent_runner: ConcurrentTaskRunner | None = None
+
+
+def get_concurrent_runner() -> ConcurrentTaskRunner:
+    """Return the process-wide concurrent runner configured from config."""
+    global _concurrent_runner
+    if _concurrent_runner is None:
+        import config
+        _concurrent_runner = ConcurrentTaskRunner(
+            max_tasks=config.TICK_MAX_CONCURRENT_TASKS,
+            max_tasks_per_agent=config.TICK_MAX_CONCURRENT_TASKS_PER_AGENT,
+        )
+    return _concurrent_runner
+
+
+async def run_one_tick_concurrent(work_queue=None, state_file_path: str = None):
+    """Tick function for the concurrent scheduler mode (see `ConcurrentTaskRunner`)."""
+    await get_concurrent_runner().tick(work_queue, state_file_path=state_file_path)
+
+
+async def _wait_for_next_tick(max_idle_sec: float):
+    """Sleep until the next scheduled wakeup, a queue notification, or `max_idle_sec`."""
+    work_queue = WorkQueue.get_instance()
+    now = clock.now(UTC)
+    next_wakeup = work_queue.next_wakeup_time(now)
+    timeout = max_idle_sec
+    if next_wakeup is not None:
+        timeout = min(max_idle_sec, max(0.0, (next_wakeup - now).total_seconds()))
+    await work_queue.wait_for_work(timeout)
+
 
 async def run_tick_loop(
     tick_interval_sec: int = 10,
     state_file_path: str = None,
     tick_fn=run_one_tick,
+    event_driven: bool = False,
+    max_idle_sec: float = 30,
 ):
+    """
+    Run ticks forever.
+
+    With event_driven=False, sleeps `tick_interval_sec` between ticks. With
+    event_driven=True, sleeps until the work queue's next ready time (wait
+    expiry, event time, partner-typing expiry) or until something notifies the
+    queue (new graph, finished task), but never longer than `max_idle_sec`.
+    """
     n = 0
     logger.info("Tick loop started.")
     while True:
         try:
             n += 1
             await tick_fn(state_file_path=state_file_path)
+            stall_sec = take_loop_stall_seconds()
+            if stall_sec >= _DB_LOOP_STALL_WARN_SEC:
+                logger.warning(
+                    f"Tick {n}: blocking database calls stalled the event loop for {stall_sec * 1000:.0f} ms"
+                )
             if n % 10 == 0:
                 logger.info(f"Tick {n} completed.")
+                logger.debug(f"MySQL pool: {get_pool_metrics()}")
+                logger.debug(f"Media record cache: {get_media_record_cache_metrics()}")
+                logger.debug(f"Media generation single-flight: {get_media_single_flight_stats()}")
         except ShutdownException:
             raise
         except Exception as e:
             logger.exception(f"Exception during tick: {e}")
-        await clock.sleep(tick_interval_sec)
+        if event_driven:
+            await _wait_for_next_tick(max_idle_sec)
+        else:
+            await clock.sleep(tick_interval_sec)
@@ -45,6 +45,23 @@ def is_partner_typing(agent_id: int, peer_id: int) -> bool:
     return clock.now(UTC) - last_seen <= _TYPING_TIMEOUT
 
 
+def partner_typing_expires_at(agent_id: int, peer_id: int) -> datetime | None:
+    """
+    Return when the partner's typing observation will time out, or None if not typing.
+    """
+    if agent_id is None or peer_id is None:
+        return None
+
+    last_seen = _typing_state.get((int(agent_id), int(peer_id)))
+    if not last_seen:
+        return None
+
+    expires_at = last_seen + _TYPING_TIMEOUT
+    if clock.now(UTC) > expires_at:
+        return None
+    return expires_at
+
+
 def clear_typing_state() -> None:
     """Clear all tracked typing information (used in tests)."""
     _typing_state.clear()
@@ -40,3 +40,59 @@ def mock_superuser_for_session(monkeypatch):
         "db.administrators.get_roles_for_email",
         lambda email: ["superuser"],
     )
+
+
+@pytest.fixture(autouse=True)
+def clear_media_record_cache():
+    """Keep media records cached by one test (often from patched db calls) out of the next."""
+    from media.media_record_cache import clear_media_record_cache
+
+    clear_media_record_cache()
+    yield
+    clear_media_record_cache()
+
+
+@pytest.fixture(autouse=True)
+def clear_agent_content_cache():
+    """Keep notes, memories, plans etc. cached by one test out of the next."""
+    from db.content_cache import clear_agent_content_cache
+
+    clear_agent_content_cache()
+    yield
+    clear_agent_content_cache()
+
+
+@pytest.fixture(autouse=True)
+def isolate_task_log_writer(monkeypatch):
+    """Queued task log rows go to an in-memory list instead of MySQL."""
+    from db import task_log
+
+    rows = []
+    writer = task_log.TaskLogWriter(insert_rows=rows.extend)
+    monkeypatch.setattr(task_log, "_writer", writer)
+    yield rows
+    writer.close()
+
+
+@pytest.fixture(autouse=True)
+def isolate_media_last_used_tracker(monkeypatch):
+    """Media last-used touches are written to an in-memory list instead of MySQL."""
+    from db import media_metadata
+
+    writes = []
+    tracker = media_metadata.MediaLastUsedTracker(update_many=writes.append)
+    monkeypatch.setattr(media_metadata, "_last_used_tracker", tracker)
+    yield writes
+    tracker.close()
+
+
+@pytest.fixture(autouse=True)
+def isolate_tgs_video_cache(tmp_path, monkeypatch):
+    """Converted sticker videos go to a per-test directory instead of state/tgs_video."""
+    monkeypatch.setattr("media.tgs_video_cache.TGS_VIDEO_CACHE_DIRECTORY", tmp_path / "tgs_video")
+
+
+@pytest.fixture(autouse=True)
+def isolate_media_scratch(tmp_path, monkeypatch):
+    """Media downloads and TGS conversions go to a per-test directory instead of state/media_scratch."""
+    monkeypatch.setattr("media.media_scratch.MEDIA_SCRATCH_DIRECTORY", str(tmp_path / "media_scratch"))
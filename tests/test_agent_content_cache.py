@@ -0,0 +1,86 @@
+# tests/test_agent_content_cache.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for the write-through cache of agent prompt content."""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+from agent.storage_mysql import AgentStorageMySQL
+from db import notes
+from db.content_cache import AgentContentCache, get_agent_content_cache
+
+
+def _storage():
+    return AgentStorageMySQL("TestAgent", 1001, None, Path("state"))
+
+
+def test_prompt_content_is_loaded_once_until_saved():
+    storage = _storage()
+    rows = [{"id": "n1", "content": "likes tea"}]
+    load_notes = MagicMock(side_effect=lambda agent_id, channel_id: [dict(r) for r in rows])
+    load_memories = MagicMock(return_value=[])
+
+    with patch("db.notes.load_notes", load_notes), patch("db.memories.load_memories", load_memories):
+        first = storage.load_memory_content(42)
+        assert '"likes tea"' in first
+        assert storage.load_memory_content(42) == first
+        assert load_notes.call_count == 1
+        assert load_memories.call_count == 1
+
+        # Saving a note through the db layer invalidates that channel's notes only
+        rows.append({"id": "n2", "content": "has a cat"})
+        conn = MagicMock()
+        with patch("db.notes.get_db_connection") as get_conn:
+            get_conn.return_value.__enter__.return_value = conn
+            notes.save_note(1001, 42, "n2", "has a cat")
+        assert '"has a cat"' in storage.load_memory_content(42)
+        assert load_notes.call_count == 2
+        assert load_memories.call_count == 1
+
+
+def test_renders_are_cached_per_variant():
+    storage = _storage()
+    summaries = [{"id": "s1", "content": "They met.", "min_message_id": 1, "max_message_id": 5}]
+    events = [{"id": "e1", "intent": "remind", "time_utc": "2026-03-02T12:00:00Z", "interval": None}]
+
+    with patch("db.summaries.load_summaries", return_value=summaries) as load_summaries, patch(
+        "db.events.load_events", return_value=events
+    ) as load_events:
+        assert storage.load_summary_content(42) == "They met."
+        assert 'id "s1"' in storage.load_summary_content(42, include_metadata=True)
+        assert '"id": "s1"' in storage.load_summary_content(42, json_format=True)
+        assert load_summaries.call_count == 1
+
+        utc = storage.load_event_content(42, ZoneInfo("UTC"))
+        tokyo = storage.load_event_content(42, ZoneInfo("Asia/Tokyo"))
+        assert "12:00:00+00:00" in utc and "21:00:00+09:00" in tokyo
+        assert load_events.call_count == 1
+
+
+def test_load_overlapping_invalidation_is_not_stored():
+    cache = AgentContentCache(max_entries=10, ttl_seconds=60)
+
+    def load():
+        # A write lands while the SELECT is running
+        cache.invalidate("plans", 1, 2)
+        return [{"id": "p1"}]
+
+    assert cache.rows("plans", 1, 2, load) == [{"id": "p1"}]
+    assert cache.metrics()["entries"] == 0
+
+    cache.rows("plans", 1, 2, lambda: [{"id": "p1"}])
+    cache.invalidate_agent(1)
+    assert cache.metrics()["entries"] == 0
+
+
+def test_cache_disabled_with_zero_entries():
+    cache = AgentContentCache(max_entries=0, ttl_seconds=60)
+    load = MagicMock(return_value=[])
+    cache.rendered("intentions", 1, None, "json", load, lambda rows: "")
+    cache.rendered("intentions", 1, None, "json", load, lambda rows: "")
+    assert load.call_count == 2
+    assert get_agent_content_cache().enabled
@@ -12,9 +12,29 @@ import pytest
 from telethon.tl.functions.channels import GetFullChannelRequest
 from telethon.tl.functions.messages import GetFullChatRequest
 from telethon.tl.functions.users import GetFullUserRequest
-from telethon.tl.types import Birthday, Channel, Chat, ChatPhotoEmpty, User
-
-from handlers.received_helpers.channel_details import build_channel_details_section
+from telethon.tl.types import (
+    Birthday,
+    Channel,
+    Chat,
+    ChatPhotoEmpty,
+    UpdateChat,
+    UpdateUserName,
+    User,
+)
+
+from handlers.received_helpers.channel_details import (
+    build_channel_details_section,
+    channel_details_peer_id,
+    get_channel_details_cache,
+    invalidate_channel_details,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_channel_details_cache():
+    get_channel_details_cache().clear()
+    yield
+    get_channel_details_cache().clear()
 
 
 class FakeMediaChain:
@@ -179,3 +199,53 @@ async def test_channel_details_supergroup():
     assert "- Forum enabled: Yes" in section
     assert "- Description: Important updates" in section
     assert "- Profile photo:" not in section
+
+
+@pytest.mark.asyncio
+async def test_channel_details_cached_until_entity_changes_or_update():
+    """Rendered details are reused without RPCs until the entity or an update says otherwise."""
+
+    user = User(id=101, first_name="Alice", username="alice")
+    client = AsyncMock()
+    client.side_effect = AsyncMock(return_value=SimpleNamespace(about="Friendly bio", birthday=None))
+    client.get_input_entity = AsyncMock(return_value=types.SimpleNamespace())
+    client.get_profile_photos = AsyncMock(return_value=[])
+    agent = SimpleNamespace(client=client, agent_id=9001)
+
+    async def build(entity):
+        return await build_channel_details_section(
+            agent=agent, channel_id=101, dialog=entity, media_chain=FakeMediaChain(), channel_name="Alice"
+        )
+
+    first = await build(user)
+    assert await build(user) == first
+    assert client.call_count == 1
+    assert client.get_profile_photos.await_count == 1
+
+    # A renamed entity no longer matches the cached fingerprint
+    renamed = User(id=101, first_name="Alicia", username="alice")
+    assert "- First name: Alicia" in await build(renamed)
+    assert client.call_count == 2
+
+    # A Telegram update about the peer drops the entry
+    update = UpdateUserName(user_id=101, first_name="Alicia", last_name="", usernames=[])
+    invalidate_channel_details(agent.agent_id, channel_details_peer_id(update))
+    await build(renamed)
+    assert client.call_count == 3
+    assert channel_details_peer_id(UpdateChat(chat_id=202)) == -202
+
+
+@pytest.mark.asyncio
+async def test_channel_details_not_cached_after_failed_lookup():
+    user = User(id=101, first_name="Alice")
+    client = AsyncMock()
+    client.side_effect = RuntimeError("FLOOD_WAIT")
+    client.get_input_entity = AsyncMock(return_value=types.SimpleNamespace())
+    client.get_profile_photos = AsyncMock(return_value=[])
+    agent = SimpleNamespace(client=client, agent_id=9001)
+
+    for _ in range(2):
+        await build_channel_details_section(
+            agent=agent, channel_id=101, dialog=user, media_chain=FakeMediaChain(), channel_name="Alice"
+        )
+    assert client.call_count == 2
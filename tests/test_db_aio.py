@@ -0,0 +1,48 @@
+# tests/test_db_aio.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+import threading
+
+import pytest
+
+from db import aio
+
+
+@pytest.mark.asyncio
+async def test_run_db_runs_off_the_event_loop_thread():
+    loop_thread = threading.get_ident()
+
+    def query(value, *, scale):
+        assert not aio.on_event_loop_thread()
+        return threading.get_ident(), value * scale
+
+    worker_thread, result = await aio.run_db(query, 21, scale=2)
+
+    assert result == 42
+    assert worker_thread != loop_thread
+    assert aio.on_event_loop_thread()
+
+
+@pytest.mark.asyncio
+async def test_run_db_propagates_exceptions():
+    def failing_query():
+        raise RuntimeError("table missing")
+
+    with pytest.raises(RuntimeError, match="table missing"):
+        await aio.run_db(failing_query)
+
+
+def test_loop_stall_is_reset_when_taken():
+    aio.take_loop_stall_seconds()
+    before = aio.get_db_async_metrics()
+
+    aio.record_loop_blocking(0.25)
+    aio.record_loop_blocking(0.5)
+
+    assert aio.take_loop_stall_seconds() == pytest.approx(0.75)
+    assert aio.take_loop_stall_seconds() == 0.0
+    after = aio.get_db_async_metrics()
+    assert after["loop_blocking_calls"] - before["loop_blocking_calls"] == 2
+    assert after["loop_stall_seconds"] - before["loop_stall_seconds"] == pytest.approx(0.75)
@@ -0,0 +1,187 @@
+# tests/test_db_connection_pool.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+import threading
+import time
+
+import pytest
+from pymysql.constants import SERVER_STATUS
+
+from db import connection
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.server_status = 0
+        self.pings = 0
+        self.rollbacks = 0
+        self.closed = False
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.server_status &= ~SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    opened = []
+
+    def fake_open():
+        conn = _FakeConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(connection, "_open_connection", fake_open)
+    monkeypatch.setattr(connection, "MYSQL_POOL_SIZE", 2)
+    monkeypatch.setattr(connection, "MYSQL_POOL_TIMEOUT", 0.2)
+    monkeypatch.setattr(connection, "MYSQL_POOL_IDLE_CHECK_SECONDS", 30.0)
+    monkeypatch.setattr(connection, "MYSQL_POOL_MAX_LIFETIME_SECONDS", 3600.0)
+    monkeypatch.setattr(connection, "_idle_connections", [])
+    monkeypatch.setattr(connection, "_open_count", 0)
+    monkeypatch.setattr(connection, "_in_use_count", 0)
+    monkeypatch.setattr(connection, "_metrics", dict.fromkeys(connection._metrics, 0))
+    monkeypatch.setattr(connection, "_pool_initialized", True)
+    return opened
+
+
+def _hold_in_thread(release: threading.Event) -> threading.Event:
+    """Check out a connection in a background thread and keep it until `release` is set."""
+    acquired = threading.Event()
+
+    def worker():
+        with connection.get_db_connection():
+            acquired.set()
+            release.wait(5)
+
+    threading.Thread(target=worker, daemon=True).start()
+    assert acquired.wait(5)
+    return acquired
+
+
+def test_pool_is_bounded_and_times_out(pool):
+    release = threading.Event()
+    _hold_in_thread(release)
+    _hold_in_thread(release)
+
+    with pytest.raises(connection.PoolTimeoutError):
+        with connection.get_db_connection():
+            pass
+
+    metrics = connection.get_pool_metrics()
+    assert metrics["open"] == 2
+    assert metrics["in_use"] == 2
+    assert metrics["timeouts"] == 1
+    assert len(pool) == 2
+    release.set()
+
+
+def test_waiter_gets_connection_when_one_is_returned(pool, monkeypatch):
+    monkeypatch.setattr(connection, "MYSQL_POOL_TIMEOUT", 5)
+    release = threading.Event()
+    _hold_in_thread(release)
+    _hold_in_thread(release)
+
+    got = []
+
+    def waiter():
+        with connection.get_db_connection() as conn:
+            got.append(conn)
+
+    thread = threading.Thread(target=waiter, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while connection.get_pool_metrics()["waits"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    thread.join(5)
+
+    assert got and got[0] in pool
+    metrics = connection.get_pool_metrics()
+    assert metrics["waits"] == 1
+    assert metrics["wait_seconds_total"] > 0
+    assert metrics["connections_opened"] == 2
+
+
+def test_nested_checkout_may_exceed_cap_and_surplus_is_closed(pool):
+    with connection.get_db_connection():
+        with connection.get_db_connection():
+            with connection.get_db_connection() as third:
+                assert connection.get_pool_metrics()["open"] == 3
+
+    assert third.closed
+    metrics = connection.get_pool_metrics()
+    assert metrics["open"] == 2
+    assert metrics["idle"] == 2
+    assert metrics["in_use"] == 0
+
+
+def test_liveness_check_only_after_idle_and_recycle_after_lifetime(pool, monkeypatch):
+    fake_time = _FakeClock()
+    monkeypatch.setattr(connection.time, "monotonic", fake_time.monotonic)
+
+    with connection.get_db_connection() as first:
+        pass
+    with connection.get_db_connection() as conn:
+        assert conn is first
+    assert first.pings == 0
+
+    # Idle past the check interval: pinged once, dead, replaced
+    fake_time.now += 31
+    first.alive = False
+    with connection.get_db_connection() as conn:
+        assert conn is not first
+        second = conn
+    assert first.pings == 1
+    assert first.closed
+
+    # Past max lifetime: replaced without a ping
+    fake_time.now += 3600
+    with connection.get_db_connection() as conn:
+        assert conn is not second
+    assert second.pings == 0
+    assert second.closed
+
+    metrics = connection.get_pool_metrics()
+    assert metrics["connections_opened"] == 3
+    assert metrics["connections_closed"] == 2
+    assert metrics["liveness_checks"] == 1
+
+
+def test_rollback_only_when_transaction_open(pool):
+    with connection.get_db_connection() as conn:
+        pass
+    assert conn.rollbacks == 0
+
+    with connection.get_db_connection() as conn:
+        conn.server_status |= SERVER_STATUS.SERVER_STATUS_IN_TRANS
+    assert conn.rollbacks == 1
+    assert not conn.closed
+
+
+def test_default_executor_size_leaves_connections_for_other_callers(monkeypatch):
+    import config
+
+    monkeypatch.delenv("DB_EXECUTOR_THREADS", raising=False)
+    monkeypatch.setattr(config, "MYSQL_POOL_SIZE", 10)
+    threads = config._parse_db_executor_threads()
+    # Background writers, admin console requests and event loop calls need spare connections
+    assert threads + config.DB_BACKGROUND_WRITER_CONNECTIONS < config.MYSQL_POOL_SIZE
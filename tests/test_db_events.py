@@ -52,8 +52,8 @@ class TestLoadEventsForAgentInWindow:
     """Tests for load_events_for_agent_in_window (with mocked DB)."""
 
     def test_returns_events_with_channel_id(self):
-        from unittest.mock import patch, MagicMock
         from datetime import datetime
+        from unittest.mock import MagicMock, patch
 
         with patch("db.events.get_db_connection") as mock_conn:
             mock_cursor = MagicMock()
@@ -90,3 +90,135 @@ class TestLoadEventsForAgentInWindow:
             assert result[1]["id"] == "ev-2"
             assert result[1]["channel_id"] == 888
             assert result[1].get("occurrences") is None
+
+
+def _index_event(event_id, time_utc, agent_id=1, channel_id=10, **extra):
+    return {
+        "id": event_id,
+        "agent_telegram_id": agent_id,
+        "channel_id": channel_id,
+        "intent": f"intent {event_id}",
+        "interval_value": None,
+        "occurrences": None,
+        "time_utc": time_utc,
+        **extra,
+    }
+
+
+class TestEventIndex:
+    def test_due_events_returns_all_due_in_time_order(self):
+        index = db_events.EventIndex()
+        index.replace_all([
+            _index_event("late", datetime(2025, 6, 1, 13, 0, tzinfo=UTC)),
+            _index_event("b", datetime(2025, 6, 1, 12, 5)),  # naive: treated as UTC
+            _index_event("a", datetime(2025, 6, 1, 12, 0, tzinfo=UTC), channel_id=11),
+        ])
+        due = index.due_events(datetime(2025, 6, 1, 12, 30, tzinfo=UTC))
+        assert [ev["id"] for ev in due] == ["a", "b"]
+        assert due[1]["time_utc"].tzinfo is not None
+        # Due events stay in the index until rescheduled or removed
+        assert len(index.due_events(datetime(2025, 6, 1, 12, 30, tzinfo=UTC))) == 2
+        assert index.next_time_after(datetime(2025, 6, 1, 12, 30, tzinfo=UTC)) == datetime(
+            2025, 6, 1, 13, 0, tzinfo=UTC
+        )
+
+    def test_reschedule_and_remove_supersede_heap_entries(self):
+        index = db_events.EventIndex()
+        index.replace_all([
+            _index_event("a", datetime(2025, 6, 1, 12, 0, tzinfo=UTC), occurrences=3),
+            _index_event("b", datetime(2025, 6, 1, 12, 1, tzinfo=UTC), agent_id=2),
+        ])
+        index.reschedule(1, 10, "a", datetime(2025, 6, 1, 14, 0, tzinfo=UTC), 2)
+        index.remove_agent(2)
+        now = datetime(2025, 6, 1, 12, 30, tzinfo=UTC)
+        assert index.due_events(now) == []
+        assert index.next_time_after(now) == datetime(2025, 6, 1, 14, 0, tzinfo=UTC)
+        later = index.due_events(datetime(2025, 6, 1, 14, 0, tzinfo=UTC))
+        assert [(ev["id"], ev["occurrences"]) for ev in later] == [("a", 2)]
+        index.remove(1, 10, "a")
+        assert len(index) == 0
+        assert index.next_time_after(now) is None
+
+    def test_upsert_is_ignored_until_loaded(self):
+        index = db_events.EventIndex()
+        index.upsert(_index_event("a", datetime(2025, 6, 1, 12, 0, tzinfo=UTC)))
+        assert len(index) == 0
+        assert not index.is_fresh()
+        index.replace_all([])
+        index.upsert(_index_event("a", datetime(2025, 6, 1, 12, 0, tzinfo=UTC)))
+        assert len(index) == 1
+        assert index.is_fresh()
+
+    @pytest.mark.parametrize("initially_loaded", [False, True])
+    def test_writes_during_a_load_survive_it(self, monkeypatch, initially_loaded):
+        from unittest.mock import MagicMock, patch
+
+        index = db_events.EventIndex()
+        if initially_loaded:
+            index.replace_all([_index_event("gone", datetime(2025, 6, 1, 11, 0, tzinfo=UTC))])
+            monkeypatch.setattr(db_events, "_EVENT_INDEX_RESYNC_SECONDS", 0)
+        monkeypatch.setattr(db_events, "_event_index", index)
+        stale_row = _index_event("a", datetime(2025, 6, 1, 12, 0))
+
+        def fetchall():
+            # Saved and rescheduled while the SELECT is running, after it read the rows
+            index.upsert(_index_event("new", datetime(2025, 6, 1, 12, 30, tzinfo=UTC)))
+            index.reschedule(1, 10, "a", datetime(2025, 6, 1, 15, 0, tzinfo=UTC))
+            return [stale_row]
+
+        with patch("db.events.get_db_connection") as mock_conn:
+            cursor = mock_conn.return_value.__enter__.return_value.cursor.return_value = MagicMock()
+            cursor.fetchall.side_effect = fetchall
+            assert db_events.get_event_index() is index
+
+        assert len(index) == 2
+        due = index.due_events(datetime(2025, 6, 1, 13, 0, tzinfo=UTC))
+        assert [ev["id"] for ev in due] == ["new"]
+        assert index.next_time_after(datetime(2025, 6, 1, 13, 0, tzinfo=UTC)) == datetime(
+            2025, 6, 1, 15, 0, tzinfo=UTC
+        )
+        # Writes are only recorded while a load is running
+        assert index._writes_during_load == []
+
+
+class TestApplyFiredEvents:
+    def test_writes_back_in_one_transaction_and_updates_index(self, monkeypatch):
+        from unittest.mock import MagicMock, patch
+
+        index = db_events.EventIndex()
+        index.replace_all([
+            _index_event("r", datetime(2025, 6, 1, 12, 0, tzinfo=UTC), occurrences=3),
+            _index_event("d", datetime(2025, 6, 1, 12, 0, tzinfo=UTC), channel_id=11),
+        ])
+        monkeypatch.setattr(db_events, "_event_index", index)
+        new_time = datetime(2025, 6, 1, 13, 0, tzinfo=UTC)
+
+        with patch("db.events.get_db_connection") as mock_conn:
+            conn = mock_conn.return_value.__enter__.return_value
+            cursor = conn.cursor.return_value = MagicMock()
+            db_events.apply_fired_events([(1, 10, "r", new_time, 2)], [(1, 11, "d")])
+
+        assert mock_conn.call_count == 1
+        conn.commit.assert_called_once()
+        assert cursor.executemany.call_count == 2
+        assert cursor.executemany.call_args_list[0].args[1] == [("2025-06-01 13:00:00", 2, "r", 1, 10)]
+        assert cursor.executemany.call_args_list[1].args[1] == [("d", 1, 11)]
+        assert index.due_events(datetime(2025, 6, 1, 12, 30, tzinfo=UTC)) == []
+        assert index.next_time_after(datetime(2025, 6, 1, 12, 30, tzinfo=UTC)) == new_time
+
+    def test_failed_write_leaves_index_unchanged(self, monkeypatch):
+        from unittest.mock import MagicMock, patch
+
+        index = db_events.EventIndex()
+        index.replace_all([_index_event("d", datetime(2025, 6, 1, 12, 0, tzinfo=UTC))])
+        monkeypatch.setattr(db_events, "_event_index", index)
+
+        with patch("db.events.get_db_connection") as mock_conn:
+            conn = mock_conn.return_value.__enter__.return_value
+            cursor = conn.cursor.return_value = MagicMock()
+            cursor.executemany.side_effect = RuntimeError("db down")
+            with pytest.raises(RuntimeError):
+                db_events.apply_fired_events([], [(1, 10, "d")])
+
+        conn.rollback.assert_called_once()
+        assert len(index.due_events(datetime(2025, 6, 1, 12, 30, tzinfo=UTC))) == 1
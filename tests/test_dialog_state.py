@@ -0,0 +1,195 @@
+# tests/test_dialog_state.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for incremental dialog state tracking used by the unread scan."""
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from telethon.tl.functions.messages import GetPeerDialogsRequest
+from telethon.tl.types import PeerUser
+from test_utils import make_mock_agent
+
+
+@pytest.fixture
+def dialog_state(monkeypatch):
+    # agent_server's package import reads CINDY_AGENT_STATE_DIR
+    monkeypatch.setenv("CINDY_AGENT_STATE_DIR", "/tmp")
+    from agent_server import dialog_state
+
+    return dialog_state
+
+
+def _raw_dialog(user_id, unread_count=0, unread_mentions_count=0, unread_reactions_count=0):
+    # Stand-in for telethon.tl.types.Dialog, whose required fields vary by layer
+    return SimpleNamespace(
+        peer=PeerUser(user_id),
+        unread_count=unread_count,
+        unread_mentions_count=unread_mentions_count,
+        unread_reactions_count=unread_reactions_count,
+        unread_mark=False,
+    )
+
+
+def test_tracker_counters_follow_updates(dialog_state):
+    tracker = dialog_state.DialogStateTracker()
+    tracker.note_new_message(10, mentioned=True)
+    tracker.note_new_message(10)
+    tracker.note_reaction(20)
+    counters = tracker.counters(10)
+    assert (counters.unread, counters.mentions) == (2, 1)
+    assert tracker.take_changed() == {10, 20}
+    assert tracker.take_changed() == set()
+
+    tracker.note_read(10)
+    assert not tracker.counters(10).has_pending()
+    assert tracker.take_changed() == {10}
+
+
+def test_tracker_full_scan_schedule(dialog_state, fake_clock):
+    tracker = dialog_state.DialogStateTracker()
+    now = fake_clock.now(UTC)
+    assert tracker.needs_full_scan(now)
+    tracker.full_scan_completed(now)
+    assert not tracker.needs_full_scan(now + timedelta(seconds=10))
+    assert tracker.needs_full_scan(now + timedelta(days=1))
+    tracker.request_full_scan()
+    assert tracker.needs_full_scan(now)
+
+
+@pytest.mark.asyncio
+async def test_scan_only_fetches_changed_dialogs_after_full_scan(dialog_state, monkeypatch, fake_clock):
+    from agent_server import scan_unread_messages
+
+    monkeypatch.setattr("agent_server.scan.clock", fake_clock)
+    agent = make_mock_agent(use_agent_spec=True)
+    iter_calls = []
+
+    async def mock_iter_dialogs():
+        iter_calls.append(1)
+        return
+        yield
+
+    async def mock_iter_messages(*args, **kwargs):
+        return
+        yield
+
+    agent.client.iter_dialogs = mock_iter_dialogs
+    agent.client.iter_messages = mock_iter_messages
+    agent.client.get_input_entity = AsyncMock(side_effect=lambda peer_id: PeerUser(peer_id))
+    peer_dialogs = MagicMock()
+    peer_dialogs.dialogs = [_raw_dialog(555, unread_count=1)]
+    agent.client.return_value = peer_dialogs
+
+    with patch("agent_server.scan.get_channel_name", return_value="Chat"), patch(
+        "agent_server.scan.can_agent_send_to_channel", new=AsyncMock(return_value=True)
+    ), patch("agent_server.scan.insert_received_task_for_conversation") as mock_insert, patch(
+        "agent_server.scan.ensure_media_cache", return_value=None
+    ):
+        # First scan reconciles every dialog
+        await scan_unread_messages(agent)
+        assert iter_calls == [1]
+        mock_insert.assert_not_called()
+
+        # Nothing changed: no dialog API calls at all
+        agent.client.reset_mock()
+        await scan_unread_messages(agent)
+        assert iter_calls == [1]
+        assert not any(isinstance(c.args[0], GetPeerDialogsRequest) for c in agent.client.call_args_list)
+
+        # A read on another device clears the dialog without a fetch
+        tracker = dialog_state.get_dialog_tracker(agent)
+        tracker.note_new_message(444)
+        tracker.note_read(444)
+        tracker.note_new_message(555)
+        await scan_unread_messages(agent)
+
+    assert iter_calls == [1]
+    requests = [c.args[0] for c in agent.client.call_args_list if isinstance(c.args[0], GetPeerDialogsRequest)]
+    assert len(requests) == 1
+    assert [p.peer for p in requests[0].peers] == [PeerUser(555)]
+    mock_insert.assert_called_once()
+    assert mock_insert.call_args.kwargs["channel_id"] == 555
+
+
+def test_recheck_pending_requeues_dialogs_without_a_received_task(dialog_state):
+    tracker = dialog_state.DialogStateTracker()
+    tracker.note_new_message(1)  # skipped by the scan, e.g. gagged
+    tracker.note_new_message(2)  # given a received task
+    tracker.note_new_message(3)
+    tracker.note_read(3)
+    tracker.take_changed()
+    queued = {2}
+
+    tracker.recheck_pending([1, 2, 3], lambda dialog_id: dialog_id in queued)
+    assert tracker.take_changed() == {1}
+
+    # Left to its received task while the task is queued
+    tracker.recheck_pending([], lambda dialog_id: dialog_id in queued)
+    assert tracker.take_changed() == set()
+
+    # The task ended without reading the dialog
+    queued.clear()
+    tracker.recheck_pending([], lambda dialog_id: dialog_id in queued)
+    assert tracker.take_changed() == {2}
+
+
+def test_mark_dialog_changed_only_touches_existing_trackers(dialog_state):
+    agent = make_mock_agent(use_agent_spec=True)
+    dialog_state.mark_dialog_changed(agent, 7)
+    assert agent not in dialog_state._trackers
+
+    tracker = dialog_state.get_dialog_tracker(agent)
+    tracker.full_scan_completed(datetime.now(UTC))
+    dialog_state.mark_dialog_changed(agent, 7)
+    assert tracker.take_changed() == {7}
+    dialog_state.request_full_dialog_scan(agent)
+    assert tracker._last_full_scan is None
+
+
+@pytest.mark.asyncio
+async def test_scan_rechecks_gagged_dialog_until_ungagged(dialog_state, monkeypatch, fake_clock):
+    from agent_server import scan_unread_messages
+    from task_graph import WorkQueue
+
+    WorkQueue.reset_instance()
+    monkeypatch.setattr("agent_server.scan.clock", fake_clock)
+    agent = make_mock_agent(use_agent_spec=True)
+    agent.is_conversation_gagged = AsyncMock(return_value=True)
+
+    async def mock_iter_dialogs():
+        yield SimpleNamespace(id=555, unread_count=1, unread_mentions_count=0, dialog=_raw_dialog(555, 1))
+
+    async def mock_iter_messages(*args, **kwargs):
+        return
+        yield
+
+    agent.client.iter_dialogs = mock_iter_dialogs
+    agent.client.iter_messages = mock_iter_messages
+    agent.client.get_input_entity = AsyncMock(side_effect=lambda peer_id: PeerUser(peer_id))
+    peer_dialogs = MagicMock()
+    peer_dialogs.dialogs = [_raw_dialog(555, unread_count=1)]
+    agent.client.return_value = peer_dialogs
+
+    with patch("agent_server.scan.get_channel_name", return_value="Chat"), patch(
+        "agent_server.scan.can_agent_send_to_channel", new=AsyncMock(return_value=True)
+    ), patch("agent_server.scan.insert_received_task_for_conversation") as mock_insert, patch(
+        "agent_server.scan.ensure_media_cache", return_value=None
+    ):
+        await scan_unread_messages(agent)
+        mock_insert.assert_not_called()
+
+        # No Telegram update arrives, but the still-unread gagged dialog is checked again
+        agent.client.reset_mock()
+        await scan_unread_messages(agent)
+        assert any(isinstance(c.args[0], GetPeerDialogsRequest) for c in agent.client.call_args_list)
+        mock_insert.assert_not_called()
+
+        agent.is_conversation_gagged = AsyncMock(return_value=False)
+        await scan_unread_messages(agent)
+
+    mock_insert.assert_called_once()
+    assert mock_insert.call_args.kwargs["channel_id"] == 555
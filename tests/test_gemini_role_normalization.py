@@ -24,8 +24,8 @@ class FakeClient:
         def __init__(self, client):
             self.client = client
 
-        # Called via asyncio.to_thread; keep it sync
-        def generate_content(self, model, contents, config=None, **kwargs):
+        # Called as client.aio.models.generate_content
+        async def generate_content(self, model, contents, config=None, **kwargs):
             self.client.last_model = model
             self.client.last_contents = contents
             self.client.last_kwargs = kwargs
@@ -37,6 +37,10 @@ class FakeClient:
     def models(self):
         return self.Models(self)
 
+    @property
+    def aio(self):
+        return self
+
 
 @pytest.mark.asyncio
 async def test_roles_and_system_instruction_path():
@@ -0,0 +1,53 @@
+# tests/test_llm_http_pool.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for the pooled per-provider HTTP and SDK clients used by LLM classes."""
+
+import asyncio
+
+import pytest
+
+from llm.gemini import GeminiLLM
+from llm.grok import GrokLLM
+from llm.http_pool import close_llm_http_clients, get_llm_http_client
+
+
+@pytest.mark.asyncio
+async def test_llm_instances_share_pooled_clients_per_provider():
+    first = GrokLLM(model="grok-test", api_key="key-1")
+    second = GrokLLM(model="grok-test", api_key="key-1")
+    other_key = GrokLLM(model="grok-test", api_key="key-2")
+
+    assert first.client is second.client
+    assert other_key.client is not first.client
+    # Both SDK clients send through the provider's one HTTP connection pool
+    assert first.client._client is get_llm_http_client("grok")
+    assert other_key.client._client is get_llm_http_client("grok")
+    assert get_llm_http_client("gemini") is not get_llm_http_client("grok")
+
+    gemini = GeminiLLM(model="gemini-test", api_key="key-1")
+    assert gemini.client is GeminiLLM(model="gemini-test", api_key="key-1").client
+    assert gemini.client._api_client._async_httpx_client is get_llm_http_client("gemini")
+
+    # Assigning the attribute overrides the pooled client for that instance only
+    first.client = "fake"
+    assert first.client == "fake"
+    assert second.client != "fake"
+
+    http_client = get_llm_http_client("grok")
+    await close_llm_http_clients()
+    assert http_client.is_closed
+    assert get_llm_http_client("grok") is not http_client
+    await close_llm_http_clients()
+
+
+def test_pooled_clients_are_per_event_loop():
+    async def grab():
+        client = get_llm_http_client("openai")
+        assert get_llm_http_client("openai") is client
+        await close_llm_http_clients()
+        return client
+
+    assert asyncio.run(grab()) is not asyncio.run(grab())
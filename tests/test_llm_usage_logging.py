@@ -165,7 +165,7 @@ def test_log_llm_usage_persists_to_task_log_when_context_provided():
     """Test that llm usage is persisted to task_execution_log with conversation context."""
     with patch("llm.usage_logging.get_model_pricing", return_value=(1.00, 3.00)):
         with patch("llm.usage_logging.logger"):
-            with patch("db.task_log.log_task_execution") as mock_log_task_execution:
+            with patch("db.task_log.enqueue_task_execution") as mock_enqueue_task_execution:
                 log_llm_usage(
                     agent=SimpleNamespace(name="TestAgent", agent_id=123456),
                     model_name="test-model",
@@ -175,8 +175,8 @@ def test_log_llm_usage_persists_to_task_log_when_context_provided():
                     channel_telegram_id=78910,
                 )
 
-                assert mock_log_task_execution.call_count == 1
-                kwargs = mock_log_task_execution.call_args.kwargs
+                assert mock_enqueue_task_execution.call_count == 1
+                kwargs = mock_enqueue_task_execution.call_args.kwargs
                 assert kwargs["agent_telegram_id"] == 123456
                 assert kwargs["channel_telegram_id"] == 78910
                 assert kwargs["action_kind"] == "llm_usage"
@@ -195,7 +195,7 @@ def test_log_llm_usage_does_not_persist_without_context():
     """Test that llm usage is not persisted when conversation context is missing."""
     with patch("llm.usage_logging.get_model_pricing", return_value=(1.00, 3.00)):
         with patch("llm.usage_logging.logger"):
-            with patch("db.task_log.log_task_execution") as mock_log_task_execution:
+            with patch("db.task_log.enqueue_task_execution") as mock_enqueue_task_execution:
                 log_llm_usage(
                     agent=SimpleNamespace(name="TestAgent"),
                     model_name="test-model",
@@ -204,7 +204,7 @@ def test_log_llm_usage_does_not_persist_without_context():
                     operation="query_structured",
                 )
 
-                assert mock_log_task_execution.call_count == 0
+                assert mock_enqueue_task_execution.call_count == 0
 
 
 def test_log_llm_usage_with_cost_usd_override():
@@ -228,7 +228,7 @@ def test_log_llm_usage_with_cost_usd_override():
 def test_log_llm_usage_with_cost_usd_persists_to_task_log():
     """Test that when cost_usd is provided, persisted task log uses that cost."""
     with patch("llm.usage_logging.logger"):
-        with patch("db.task_log.log_task_execution") as mock_log_task_execution:
+        with patch("db.task_log.enqueue_task_execution") as mock_enqueue_task_execution:
             log_llm_usage(
                 agent=SimpleNamespace(name="TestAgent", agent_id=123456),
                 model_name="grok-4-1-fast-non-reasoning",
@@ -237,8 +237,8 @@ def test_log_llm_usage_with_cost_usd_persists_to_task_log():
                 operation="query_structured",
                 cost_usd=0.001234,
             )
-            assert mock_log_task_execution.call_count == 1
-            details = json.loads(mock_log_task_execution.call_args.kwargs["action_details"])
+            assert mock_enqueue_task_execution.call_count == 1
+            details = json.loads(mock_enqueue_task_execution.call_args.kwargs["action_details"])
             assert details["cost"] == pytest.approx(0.001234)
             assert details["input_tokens"] == 100
             assert details["output_tokens"] == 50
@@ -303,7 +303,7 @@ def test_log_llm_usage_falls_back_to_agent_id_for_channel():
     """Test that channel_id falls back to agent_id when conversation ID is missing."""
     with patch("llm.usage_logging.get_model_pricing", return_value=(1.00, 3.00)):
         with patch("llm.usage_logging.logger"):
-            with patch("db.task_log.log_task_execution") as mock_log_task_execution:
+            with patch("db.task_log.enqueue_task_execution") as mock_enqueue_task_execution:
                 log_llm_usage(
                     agent=SimpleNamespace(name="TestAgent", agent_id=123456),
                     model_name="test-model",
@@ -312,8 +312,8 @@ def test_log_llm_usage_falls_back_to_agent_id_for_channel():
                     operation="query_structured",
                 )
 
-                assert mock_log_task_execution.call_count == 1
-                kwargs = mock_log_task_execution.call_args.kwargs
+                assert mock_enqueue_task_execution.call_count == 1
+                kwargs = mock_enqueue_task_execution.call_args.kwargs
                 assert kwargs["agent_telegram_id"] == 123456
                 assert kwargs["channel_telegram_id"] == 123456
 
@@ -341,7 +341,7 @@ def test_gemini_thinking_tokens_counted_in_rest_response():
     with patch("llm.usage_logging.get_model_pricing", return_value=(0.50, 3.00)):
         with patch("llm.usage_logging.logger") as mock_logger:
             with patch("llm.gemini.GOOGLE_GEMINI_API_KEY", "fake-api-key"):
-                with patch("llm.gemini.genai.Client"):
+                with patch("llm.gemini.get_genai_client"):
                     # Create a mock GeminiLLM instance
                     gemini = GeminiLLM(model="gemini-3-flash-preview")
                     
@@ -382,7 +382,7 @@ def test_gemini_thinking_tokens_counted_in_sdk_response():
     with patch("llm.usage_logging.get_model_pricing", return_value=(0.50, 3.00)):
         with patch("llm.usage_logging.logger") as mock_logger:
             with patch("llm.gemini.GOOGLE_GEMINI_API_KEY", "fake-api-key"):
-                with patch("llm.gemini.genai.Client"):
+                with patch("llm.gemini.get_genai_client"):
                     # Create a mock GeminiLLM instance
                     gemini = GeminiLLM(model="gemini-3-flash-preview")
                     
@@ -430,7 +430,7 @@ def test_gemini_no_thinking_tokens_still_works():
     with patch("llm.usage_logging.get_model_pricing", return_value=(0.50, 3.00)):
         with patch("llm.usage_logging.logger") as mock_logger:
             with patch("llm.gemini.GOOGLE_GEMINI_API_KEY", "fake-api-key"):
-                with patch("llm.gemini.genai.Client"):
+                with patch("llm.gemini.get_genai_client"):
                     gemini = GeminiLLM(model="gemini-2.0-flash")
                     
                     gemini._log_usage_from_rest_response(
@@ -474,7 +474,7 @@ def test_gemini_rest_response_with_none_token_counts_does_not_raise():
     with patch("llm.usage_logging.get_model_pricing", return_value=(0.50, 3.00)):
         with patch("llm.usage_logging.logger") as mock_logger:
             with patch("llm.gemini.GOOGLE_GEMINI_API_KEY", "fake-api-key"):
-                with patch("llm.gemini.genai.Client"):
+                with patch("llm.gemini.get_genai_client"):
                     gemini = GeminiLLM(model="gemini-3-flash-preview")
                     gemini._log_usage_from_rest_response(
                         obj=mock_response,
@@ -503,7 +503,7 @@ def test_gemini_sdk_response_with_none_token_counts_does_not_raise():
     with patch("llm.usage_logging.get_model_pricing", return_value=(0.50, 3.00)):
         with patch("llm.usage_logging.logger") as mock_logger:
             with patch("llm.gemini.GOOGLE_GEMINI_API_KEY", "fake-api-key"):
-                with patch("llm.gemini.genai.Client"):
+                with patch("llm.gemini.get_genai_client"):
                     gemini = GeminiLLM(model="gemini-3-flash-preview")
                     gemini._log_usage_from_sdk_response(
                         response=mock_response,
@@ -0,0 +1,230 @@
+# tests/test_media_batch_lookup.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for batch media lookups (get_many) and PrefetchedMediaSource."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from media.mysql_media_source import MySQLMediaSource
+from media.sources import (
+    AIChainMediaSource,
+    CompositeMediaSource,
+    DirectoryMediaSource,
+    MediaSource,
+    NothingMediaSource,
+    PrefetchedMediaSource,
+)
+
+
+class CountingSource(MediaSource):
+    """Single-record source that counts get() calls."""
+
+    def __init__(self, records):
+        self.records = records
+        self.get_calls = []
+
+    async def get(self, unique_id, agent=None, doc=None, **metadata):
+        self.get_calls.append(unique_id)
+        return self.records.get(unique_id)
+
+
+def _mysql_chain():
+    return AIChainMediaSource(
+        cache_source=MySQLMediaSource(),
+        unsupported_source=NothingMediaSource(),
+        budget_source=NothingMediaSource(),
+        ai_source=NothingMediaSource(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_composite_get_many_uses_one_mysql_query_after_directory(tmp_path):
+    curated = tmp_path / "media"
+    curated.mkdir()
+    (curated / "curated-1.json").write_text(
+        json.dumps({"unique_id": "curated-1", "kind": "photo", "description": "curated"}),
+        encoding="utf-8",
+    )
+    chain = CompositeMediaSource([DirectoryMediaSource(curated), _mysql_chain()])
+
+    with patch("db.media_metadata.load_media_metadata_many") as load_many, patch(
+        "db.media_metadata.touch_media_last_used"
+    ) as touch, patch("db.media_metadata.load_media_metadata") as load_one:
+        load_many.return_value = {"db-1": {"unique_id": "db-1", "description": "from db"}}
+        records = await chain.get_many(
+            ["curated-1", "db-1", "missing", "db-1"], update_last_used=True
+        )
+
+    assert set(records) == {"curated-1", "db-1"}
+    assert records["curated-1"]["description"] == "curated"
+    # Only IDs the curated directory did not resolve reach MySQL, in one query
+    load_many.assert_called_once_with(["db-1", "missing"])
+    touch.assert_called_once_with(["db-1"])
+    load_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_prefetched_source_serves_lookups_and_delegates_misses(tmp_path):
+    inner = CountingSource({"miss": {"unique_id": "miss", "description": "slow path"}})
+
+    async def get_many(unique_ids, agent=None, **metadata):
+        return {
+            "hit": {"unique_id": "hit", "description": "cached", "status": "generated"},
+            "temp": {"unique_id": "temp", "status": "temporary_failure"},
+        }
+
+    inner.get_many = get_many
+    prefetched = await PrefetchedMediaSource.prefetch(inner, ["hit", "temp", "miss"])
+
+    assert (await prefetched.get("hit"))["description"] == "cached"
+    assert (await prefetched.get("temp"))["status"] == "temporary_failure"
+    assert (await prefetched.get("miss"))["description"] == "slow path"
+    assert inner.get_calls == ["miss"]
+
+    # With a document, temporary failures and records without a media file on disk
+    # go through the wrapped chain (retry / download)
+    with patch("media.state_path.STATE_DIRECTORY", str(tmp_path)):
+        await prefetched.get("temp", doc=object())
+        await prefetched.get("hit", doc=object())
+        assert inner.get_calls == ["miss", "temp", "hit"]
+
+        prefetched = await PrefetchedMediaSource.prefetch(inner, ["hit"])
+        (tmp_path / "media").mkdir()
+        (tmp_path / "media" / "hit.webp").write_bytes(b"x")
+        assert (await prefetched.get("hit", doc=object()))["description"] == "cached"
+        assert inner.get_calls == ["miss", "temp", "hit"]
+
+
+@pytest.mark.asyncio
+async def test_prefetched_source_checks_media_files_in_the_chain_directory(tmp_path):
+    media_dir = tmp_path / "relocated"
+    media_dir.mkdir()
+    (media_dir / "hit.webp").write_bytes(b"x")
+    chain = AIChainMediaSource(
+        cache_source=MySQLMediaSource(directory_source=DirectoryMediaSource(media_dir)),
+        unsupported_source=NothingMediaSource(),
+        budget_source=NothingMediaSource(),
+        ai_source=NothingMediaSource(),
+    )
+    record = {"unique_id": "hit", "description": "cached", "status": "generated"}
+    prefetched = PrefetchedMediaSource(CompositeMediaSource([chain]), {"hit": record})
+
+    with patch.object(chain, "get", side_effect=AssertionError("slow path")):
+        assert (await prefetched.get("hit", doc=object()))["description"] == "cached"
+
+
+def test_last_used_tracker_coalesces_touches_into_one_write():
+    from db.media_metadata import MediaLastUsedTracker
+
+    writes = []
+    tracker = MediaLastUsedTracker(flush_interval=3600, update_many=writes.append)
+    tracker.touch("a")
+    tracker.touch(["b", "a", "", "b"])
+    assert tracker.flush(timeout=5)
+    assert writes == [["a", "b"]]
+    assert (tracker.touches, tracker.rows_written) == (4, 2)
+
+    tracker.touch("c")
+    tracker.close(timeout=5)
+    assert writes == [["a", "b"], ["c"]]
+    # Touches after close are dropped rather than starting a new writer
+    tracker.touch("d")
+    assert tracker.touches_dropped == 1
+
+
+def test_last_used_tracker_requeues_failed_write():
+    from db.media_metadata import MediaLastUsedTracker
+
+    writes = []
+
+    def flaky_update(batch):
+        writes.append(batch)
+        if len(writes) == 1:
+            raise RuntimeError("db down")
+
+    tracker = MediaLastUsedTracker(flush_interval=3600, retry_delay=0.1, update_many=flaky_update)
+    tracker.touch(["a", "b"])
+    assert not tracker.flush(timeout=5)
+    tracker.touch("c")
+    assert tracker.flush(timeout=5)
+    tracker.close(timeout=5)
+    assert writes == [["a", "b"], ["a", "b", "c"]]
+    assert tracker.failed_flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_mysql_source_serves_repeat_lookups_from_record_cache():
+    source = MySQLMediaSource()
+    with patch("db.media_metadata.load_media_metadata") as load_one, patch(
+        "db.media_metadata.load_media_metadata_many"
+    ) as load_many:
+        load_one.return_value = {"unique_id": "a", "description": "first"}
+        load_many.return_value = {"b": {"unique_id": "b", "description": "second"}}
+        assert (await source.get("a"))["description"] == "first"
+        assert (await source.get("a"))["description"] == "first"
+        records = await source.get_many(["a", "b"])
+        assert set(records) == {"a", "b"}
+        # Only b was not cached yet
+        load_many.assert_called_once_with(["b"])
+        assert load_one.call_count == 1
+
+        # A metadata write through the db layer invalidates the cached record
+        from media.media_record_cache import invalidate_media_record
+
+        invalidate_media_record("a")
+        load_one.return_value = {"unique_id": "a", "description": "edited"}
+        assert (await source.get("a"))["description"] == "edited"
+        assert load_one.call_count == 2
+
+
+def test_record_cache_bounds_entries_and_reports_hit_rate(tmp_path):
+    from media.media_record_cache import MediaRecordCache
+
+    cache = MediaRecordCache(max_entries=2, ttl_seconds=60)
+    for uid in ("a", "b", "c"):
+        cache.put_record(uid, {"unique_id": uid})
+    assert cache.get_record("a") is None
+    assert cache.get_record("c") == {"unique_id": "c"}
+    cache.remember_file_exists(str(tmp_path), "c", "c.webp")
+    assert cache.file_exists(str(tmp_path), "c", "c.webp")
+    cache.invalidate("c")
+    assert not cache.file_exists(str(tmp_path), "c", "c.webp")
+
+    metrics = cache.metrics()
+    assert metrics["records"] == 1
+    assert metrics["evictions"] == 1
+    assert metrics["record_hit_rate"] == 0.5
+    assert metrics["record_bytes"] > 0
+
+
+@pytest.mark.asyncio
+async def test_mysql_source_does_not_cache_record_invalidated_during_load():
+    from media.media_record_cache import get_media_record_cache, invalidate_media_record
+
+    source = MySQLMediaSource()
+
+    def load_racing_a_write(unique_id):
+        # A metadata write lands after the SELECT read the old row
+        invalidate_media_record(unique_id)
+        return {"unique_id": unique_id, "description": "stale"}
+
+    with patch("db.media_metadata.load_media_metadata", side_effect=load_racing_a_write), patch(
+        "db.media_metadata.load_media_metadata_many",
+        side_effect=lambda uids: {uid: load_racing_a_write(uid) for uid in uids},
+    ):
+        assert (await source.get("race-a"))["description"] == "stale"
+        assert set(await source.get_many(["race-b"])) == {"race-b"}
+    cache = get_media_record_cache()
+    assert cache.get_record("race-a") is None
+    assert cache.get_record("race-b") is None
+
+    # A write to another record does not stop this one being cached
+    generation = cache.generation
+    invalidate_media_record("other")
+    cache.put_record("race-a", {"unique_id": "race-a"}, loaded_at_generation=generation)
+    assert cache.get_record("race-a") == {"unique_id": "race-a"}
@@ -75,12 +75,13 @@ async def test_budget_exhaustion_returns_fallback_after_limit(monkeypatch, tmp_p
     agent = SimpleNamespace(client=client, llm=llm, name="TestAgent")
 
     # Prevent real network; return small bytes (async)
-    async def _fake_download_media_bytes(client, doc):
-        return b"\x89PNG..."
+    async def _fake_download_media_to_file(client, doc, path, max_bytes=None):
+        path.write_bytes(b"\x89PNG...")
+        return path.stat().st_size
 
-        # Patch download_media_bytes where it's used (in ai_generating module)
+        # Patch download_media_to_file where it's used (in ai_generating module)
         monkeypatch.setattr(
-            "media.sources.ai_generating.download_media_bytes", _fake_download_media_bytes
+            "media.sources.ai_generating.download_media_to_file", _fake_download_media_to_file
         )
 
     # Create a media source chain with budget management
@@ -309,12 +310,13 @@ async def test_ai_chain_updates_cache_on_generation(monkeypatch, tmp_path):
     agent = SimpleNamespace(client=client, llm=llm, name="TestAgent")
 
     # Prevent real network; return small bytes (async)
-    async def _fake_download_media_bytes(client, doc):
-        return b"\x89PNG..."
+    async def _fake_download_media_to_file(client, doc, path, max_bytes=None):
+        path.write_bytes(b"\x89PNG...")
+        return path.stat().st_size
 
-        # Patch download_media_bytes where it's used (in ai_generating module)
+        # Patch download_media_to_file where it's used (in ai_generating module)
         monkeypatch.setattr(
-            "media.sources.ai_generating.download_media_bytes", _fake_download_media_bytes
+            "media.sources.ai_generating.download_media_to_file", _fake_download_media_to_file
         )
 
     # Create AI cache directory and sources
@@ -375,9 +377,10 @@ async def test_budget_exhaustion_still_stores_media(monkeypatch, tmp_path):
     # Track download calls
     download_calls = []
 
-    async def _fake_download_media_bytes(client, doc):
+    async def _fake_download_media_to_file(client, doc, path, max_bytes=None):
         download_calls.append(doc)
-        return b"\x89PNG..."
+        path.write_bytes(b"\x89PNG...")
+        return path.stat().st_size
 
     # Create AI cache directory and sources
     ai_cache_dir = tmp_path / "media"
@@ -397,10 +400,10 @@ async def test_budget_exhaustion_still_stores_media(monkeypatch, tmp_path):
     # Budget = 0 (exhausted)
     reset_description_budget(0)
 
-    # Mock get_media_llm and download_media_bytes (used in both ai_chain and ai_generating)
+    # Mock get_media_llm and download_media_to_file (used in both ai_chain and ai_generating)
     with patch("media.sources.ai_generating.get_media_llm", return_value=llm), \
-         patch("media.sources.ai_chain.download_media_bytes", side_effect=_fake_download_media_bytes), \
-         patch("media.sources.ai_generating.download_media_bytes", side_effect=_fake_download_media_bytes):
+         patch("media.sources.ai_chain.download_media_to_file", side_effect=_fake_download_media_to_file), \
+         patch("media.sources.ai_generating.download_media_to_file", side_effect=_fake_download_media_to_file):
         # Act: Try to get description when budget is exhausted
         doc = SimpleNamespace(uid="budget-exhausted-uid", mime_type="image/png")
         result = await ai_chain.get(
@@ -461,7 +464,7 @@ async def test_ai_generating_source_uses_cached_media_file(monkeypatch, tmp_path
             channel_telegram_id: int | None = None,
             channel_name: str | None = None,
         ) -> str:
-            received_bytes.append(image_bytes)
+            received_bytes.append(bytes(image_bytes))
             return await super().describe_image(
                 image_bytes,
                 agent,
@@ -483,13 +486,14 @@ async def test_ai_generating_source_uses_cached_media_file(monkeypatch, tmp_path
     cached_media_file = cache_dir / f"{unique_id}.png"
     cached_media_file.write_bytes(cached_media_bytes)
     
-    async def _fake_download_media_bytes(client, doc):
+    async def _fake_download_media_to_file(client, doc, path, max_bytes=None):
         download_calls.append((client, doc))
-        return b"downloaded content (should not be called)"
+        path.write_bytes(b"downloaded content (should not be called)")
+        return path.stat().st_size
     
     # Patch where download_media_bytes is actually used
     monkeypatch.setattr(
-        "media.sources.ai_generating.download_media_bytes", _fake_download_media_bytes
+        "media.sources.ai_generating.download_media_to_file", _fake_download_media_to_file
     )
     
     # Create AIGeneratingMediaSource with the cache directory
@@ -581,11 +585,12 @@ async def test_ai_chain_increments_retry_count_on_temp_failure(monkeypatch, tmp_
     client = FakeClient()
     agent = SimpleNamespace(client=client, llm=llm, name="TestAgent")
 
-    async def _fake_download_media_bytes(client, doc):
-        return b"\x89PNG..."
+    async def _fake_download_media_to_file(client, doc, path, max_bytes=None):
+        path.write_bytes(b"\x89PNG...")
+        return path.stat().st_size
 
     monkeypatch.setattr(
-        "media.sources.ai_generating.download_media_bytes", _fake_download_media_bytes
+        "media.sources.ai_generating.download_media_to_file", _fake_download_media_to_file
     )
 
     cache_dir = tmp_path / "cache"
@@ -715,17 +720,18 @@ async def test_ai_chain_persists_retry_count_when_skipping_temp_failure_overwrit
 async def test_ai_chain_updates_last_used_when_chain_returns(monkeypatch, tmp_path):
     """
     When AIChainMediaSource returns a record from the chain (not cache) and
-    update_last_used=True, it should call update_media_last_used.
+    update_last_used=True, it should touch the media last-used tracker.
     """
     llm = FakeLLM("generated desc")
     client = FakeClient()
     agent = SimpleNamespace(client=client, llm=llm, name="TestAgent")
 
-    async def _fake_download_media_bytes(client, doc):
-        return b"\x89PNG..."
+    async def _fake_download_media_to_file(client, doc, path, max_bytes=None):
+        path.write_bytes(b"\x89PNG...")
+        return path.stat().st_size
 
     monkeypatch.setattr(
-        "media.sources.ai_generating.download_media_bytes", _fake_download_media_bytes
+        "media.sources.ai_generating.download_media_to_file", _fake_download_media_to_file
     )
 
     cache_dir = tmp_path / "cache"
@@ -749,7 +755,7 @@ async def test_ai_chain_updates_last_used_when_chain_returns(monkeypatch, tmp_pa
         update_calls.append(uid)
 
     with patch("media.sources.ai_generating.get_media_llm", return_value=llm), \
-         patch("db.media_metadata.update_media_last_used", side_effect=mock_update_last_used):
+         patch("db.media_metadata.touch_media_last_used", side_effect=mock_update_last_used):
         result = await ai_chain.get(
             unique_id,
             agent=agent,
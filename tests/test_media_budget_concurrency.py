@@ -40,9 +40,10 @@ async def test_concurrent_budget_consumption(tmp_path):
     agent = SimpleNamespace(client=MagicMock(), llm=llm, name="TestAgent")
     
     # Mock download_media_bytes to add a delay
-    async def fake_download(*args, **kwargs):
+    async def fake_download(client, doc, path, max_bytes=None):
         await asyncio.sleep(0.1)
-        return b"fake_data"
+        path.write_bytes(b"fake_data")
+        return path.stat().st_size
 
     ai_cache_dir = tmp_path / "media"
     ai_cache_dir.mkdir()
@@ -55,7 +56,7 @@ async def test_concurrent_budget_consumption(tmp_path):
     # Budget = 1
     reset_description_budget(1)
 
-    with patch("media.sources.ai_generating.download_media_bytes", side_effect=fake_download), \
+    with patch("media.sources.ai_generating.download_media_to_file", side_effect=fake_download), \
          patch("media.sources.ai_generating.get_media_llm", return_value=llm):
         
         # Run 3 requests concurrently
@@ -74,3 +75,176 @@ async def test_concurrent_budget_consumption(tmp_path):
     assert llm.call_count == 1
     assert get_remaining_description_budget() == 0
 
+
+
+@pytest.mark.asyncio
+async def test_inject_media_descriptions_runs_items_concurrently_newest_first():
+    """
+    inject_media_descriptions describes uncached items concurrently, gives the
+    remaining budget to the newest ones, and processes each unique_id once.
+    """
+    from media.media_injector import inject_media_descriptions
+    from media.media_types import MediaItem, MediaKind
+    from media.sources import MediaSource
+
+    class SlowChain(MediaSource):
+        def __init__(self):
+            self.active = 0
+            self.max_active = 0
+            self.order = []
+
+        async def get(self, unique_id, agent=None, doc=None, **metadata):
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.order.append(unique_id)
+            await asyncio.sleep(0.05)
+            self.active -= 1
+            return {"unique_id": unique_id, "description": "d", "status": MediaStatus.GENERATED.value}
+
+    # Newest first, as returned by get_messages; "uid-0" appears twice
+    uids = ["uid-0", "uid-1", "uid-2", "uid-3", "uid-0"]
+    messages = [SimpleNamespace(date=None, uid=uid) for uid in uids]
+    items = {
+        id(msg): [MediaItem(kind=MediaKind.PHOTO, unique_id=msg.uid, file_ref=object())]
+        for msg in messages
+    }
+    chain = SlowChain()
+    agent = SimpleNamespace(client=MagicMock(), llm=FakeLLM(), name="TestAgent")
+    reset_description_budget(2)
+
+    with patch("media.media_injector.iter_media_parts", side_effect=lambda m: items[id(m)]), \
+         patch("media.media_injector._resolve_sender_and_channel",
+               new=AsyncMock(return_value=(None, None, None, None))):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await inject_media_descriptions(messages, agent=agent, peer_id=1, media_chain=chain)
+        elapsed = loop.time() - started
+
+    assert sorted(chain.order) == ["uid-0", "uid-1", "uid-2", "uid-3"]
+    # The two newest items (within budget) run before the older ones
+    assert set(chain.order[:2]) == {"uid-0", "uid-1"}
+    assert chain.max_active == 2
+    assert elapsed < 0.05 * 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_same_media_share_one_generation(tmp_path):
+    """
+    Concurrent AIChainMediaSource.get calls for one unique_id (e.g. the same
+    sticker arriving in two conversations) download and describe it once.
+    """
+    from media.single_flight import get_media_single_flight
+    from media.sources import DirectoryMediaSource
+
+    llm = FakeLLM()
+    agent = SimpleNamespace(client=MagicMock(), llm=llm, name="TestAgent")
+    downloads = []
+
+    async def fake_download(client, doc, path, max_bytes=None):
+        downloads.append(doc)
+        await asyncio.sleep(0.05)
+        path.write_bytes(b"\x89PNG fake")
+        return path.stat().st_size
+
+    cache_dir = tmp_path / "media"
+    cache_dir.mkdir()
+    chain = AIChainMediaSource(
+        cache_source=DirectoryMediaSource(cache_dir),
+        unsupported_source=NothingMediaSource(),
+        budget_source=BudgetExhaustedMediaSource(),
+        ai_source=AIGeneratingMediaSource(cache_directory=cache_dir),
+    )
+    reset_description_budget(5)
+    saved_before = get_media_single_flight().llm_calls_saved
+
+    with patch("media.sources.ai_generating.download_media_to_file", side_effect=fake_download), \
+         patch("media.sources.ai_chain.download_media_to_file", side_effect=fake_download), \
+         patch("media.sources.ai_generating.get_media_llm", return_value=llm):
+        docs = [SimpleNamespace(mime_type="image/png") for _ in range(3)]
+        results = await asyncio.gather(
+            *(chain.get(unique_id="same-uid", agent=agent, doc=doc, kind="photo") for doc in docs)
+        )
+
+    assert [r["description"] for r in results] == ["fake description"] * 3
+    assert llm.call_count == 1
+    # Only the leader downloads (followers never reach the download step), and
+    # the chain reuses the file the AI source already streamed to scratch
+    assert downloads == [downloads[0]]
+    assert get_remaining_description_budget() == 4
+    assert get_media_single_flight().llm_calls_saved - saved_before == 2
+
+
+@pytest.mark.asyncio
+async def test_scratch_downloads_are_removed(tmp_path):
+    """The AI source removes its own download; the chain removes the shared one after storing it."""
+    from media.media_scratch import get_scratch_file
+    from media.sources import DirectoryMediaSource
+
+    llm = FakeLLM()
+    agent = SimpleNamespace(client=MagicMock(), llm=llm, name="TestAgent")
+
+    async def fake_download(client, doc, path, max_bytes=None):
+        path.write_bytes(b"\x89PNG fake")
+        return path.stat().st_size
+
+    cache_dir = tmp_path / "media"
+    cache_dir.mkdir()
+    ai_source = AIGeneratingMediaSource(cache_directory=cache_dir)
+    chain = AIChainMediaSource(
+        cache_source=DirectoryMediaSource(cache_dir),
+        unsupported_source=NothingMediaSource(),
+        budget_source=BudgetExhaustedMediaSource(),
+        ai_source=ai_source,
+    )
+    reset_description_budget(5)
+    scratch_dir = get_scratch_file("probe").parent
+
+    with patch("media.sources.ai_generating.download_media_to_file", side_effect=fake_download), \
+         patch("media.sources.ai_chain.download_media_to_file", side_effect=fake_download), \
+         patch("media.sources.ai_generating.get_media_llm", return_value=llm):
+        direct = await ai_source.get("direct-uid", agent=agent, doc=SimpleNamespace(), kind="photo")
+        chained = await chain.get("chain-uid", agent=agent, doc=SimpleNamespace(mime_type="image/png"), kind="photo")
+
+    assert direct["status"] == chained["status"] == MediaStatus.GENERATED.value
+    assert list(scratch_dir.iterdir()) == []
+    assert list(cache_dir.glob("chain-uid.*")) != []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_missing_file_downloads_use_separate_files(tmp_path):
+    """Restoring the media file of a cached record downloads to a file private to each call."""
+    from media.sources import DirectoryMediaSource
+
+    cache_dir = tmp_path / "media"
+    cache_dir.mkdir()
+    cache_source = DirectoryMediaSource(cache_dir)
+    cache_source.put(
+        "cached-uid",
+        {"unique_id": "cached-uid", "kind": "photo", "status": MediaStatus.GENERATED.value, "description": "d"},
+        None,
+        None,
+    )
+    chain = AIChainMediaSource(
+        cache_source=cache_source,
+        unsupported_source=NothingMediaSource(),
+        budget_source=BudgetExhaustedMediaSource(),
+        ai_source=MagicMock(),
+    )
+    paths = []
+
+    async def fake_download(client, doc, path, max_bytes=None):
+        paths.append(path)
+        await asyncio.sleep(0.05)
+        path.write_bytes(b"\x89PNG fake")
+        return path.stat().st_size
+
+    agent = SimpleNamespace(client=MagicMock(), name="TestAgent")
+    with patch("media.sources.ai_chain.download_media_to_file", side_effect=fake_download):
+        results = await asyncio.gather(
+            *(chain.get("cached-uid", agent=agent, doc=SimpleNamespace(mime_type="image/png")) for _ in range(2))
+        )
+
+    assert [r["description"] for r in results] == ["d", "d"]
+    assert len(set(paths)) == 2
+    assert not any(p.exists() for p in paths)
+    assert list(cache_dir.glob("cached-uid.png")) != []
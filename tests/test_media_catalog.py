@@ -0,0 +1,148 @@
+# tests/test_media_catalog.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for the per-agent sticker/media catalog behind system prompts and media.json."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from handlers.received_helpers.prompt_builder import _build_sticker_list, get_media_list_json
+from media.media_catalog import mark_media_catalog_changed
+from media.media_record_cache import invalidate_media_record
+from media.sources import MediaSource, MediaStatus
+
+
+class RecordingChain(MediaSource):
+    """Chain stand-in that serves records from a dict and records lookups."""
+
+    def __init__(self, records):
+        self.records = records
+        self.get_calls = []
+        self.batch_calls = []
+
+    async def get(self, unique_id, agent=None, doc=None, **metadata):
+        self.get_calls.append(unique_id)
+        record = self.records.get(unique_id)
+        return dict(record) if record else None
+
+    async def get_many(self, unique_ids, agent=None, **metadata):
+        self.batch_calls.append(list(unique_ids))
+        return {}
+
+
+def _doc(uid, premium=False):
+    video_thumbs = [SimpleNamespace(type="f")] if premium else None
+    return SimpleNamespace(file_unique_id=uid, video_thumbs=video_thumbs)
+
+
+class _Agent:
+    """Minimal agent (catalogs are keyed weakly by agent, which SimpleNamespace does not support)."""
+
+    def __init__(self, stickers, media):
+        self.stickers = stickers
+        self.media = media
+        self.filter_premium_stickers = True
+
+
+def _agent(stickers, media=None):
+    return _Agent(stickers, media or {})
+
+
+@pytest.mark.asyncio
+async def test_sticker_list_only_resolves_new_and_changed_stickers():
+    chain = RecordingChain(
+        {
+            "s1": {"description": "waving", "status": "generated"},
+            "s2": {"description": "dancing", "status": "generated"},
+            "s3": {"status": MediaStatus.BUDGET_EXHAUSTED.value},
+        }
+    )
+    agent = _agent(
+        {
+            ("Set", "b"): _doc("s2"),
+            ("Set", "a"): _doc("s1"),
+            ("Set", "p"): _doc("premium", premium=True),
+        }
+    )
+
+    first = await _build_sticker_list(agent, chain)
+    assert first == "- Set :: a - waving\n- Set :: b - dancing"
+    assert sorted(chain.get_calls) == ["s1", "s2"]
+
+    # Unchanged: no lookups at all
+    chain.get_calls.clear()
+    assert await _build_sticker_list(agent, chain) == first
+    assert chain.get_calls == []
+
+    # A sticker added by the cache refresh is the only one looked up; without a
+    # final description it is retried on the next prompt
+    agent.stickers[("Set", "c")] = _doc("s3")
+    mark_media_catalog_changed(agent)
+    assert (await _build_sticker_list(agent, chain)).endswith("- Set :: c")
+    await _build_sticker_list(agent, chain)
+    assert chain.get_calls == ["s3", "s3"]
+
+    # A description edit invalidates just that sticker
+    chain.get_calls.clear()
+    chain.records["s1"]["description"] = "waving hello"
+    chain.records["s3"] = {"description": "sleeping", "status": "generated"}
+    invalidate_media_record("s1")
+    text = await _build_sticker_list(agent, chain)
+    assert "- Set :: a - waving hello" in text
+    assert "- Set :: c - sleeping" in text
+    assert sorted(chain.get_calls) == ["s1", "s3"]
+
+    # Removed stickers disappear
+    del agent.stickers[("Set", "b")]
+    mark_media_catalog_changed(agent)
+    assert "dancing" not in await _build_sticker_list(agent, chain)
+
+
+@pytest.mark.asyncio
+async def test_media_list_is_cached_until_media_changes():
+    chain = RecordingChain({"m1": {"description": "a cat", "kind": "photo", "status": "generated"}})
+    agent = _agent({}, media={"m1": _doc("m1"), "m2": _doc("m2")})
+
+    items = await get_media_list_json(agent, chain)
+    assert items == [
+        {"media_id": "m1", "media_type": "photo", "description": "a cat"},
+        {"media_id": "m2", "media_type": "document"},
+    ]
+    chain.get_calls.clear()
+    items[0]["description"] = "mutated by caller"
+    assert (await get_media_list_json(agent, chain))[0]["description"] == "a cat"
+    # m2 has no record yet, so only it is retried
+    assert chain.get_calls == ["m2"]
+
+    agent.media.pop("m2")
+    mark_media_catalog_changed(agent)
+    assert [item["media_id"] for item in await get_media_list_json(agent, chain)] == ["m1"]
+
+
+@pytest.mark.asyncio
+async def test_resolved_entries_are_touched_on_every_build():
+    chain = RecordingChain(
+        {
+            "s1": {"description": "waving", "status": "generated"},
+            "m1": {"description": "a cat", "kind": "photo", "status": "generated"},
+        }
+    )
+    agent = _agent({("Set", "a"): _doc("s1"), ("Set", "p"): _doc("premium", premium=True)},
+                   media={"m1": _doc("m1")})
+
+    with patch("db.media_metadata.touch_media_last_used") as touch:
+        await _build_sticker_list(agent, chain)
+        await get_media_list_json(agent, chain)
+        # First build: the chain lookups (update_last_used=True) cover the new entries
+        touch.assert_not_called()
+
+        chain.get_calls.clear()
+        await _build_sticker_list(agent, chain)
+        await get_media_list_json(agent, chain)
+        # Later builds skip the lookups but keep last_used_at current for cleanup
+        assert chain.get_calls == []
+        assert [c.args[0] for c in touch.call_args_list] == [["s1"], ["m1"]]
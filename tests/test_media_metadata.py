@@ -149,3 +149,25 @@ def test_load_media_metadata_returns_last_used_at():
         assert loaded["last_used_at"] is not None
     finally:
         media_metadata.delete_media_metadata(unique_id)
+
+
+def test_load_media_metadata_many_and_update_last_used_many():
+    """Batch load returns only known IDs; batch last_used update touches all of them."""
+    from db import media_metadata
+
+    unique_ids = ["test-batch-uid-1", "test-batch-uid-2"]
+    try:
+        for uid in unique_ids:
+            media_metadata.save_media_metadata(
+                {"unique_id": uid, "kind": "photo", "description": uid, "status": "generated"}
+            )
+        loaded = media_metadata.load_media_metadata_many(unique_ids + ["test-batch-missing", ""])
+        assert set(loaded) == set(unique_ids)
+        assert loaded["test-batch-uid-2"]["description"] == "test-batch-uid-2"
+
+        media_metadata.update_media_last_used_many(unique_ids)
+        for record in media_metadata.load_media_metadata_many(unique_ids).values():
+            assert record.get("last_used_at") is not None
+    finally:
+        for uid in unique_ids:
+            media_metadata.delete_media_metadata(uid)
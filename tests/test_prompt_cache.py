@@ -0,0 +1,157 @@
+# tests/test_prompt_cache.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for the stable-prefix prompt layout and provider prompt caching."""
+
+import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from llm.openrouter import OpenRouterLLM
+from llm.prompt_cache import (
+    GeminiContextCache,
+    SystemPrompt,
+    prompt_cache_key,
+    split_system_prompt,
+)
+from llm.usage_logging import calculate_cost, log_llm_usage
+
+
+def _make_agent():
+    agent = MagicMock()
+    agent.name = "TestAgent"
+    agent.media = {}
+    agent.photos = {}
+    agent.stickers = {}
+    agent.get_system_prompt.return_value = "Intentions\n\nBase prompt"
+    agent.get_stable_system_prompt.return_value = "Base prompt"
+    agent.get_intentions_section.return_value = "# Intentions\n\nbe kind"
+    agent._load_memory_content.return_value = "remember this"
+    agent._load_event_content.return_value = None
+    agent.get_current_time.return_value = datetime.datetime(2026, 3, 2, 12, 0, 0)
+    agent.daily_schedule_description = None
+    agent._load_summary_content = AsyncMock(return_value=None)
+    return agent
+
+
+async def _build(agent):
+    from handlers.received_helpers.prompt_builder import build_complete_system_prompt
+
+    with patch(
+        "handlers.received_helpers.prompt_builder.build_channel_details_section",
+        new_callable=AsyncMock,
+        return_value="",
+    ):
+        return await build_complete_system_prompt(
+            agent=agent,
+            channel_id=123,
+            messages=[],
+            media_chain=AsyncMock(),
+            is_group=False,
+            channel_name="User",
+            dialog=None,
+            target_msg=None,
+        )
+
+
+@pytest.mark.asyncio
+async def test_stable_layout_puts_per_turn_sections_after_prefix():
+    with patch("config.PROMPT_STABLE_PREFIX", True):
+        prompt = await _build(_make_agent())
+
+    assert isinstance(prompt, SystemPrompt)
+    prefix, rest = split_system_prompt(prompt)
+    assert prefix.startswith("Base prompt")
+    assert "remember this" not in prefix and "be kind" not in prefix
+    assert rest.index("remember this") < rest.index("be kind") < rest.index("Current Time")
+
+
+@pytest.mark.asyncio
+async def test_legacy_layout_returns_plain_prompt():
+    with patch("config.PROMPT_STABLE_PREFIX", False):
+        prompt = await _build(_make_agent())
+
+    assert not isinstance(prompt, SystemPrompt)
+    assert prompt.startswith("Intentions\n\nBase prompt")
+    assert split_system_prompt(prompt) == ("", prompt)
+
+
+def test_split_system_prompt_and_cache_key():
+    prompt = SystemPrompt("stable|changing", 7)
+    assert split_system_prompt(prompt) == ("stable|", "changing")
+    assert split_system_prompt(None) == ("", "")
+    assert prompt_cache_key("stable|", "model-a") == prompt_cache_key("stable|", "model-a")
+    assert prompt_cache_key("stable|", "model-a") != prompt_cache_key("stable|", "model-b")
+
+
+@pytest.mark.asyncio
+async def test_gemini_context_cache_creates_once_and_backs_off_on_failure():
+    client = MagicMock()
+    client.aio.caches.create = AsyncMock(return_value=SimpleNamespace(name="cachedContents/abc"))
+    cache = GeminiContextCache()
+    prefix = "x" * 400
+
+    with patch("config.GEMINI_CONTEXT_CACHE_MIN_TOKENS", 50):
+        assert await cache.get_or_create(client, "gemini-test", prefix) == "cachedContents/abc"
+        assert await cache.get_or_create(client, "gemini-test", prefix) == "cachedContents/abc"
+        assert client.aio.caches.create.await_count == 1
+        assert cache.stats() == {"entries": 1, "created": 1, "hits": 1}
+
+        # Too short to be worth caching
+        assert await cache.get_or_create(client, "gemini-test", "short") is None
+
+        # Failures are not retried until the TTL passes
+        cache.invalidate("cachedContents/abc")
+        client.aio.caches.create = AsyncMock(side_effect=RuntimeError("unsupported"))
+        assert await cache.get_or_create(client, "gemini-test", prefix) is None
+        assert await cache.get_or_create(client, "gemini-test", prefix) is None
+        assert client.aio.caches.create.await_count == 1
+
+
+def test_gemini_prompt_rest_joins_first_user_turn():
+    from llm.gemini import _prepend_user_text
+
+    contents = [
+        {"role": "user", "parts": [{"text": "hello"}]},
+        {"role": "model", "parts": [{"text": "hi"}]},
+    ]
+    merged = _prepend_user_text(contents, "rest of prompt")
+    assert [turn["role"] for turn in merged] == ["user", "model"]
+    assert merged[0]["parts"] == [{"text": "rest of prompt"}, {"text": "hello"}]
+    # The caller's contents are not modified
+    assert contents[0]["parts"] == [{"text": "hello"}]
+
+    merged = _prepend_user_text(contents[1:], "rest of prompt")
+    assert [turn["role"] for turn in merged] == ["user", "model"]
+
+
+def test_openrouter_marks_stable_prefix_with_cache_breakpoint():
+    llm = OpenRouterLLM(model="anthropic/claude-test", api_key="test-key")
+    prompt = SystemPrompt("stable|changing", 7)
+    messages = llm._build_messages([], system_prompt=prompt)
+
+    assert llm._needs_cache_breakpoint("anthropic/claude-test")
+    assert not llm._needs_cache_breakpoint("openai/gpt-test")
+    llm._mark_stable_prefix(messages, prompt)
+    assert messages[0]["content"] == [
+        {"type": "text", "text": "stable|", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "changing"},
+    ]
+
+
+def test_cached_input_tokens_are_discounted_and_logged():
+    with patch("llm.usage_logging.get_model_pricing", return_value=(1.00, 3.00)):
+        assert calculate_cost("test-model", 1_000_000, 0, cached_input_tokens=800_000) == pytest.approx(0.40)
+        with patch("llm.usage_logging.logger") as mock_logger:
+            log_llm_usage(
+                agent=SimpleNamespace(name="TestAgent"),
+                model_name="test-model",
+                input_tokens=1000,
+                output_tokens=10,
+                cached_input_tokens=800,
+            )
+    assert "cached_input_tokens=800" in mock_logger.info.call_args[0][0]
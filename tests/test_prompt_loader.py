@@ -0,0 +1,95 @@
+# tests/test_prompt_loader.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for the in-memory prompt registry."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from prompt_loader import (
+    cached_render,
+    get_available_system_prompts,
+    invalidate_prompt_cache,
+    load_system_prompt,
+)
+
+
+def _bump_mtime(path, seconds=10):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def config_dirs(tmp_path):
+    first = tmp_path / "first" / "prompts"
+    second = tmp_path / "second" / "prompts"
+    first.mkdir(parents=True)
+    second.mkdir(parents=True)
+    (first / "Role.md").write_text("first role\n")
+    (second / "Role.md").write_text("second role")
+    (second / "Other.md").write_text("other")
+    dirs = [str(tmp_path / "first"), str(tmp_path / "second")]
+    with patch("prompt_loader.CONFIG_DIRECTORIES", dirs):
+        yield first, second
+
+
+def test_loads_from_first_directory_and_lists_all(config_dirs):
+    assert load_system_prompt("Role") == "first role"
+    assert load_system_prompt("Other") == "other"
+    assert get_available_system_prompts() == ["Other", "Role"]
+    with pytest.raises(RuntimeError, match="Missing.md"):
+        load_system_prompt("Missing")
+
+
+def test_serves_from_memory_until_check_interval(config_dirs):
+    first, _ = config_dirs
+    with patch("config.PROMPT_CACHE_CHECK_INTERVAL_SECONDS", 3600):
+        assert load_system_prompt("Role") == "first role"
+        (first / "Role.md").write_text("edited")
+        _bump_mtime(first / "Role.md")
+        with patch("pathlib.Path.read_text", side_effect=AssertionError("read from disk")):
+            assert load_system_prompt("Role") == "first role"
+
+        # Admin console edits invalidate explicitly
+        invalidate_prompt_cache()
+        assert load_system_prompt("Role") == "edited"
+
+
+def test_reloads_changed_and_new_files(config_dirs):
+    first, _ = config_dirs
+    with patch("config.PROMPT_CACHE_CHECK_INTERVAL_SECONDS", 0):
+        assert load_system_prompt("Role") == "first role"
+        (first / "Role.md").write_text("edited")
+        _bump_mtime(first / "Role.md")
+        assert load_system_prompt("Role") == "edited"
+
+        (first / "New.md").write_text("new")
+        _bump_mtime(first)
+        assert load_system_prompt("New") == "new"
+
+        (first / "Role.md").unlink()
+        _bump_mtime(first, seconds=20)
+        assert load_system_prompt("Role") == "second role"
+
+
+def test_cached_render_is_dropped_when_a_prompt_changes(config_dirs):
+    first, _ = config_dirs
+    builds = []
+
+    def build():
+        builds.append(1)
+        return load_system_prompt("Role").upper()
+
+    with patch("config.PROMPT_CACHE_CHECK_INTERVAL_SECONDS", 0):
+        assert cached_render(("test", 1), build) == "FIRST ROLE"
+        assert cached_render(("test", 1), build) == "FIRST ROLE"
+        assert len(builds) == 1
+
+        (first / "Role.md").write_text("edited")
+        _bump_mtime(first / "Role.md")
+        assert cached_render(("test", 1), build) == "EDITED"
+        assert len(builds) == 2
@@ -0,0 +1,125 @@
+# tests/test_prompt_pipeline.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for concurrent prompt stages and stage timings."""
+
+import asyncio
+import datetime
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from handlers.received_helpers.prompt_pipeline import StageTimings, run_stages
+
+
+@pytest.mark.asyncio
+async def test_run_stages_overlaps_and_keeps_order():
+    async def slow(value):
+        await asyncio.sleep(0.1)
+        return value
+
+    start = time.perf_counter()
+    assert await run_stages(slow("a"), slow("b"), slow("c")) == ["a", "b", "c"]
+    assert time.perf_counter() - start < 0.25
+
+
+@pytest.mark.asyncio
+async def test_run_stages_raises_first_error_unwrapped_and_cancels_others():
+    cancelled = asyncio.Event()
+
+    async def hangs():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def fails():
+        raise ValueError("Cannot resolve entity")
+
+    with pytest.raises(ValueError, match="Cannot resolve entity"):
+        await run_stages(hangs(), fails())
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_go_into_the_received_task_log_row():
+    from db.task_log import format_action_details
+    from task_graph import TaskGraph, TaskNode
+    from tick import _log_task_completion
+
+    timings = StageTimings()
+    await timings.timed("memories", asyncio.sleep(0.01))
+    with timings.stage("get_messages"):
+        pass
+
+    task = TaskNode(id="task-1", type="received", params={"message_id": 7})
+    timings.log("[Agent]", task)
+    graph = TaskGraph(id="g-1", context={"agent_id": 1001, "channel_id": 42}, tasks=[task])
+
+    with patch("db.task_log.enqueue_task_execution") as enqueue:
+        _log_task_completion(graph, task)
+
+    # One row per received task, with the timings in its details
+    enqueue.assert_called_once()
+    kwargs = enqueue.call_args.kwargs
+    assert kwargs["action_kind"] == "received"
+    assert kwargs["task_identifier"] == "task-1"
+    details = json.loads(kwargs["action_details"])
+    assert details == json.loads(format_action_details("received", task.params))
+    timing = details["prompt_timings"]
+    assert set(timing["stages"]) == {"memories", "get_messages"}
+    assert timing["stages"]["memories"] >= 10
+    assert timing["total_ms"] >= timing["stages"]["memories"]
+
+
+@pytest.mark.asyncio
+async def test_prompt_sections_are_fetched_concurrently():
+    from handlers.received_helpers.prompt_builder import build_complete_system_prompt
+
+    agent = MagicMock()
+    agent.name = "TestAgent"
+    agent.media = {}
+    agent.photos = {}
+    agent.stickers = {}
+    agent.role_prompt_names = []
+    agent.get_system_prompt.return_value = "Base prompt"
+    agent._load_memory_content.side_effect = lambda channel_id: time.sleep(0.1) or "remember this"
+    agent._load_event_content.side_effect = lambda channel_id: time.sleep(0.1) or None
+    agent.get_current_time.return_value = datetime.datetime(2026, 3, 2, 12, 0, 0)
+    agent.daily_schedule_description = None
+
+    async def summaries(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        return "They met."
+
+    async def details(**kwargs):
+        await asyncio.sleep(0.1)
+        return "# Channel Details"
+
+    agent._load_summary_content = summaries
+    timings = StageTimings()
+    start = time.perf_counter()
+    with patch("config.PROMPT_STABLE_PREFIX", False), patch(
+        "handlers.received_helpers.prompt_builder.build_channel_details_section", details
+    ), patch("handlers.received_helpers.prompt_builder.get_dialog_name", AsyncMock(return_value="User")):
+        prompt = await build_complete_system_prompt(
+            agent=agent,
+            channel_id=123,
+            messages=[],
+            media_chain=AsyncMock(),
+            is_group=False,
+            channel_name="User",
+            dialog=None,
+            target_msg=None,
+            timings=timings,
+        )
+
+    assert time.perf_counter() - start < 0.3
+    # Sections keep their prompt order
+    assert prompt.index("remember this") < prompt.index("# Channel Details") < prompt.index("They met.")
+    assert {"memories", "events", "channel_details", "summaries"} <= set(timings.stages)
@@ -502,6 +502,8 @@ async def test_prompt_includes_retrieve_media_json_instruction_when_agent_has_me
     mock_agent.photos = {}
     mock_agent.stickers = {}
     mock_agent.get_system_prompt.return_value = "Base prompt"
+    mock_agent.get_stable_system_prompt.return_value = "Base prompt"
+    mock_agent.get_intentions_section.return_value = ""
     mock_agent._load_memory_content.return_value = None
     mock_agent._load_event_content.return_value = None
     mock_agent.get_current_time.return_value = __import__("datetime").datetime(2026, 3, 2, 12, 0, 0)
@@ -33,8 +33,8 @@ class MockClientWithProhibitedContent:
         def __init__(self, client):
             self.client = client
 
-        # Called via asyncio.to_thread; keep it sync
-        def generate_content(self, model, contents, config=None, **kwargs):
+        # Called as client.aio.models.generate_content
+        async def generate_content(self, model, contents, config=None, **kwargs):
             self.client.call_count += 1
 
             # First call returns PROHIBITED_CONTENT
@@ -56,6 +56,10 @@ class MockClientWithProhibitedContent:
     def models(self):
         return self.Models(self)
 
+    @property
+    def aio(self):
+        return self
+
 
 class MockClientWithRetrieval:
     """Mock Gemini client that returns retrieve tasks."""
@@ -67,7 +71,7 @@ class MockClientWithRetrieval:
         def __init__(self, client):
             self.client = client
 
-        def generate_content(self, model, contents, config=None, **kwargs):
+        async def generate_content(self, model, contents, config=None, **kwargs):
             self.client.call_count += 1
 
             # First call returns retrieve task
@@ -96,6 +100,10 @@ class MockClientWithRetrieval:
     def models(self):
         return self.Models(self)
 
+    @property
+    def aio(self):
+        return self
+
 
 @pytest.mark.asyncio
 async def test_prohibited_content_triggers_task_graph_retry(monkeypatch):
@@ -359,7 +367,7 @@ async def test_retrieval_resources_available_on_retry(monkeypatch):
         def __init__(self, client):
             self.client = client
 
-        def generate_content(self, model, contents, config=None, **kwargs):
+        async def generate_content(self, model, contents, config=None, **kwargs):
             self.client.call_count += 1
             return types.SimpleNamespace(
                 text=json.dumps(
@@ -369,6 +377,7 @@ async def test_retrieval_resources_available_on_retry(monkeypatch):
             )
 
     mock_llm_client.models = Models(mock_llm_client)
+    mock_llm_client.aio = mock_llm_client
 
     mock_llm = object.__new__(GeminiLLM)
     mock_llm.client = mock_llm_client
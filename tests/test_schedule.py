@@ -0,0 +1,130 @@
+# tests/test_schedule.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from agent.storage import AgentStorageMixin
+from schedule import (
+    CompiledSchedule,
+    days_remaining,
+    get_agent_responsiveness,
+    get_agent_wake_time,
+    get_current_activity,
+    get_responsiveness,
+    get_wake_time,
+)
+
+BASE = datetime(2025, 12, 2, 0, 0, tzinfo=UTC)
+
+
+def _activity(act_id: str, start_hour: float, end_hour: float, responsiveness: int) -> dict:
+    return {
+        "id": act_id,
+        "start_time": (BASE + timedelta(hours=start_hour)).isoformat(),
+        "end_time": (BASE + timedelta(hours=end_hour)).isoformat(),
+        "activity_name": act_id,
+        "responsiveness": responsiveness,
+        "description": act_id,
+    }
+
+
+def _schedule() -> dict:
+    # Deliberately out of order; sleep -> breakfast -> work -> nap -> evening
+    return {
+        "activities": [
+            _activity("work", 8, 12, 40),
+            _activity("sleep", 0, 7, 0),
+            _activity("evening", 14, 22, 90),
+            _activity("breakfast", 7, 8, 80),
+            _activity("nap", 12, 14, 0),
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "hour, current, responsiveness, next_id, wake_hour",
+    [
+        (-1, None, 100, "sleep", None),
+        (3, "sleep", 0, "breakfast", 7),
+        (7, "sleep", 0, "work", 8),  # boundary: earlier activity wins
+        (7.5, "breakfast", 80, "work", None),
+        (13, "nap", 0, "evening", 14),
+        (21, "evening", 90, None, None),
+        (23, None, 100, None, None),
+    ],
+)
+def test_compiled_schedule_lookups(hour, current, responsiveness, next_id, wake_hour):
+    compiled = CompiledSchedule(_schedule())
+    now = BASE + timedelta(hours=hour)
+
+    current_activity, remaining, next_activity = get_current_activity(compiled, now)
+    assert (current_activity.id if current_activity else None) == current
+    assert (next_activity.id if next_activity else None) == next_id
+    if current_activity:
+        assert remaining == current_activity.end_time - now
+    assert get_responsiveness(compiled, now) == responsiveness
+    expected_wake = BASE + timedelta(hours=wake_hour) if wake_hour is not None else None
+    assert get_wake_time(compiled, now) == expected_wake
+    # Raw dicts give the same answers
+    assert get_responsiveness(_schedule(), now) == responsiveness
+    assert get_wake_time(_schedule(), now) == expected_wake
+
+
+def test_compiled_schedule_skips_bad_activities_and_reports_days_remaining():
+    schedule = _schedule()
+    schedule["activities"].append({"id": "broken", "start_time": "not a time"})
+    compiled = CompiledSchedule(schedule)
+
+    assert compiled.has_schedule
+    assert len(compiled.activities) == 5
+    assert days_remaining(compiled, BASE) == pytest.approx(22 / 24)
+    assert days_remaining(CompiledSchedule(None), BASE) == 0.0
+    assert not CompiledSchedule(None).has_schedule
+
+
+class _ScheduleAgent(AgentStorageMixin):
+    def __init__(self, storage):
+        self.name = "Scheduled"
+        self.daily_schedule_description = "A day"
+        self._storage_obj = storage
+        self._compiled_schedule = None
+
+
+def test_agent_compiled_schedule_is_cached_until_save():
+    storage = MagicMock()
+    storage.load_schedule.return_value = _schedule()
+    agent = _ScheduleAgent(storage)
+    now = BASE + timedelta(hours=3)
+
+    for _ in range(5):
+        assert get_agent_responsiveness(agent, now) == 0
+    assert storage.load_schedule.call_count == 1
+
+    awake = {"activities": [_activity("up-all-night", 0, 7, 70)]}
+    storage.load_schedule.return_value = awake
+    agent._save_schedule(awake)
+
+    assert get_agent_responsiveness(agent, now) == 70
+    assert storage.load_schedule.call_count == 2
+    storage.save_schedule.assert_called_once_with(awake)
+
+
+def test_agent_wake_time_is_end_of_sleep_or_next_awake_activity():
+    storage = MagicMock()
+    storage.load_schedule.return_value = _schedule()
+    agent = _ScheduleAgent(storage)
+
+    assert get_agent_wake_time(agent, BASE + timedelta(hours=3)) == BASE + timedelta(hours=7)
+    assert get_agent_wake_time(agent, BASE + timedelta(hours=13)) == BASE + timedelta(hours=14)
+    assert get_agent_wake_time(agent, BASE + timedelta(hours=9)) is None
+
+    # With a gap after sleeping, the agent is fully responsive once the sleep ends
+    gap = {"activities": [_activity("sleep", 0, 5, 0), _activity("work", 8, 12, 40)]}
+    agent._save_schedule(gap)
+    storage.load_schedule.return_value = gap
+    assert get_agent_wake_time(agent, BASE + timedelta(hours=3)) == BASE + timedelta(hours=5)
@@ -480,3 +480,300 @@ def test_pending_tasks_cancels_transitive_failed_dependency_chain():
     assert second.status == TaskStatus.CANCELLED
     assert third.status == TaskStatus.CANCELLED
     assert pending == []
+
+
+def test_round_robin_schedules_wakeup_for_wait_until():
+    wait = make_wait_task_legacy("w-future", 30)
+    follow = TaskNode(id="after-wait", type="send", depends_on=["w-future"])
+    graph = TaskGraph(id="g-wake", context={"peer_id": "p"}, tasks=[wait, follow])
+    queue = WorkQueue()
+    queue.add_graph(graph)
+
+    assert queue.round_robin_one_task() is None
+    expected = datetime.strptime(wait.params["until"], "%Y-%m-%dT%H:%M:%S%z")
+    assert queue.next_wakeup_time(NOW) == expected
+    # Wakeups that have come due are discarded
+    assert queue.next_wakeup_time(expected) is None
+
+
+def test_round_robin_skips_parked_graphs_until_changed_or_due(fake_clock, monkeypatch):
+    visited = []
+    pending_tasks = TaskGraph.pending_tasks
+
+    def recording_pending_tasks(graph, now):
+        visited.append(graph.id)
+        return pending_tasks(graph, now)
+
+    monkeypatch.setattr(TaskGraph, "pending_tasks", recording_pending_tasks)
+    waiting = TaskGraph(
+        id="g-waiting",
+        context={},
+        tasks=[
+            TaskNode(id="w", type="wait", params={"delay": 60}),
+            TaskNode(id="after-w", type="send", depends_on=["w"]),
+        ],
+    )
+    busy = TaskGraph(id="g-busy", context={}, tasks=[TaskNode(id="b1", type="send", status=TaskStatus.ACTIVE)])
+    queue = WorkQueue()
+    queue.add_graph(waiting)
+    queue.add_graph(busy)
+
+    assert queue.round_robin_tasks(4) == []
+    assert sorted(visited) == ["g-busy", "g-waiting"]
+
+    # Neither graph can have a runnable task yet, so neither is checked again
+    visited.clear()
+    assert queue.round_robin_tasks(4) == []
+    assert visited == []
+
+    # Changes made through the graph/queue API make a parked graph due again
+    busy.tasks[0].status = TaskStatus.DONE
+    busy.add_task(TaskNode(id="b2", type="send", depends_on=["b1"]))
+    assert [task.id for task, _ in queue.round_robin_tasks(4)] == ["b2"]
+    assert visited == ["g-busy"]
+
+    # The waiting graph comes due when its wait expires
+    fake_clock.advance(61)
+    assert "w" in [task.id for task, _ in queue.round_robin_tasks(4)]
+
+
+def test_completed_and_indicator_graphs_are_tracked_without_scanning():
+    online = make_wait_task("online", delay_seconds=300, online=True)
+    presence = TaskGraph(
+        id="g-online",
+        context={},
+        tasks=[online, TaskNode(id="reply", type="send", status=TaskStatus.ACTIVE)],
+    )
+    finished = TaskGraph(id="g-done", context={}, tasks=[TaskNode(id="d1", type="send", status=TaskStatus.DONE)])
+    queue = WorkQueue()
+    queue.add_graph(presence)
+    queue.add_graph(finished)
+
+    assert queue.completed_graphs() == [finished]
+    assert queue.indicator_graphs() == [presence]
+
+    # Changes reported through mark_dirty move graphs between the sets
+    online.status = TaskStatus.DONE
+    presence.tasks[1].status = TaskStatus.DONE
+    queue.mark_dirty(presence)
+    assert queue.indicator_graphs() == []
+    assert queue.completed_graphs() == [finished, presence]
+
+    queue.remove(finished)
+    assert queue.completed_graphs() == [presence]
+
+    # A graph reopened without mark_dirty is not reported as complete
+    presence.tasks.append(TaskNode(id="late", type="send"))
+    assert queue.completed_graphs() == []
+
+    # Replacing the list directly rebuilds the sets
+    queue._task_graphs = [finished]
+    assert queue.completed_graphs() == [finished]
+
+
+async def test_add_graph_wakes_waiting_loop():
+    import asyncio
+
+    queue = WorkQueue()
+    waiter = asyncio.create_task(queue.wait_for_work(10))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    queue.add_graph(TaskGraph(id="g-notify", context={}, tasks=[]))
+    assert await asyncio.wait_for(waiter, 1) is True
+
+    # With no notification pending, a short wait times out
+    assert await queue.wait_for_work(0.01) is False
+
+
+def test_work_queue_indexes_track_added_and_removed_graphs():
+    queue = WorkQueue()
+    graphs = [
+        TaskGraph(
+            id=f"g-idx-{i}",
+            context={"agent_id": 1 + i % 2, "channel_id": 100 + i},
+            tasks=[TaskNode(id=f"t-idx-{i}", type="send")],
+        )
+        for i in range(5)
+    ]
+    for graph in graphs:
+        queue.add_graph(graph)
+
+    assert queue.graph_for_conversation(1, 102) is graphs[2]
+    assert queue.graph_containing(graphs[3].tasks[0]) is graphs[3]
+    assert {g.id for g in queue.graphs_for_agent(2)} == {"g-idx-1", "g-idx-3"}
+
+    # Tasks added after the graph is queued are indexed too
+    wait_task = graphs[3].tasks[0].insert_delay(graphs[3], 10)
+    assert queue.graph_containing(wait_task) is graphs[3]
+    assert graphs[3].get_node(wait_task.id) is wait_task
+
+    queue.remove(graphs[0])
+    queue.remove_conversation(1, 102)
+    assert graphs[0] not in queue._task_graphs
+    assert queue.graph_for_conversation(1, 102) is None
+    assert queue.graph_containing(graphs[2].tasks[0]) is None
+    assert queue.graph_containing(graphs[4].tasks[0]) is graphs[4]
+    assert len(queue._task_graphs) == 3
+
+
+def test_work_queue_removal_keeps_round_robin_order():
+    queue = WorkQueue()
+    graphs = [
+        TaskGraph(
+            id=f"g-order-{i}",
+            context={"agent_id": 1, "channel_id": 200 + i},
+            tasks=[TaskNode(id=f"t-order-{i}", type="send")],
+        )
+        for i in range(6)
+    ]
+    for graph in graphs:
+        queue.add_graph(graph)
+
+    # Serve g-order-0 and g-order-1, then drop one served and one waiting graph
+    assert [t.id for t, _ in queue.round_robin_tasks(2)] == ["t-order-0", "t-order-1"]
+    queue.remove(graphs[0])
+    queue.remove(graphs[3])
+    assert [g.id for g in queue._task_graphs] == ["g-order-1", "g-order-2", "g-order-4", "g-order-5"]
+
+    # Round-robin continues with the next graph that has not had a turn
+    assert [t.id for t, _ in queue.round_robin_tasks(3)] == ["t-order-2", "t-order-4", "t-order-5"]
+
+    # Positions stay right after many removals and additions
+    for i in range(6, 200):
+        queue.add_graph(TaskGraph(id=f"g-order-{i}", context={"agent_id": 2, "channel_id": i}))
+    for graph in list(queue._task_graphs[::2]):
+        queue.remove(graph)
+    for position, graph in enumerate(queue._task_graphs):
+        assert queue._position_of(graph) == position
+    queue.remove_conversation(2, 199)
+    assert queue.graph_for_conversation(2, 199) is None
+    assert queue._task_graphs[-1].id == "g-order-197"
+    serials = [int(g.id.rsplit("-", 1)[1]) for g in queue._task_graphs]
+    assert serials == sorted(serials)
+
+
+def test_work_queue_indexes_rebuild_when_list_replaced():
+    graph = TaskGraph(id="g-replaced", context={"agent_id": 7, "channel_id": 8}, tasks=[])
+    queue = WorkQueue()
+    queue.add_graph(TaskGraph(id="g-old", context={"agent_id": 7, "channel_id": 8}))
+
+    queue._task_graphs = [graph]
+    assert queue.graph_for_conversation(7, 8) is graph
+
+    clear_graph = TaskGraph(id="g-clear", context={"agent_id": 9, "channel_id": 1})
+    queue.add_graph(clear_graph)
+    queue._state_file_path = None
+    queue.save = lambda path=None: None
+    queue.clear_tasks_for_agent(agent_id=9)
+    assert queue._task_graphs == [graph]
+
+
+def test_get_node_sees_direct_task_list_edits():
+    graph = TaskGraph(id="g-nodes", context={}, tasks=[TaskNode(id="a", type="send")])
+    assert graph.get_node("a") is graph.tasks[0]
+    late = TaskNode(id="b", type="send")
+    graph.tasks.append(late)
+    assert graph.get_node("b") is late
+    assert graph.get_node("missing") is None
+
+
+def _journal_lines(path):
+    journal = path + ".journal"
+    try:
+        with open(journal) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def test_journal_appends_changes_and_reload_replays_them(tmp_path):
+    path = str(tmp_path / "work_queue.json")
+    queue = WorkQueue()
+    queue._state_file_path = path
+    queue.enable_journal(compact_threshold=100)
+
+    kept = TaskGraph(id="g-keep", context={"agent_id": 1, "channel_id": 2},
+                     tasks=[TaskNode(id="t-keep", type="send")])
+    dropped = TaskGraph(id="g-drop", context={"agent_id": 1, "channel_id": 3},
+                        tasks=[TaskNode(id="t-drop", type="send")])
+    queue.add_graph(kept)
+    queue.add_graph(dropped)
+    # First save writes a snapshot
+    queue.save()
+    assert _journal_lines(path) == []
+
+    kept.tasks[0].status = TaskStatus.DONE
+    queue.mark_dirty(kept, kept.tasks[0])
+    kept.add_task(TaskNode(id="t-next", type="send", depends_on=["t-keep"]))
+    queue.remove(dropped)
+    queue.save()
+
+    header, *records = _journal_lines(path)
+    assert header["op"] == "snapshot"
+    assert {r["op"] for r in records} == {"put_task", "remove_graph"}
+    assert len(records) == 3
+
+    reloaded = WorkQueue._load(path)
+    assert [g.id for g in reloaded._task_graphs] == ["g-keep"]
+    graph = reloaded._task_graphs[0]
+    assert graph.get_node("t-keep").status == TaskStatus.DONE
+    assert graph.get_node("t-next").depends_on == ["t-keep"]
+
+
+def test_journal_compacts_into_snapshot(tmp_path):
+    path = str(tmp_path / "work_queue.json")
+    queue = WorkQueue()
+    queue._state_file_path = path
+    queue.enable_journal(compact_threshold=2)
+    queue.save()
+
+    for i in range(3):
+        queue.add_graph(TaskGraph(id=f"g-{i}", context={}, tasks=[]))
+        queue.save()
+
+    # Two records reached the threshold, so the third save compacted
+    assert _journal_lines(path) == []
+    with open(path) as f:
+        assert [g["id"] for g in json.load(f)] == ["g-0", "g-1", "g-2"]
+
+
+def test_journal_left_behind_by_compaction_is_not_replayed(tmp_path):
+    path = str(tmp_path / "work_queue.json")
+    queue = WorkQueue()
+    queue._state_file_path = path
+    queue.enable_journal(compact_threshold=100)
+
+    graph = TaskGraph(id="g-a", context={}, tasks=[TaskNode(id="t-a", type="send")])
+    queue.add_graph(graph)
+    queue.save()
+    extra = TaskGraph(id="g-b", context={}, tasks=[])
+    queue.add_graph(extra)
+    queue.mark_dirty(graph, graph.tasks[0])
+    queue.save()
+    with open(path + ".journal") as f:
+        old_journal = f.read()
+
+    # Changes captured only by the next snapshot
+    queue.remove(extra)
+    graph.tasks[0].status = TaskStatus.DONE
+    queue.compact()
+    # Crash between replacing the snapshot and removing the journal
+    with open(path + ".journal", "w") as f:
+        f.write(old_journal)
+
+    reloaded = WorkQueue._load(path)
+    assert [g.id for g in reloaded._task_graphs] == ["g-a"]
+    assert reloaded._task_graphs[0].get_node("t-a").status == TaskStatus.DONE
+
+
+def test_journal_skips_truncated_last_line(tmp_path):
+    path = str(tmp_path / "work_queue.json")
+    queue = WorkQueue(_task_graphs=[TaskGraph(id="g-a", context={}, tasks=[])])
+    queue.save(path)
+    with open(path + ".journal", "w") as f:
+        f.write(json.dumps({"op": "remove_graph", "graph_id": "g-a"}) + "\n")
+        f.write('{"op": "put_graph", "graph": {"id": "g-b"')
+
+    reloaded = WorkQueue._load(path)
+    assert reloaded._task_graphs == []
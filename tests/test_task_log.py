@@ -8,6 +8,8 @@ Unit tests for task execution logging functionality.
 """
 
 import json
+import threading
+import time
 from datetime import UTC, datetime, timedelta
 from unittest.mock import MagicMock, patch
 
@@ -15,6 +17,8 @@ import pytest
 
 from clock import clock
 from db.task_log import (
+    TaskLogWriter,
+    _insert_task_log_rows,
     delete_old_logs,
     format_action_details,
     get_agent_cost_logs,
@@ -122,6 +126,99 @@ class TestLogTaskExecution:
             assert params[0] == test_time
 
 
+class TestTaskLogWriter:
+    """Tests for the batched background task log writer."""
+
+    @staticmethod
+    def _recording_writer(fail_times=0, **kwargs):
+        batches = []
+        lock = threading.Lock()
+        failures = {"left": fail_times}
+
+        def insert_rows(rows):
+            with lock:
+                if failures["left"]:
+                    failures["left"] -= 1
+                    raise RuntimeError("MySQL server has gone away")
+                batches.append(list(rows))
+
+        return TaskLogWriter(insert_rows=insert_rows, **kwargs), batches
+
+    @staticmethod
+    def _wait_for(predicate, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return predicate()
+
+    def test_writes_full_batches_without_waiting_for_interval(self):
+        writer, batches = self._recording_writer(batch_size=3, flush_interval=60)
+        for i in range(7):
+            writer.enqueue((i,))
+
+        assert self._wait_for(lambda: writer.batches_written == 2)
+        assert batches == [[(0,), (1,), (2,)], [(3,), (4,), (5,)]]
+
+        assert writer.flush(timeout=3)
+        assert batches[-1] == [(6,)]
+        writer.close()
+
+    def test_flushes_partial_batch_after_interval(self):
+        writer, batches = self._recording_writer(batch_size=100, flush_interval=0.05)
+        writer.enqueue(("only",))
+
+        assert self._wait_for(lambda: writer.rows_written == 1)
+        assert batches == [[("only",)]]
+        writer.close()
+
+    def test_failed_batch_is_retried_in_order(self):
+        writer, batches = self._recording_writer(fail_times=1, batch_size=2, flush_interval=60)
+        writer.enqueue(("a",))
+        writer.enqueue(("b",))
+
+        assert self._wait_for(lambda: writer.rows_written == 2)
+        assert writer.failed_batches == 1
+        assert batches == [[("a",), ("b",)]]
+        writer.close()
+
+    def test_buffer_is_bounded_while_database_is_down(self):
+        writer, batches = self._recording_writer(
+            fail_times=1, batch_size=2, flush_interval=60, max_buffered=3
+        )
+        for i in range(2):
+            writer.enqueue((i,))
+        assert self._wait_for(lambda: writer.failed_batches == 1)
+        for i in range(2, 5):
+            writer.enqueue((i,))
+
+        assert writer.rows_dropped == 2
+        assert writer.flush(timeout=5)
+        assert [row for batch in batches for row in batch] == [(2,), (3,), (4,)]
+        writer.close()
+
+    def test_close_writes_buffered_rows(self):
+        writer, batches = self._recording_writer(batch_size=100, flush_interval=60)
+        writer.enqueue(("pending",))
+
+        writer.close()
+
+        assert batches == [[("pending",)]]
+        writer.enqueue(("late",))
+        assert writer.rows_dropped == 1
+
+    def test_insert_rows_uses_one_multi_row_statement(self, mock_db):
+        mock_conn, mock_cursor = mock_db
+        rows = [(datetime(2026, 2, 9, tzinfo=UTC), 1, 2, "send", "t", "{}", None)] * 3
+
+        _insert_task_log_rows(rows)
+
+        assert mock_cursor.executemany.call_count == 1
+        sql, params = mock_cursor.executemany.call_args[0]
+        assert "INSERT INTO task_execution_log" in sql
+        assert params == rows
+        assert mock_conn.return_value.__enter__.return_value.commit.called
+
+
 class TestGetTaskLogs:
     """Tests for get_task_logs function."""
     
@@ -0,0 +1,54 @@
+# tests/test_telegram_download.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for streaming media downloads with size caps."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from telegram_download import MediaTooLargeError, download_media_to_file, media_file_view
+
+
+class ChunkedClient:
+    """Client whose download_media writes chunks into the target file object."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def download_media(self, file_ref, file):
+        for chunk in self.chunks:
+            file.write(chunk)
+
+
+@pytest.mark.asyncio
+async def test_download_media_to_file_streams_and_maps(tmp_path):
+    path = tmp_path / "media" / "abc.download"
+    client = ChunkedClient([b"\x89PNG", b"-rest-of-image"])
+
+    size = await download_media_to_file(client, SimpleNamespace(size=18), path, max_bytes=100)
+
+    assert size == 18
+    assert not path.with_name("abc.download.tmp").exists()
+    with media_file_view(path) as view:
+        assert len(view) == 18
+        assert view[:4] == b"\x89PNG"
+
+
+@pytest.mark.asyncio
+async def test_download_media_to_file_enforces_cap(tmp_path):
+    path = tmp_path / "big.download"
+
+    # Declared size over the cap: rejected before anything is downloaded
+    client = ChunkedClient([b"x" * 10])
+    with pytest.raises(MediaTooLargeError):
+        await download_media_to_file(client, SimpleNamespace(size=1000), path, max_bytes=100)
+
+    # Undeclared size: stopped mid-stream and the partial file is removed
+    client = ChunkedClient([b"x" * 60, b"x" * 60])
+    with pytest.raises(MediaTooLargeError) as excinfo:
+        await download_media_to_file(client, SimpleNamespace(), path, max_bytes=100)
+    assert excinfo.value.size == 120
+    assert list(tmp_path.iterdir()) == []
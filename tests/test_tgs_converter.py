@@ -0,0 +1,230 @@
+# tests/test_tgs_converter.py
+#
+# Copyright (c) 2025-2026 Cindy's World LLC and contributors
+# Licensed under the MIT License. See LICENSE.md for details.
+#
+"""Tests for TGS frame rendering, compositing and video encoding."""
+
+import gzip
+import json
+import time
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from media import tgs_converter
+from media.tgs_converter import (
+    _CAIRO_ALPHA,
+    _CAIRO_RGB,
+    _FRAME_BATCH_SIZE,
+    _composite_on_white,
+    _composite_straight_on_white,
+    _frame_batches,
+    _render_frames,
+    _write_video,
+    convert_tgs_to_video_async,
+    iter_tgs_frame_batches,
+)
+from media.tgs_video_cache import cached_tgs_video_path, store_cached_tgs_video
+
+try:
+    import cairosvg  # noqa: F401
+
+    HAS_CAIRO = True
+except (ImportError, OSError):
+    HAS_CAIRO = False
+
+
+def _old_composite(rgba: np.ndarray) -> np.ndarray:
+    """The float compositing create_video_from_frames used before frames were stacked."""
+    alpha = rgba[..., 3:4] / 255.0
+    rgb = rgba[..., :3]
+    return (rgb * alpha + np.ones_like(rgb) * 255 * (1 - alpha)).astype(np.uint8)
+
+
+def _random_rgba(shape=(3, 8, 8)) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    rgba = rng.integers(0, 256, size=(*shape, 4), dtype=np.uint8)
+    # Include fully transparent and fully opaque pixels
+    rgba[0, 0, 0, 3] = 0
+    rgba[0, 0, 1, 3] = 255
+    return rgba
+
+
+def test_composite_straight_on_white_matches_float_formula():
+    rgba = _random_rgba()
+    result = _composite_straight_on_white(rgba)
+    assert result.dtype == np.uint8
+    assert result.shape == (*rgba.shape[:-1], 3)
+    # The integer version rounds where the float version truncated
+    assert np.abs(result.astype(int) - _old_composite(rgba).astype(int)).max() <= 1
+    assert (result[0, 0, 0] == 255).all()
+    assert (result[0, 0, 1] == rgba[0, 0, 1, :3]).all()
+
+
+def test_composite_on_white_matches_float_formula_for_premultiplied_pixels():
+    rgba = _random_rgba()
+    alpha = rgba[..., 3:4].astype(np.uint16)
+    premultiplied = ((rgba[..., :3] * alpha + 127) // 255).astype(np.uint8)
+    # Lay the pixels out as cairo's native-endian ARGB32
+    stack = np.zeros_like(rgba)
+    stack[..., _CAIRO_RGB] = premultiplied
+    stack[..., _CAIRO_ALPHA] = rgba[..., 3]
+
+    result = _composite_on_white(stack)
+    assert result.shape == (*rgba.shape[:-1], 3)
+    assert np.abs(result.astype(int) - _old_composite(rgba).astype(int)).max() <= 1
+
+
+def test_frame_batches_are_contiguous_and_bounded():
+    frames = list(range(40))
+    batches = _frame_batches(frames, 4)
+    assert [f for batch in batches for f in batch] == frames
+    assert len(batches) >= 4
+    assert all(len(batch) <= 10 for batch in batches)
+
+    batches = _frame_batches(frames, 1)
+    assert [len(batch) for batch in batches] == [_FRAME_BATCH_SIZE, _FRAME_BATCH_SIZE, 40 - 2 * _FRAME_BATCH_SIZE]
+    assert _frame_batches([], 2) == []
+
+
+def test_broken_pool_resumes_after_rendered_frames(tmp_path):
+    animation = MagicMock()
+    frame_numbers = list(range(10))
+
+    def render(animation, frames, width, height, deadline=None):
+        return np.array(frames, dtype=np.uint8).reshape(-1, 1, 1, 1)
+
+    def pool_batches(pool, path, width, height, frames, deadline):
+        yield render(None, frames[:4], width, height)
+        raise BrokenProcessPool("worker died")
+
+    with patch.object(tgs_converter, "_load_animation", return_value=animation), patch.object(
+        tgs_converter, "_plan_frames", return_value=frame_numbers
+    ), patch.object(tgs_converter, "_get_render_pool", return_value=MagicMock()), patch.object(
+        tgs_converter, "_iter_frames_in_pool", pool_batches
+    ), patch.object(tgs_converter, "_render_frames", side_effect=render) as render_in_process, patch.object(
+        tgs_converter, "shutdown_tgs_render_pool"
+    ) as shutdown:
+        batches = list(iter_tgs_frame_batches(tmp_path / "a.tgs", 1, 1))
+
+    assert np.concatenate(batches).ravel().tolist() == frame_numbers
+    # Only the frames the pool did not deliver are rendered again
+    assert [f for call in render_in_process.call_args_list for f in call.args[1]] == frame_numbers[4:]
+    shutdown.assert_called_once_with(wait=False)
+
+
+def test_pool_render_without_failures_renders_nothing_in_process(tmp_path):
+    frame_numbers = list(range(6))
+
+    def pool_batches(pool, path, width, height, frames, deadline):
+        yield np.array(frames, dtype=np.uint8).reshape(-1, 1, 1, 1)
+
+    with patch.object(tgs_converter, "_load_animation", return_value=MagicMock()), patch.object(
+        tgs_converter, "_plan_frames", return_value=frame_numbers
+    ), patch.object(tgs_converter, "_get_render_pool", return_value=MagicMock()), patch.object(
+        tgs_converter, "_iter_frames_in_pool", pool_batches
+    ), patch.object(tgs_converter, "_render_frames") as render_in_process:
+        batches = list(iter_tgs_frame_batches(tmp_path / "a.tgs", 1, 1))
+
+    assert np.concatenate(batches).ravel().tolist() == frame_numbers
+    render_in_process.assert_not_called()
+
+
+def test_write_video_without_frames_leaves_no_file(tmp_path):
+    output = tmp_path / "out.mp4"
+    with pytest.raises(ValueError, match="No frames"):
+        _write_video(iter([np.zeros((0, 16, 16, 3), dtype=np.uint8)]), output, 4.0)
+    assert not output.exists()
+
+
+def _write_tgs(path):
+    square = {
+        "ty": 4, "ind": 1, "ip": 0, "op": 8, "st": 0,
+        "ks": {
+            "o": {"a": 0, "k": 100}, "r": {"a": 0, "k": 0}, "p": {"a": 0, "k": [16, 16, 0]},
+            "a": {"a": 0, "k": [0, 0, 0]}, "s": {"a": 0, "k": [100, 100, 100]},
+        },
+        "shapes": [
+            {"ty": "rc", "p": {"a": 0, "k": [0, 0]}, "s": {"a": 0, "k": [16, 16]}, "r": {"a": 0, "k": 0}},
+            {"ty": "fl", "c": {"a": 0, "k": [1, 0, 0, 1]}, "o": {"a": 0, "k": 100}},
+        ],
+    }
+    lottie = {"tgs": 1, "v": "5.5.2", "fr": 30, "ip": 0, "op": 8, "w": 32, "h": 32, "layers": [square]}
+    path.write_bytes(gzip.compress(json.dumps(lottie).encode()))
+
+
+@pytest.mark.skipif(not HAS_CAIRO, reason="cairo library not installed")
+def test_renders_synthetic_sticker_end_to_end(tmp_path):
+    tgs_path = tmp_path / "square.tgs"
+    _write_tgs(tgs_path)
+
+    with patch.object(tgs_converter, "TGS_RENDER_WORKERS", 0):
+        frames, fps = tgs_converter.render_tgs_to_frames(tgs_path, 32, 32, target_fps=10.0)
+        video = tgs_converter.convert_tgs_to_video(tgs_path, tmp_path / "square.mp4", 32, 32, target_fps=10.0)
+
+    assert frames.shape == (3, 32, 32, 3) and fps == 10.0
+    # A red square on a white background
+    assert tuple(frames[0, 16, 16]) == (255, 0, 0)
+    assert tuple(frames[0, 1, 1]) == (255, 255, 255)
+    assert video.stat().st_size > 0
+
+
+def test_in_process_render_stops_at_deadline():
+    with patch.object(tgs_converter.svg, "export_svg") as export:
+        with pytest.raises(TimeoutError):
+            _render_frames(MagicMock(), [0, 1, 2], 4, 4, deadline=time.monotonic() - 1)
+    export.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cached_video_skips_rendering(tmp_path):
+    rendered = tmp_path / "rendered.mp4"
+    rendered.write_bytes(b"cached video")
+    store_cached_tgs_video(rendered, cached_tgs_video_path("sticker-uid", 512, 512, None, 4.0))
+    output = tmp_path / "out.mp4"
+
+    with patch.object(tgs_converter, "convert_tgs_to_video", side_effect=AssertionError("rendered")):
+        result = await convert_tgs_to_video_async(tmp_path / "in.tgs", output, unique_id="sticker-uid")
+
+    assert result == output
+    assert output.read_bytes() == b"cached video"
+
+
+@pytest.mark.asyncio
+async def test_render_timeout_is_temporary_then_permanent(tmp_path):
+    from media.media_source import AIGeneratingMediaSource, MediaStatus
+
+    async def download(client, doc, path, max_bytes=None):
+        path.write_bytes(b"tgs bytes")
+        return 9
+
+    source = AIGeneratingMediaSource(cache_directory=tmp_path / "cache")
+    agent = SimpleNamespace(client=MagicMock(), name="TestAgent")
+    llm = MagicMock()
+
+    async def describe():
+        return await source.get(
+            "slow-sticker", agent=agent, doc=SimpleNamespace(), kind="sticker", mime_type="application/x-tgsticker"
+        )
+
+    with patch.dict(tgs_converter._render_timeouts, clear=True), patch(
+        "media.sources.ai_generating.download_media_to_file", side_effect=download
+    ), patch("media.sources.ai_generating.get_media_llm", return_value=llm), patch(
+        "media.sources.ai_generating.classify_media_from_bytes_and_hints",
+        return_value=("animated_sticker", "application/x-tgsticker"),
+    ), patch.object(
+        tgs_converter, "convert_tgs_to_video", side_effect=TimeoutError("deadline")
+    ) as render:
+        first = await describe()
+        second = await describe()
+
+    assert first["status"] == MediaStatus.TEMPORARY_FAILURE.value
+    assert "timed out" in first["failure_reason"]
+    # The second timeout marks the sticker as unrenderable rather than retrying forever
+    assert second["status"] == MediaStatus.PERMANENT_FAILURE.value
+    assert render.call_count == 2
+    llm.describe_video.assert_not_called()
@@ -490,3 +490,196 @@ async def test_ordinary_exception_logs_stack_trace(monkeypatch):
 
     assert len(exception_log_calls) == 1
     assert "Task ord-err raised exception" in str(exception_log_calls[0])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runner_runs_one_task_per_conversation(monkeypatch):
+    """The concurrent scheduler runs tasks from different conversations at the same time."""
+    from tick import ConcurrentTaskRunner
+
+    dispatch_table = get_task_dispatch_table()
+    monkeypatch.setattr("tick.get_agent_for_id", lambda x: None)
+
+    release = asyncio.Event()
+    running = []
+
+    async def slow_send(task, graph, work_queue=None):
+        running.append(task.id)
+        await release.wait()
+
+    monkeypatch.setitem(dispatch_table, "send", slow_send)
+
+    WorkQueue.reset_instance()
+    queue = WorkQueue.get_instance()
+    graphs = []
+    for i in range(3):
+        first = TaskNode(id=f"c{i}-a", type="send", params={"text": "a"})
+        second = TaskNode(id=f"c{i}-b", type="send", params={"text": "b"})
+        graph = TaskGraph(
+            id=f"g-conc-{i}",
+            context={"agent_id": 1, "channel_id": 100 + i},
+            tasks=[first, second],
+        )
+        graphs.append(graph)
+        queue.add_graph(graph)
+
+    runner = ConcurrentTaskRunner(max_tasks=10, max_tasks_per_agent=10)
+    await runner.tick(queue)
+    await asyncio.sleep(0)
+
+    # One task per conversation, even though each graph has two runnable tasks
+    assert sorted(running) == ["c0-a", "c1-a", "c2-a"]
+    assert runner.in_flight_count == 3
+
+    # A second tick while the first tasks are still running starts nothing new
+    await runner.tick(queue)
+    await asyncio.sleep(0)
+    assert len(running) == 3
+
+    release.set()
+    await runner.drain()
+    for graph in graphs:
+        assert graph.get_node(graph.tasks[0].id).status == TaskStatus.DONE
+    assert runner.in_flight_count == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runner_respects_global_and_per_agent_limits(monkeypatch):
+    from tick import ConcurrentTaskRunner
+
+    dispatch_table = get_task_dispatch_table()
+    monkeypatch.setattr("tick.get_agent_for_id", lambda x: None)
+
+    release = asyncio.Event()
+
+    async def slow_send(task, graph, work_queue=None):
+        await release.wait()
+
+    monkeypatch.setitem(dispatch_table, "send", slow_send)
+
+    WorkQueue.reset_instance()
+    queue = WorkQueue.get_instance()
+    for agent_id in (1, 2):
+        for channel_id in range(3):
+            queue.add_graph(
+                TaskGraph(
+                    id=f"g-{agent_id}-{channel_id}",
+                    context={"agent_id": agent_id, "channel_id": channel_id},
+                    tasks=[TaskNode(id=f"t-{agent_id}-{channel_id}", type="send")],
+                )
+            )
+
+    runner = ConcurrentTaskRunner(max_tasks=3, max_tasks_per_agent=2)
+    await runner.tick(queue)
+    counts = runner._agent_task_counts()
+    assert runner.in_flight_count == 3
+    assert all(count <= 2 for count in counts.values())
+
+    release.set()
+    await runner.drain()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runner_failure_uses_retry_semantics(monkeypatch):
+    from tick import ConcurrentTaskRunner
+
+    monkeypatch.setattr("tick.get_agent_for_id", lambda x: None)
+
+    task = TaskNode(id="bad", type="explode", params={})
+    graph = TaskGraph(id="g-conc-fail", context={"agent_id": 1, "channel_id": 5}, tasks=[task])
+    WorkQueue.reset_instance()
+    queue = WorkQueue.get_instance()
+    queue.add_graph(graph)
+
+    runner = ConcurrentTaskRunner(max_tasks=4)
+    await runner.tick(queue)
+    await runner.drain()
+
+    assert task.status == TaskStatus.PENDING
+    assert task.params["previous_retries"] == 1
+    assert any(n.type == "wait" for n in graph.tasks)
+    assert graph in queue._task_graphs
+
+
+@pytest.mark.asyncio
+async def test_event_driven_tick_loop_wakes_on_new_graph():
+    """In event-driven mode the loop sleeps until the queue is notified, not a fixed interval."""
+    WorkQueue.reset_instance()
+    queue = WorkQueue.get_instance()
+    ticks = []
+
+    async def tick_fn(state_file_path=None):
+        ticks.append(len(queue._task_graphs))
+        if len(ticks) == 2:
+            raise ShutdownException("stop test")
+
+    loop_task = asyncio.create_task(
+        run_tick_loop(tick_fn=tick_fn, event_driven=True, max_idle_sec=30)
+    )
+    await asyncio.sleep(0.01)
+    assert ticks == [0]
+
+    queue.add_graph(TaskGraph(id="g-wake", context={}, tasks=[]))
+    with pytest.raises(ShutdownException):
+        await asyncio.wait_for(loop_task, 1)
+    assert ticks == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_process_due_events_fires_all_due_in_one_pass(monkeypatch, fake_clock):
+    """Due events fire together from the in-memory index and are written back in one call."""
+    from datetime import UTC, timedelta
+
+    import tick
+    from db import events as db_events
+
+    now = fake_clock.now(UTC)
+    index = db_events.EventIndex()
+    index.replace_all([
+        {"id": "once", "agent_telegram_id": 1, "channel_id": 10, "intent": "hello",
+         "interval_value": None, "occurrences": None, "time_utc": now - timedelta(minutes=5)},
+        {"id": "repeat", "agent_telegram_id": 1, "channel_id": 11, "intent": "again",
+         "interval_value": "1 hours", "occurrences": 3, "time_utc": now - timedelta(minutes=1)},
+        {"id": "same-conv", "agent_telegram_id": 1, "channel_id": 10, "intent": "later",
+         "interval_value": None, "occurrences": None, "time_utc": now - timedelta(seconds=30)},
+        {"id": "gagged", "agent_telegram_id": 1, "channel_id": 12, "intent": "shh",
+         "interval_value": None, "occurrences": None, "time_utc": now - timedelta(minutes=2)},
+        {"id": "future", "agent_telegram_id": 1, "channel_id": 13, "intent": "soon",
+         "interval_value": None, "occurrences": None, "time_utc": now + timedelta(minutes=10)},
+    ])
+    monkeypatch.setattr(db_events, "_event_index", index)
+
+    agent = MagicMock(name="agent", is_disabled=False)
+    agent.name = "Agent"
+    agent.is_conversation_gagged = AsyncMock(side_effect=lambda channel_id: channel_id == 12)
+    monkeypatch.setattr("tick.get_agent_for_id", lambda agent_id: agent)
+    monkeypatch.setattr("tick.get_channel_name", AsyncMock(return_value="chan"))
+    inserted = []
+
+    async def fake_insert(recipient_id, channel_id, xsend_intent, bypass_gagged):
+        inserted.append((channel_id, xsend_intent))
+
+    monkeypatch.setattr("tick.insert_received_task_for_conversation", fake_insert)
+    write_backs = []
+
+    def fake_apply(reschedules, deletes):
+        write_backs.append((reschedules, deletes))
+        for agent_id, channel_id, event_id, new_time, occurrences in reschedules:
+            index.reschedule(agent_id, channel_id, event_id, new_time, occurrences)
+        for key in deletes:
+            index.remove(*key)
+
+    monkeypatch.setattr(db_events, "apply_fired_events", fake_apply)
+    monkeypatch.setattr(db_events, "get_event_index", MagicMock(side_effect=AssertionError("no reload")))
+    WorkQueue.reset_instance()
+
+    await tick._process_due_events()
+
+    assert inserted == [("10", "hello"), ("11", "again")]
+    assert write_backs == [(
+        [(1, 11, "repeat", now - timedelta(minutes=1) + timedelta(hours=1), 2)],
+        [(1, 10, "once")],
+    )]
+    # Gagged and same-conversation events stay due for a later pass
+    assert [ev["id"] for ev in index.due_events(now)] == ["gagged", "same-conv"]
+    assert WorkQueue.get_instance().next_wakeup_time(now) == now + timedelta(minutes=10)
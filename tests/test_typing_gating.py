@@ -3,7 +3,7 @@
 # Copyright (c) 2025-2026 Cindy's World LLC and contributors
 # Licensed under the MIT License. See LICENSE.md for details.
 #
-from datetime import UTC
+from datetime import UTC, timedelta
 
 import pytest
 
@@ -71,3 +71,16 @@ def test_missing_flag_uses_channel_sign(fake_clock):
     pending = graph.pending_tasks(fake_clock.now(UTC))
     assert pending == [received]
 
+
+
+def test_next_ready_time_reports_typing_expiry(fake_clock):
+    graph = TaskGraph(
+        id="g-expiry",
+        context={"agent_id": 1, "channel_id": 42, "is_group_chat": False},
+    )
+    graph.add_task(TaskNode(id="received-expiry", type="received"))
+
+    mark_partner_typing(1, 42)
+    now = fake_clock.now(UTC)
+    assert graph.pending_tasks(now) == []
+    assert graph.next_ready_time(now) == now + timedelta(seconds=5)
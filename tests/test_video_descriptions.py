@@ -14,7 +14,7 @@ Covers:
 
 import base64
 import json
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import DEFAULT, AsyncMock, MagicMock, patch
 
 import httpx  # pyright: ignore[reportMissingImports]
 import pytest  # pyright: ignore[reportMissingImports]
@@ -57,6 +57,28 @@ def make_minimal_webm_bytes() -> bytes:
     return b"\x1a\x45\xdf\xa3" + b"\x00" * 20
 
 
+def writes_download(data: bytes):
+    """download_media_to_file side effect that writes data to the target path."""
+
+    async def _download(client, doc, path, max_bytes=None):
+        path.write_bytes(data)
+        return len(data)
+
+    return _download
+
+
+def capture_media_bytes(mock) -> list[bytes]:
+    """Record the media passed to an LLM describe mock (a memory map closed after get returns)."""
+    captured = []
+
+    def _capture(data, *args, **kwargs):
+        captured.append(bytes(data))
+        return DEFAULT
+
+    mock.side_effect = _capture
+    return captured
+
+
 def make_msg(**kw):
     """Create a mock Telegram message."""
     return Obj(**kw)
@@ -500,6 +522,7 @@ async def test_ai_generating_source_calls_describe_video(tmp_path):
     client = MagicMock()
     llm = MagicMock()
     llm.describe_video = AsyncMock(return_value="A person skateboarding in a park.")
+    video_bytes = capture_media_bytes(llm.describe_video)
     agent.client = client
     agent.llm = llm
 
@@ -512,8 +535,8 @@ async def test_ai_generating_source_calls_describe_video(tmp_path):
         del doc.read_bytes
 
     # Mock download_media_bytes and ensure cache directory is empty
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_video_bytes_12345"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_video_bytes_12345")
 
         # Mock detect_mime_type_from_bytes
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
@@ -532,7 +555,7 @@ async def test_ai_generating_source_calls_describe_video(tmp_path):
                 # Verify describe_video was called (not describe_image)
                 llm.describe_video.assert_called_once()
                 call_args = llm.describe_video.call_args
-                assert call_args[0][0] == b"fake_video_bytes_12345"
+                assert video_bytes == [b"fake_video_bytes_12345"]
                 assert call_args[1]["duration"] == 7
 
                 # Verify result
@@ -563,8 +586,8 @@ async def test_ai_generating_source_calls_describe_video_for_animated_sticker(tm
     if hasattr(doc, 'read_bytes'):
         del doc.read_bytes
 
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_tgs_bytes"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_tgs_bytes")
 
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "application/gzip"
@@ -637,8 +660,8 @@ async def test_ai_generating_source_calls_describe_image_for_photos(tmp_path):
     if hasattr(doc, 'read_bytes'):
         del doc.read_bytes
 
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_image_bytes"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_image_bytes")
 
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "image/jpeg"
@@ -684,8 +707,8 @@ async def test_ai_generating_source_handles_video_too_long_error(tmp_path):
     if hasattr(doc, 'read_bytes'):
         del doc.read_bytes
 
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_long_video"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_long_video")
 
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "video/mp4"
@@ -737,8 +760,8 @@ async def test_tgs_cleanup_on_llm_timeout(tmp_path):
     tgs_path.write_bytes(b"fake_tgs_data")
     video_path.write_bytes(b"fake_video_data")
     
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_tgs_bytes"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_tgs_bytes")
         
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "application/gzip"
@@ -804,8 +827,8 @@ async def test_tgs_cleanup_on_llm_runtime_error(tmp_path):
     tgs_path.write_bytes(b"fake_tgs_data")
     video_path.write_bytes(b"fake_video_data")
     
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_tgs_bytes"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_tgs_bytes")
         
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "application/gzip"
@@ -871,8 +894,8 @@ async def test_tgs_cleanup_on_llm_value_error(tmp_path):
     tgs_path.write_bytes(b"fake_tgs_data")
     video_path.write_bytes(b"fake_video_data")
     
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_tgs_bytes"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_tgs_bytes")
         
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "application/gzip"
@@ -929,8 +952,8 @@ async def test_ai_generating_source_empty_description_gets_fallback_for_sticker(
     if hasattr(doc, 'read_bytes'):
         del doc.read_bytes
 
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_image_bytes"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_image_bytes")
 
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "image/webp"
@@ -989,8 +1012,8 @@ async def test_ai_generating_source_empty_description_gets_fallback_for_animated
     tgs_path.write_bytes(b"fake_tgs_data")
     video_path.write_bytes(b"fake_video_data")
 
-    with patch("media.sources.ai_generating.download_media_bytes", new_callable=AsyncMock) as mock_download:
-        mock_download.return_value = b"fake_tgs_bytes"
+    with patch("media.sources.ai_generating.download_media_to_file", new_callable=AsyncMock) as mock_download:
+        mock_download.side_effect = writes_download(b"fake_tgs_bytes")
 
         with patch("media.mime_utils.detect_mime_type_from_bytes") as mock_detect:
             mock_detect.return_value = "application/gzip"
@@ -1031,3 +1054,27 @@ async def test_ai_generating_source_empty_description_gets_fallback_for_animated
                         # Note: TGS file cleanup may not happen in all error paths
                         # The video file should be cleaned up since LLM was called
                         assert not video_path.exists(), "Video file should be cleaned up"
+
+
+def test_tgs_video_cache_stores_by_settings_and_prunes_oldest(tmp_path, monkeypatch):
+    """Converted sticker videos are cached per render settings and bounded in count."""
+    import os
+
+    from media import tgs_video_cache
+
+    monkeypatch.setattr(tgs_video_cache, "_TGS_VIDEO_CACHE_MAX_FILES", 2)
+    video = tmp_path / "out.mp4"
+    video.write_bytes(b"video")
+
+    paths = [
+        tgs_video_cache.cached_tgs_video_path(f"uid{i}", 512, 512, 3.0, 4.0) for i in range(3)
+    ]
+    assert paths[0] != tgs_video_cache.cached_tgs_video_path("uid0", 512, 512, None, 4.0)
+    for i, path in enumerate(paths):
+        tgs_video_cache.store_cached_tgs_video(video, path)
+        os.utime(path, (1000 + i, 1000 + i))
+
+    assert paths[2].read_bytes() == b"video"
+    assert not paths[0].exists()
+    assert paths[1].exists() and paths[2].exists()
+    assert not list(paths[0].parent.glob("*.tmp"))